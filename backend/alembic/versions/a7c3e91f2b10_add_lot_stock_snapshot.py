@@ -0,0 +1,107 @@
+"""add lot_stock_snapshot
+
+Revision ID: a7c3e91f2b10
+Revises: 5d946032d272
+Create Date: 2026-10-17 10:00:00
+
+在庫系ビューが参照のたびに再集計していた出庫・予約数量を保持する派生テーブル。
+維持用の関数・トリガーは sql/views/create_views.sql で定義され、
+マイグレーション完了後のビュー再作成（env.py）で作成される。
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "a7c3e91f2b10"
+down_revision = "5d946032d272"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "lot_stock_snapshot",
+        sa.Column("lot_id", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "withdrawn_quantity",
+            sa.Numeric(15, 3),
+            server_default=sa.text("0"),
+            nullable=False,
+            comment="出庫済み数量（取消済み出庫を除く）",
+        ),
+        sa.Column(
+            "confirmed_reserved_quantity",
+            sa.Numeric(15, 3),
+            server_default=sa.text("0"),
+            nullable=False,
+            comment="確定予約数量（CONFIRMED）",
+        ),
+        sa.Column(
+            "active_reserved_quantity",
+            sa.Numeric(15, 3),
+            server_default=sa.text("0"),
+            nullable=False,
+            comment="仮予約数量（ACTIVE）",
+        ),
+        sa.Column(
+            "refreshed_at",
+            sa.DateTime(),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+            comment="最終再集計日時",
+        ),
+        sa.ForeignKeyConstraint(["lot_id"], ["lot_receipts.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("lot_id"),
+        comment="ロット在庫集計スナップショット（トリガーで同一トランザクション更新）",
+    )
+
+    # 既存ロットの初期集計
+    op.execute(
+        sa.text(
+            """
+            INSERT INTO lot_stock_snapshot (
+                lot_id, withdrawn_quantity, confirmed_reserved_quantity, active_reserved_quantity
+            )
+            SELECT
+                lr.id,
+                COALESCE(wl_sum.total_withdrawn, 0),
+                COALESCE(res.confirmed_qty, 0),
+                COALESCE(res.active_qty, 0)
+            FROM lot_receipts lr
+            LEFT JOIN (
+                SELECT wl.lot_receipt_id, SUM(wl.quantity) AS total_withdrawn
+                FROM withdrawal_lines wl
+                JOIN withdrawals wd ON wl.withdrawal_id = wd.id
+                WHERE wd.cancelled_at IS NULL
+                GROUP BY wl.lot_receipt_id
+            ) wl_sum ON wl_sum.lot_receipt_id = lr.id
+            LEFT JOIN (
+                SELECT
+                    lot_id,
+                    SUM(reserved_qty) FILTER (WHERE status = 'confirmed') AS confirmed_qty,
+                    SUM(reserved_qty) FILTER (WHERE status = 'active') AS active_qty
+                FROM lot_reservations
+                GROUP BY lot_id
+            ) res ON res.lot_id = lr.id
+            """
+        )
+    )
+
+
+def downgrade() -> None:
+    # 依存ビューは CASCADE で削除される。旧版の create_views.sql で再作成すること。
+    op.execute("DROP TRIGGER IF EXISTS trg_lot_reservations_snapshot_ins ON lot_reservations")
+    op.execute("DROP TRIGGER IF EXISTS trg_lot_reservations_snapshot_upd ON lot_reservations")
+    op.execute("DROP TRIGGER IF EXISTS trg_lot_reservations_snapshot_del ON lot_reservations")
+    op.execute("DROP TRIGGER IF EXISTS trg_withdrawal_lines_snapshot_ins ON withdrawal_lines")
+    op.execute("DROP TRIGGER IF EXISTS trg_withdrawal_lines_snapshot_upd ON withdrawal_lines")
+    op.execute("DROP TRIGGER IF EXISTS trg_withdrawal_lines_snapshot_del ON withdrawal_lines")
+    op.execute("DROP TRIGGER IF EXISTS trg_withdrawals_snapshot_upd ON withdrawals")
+    op.execute("DROP FUNCTION IF EXISTS trg_lot_reservations_stock_snapshot()")
+    op.execute("DROP FUNCTION IF EXISTS trg_withdrawal_lines_stock_snapshot()")
+    op.execute("DROP FUNCTION IF EXISTS trg_withdrawals_stock_snapshot()")
+    op.execute("DROP FUNCTION IF EXISTS refresh_lot_stock_snapshot(BIGINT[])")
+    op.execute("DROP TABLE IF EXISTS lot_stock_snapshot CASCADE")
@@ -0,0 +1,100 @@
+"""add daily_demand_facts
+
+Revision ID: b3e8d5f1c2a4
+Revises: a7c3e91f2b10
+Create Date: 2026-10-17 12:00:00
+
+需要予測・出庫カレンダーが参照のたびに再集計していた出庫実績の日次集計テーブル。
+WithdrawalService が出庫の登録・取消時に同一トランザクションで差分更新する。
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "b3e8d5f1c2a4"
+down_revision = "a7c3e91f2b10"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_demand_facts",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("supplier_item_id", sa.BigInteger(), nullable=True),
+        sa.Column("warehouse_id", sa.BigInteger(), nullable=False),
+        sa.Column("supplier_id", sa.BigInteger(), nullable=True, comment="ロットの仕入先"),
+        sa.Column("ship_date", sa.Date(), nullable=False),
+        sa.Column("withdrawal_type", sa.String(length=20), nullable=False),
+        sa.Column(
+            "quantity",
+            sa.Numeric(15, 3),
+            server_default=sa.text("0"),
+            nullable=False,
+            comment="出庫数量合計（取消済み出庫を除く）",
+        ),
+        sa.Column(
+            "withdrawal_count",
+            sa.Integer(),
+            server_default=sa.text("0"),
+            nullable=False,
+            comment="出庫件数（取消済み出庫を除く）",
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+            comment="最終更新日時",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        comment="日次需要ファクト（出庫サービスで同一トランザクション更新）",
+    )
+    op.create_index(
+        "uq_daily_demand_facts_grain",
+        "daily_demand_facts",
+        ["supplier_item_id", "ship_date", "warehouse_id", "withdrawal_type", "supplier_id"],
+        unique=True,
+        postgresql_nulls_not_distinct=True,
+    )
+    op.create_index(
+        "idx_daily_demand_facts_date",
+        "daily_demand_facts",
+        ["ship_date", "warehouse_id"],
+    )
+
+    # 既存出庫の初期集計
+    op.execute(
+        sa.text(
+            """
+            INSERT INTO daily_demand_facts (
+                supplier_item_id, ship_date, warehouse_id, withdrawal_type, supplier_id,
+                quantity, withdrawal_count
+            )
+            SELECT
+                lr.supplier_item_id,
+                wd.ship_date,
+                lr.warehouse_id,
+                wd.withdrawal_type,
+                lr.supplier_id,
+                SUM(wl.quantity),
+                COUNT(DISTINCT wd.id)
+            FROM withdrawals wd
+            JOIN withdrawal_lines wl ON wl.withdrawal_id = wd.id
+            JOIN lot_receipts lr ON wl.lot_receipt_id = lr.id
+            WHERE wd.cancelled_at IS NULL
+              AND wd.ship_date IS NOT NULL
+            GROUP BY lr.supplier_item_id, wd.ship_date, lr.warehouse_id,
+                     wd.withdrawal_type, lr.supplier_id
+            """
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_daily_demand_facts_date", table_name="daily_demand_facts")
+    op.drop_index("uq_daily_demand_facts_grain", table_name="daily_demand_facts")
+    op.drop_table("daily_demand_facts")
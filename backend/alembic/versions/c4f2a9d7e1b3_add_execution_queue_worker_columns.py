@@ -0,0 +1,51 @@
+"""add execution_queue worker columns
+
+Revision ID: c4f2a9d7e1b3
+Revises: b3e8d5f1c2a4
+Create Date: 2026-10-17 15:00:00
+
+ジョブワーカー（app.application.services.jobs）が execution_queue から
+ジョブを取得・進捗報告するための列を追加する。
+既存行は executor='inline'（従来どおり API プロセス内で実行）となる。
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "c4f2a9d7e1b3"
+down_revision = "b3e8d5f1c2a4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "execution_queue",
+        sa.Column(
+            "executor",
+            sa.String(length=20),
+            server_default=sa.text("'inline'"),
+            nullable=False,
+            comment="inline: APIプロセス内で実行 / worker: ジョブワーカーが取得",
+        ),
+    )
+    op.add_column("execution_queue", sa.Column("progress", sa.Integer(), nullable=True))
+    op.add_column("execution_queue", sa.Column("progress_message", sa.Text(), nullable=True))
+    op.add_column("execution_queue", sa.Column("worker_id", sa.String(length=100), nullable=True))
+    op.create_index(
+        "ix_execution_queue_worker_pending",
+        "execution_queue",
+        ["priority", "created_at"],
+        postgresql_where=sa.text("status = 'pending' AND executor = 'worker'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_execution_queue_worker_pending", table_name="execution_queue")
+    op.drop_column("execution_queue", "worker_id")
+    op.drop_column("execution_queue", "progress_message")
+    op.drop_column("execution_queue", "progress")
+    op.drop_column("execution_queue", "executor")
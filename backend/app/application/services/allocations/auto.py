@@ -114,6 +114,17 @@ v3.0: Delegates to AllocationCandidateService (SSOT).
     → 全明細の引当が完了してから、1回だけコミット
     メリット:
     - トランザクション回数の削減
+
+11. なぜ set_based モードがあるのか
+    理由: 明細数に比例するクエリ数の解消
+    問題:
+    - 明細別処理は1明細あたり既存予約取得・候補取得・予約作成・ステータス更新
+    → 月末の数千明細で数分かかる
+    解決:
+    - set_based=True: bulk_auto.auto_reserve_bulk_set_based() に委譲
+    → 既存予約・候補ロットを一括取得し、メモリ上でFEFO計算、バルクINSERT
+    互換性:
+    - 引当結果・サマリーは明細別処理と同一（既定は従来の明細別処理）
 """
 
 from __future__ import annotations
@@ -351,6 +362,7 @@ def auto_reserve_bulk(
     delivery_place_id: int | None = None,
     order_type: str | None = None,
     skip_already_reserved: bool = True,
+    set_based: bool = False,
 ) -> dict:
     """複数受注明細に対して一括でFEFO自動予約を実行.
 
@@ -363,6 +375,8 @@ def auto_reserve_bulk(
         delivery_place_id: 納入先ID（指定時はその納入先のみ対象）
         order_type: 受注タイプ（FORECAST_LINKED, KANBAN, SPOT, ORDER）
         skip_already_reserved: True の場合、既に全量予約済みの明細はスキップ
+        set_based: True の場合、セットベースの一括引当エンジン（bulk_auto）を使用
+            （結果は明細別処理と同一、クエリ数は明細数に依存しない）
 
     Returns:
         dict: 処理結果サマリー
@@ -388,7 +402,7 @@ def auto_reserve_bulk(
     if order_type is not None:
         query = query.filter(OrderLine.order_type == order_type)
 
-    order_lines = query.order_by(OrderLine.delivery_date.asc()).all()
+    order_lines = query.order_by(OrderLine.delivery_date.asc(), OrderLine.id.asc()).all()
 
     logger.info(
         "Starting bulk auto reserve",
@@ -398,9 +412,23 @@ def auto_reserve_bulk(
             "customer_id": customer_id,
             "delivery_place_id": delivery_place_id,
             "order_type": order_type,
+            "set_based": set_based,
         },
     )
 
+    if set_based:
+        from app.application.services.allocations.bulk_auto import (
+            auto_reserve_bulk_set_based,
+        )
+
+        set_result = auto_reserve_bulk_set_based(
+            db, order_lines, skip_already_reserved=skip_already_reserved
+        )
+        if set_result["total_reservations"] > 0:
+            db.commit()
+        _log_bulk_result(set_result)
+        return set_result
+
     result: dict[str, Any] = {
         "processed_lines": 0,
         "reserved_lines": 0,
@@ -444,6 +472,12 @@ def auto_reserve_bulk(
     if result["total_reservations"] > 0:
         db.commit()
 
+    _log_bulk_result(result)
+
+    return result
+
+
+def _log_bulk_result(result: dict[str, Any]) -> None:
     logger.info(
         "Bulk auto reserve completed",
         extra={
@@ -454,5 +488,3 @@ def auto_reserve_bulk(
             "failed_count": len(result["failed_lines"]),
         },
     )
-
-    return result
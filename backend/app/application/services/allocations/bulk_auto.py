@@ -0,0 +1,266 @@
+"""Set-based bulk auto-reservation engine.
+
+auto_reserve_bulk(set_based=True) の実装。
+
+【設計意図】セットベース一括引当の設計判断:
+
+1. なぜ明細ループをやめるのか
+   理由: 月末の一括引当で明細数に比例したクエリが発生していた
+   問題:
+   - 明細ごとに既存予約の集計、候補ロット取得、予約INSERT、ステータス更新
+   → 数千明細で数万クエリ、処理に数分
+   解決:
+   - 対象明細・既存予約・候補ロットをそれぞれ1回のクエリで取得
+   - 引当計算はメモリ上で実施
+   - 予約は1回のバルクINSERT、ステータスは一括UPDATE
+   → クエリ数は明細数に依存しない
+
+2. なぜ (supplier_item_id, warehouse_id) 単位で候補をまとめるのか
+   理由: 候補ロットの抽出条件が製品と倉庫で決まるため
+   → 同じキーの明細は同じ候補リスト・同じ在庫台帳を共有する
+
+3. LotAvailabilityLedger（共有在庫台帳）の設計
+   理由: ロットごとの利用可能数量を実行全体で一元管理する
+   ルール:
+   - 初期値は候補取得時の利用可能数量（received - CONFIRMED予約 - locked）
+   - CONFIRMED 予約の記帳のみ利用可能数量を減らす
+   - ACTIVE（仮予約）は provisional に記帳するだけ
+   → stock_calculation の不変条件（§1.2: 仮予約は利用可能数量を減らさない）と同じ
+   → 明細別パス（auto_reserve_line）と同じ引当結果になる
+
+4. なぜ domain の calculate_allocation を使うのか
+   理由: 引当計算ロジックのSSoT
+   - strategy="fefo": 明細別パスと同じFEFO分割引当
+   - strategy="single_lot_fit": 単一ロットで充足できる場合はそれを優先
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field, replace
+from datetime import date
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.application.services.allocations.candidate_service import (
+    AllocationCandidateService,
+)
+from app.application.services.allocations.utils import (
+    update_order_allocation_statuses,
+    update_order_line_statuses,
+)
+from app.core.time_utils import utcnow
+from app.domain.allocation import AllocationRequest, calculate_allocation
+from app.domain.allocation_policy import AllocationPolicy, LockMode
+from app.domain.lot import LotCandidate
+from app.infrastructure.monitoring.sql_profiler import sql_budget
+from app.infrastructure.persistence.models import LotReceipt, OrderLine
+from app.infrastructure.persistence.models.lot_reservations_model import (
+    LotReservation,
+    ReservationSourceType,
+    ReservationStatus,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LotAvailabilityLedger:
+    """Per-lot availability shared by every line in one bulk run."""
+
+    available: dict[int, Decimal] = field(default_factory=dict)
+    provisional: dict[int, Decimal] = field(default_factory=lambda: defaultdict(Decimal))
+
+    def load(self, candidates: list[LotCandidate]) -> None:
+        """Register the initial availability of candidate lots."""
+        for candidate in candidates:
+            self.available.setdefault(candidate.lot_id, Decimal(str(candidate.available_qty)))
+
+    def adjusted(self, candidates: list[LotCandidate]) -> list[LotCandidate]:
+        """Return candidates with the ledger's current availability (empty lots dropped)."""
+        adjusted: list[LotCandidate] = []
+        for candidate in candidates:
+            available = self.available.get(candidate.lot_id, Decimal("0"))
+            if available <= 0:
+                continue
+            adjusted.append(replace(candidate, available_qty=float(available)))
+        return adjusted
+
+    def record(self, lot_id: int, quantity: Decimal, status: ReservationStatus) -> None:
+        """Book a reservation against a lot.
+
+        Only CONFIRMED reservations reduce availability; ACTIVE ones are provisional.
+        """
+        if status == ReservationStatus.CONFIRMED:
+            self.available[lot_id] = self.available.get(lot_id, Decimal("0")) - quantity
+        else:
+            self.provisional[lot_id] += quantity
+
+
+def _load_reserved_totals(db: Session, line_ids: list[int]) -> dict[int, Decimal]:
+    """Sum non-released reservations per order line in one query."""
+    if not line_ids:
+        return {}
+
+    stmt = (
+        select(LotReservation.source_id, func.sum(LotReservation.reserved_qty))
+        .where(
+            LotReservation.source_type == ReservationSourceType.ORDER,
+            LotReservation.source_id.in_(line_ids),
+            LotReservation.status != ReservationStatus.RELEASED,
+        )
+        .group_by(LotReservation.source_id)
+    )
+    return {
+        int(source_id): Decimal(total or 0)
+        for source_id, total in db.execute(stmt).all()
+        if source_id is not None
+    }
+
+
+def _load_candidates(
+    db: Session, order_lines: list[OrderLine]
+) -> dict[tuple[int, int | None], list[LotCandidate]]:
+    """Fetch FEFO candidates for every (supplier_item_id, warehouse_id) key at once.
+
+    One query per distinct warehouse filter (usually only ``None``).
+    """
+    products_by_warehouse: dict[int | None, set[int]] = defaultdict(set)
+    for line in order_lines:
+        if line.supplier_item_id:
+            products_by_warehouse[getattr(line, "warehouse_id", None)].add(line.supplier_item_id)
+
+    candidate_service = AllocationCandidateService(db)
+    candidates: dict[tuple[int, int | None], list[LotCandidate]] = {}
+    for warehouse_id, product_ids in products_by_warehouse.items():
+        by_product = candidate_service.get_candidates_for_products(
+            sorted(product_ids),
+            policy=AllocationPolicy.FEFO,
+            lock_mode=LockMode.FOR_UPDATE,
+            warehouse_ids=[warehouse_id] if warehouse_id is not None else None,
+            exclude_expired=True,
+            exclude_locked=False,
+        )
+        for product_id, product_candidates in by_product.items():
+            candidates[(product_id, warehouse_id)] = product_candidates
+    return candidates
+
+
+# 明細数に依存しない（候補ロットの取得は倉庫フィルタごとに 1 回）
+@sql_budget(max_queries=15)
+def auto_reserve_bulk_set_based(
+    db: Session,
+    order_lines: list[OrderLine],
+    *,
+    skip_already_reserved: bool = True,
+    strategy: str = "fefo",
+) -> dict[str, Any]:
+    """Reserve lots for many order lines with a constant number of queries.
+
+    Args:
+        db: Database session
+        order_lines: Target order lines, in allocation priority order
+        skip_already_reserved: True の場合、既に全量予約済みの明細はスキップ
+        strategy: Allocation strategy ("fefo" or "single_lot_fit")
+
+    Returns:
+        dict: auto_reserve_bulk と同じ形式の処理結果サマリー
+    """
+    result: dict[str, Any] = {
+        "processed_lines": 0,
+        "reserved_lines": 0,
+        "total_reservations": 0,
+        "skipped_lines": 0,
+        "failed_lines": [],
+    }
+
+    reserved_totals = _load_reserved_totals(db, [line.id for line in order_lines])
+    candidates_by_key = _load_candidates(db, order_lines)
+
+    ledger = LotAvailabilityLedger()
+    for key_candidates in candidates_by_key.values():
+        ledger.load(key_candidates)
+
+    reference_date = date.today()
+    planned: list[tuple[OrderLine, int, Decimal]] = []
+
+    for line in order_lines:
+        result["processed_lines"] += 1
+
+        already_reserved = reserved_totals.get(line.id, Decimal("0"))
+        required_qty = Decimal(str(line.order_quantity)) - already_reserved
+
+        if required_qty <= 0:
+            if skip_already_reserved:
+                result["skipped_lines"] += 1
+            continue
+
+        key = (line.supplier_item_id or 0, getattr(line, "warehouse_id", None))
+        try:
+            line_candidates = ledger.adjusted(candidates_by_key.get(key, []))
+            if not line_candidates:
+                continue
+
+            allocation = calculate_allocation(
+                AllocationRequest(
+                    order_line_id=line.id,
+                    required_quantity=required_qty,
+                    reference_date=reference_date,
+                    strategy=strategy,
+                ),
+                line_candidates,
+            )
+        except Exception as e:
+            logger.error(
+                "Auto reserve failed for line",
+                extra={"order_line_id": line.id, "error": str(e)},
+                exc_info=True,
+            )
+            result["failed_lines"].append({"line_id": line.id, "error": str(e)})
+            continue
+
+        line_reservations = 0
+        for decision in allocation.allocated_lots:
+            if decision.lot_id is None or decision.allocated_qty <= 0:
+                continue
+            ledger.record(decision.lot_id, decision.allocated_qty, ReservationStatus.ACTIVE)
+            planned.append((line, decision.lot_id, decision.allocated_qty))
+            line_reservations += 1
+
+        if line_reservations:
+            result["reserved_lines"] += 1
+            result["total_reservations"] += line_reservations
+
+    if not planned:
+        return result
+
+    now = utcnow()
+    db.execute(
+        insert(LotReservation),
+        [
+            {
+                "lot_id": lot_id,
+                "source_type": ReservationSourceType.ORDER,
+                "source_id": line.id,
+                "reserved_qty": quantity,
+                "status": ReservationStatus.ACTIVE,
+                "created_at": now,
+            }
+            for line, lot_id, quantity in planned
+        ],
+    )
+    db.execute(
+        update(LotReceipt)
+        .where(LotReceipt.id.in_({lot_id for _, lot_id, _ in planned}))
+        .values(updated_at=now, version=LotReceipt.version + 1)
+    )
+
+    update_order_line_statuses(db, (line.id for line, _, _ in planned))
+    update_order_allocation_statuses(db, (line.order_id for line, _, _ in planned))
+
+    return result
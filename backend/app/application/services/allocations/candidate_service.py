@@ -7,6 +7,7 @@ All allocation-related candidate queries should go through this service.
 from __future__ import annotations
 
 import logging
+from collections.abc import Sequence
 from typing import TYPE_CHECKING
 
 from sqlalchemy.orm import Session
@@ -181,10 +182,11 @@ class AllocationCandidateService:
 
     def get_candidates_for_products(
         self,
-        supplier_item_ids: list[int],
+        supplier_item_ids: Sequence[int],
         *,
         policy: AllocationPolicy,
         lock_mode: LockMode = LockMode.NONE,
+        warehouse_ids: Sequence[int] | None = None,
         exclude_expired: bool = True,
         safety_days: int = 0,
         exclude_locked: bool = True,
@@ -192,14 +194,16 @@ class AllocationCandidateService:
         include_adhoc: bool = False,
         min_available_qty: float = 0.0,
     ) -> dict[int, list[LotCandidate]]:
-        """Fetch allocation candidates for multiple products.
+        """Fetch allocation candidates for multiple products in a single query.
 
-        Convenience method for batch operations.
+        Uses LotRepository.find_allocation_candidates_for_products() so the
+        cost is one round trip regardless of the number of products.
 
         Args:
             supplier_item_ids: List of product IDs to fetch candidates for
             policy: Sorting policy (FEFO or FIFO) - REQUIRED
             lock_mode: Database locking mode (default: NONE)
+            warehouse_ids: Optional warehouse filter (None = all warehouses)
             exclude_expired: Exclude lots past expiry date (default: True)
             safety_days: Safety margin in days before expiry (default: 0)
             exclude_locked: Exclude lots with locked_quantity > 0 (default: True)
@@ -209,31 +213,35 @@ class AllocationCandidateService:
 
         Returns:
             Dict mapping supplier_item_id to list of LotCandidate
+            (products without candidates are omitted)
         """
         logger.debug(
             "Batch candidate fetch started",
-            extra={"product_count": len(supplier_item_ids), "policy": policy.value},
+            extra={
+                "product_count": len(supplier_item_ids),
+                "policy": policy.value,
+                "lock_mode": lock_mode.value if hasattr(lock_mode, "value") else str(lock_mode),
+                "warehouse_ids": list(warehouse_ids) if warehouse_ids is not None else None,
+            },
+        )
+        result = self._repo.find_allocation_candidates_for_products(
+            supplier_item_ids,
+            policy=policy,
+            lock_mode=lock_mode,
+            warehouse_ids=warehouse_ids,
+            exclude_expired=exclude_expired,
+            safety_days=safety_days,
+            exclude_locked=exclude_locked,
+            include_sample=include_sample,
+            include_adhoc=include_adhoc,
+            min_available_qty=min_available_qty,
         )
-        result: dict[int, list[LotCandidate]] = {}
-        for supplier_item_id in supplier_item_ids:
-            candidates = self.get_candidates(
-                supplier_item_id=supplier_item_id,
-                policy=policy,
-                lock_mode=lock_mode,
-                exclude_expired=exclude_expired,
-                safety_days=safety_days,
-                exclude_locked=exclude_locked,
-                include_sample=include_sample,
-                include_adhoc=include_adhoc,
-                min_available_qty=min_available_qty,
-            )
-            if candidates:
-                result[supplier_item_id] = candidates
         logger.info(
             "Batch candidate fetch completed",
             extra={
-                "requested": len(supplier_item_ids),
+                "requested": len(set(supplier_item_ids)),
                 "with_candidates": len(result),
+                "candidate_count": sum(len(c) for c in result.values()),
             },
         )
         return result
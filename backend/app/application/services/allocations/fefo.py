@@ -143,21 +143,43 @@ r"""FEFO引当プレビュー機能.
     → 「この受注をFEFO引当すると、ロットXから50個、ロットYから30個」
     - 警告の一覧表示
     → 「在庫不足: 製品A 10個、製品B 20個」
+
+11. 受注単位プランナー（plan_order_allocations）の設計
+    理由: 200明細超の受注でプレビュー・確定が遅かった
+    問題:
+    - 明細ごとに SupplierItem / Warehouse 取得、_resolve_next_div、
+      候補ロット取得が走る（明細数に比例したクエリ）
+    - 引当結果からのロット検索が next(...) の線形探索（O(n²)）
+    解決:
+    - prefetch_order_context() で全明細分の既存予約・製品・倉庫・候補ロットを
+      まとめて取得（候補は get_candidates_for_products の1クエリ）
+    - 候補は (製品, 倉庫) ごとに lot_id → LotCandidate の辞書で保持
+      → 挿入順がFEFO順なので、並び順と O(1) 検索を両立
+    - 明細ごとの計画は _plan_line() に集約
+      → calculate_line_allocations()（単一明細）と同じロジック
+    - フェーズ別処理時間（load_order / prefetch / plan / total, ミリ秒）を
+      FefoPreviewResult.timings に格納し、プレビューAPIで返す
 """
 
 from __future__ import annotations
 
 import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
 from decimal import Decimal
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
 
-from app.infrastructure.persistence.models import Order, OrderLine, SupplierItem
+from app.domain.lot import LotCandidate
+from app.infrastructure.persistence.models import Order, OrderLine, SupplierItem, Warehouse
 
 from .schemas import FefoLinePlan, FefoLotPlan, FefoPreviewResult
 from .utils import (
     _existing_allocated_qty,
     _load_order,
+    _next_div_for_product,
     _resolve_next_div,
 )
 
@@ -165,6 +187,16 @@ from .utils import (
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class OrderAllocationContext:
+    """Masters and FEFO candidates prefetched for a set of order lines."""
+
+    products: dict[int, SupplierItem] = field(default_factory=dict)
+    warehouse_codes: dict[int, str] = field(default_factory=dict)
+    # (supplier_item_id, warehouse_id) -> {lot_id: candidate}（挿入順 = FEFO順）
+    candidates: dict[tuple[int, int | None], dict[int, LotCandidate]] = field(default_factory=dict)
+
+
 def validate_preview_eligibility(order: Order) -> None:
     """Validate order status for preview operation.
 
@@ -207,30 +239,97 @@ def load_order_for_preview(db: Session, order_id: int) -> Order:
     return order
 
 
-def calculate_line_allocations(
-    db: Session,
-    line: OrderLine,
-    order: Order,
-    available_per_lot: dict[int, float],
-) -> FefoLinePlan:
-    """Calculate FEFO allocations for a single order line.
+def _line_quantities(line: OrderLine) -> tuple[float, float, float]:
+    """Return (required, already_allocated, remaining) for an order line."""
+    required_qty = float(
+        line.converted_quantity
+        if line.converted_quantity is not None
+        else line.order_quantity or 0.0
+    )
+    already_allocated = _existing_allocated_qty(line)
+    return required_qty, already_allocated, required_qty - already_allocated
+
+
+def prefetch_order_context(db: Session, lines: list[OrderLine]) -> OrderAllocationContext:
+    """Load reservations, masters and FEFO candidates for all lines at once.
 
     Args:
         db: Database session
-        line: Order line to allocate
-        order: Parent order
-        available_per_lot: Shared availability tracker
+        lines: Order lines to plan
 
     Returns:
-        FefoLinePlan: Allocation plan for this line
+        OrderAllocationContext: Prefetched data shared by every line
     """
-    required_qty = float(
-        line.converted_quantity
-        if line.converted_quantity is not None
-        else line.order_quantity or 0.0
+    from app.application.services.allocations.candidate_service import (
+        AllocationCandidateService,
     )
-    already_allocated = _existing_allocated_qty(line)
-    remaining = required_qty - already_allocated
+    from app.domain.allocation_policy import AllocationPolicy
+
+    context = OrderAllocationContext()
+    if not lines:
+        return context
+
+    # 既存予約を一括ロード（_existing_allocated_qty の明細ごとの遅延ロードを防ぐ）
+    db.execute(
+        select(OrderLine)
+        .options(selectinload(OrderLine.lot_reservations))
+        .where(OrderLine.id.in_([line.id for line in lines]))
+    ).scalars().all()
+
+    product_ids = {line.supplier_item_id for line in lines if line.supplier_item_id}
+    if product_ids:
+        context.products = {
+            product.id: product
+            for product in db.execute(
+                select(SupplierItem).where(SupplierItem.id.in_(product_ids))
+            ).scalars()
+        }
+
+    warehouse_ids = {
+        warehouse_id for line in lines if (warehouse_id := getattr(line, "warehouse_id", None))
+    }
+    if warehouse_ids:
+        context.warehouse_codes = {
+            warehouse_id: code
+            for warehouse_id, code in db.execute(
+                select(Warehouse.id, Warehouse.warehouse_code).where(
+                    Warehouse.id.in_(warehouse_ids)
+                )
+            ).all()
+        }
+
+    products_by_warehouse: dict[int | None, set[int]] = defaultdict(set)
+    for line in lines:
+        if line.supplier_item_id and _line_quantities(line)[2] > 0:
+            products_by_warehouse[getattr(line, "warehouse_id", None)].add(line.supplier_item_id)
+
+    service = AllocationCandidateService(db)
+    for warehouse_id, warehouse_product_ids in products_by_warehouse.items():
+        by_product = service.get_candidates_for_products(
+            sorted(warehouse_product_ids),
+            policy=AllocationPolicy.FEFO,
+            warehouse_ids=[warehouse_id] if warehouse_id is not None else None,
+            min_available_qty=0.001,  # Filter out 0 qty candidates
+        )
+        for product_id in warehouse_product_ids:
+            context.candidates[(product_id, warehouse_id)] = {
+                candidate.lot_id: candidate for candidate in by_product.get(product_id, [])
+            }
+
+    return context
+
+
+def _plan_line(
+    db: Session,
+    line: OrderLine,
+    order: Order,
+    available_per_lot: dict[int, float],
+    context: OrderAllocationContext,
+) -> FefoLinePlan:
+    """Plan FEFO allocations for one line from prefetched context."""
+    from app.application.services.allocations.allocator import allocate_soft_for_forecast
+
+    required_qty, already_allocated, remaining = _line_quantities(line)
 
     logger.debug(
         "Calculating line allocation",
@@ -244,21 +343,9 @@ def calculate_line_allocations(
 
     supplier_item_id = getattr(line, "supplier_item_id", None)
     warehouse_id = getattr(line, "warehouse_id", None)
-    product_code = None
-    warehouse_code = None
-
-    if supplier_item_id:
-        product = db.query(SupplierItem).filter(SupplierItem.id == supplier_item_id).first()
-        if product:
-            product_code = product.maker_part_no
-
-    # Get warehouse_code from warehouse_id if needed
-    if warehouse_id and not warehouse_code:
-        from app.infrastructure.persistence.models import Warehouse
-
-        warehouse = db.query(Warehouse).filter(Warehouse.id == warehouse_id).first()
-        if warehouse:
-            warehouse_code = warehouse.warehouse_code
+    product = context.products.get(supplier_item_id) if supplier_item_id else None
+    product_code = product.maker_part_no if product else None
+    warehouse_code = context.warehouse_codes.get(warehouse_id) if warehouse_id else None
 
     if not supplier_item_id:
         warning = f"製品ID未設定: order_line={line.id}"
@@ -273,7 +360,10 @@ def calculate_line_allocations(
             warnings=[warning],
         )
 
-    next_div_value, next_div_warning = _resolve_next_div(db, order, line)
+    if product is not None:
+        next_div_value, next_div_warning = _next_div_for_product(order, line, product)
+    else:
+        next_div_value, next_div_warning = _resolve_next_div(db, order, line)
     line_plan = FefoLinePlan(
         order_line_id=line.id,
         supplier_item_id=supplier_item_id,
@@ -290,20 +380,7 @@ def calculate_line_allocations(
 
     # Allocate lots using unified allocator (Single Lot Fit + FEFO)
     if remaining > 0:
-        from app.application.services.allocations.allocator import allocate_soft_for_forecast
-        from app.application.services.allocations.candidate_service import (
-            AllocationCandidateService,
-        )
-        from app.domain.allocation_policy import AllocationPolicy
-
-        # Prepare candidates with correct availability context
-        service = AllocationCandidateService(db)
-        candidates = service.get_candidates(
-            supplier_item_id=supplier_item_id,
-            policy=AllocationPolicy.FEFO,
-            warehouse_id=warehouse_id,
-            min_available_qty=0.001,  # Filter out 0 qty candidates
-        )
+        candidates_by_lot = context.candidates.get((supplier_item_id, warehouse_id), {})
 
         logger.debug(
             "Retrieved FEFO candidates",
@@ -311,14 +388,14 @@ def calculate_line_allocations(
                 "order_line_id": line.id,
                 "supplier_item_id": supplier_item_id,
                 "warehouse_id": warehouse_id,
-                "candidate_count": len(candidates),
+                "candidate_count": len(candidates_by_lot),
             },
         )
 
         valid_candidates = []
         temp_allocations: dict[int, Decimal] = {}
 
-        for candidate in candidates:
+        for candidate in candidates_by_lot.values():
             # Check availability tracking
             current_tracked_available = available_per_lot.get(
                 candidate.lot_id, float(candidate.available_qty)
@@ -356,9 +433,8 @@ def calculate_line_allocations(
         )
 
         for res in results:
-            # Map back to FefoLotPlan
-            # Find the lot object (candidates has it)
-            allocated_lot = next(l for l in candidates if l.lot_id == res.lot_id)
+            # Map back to FefoLotPlan (lot_id index, O(1))
+            allocated_lot = candidates_by_lot[res.lot_id]
             allocated_qty_float = float(res.quantity)
 
             line_plan.allocations.append(
@@ -406,6 +482,27 @@ def calculate_line_allocations(
     return line_plan
 
 
+def calculate_line_allocations(
+    db: Session,
+    line: OrderLine,
+    order: Order,
+    available_per_lot: dict[int, float],
+) -> FefoLinePlan:
+    """Calculate FEFO allocations for a single order line.
+
+    Args:
+        db: Database session
+        line: Order line to allocate
+        order: Parent order
+        available_per_lot: Shared availability tracker
+
+    Returns:
+        FefoLinePlan: Allocation plan for this line
+    """
+    context = prefetch_order_context(db, [line])
+    return _plan_line(db, line, order, available_per_lot, context)
+
+
 def build_preview_result(
     order_id: int,
     line_plans: list[FefoLinePlan],
@@ -426,6 +523,47 @@ def build_preview_result(
     return FefoPreviewResult(order_id=order_id, lines=line_plans, warnings=all_warnings)
 
 
+def _elapsed_ms(start: float, end: float) -> float:
+    return round((end - start) * 1000, 3)
+
+
+def plan_order_allocations(db: Session, order: Order) -> FefoPreviewResult:
+    """Plan FEFO allocations for every line of an order with prefetched data.
+
+    Args:
+        db: Database session
+        order: Order entity (lines loaded)
+
+    Returns:
+        FefoPreviewResult: Preview result (timings: prefetch / plan in ms)
+    """
+    started = time.perf_counter()
+
+    sorted_lines = sorted(order.order_lines, key=lambda l: l.id)
+    logger.debug(
+        "Processing order lines",
+        extra={"order_id": order.id, "line_count": len(sorted_lines)},
+    )
+
+    context = prefetch_order_context(db, sorted_lines)
+    prefetched = time.perf_counter()
+
+    available_per_lot: dict[int, float] = {}
+    preview_lines: list[FefoLinePlan] = []
+    for line in sorted_lines:
+        if _line_quantities(line)[2] <= 0:
+            continue
+        preview_lines.append(_plan_line(db, line, order, available_per_lot, context))
+    planned = time.perf_counter()
+
+    result = build_preview_result(order.id, preview_lines)
+    result.timings = {
+        "prefetch": _elapsed_ms(started, prefetched),
+        "plan": _elapsed_ms(prefetched, planned),
+    }
+    return result
+
+
 def preview_fefo_allocation(db: Session, order_id: int) -> FefoPreviewResult:
     """FEFO引当プレビュー（状態: draft|open|part_allocated|allocated 許容）.
 
@@ -434,46 +572,31 @@ def preview_fefo_allocation(db: Session, order_id: int) -> FefoPreviewResult:
         order_id: 注文ID
 
     Returns:
-        FefoPreviewResult: 引当プレビュー結果
+        FefoPreviewResult: 引当プレビュー結果（timings にフェーズ別処理時間）
 
     Raises:
         ValueError: 注文が見つからない、または状態が不正な場合
     """
     logger.info("Starting FEFO preview", extra={"order_id": order_id})
+    started = time.perf_counter()
 
     order = load_order_for_preview(db, order_id)
+    loaded = time.perf_counter()
 
-    available_per_lot: dict[int, float] = {}
-    preview_lines: list[FefoLinePlan] = []
-
-    sorted_lines = sorted(order.order_lines, key=lambda l: l.id)
-    logger.debug(
-        "Processing order lines",
-        extra={"order_id": order_id, "line_count": len(sorted_lines)},
-    )
-
-    for line in sorted_lines:
-        required_qty = float(
-            line.converted_quantity
-            if line.converted_quantity is not None
-            else line.order_quantity or 0.0
-        )
-        already_allocated = _existing_allocated_qty(line)
-        remaining = required_qty - already_allocated
-
-        if remaining <= 0:
-            continue
-
-        line_plan = calculate_line_allocations(db, line, order, available_per_lot)
-        preview_lines.append(line_plan)
+    result = plan_order_allocations(db, order)
+    result.timings = {
+        "load_order": _elapsed_ms(started, loaded),
+        **result.timings,
+        "total": _elapsed_ms(started, time.perf_counter()),
+    }
 
-    result = build_preview_result(order_id, preview_lines)
     logger.info(
         "FEFO preview completed",
         extra={
             "order_id": order_id,
-            "lines_processed": len(preview_lines),
+            "lines_processed": len(result.lines),
             "warning_count": len(result.warnings),
+            "timings_ms": result.timings,
         },
     )
     return result
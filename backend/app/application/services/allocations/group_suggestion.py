@@ -1,23 +1,30 @@
 """Group-based allocation suggestion service (グループ別引当推奨).
 
 Handles regeneration of allocation suggestions for specific customer/product groups.
+
+The group's keys are marked dirty and regenerated incrementally, so the group is
+allocated together with the other groups and periods of the same product (the
+result matches a full rebuild) and only changed rows are written.
 """
 
 from decimal import Decimal
+from typing import Any
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.application.services.allocations.incremental_suggestion import (
+    IncrementalAllocationSuggestionService,
+    SuggestionDirtySet,
+)
 from app.application.services.allocations.suggestion_base import (
     AllocationSuggestionBase,
     create_stats_summary,
-    finalize_stats_and_gaps,
 )
 from app.infrastructure.persistence.models.forecast_models import ForecastCurrent
 from app.infrastructure.persistence.models.inventory_models import AllocationSuggestion
 from app.presentation.schemas.allocations.allocation_suggestions_schema import (
-    AllocationStatsSummary,
     AllocationSuggestionPreviewResponse,
-    AllocationSuggestionResponse,
 )
 
 
@@ -44,67 +51,52 @@ class GroupAllocationSuggestionService(AllocationSuggestionBase):
             forecast_period: 期間 (YYYY-MM)、省略時は全期間
 
         Returns:
-            AllocationSuggestionPreviewResponse with suggestions, stats, and gaps.
+            AllocationSuggestionPreviewResponse with suggestions, stats, and gaps
+            (limited to this group and, if given, forecast_period).
         """
-        # 1. Delete existing suggestions for this group
-        delete_query = self.db.query(AllocationSuggestion).filter(
-            AllocationSuggestion.customer_id == customer_id,
-            AllocationSuggestion.delivery_place_id == delivery_place_id,
-            AllocationSuggestion.supplier_item_id == supplier_item_id,
-        )
+        group = (customer_id, delivery_place_id, supplier_item_id)
         if forecast_period:
-            delete_query = delete_query.filter(
-                AllocationSuggestion.forecast_period == forecast_period
+            periods = {forecast_period}
+        else:
+            # 全期間: フォーキャストまたは既存提案のある期間
+            stmt = (
+                select(ForecastCurrent.forecast_period)
+                .where(
+                    ForecastCurrent.customer_id == group[0],
+                    ForecastCurrent.delivery_place_id == group[1],
+                    ForecastCurrent.supplier_item_id == group[2],
+                )
+                .union(
+                    select(AllocationSuggestion.forecast_period).where(
+                        AllocationSuggestion.customer_id == group[0],
+                        AllocationSuggestion.delivery_place_id == group[1],
+                        AllocationSuggestion.supplier_item_id == group[2],
+                    )
+                )
             )
-        delete_query.delete(synchronize_session=False)
+            periods = set(self.db.scalars(stmt))
 
-        # 2. Fetch forecasts for this group
-        forecast_query = self.db.query(ForecastCurrent).filter(
-            ForecastCurrent.customer_id == customer_id,
-            ForecastCurrent.delivery_place_id == delivery_place_id,
-            ForecastCurrent.supplier_item_id == supplier_item_id,
+        dirty = SuggestionDirtySet()
+        for period in periods:
+            dirty.mark_forecast(customer_id, delivery_place_id, supplier_item_id, period)
+        response = IncrementalAllocationSuggestionService(self.db).regenerate(
+            dirty, source="group_regenerate"
         )
-        if forecast_period:
-            forecast_query = forecast_query.filter(
-                ForecastCurrent.forecast_period == forecast_period
-            )
-
-        forecasts = forecast_query.order_by(ForecastCurrent.forecast_date, ForecastCurrent.id).all()
 
-        if not forecasts:
-            return AllocationSuggestionPreviewResponse(
-                suggestions=[],
-                stats=AllocationStatsSummary(
-                    total_forecast_quantity=Decimal(0),
-                    total_allocated_quantity=Decimal(0),
-                    total_shortage_quantity=Decimal(0),
-                    per_key=[],
-                ),
-                gaps=[],
-            )
-
-        lots_by_product = self._fetch_available_lots([supplier_item_id])
-
-        # 3. Process forecasts using shared method
-        result = self._process_forecasts(forecasts, lots_by_product, source="group_regenerate")
-
-        # 4. Finalize stats & gaps
-        stats_per_key, gaps = finalize_stats_and_gaps(result.stats_agg)
-
-        # 5. Bulk insert
-        if result.suggestions:
-            self.db.add_all(result.suggestions)
-            self.db.commit()
-
-        stats_summary = create_stats_summary(
-            result.total_forecast, result.total_allocated, result.total_shortage, stats_per_key
-        )
+        # 再計算は製品の全期間だが、レスポンスはこのグループ（・期間）分のみ
+        def in_group(item: Any) -> bool:
+            if forecast_period and item.forecast_period != forecast_period:
+                return False
+            return (item.customer_id, item.delivery_place_id, item.supplier_item_id) == group
 
+        per_key = [k for k in response.stats.per_key if in_group(k)]
         return AllocationSuggestionPreviewResponse(
-            suggestions=[
-                AllocationSuggestionResponse.model_validate(s, from_attributes=True)
-                for s in result.suggestions
-            ],
-            stats=stats_summary,
-            gaps=gaps,
+            suggestions=[s for s in response.suggestions if in_group(s)],
+            stats=create_stats_summary(
+                sum((k.forecast_quantity for k in per_key), Decimal(0)),
+                sum((k.allocated_quantity for k in per_key), Decimal(0)),
+                sum((k.shortage_quantity for k in per_key), Decimal(0)),
+                per_key,
+            ),
+            gaps=[g for g in response.gaps if in_group(g)],
         )
@@ -0,0 +1,213 @@
+"""Incremental allocation suggestion service (引当推奨の差分再生成).
+
+変更のあった (得意先, 納入先, 製品, 期間) キーとロットだけを追跡し、
+影響を受ける製品のみを再計算して差分（INSERT / UPDATE / DELETE）を適用する。
+
+【設計意図】なぜ差分再生成にするのか:
+- 以前はフォーキャストの登録・更新・削除・インポートのたびに
+  期間（またはグループ）の全提案を削除し、全フォーキャストから作り直していた
+  → 1件の更新でも期間全体の再計算・全行の DELETE / INSERT が発生し、
+    提案行に付けた成績書発行日・コメント等も消えていた
+- 提案は製品単位で独立に計算される（ロットは製品ごと）
+  - 同じ製品の全期間のフォーキャストを (forecast_date, id) 順に1回で割り当てる
+    （前の期間が使ったロット在庫は後の期間に回らない: _process_forecasts）
+  - このため期間単位では独立しておらず、1期間の変更が後続期間の割当を変えうる
+  → 変更キーの製品の全期間を再計算すれば、全件再構築と同じ結果になる
+
+【設計意図】差分の適用:
+- 既存行と再計算結果を (forecast_id, lot_id) で突き合わせる
+  - 一致: 数量・優先度が変わった場合のみ UPDATE（注記列は保持される）
+  - 再計算結果のみ: INSERT / 既存行のみ: DELETE
+- 全件再構築（PeriodAllocationSuggestionService.regenerate_for_periods）は
+  フォールバックとして残す
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.application.services.allocations.suggestion_base import (
+    AllocationSuggestionBase,
+    ProcessingResult,
+    create_stats_summary,
+    finalize_stats_and_gaps,
+)
+from app.infrastructure.persistence.models.forecast_models import ForecastCurrent
+from app.infrastructure.persistence.models.inventory_models import AllocationSuggestion
+from app.infrastructure.persistence.models.lot_receipt_models import LotReceipt
+from app.presentation.schemas.allocations.allocation_suggestions_schema import (
+    AllocationSuggestionPreviewResponse,
+    AllocationSuggestionResponse,
+)
+
+
+logger = logging.getLogger(__name__)
+
+SuggestionKey = tuple[int, int, int, str]
+"""(customer_id, delivery_place_id, supplier_item_id, forecast_period)."""
+
+
+@dataclass
+class SuggestionDirtySet:
+    """Forecast keys and lots changed since suggestions were last computed."""
+
+    keys: set[SuggestionKey] = field(default_factory=set)
+    lot_ids: set[int] = field(default_factory=set)
+
+    def mark_forecast(
+        self,
+        customer_id: int,
+        delivery_place_id: int,
+        supplier_item_id: int,
+        forecast_period: str,
+    ) -> None:
+        """Mark a forecast key as changed."""
+        self.keys.add((customer_id, delivery_place_id, supplier_item_id, forecast_period))
+
+    def mark_lots(self, lot_ids: Iterable[int]) -> None:
+        """Mark lots whose availability changed."""
+        self.lot_ids.update(lot_ids)
+
+    def __bool__(self) -> bool:
+        return bool(self.keys or self.lot_ids)
+
+
+class IncrementalAllocationSuggestionService(AllocationSuggestionBase):
+    """Service for incremental (diff-applied) allocation suggestion regeneration."""
+
+    def __init__(self, db: Session):
+        """Initialize service with database session."""
+        super().__init__(db)
+
+    def regenerate(
+        self, dirty: SuggestionDirtySet, source: str = "forecast_import"
+    ) -> AllocationSuggestionPreviewResponse:
+        """Recompute suggestions for the products affected by dirty and apply the diff.
+
+        Args:
+            dirty: Changed forecast keys / lots
+            source: Source identifier for inserted suggestions
+
+        Returns:
+            AllocationSuggestionPreviewResponse for the recomputed products (all periods).
+        """
+        products = self._affected_products(dirty)
+        if not products:
+            return self._response([], ProcessingResult())
+
+        forecasts = list(
+            self.db.scalars(
+                select(ForecastCurrent)
+                .where(ForecastCurrent.supplier_item_id.in_(sorted(products)))
+                .order_by(ForecastCurrent.forecast_date, ForecastCurrent.id)
+            )
+        )
+        lots_by_product = self._fetch_available_lots(
+            sorted({f.supplier_item_id for f in forecasts})
+        )
+        result = self._process_forecasts(forecasts, lots_by_product, source=source)
+
+        persisted = self._apply_diff(products, result.suggestions)
+        self.db.commit()
+
+        return self._response(persisted, result)
+
+    def _affected_products(self, dirty: SuggestionDirtySet) -> set[int]:
+        """Expand dirty keys / lots into the supplier_item_ids to recompute."""
+        products = {supplier_item_id for _c, _d, supplier_item_id, _p in dirty.keys}
+        if dirty.lot_ids:
+            # ロットの変更は、その製品の全期間に影響する
+            products.update(
+                self.db.scalars(
+                    select(LotReceipt.supplier_item_id).where(
+                        LotReceipt.id.in_(sorted(dirty.lot_ids)),
+                        LotReceipt.supplier_item_id.is_not(None),
+                    )
+                )
+            )
+        return products
+
+    def _apply_diff(
+        self, products: set[int], computed: list[AllocationSuggestion]
+    ) -> list[AllocationSuggestion]:
+        """Diff-apply computed suggestions against the stored rows of products.
+
+        Returns:
+            Persisted suggestion rows (updated/unchanged existing rows and inserted rows)
+        """
+        existing: dict[tuple[int | None, int], AllocationSuggestion] = {}
+        stale: list[AllocationSuggestion] = []
+        for row in self.db.scalars(
+            select(AllocationSuggestion)
+            .where(AllocationSuggestion.supplier_item_id.in_(sorted(products)))
+            .order_by(AllocationSuggestion.id)
+        ):
+            key = (row.forecast_id, row.lot_id)
+            if row.forecast_id is None or key in existing:
+                stale.append(row)
+            else:
+                existing[key] = row
+
+        persisted: list[AllocationSuggestion] = []
+        inserted = updated = 0
+        for suggestion in computed:
+            current = existing.pop((suggestion.forecast_id, suggestion.lot_id), None)
+            if current is None:
+                self.db.add(suggestion)
+                persisted.append(suggestion)
+                inserted += 1
+                continue
+            if (current.quantity, current.priority, current.allocation_type) != (
+                suggestion.quantity,
+                suggestion.priority,
+                suggestion.allocation_type,
+            ):
+                current.quantity = suggestion.quantity
+                current.priority = suggestion.priority
+                current.allocation_type = suggestion.allocation_type
+                updated += 1
+            persisted.append(current)
+
+        stale.extend(existing.values())
+        if stale:
+            self.db.execute(
+                delete(AllocationSuggestion).where(
+                    AllocationSuggestion.id.in_([row.id for row in stale])
+                ),
+                execution_options={"synchronize_session": False},
+            )
+            for row in stale:
+                self.db.expunge(row)
+
+        self.db.flush()
+        logger.info(
+            "Allocation suggestions regenerated incrementally",
+            extra={
+                "product_count": len(products),
+                "inserted": inserted,
+                "updated": updated,
+                "deleted": len(stale),
+            },
+        )
+        return persisted
+
+    @staticmethod
+    def _response(
+        suggestions: list[AllocationSuggestion], result: ProcessingResult
+    ) -> AllocationSuggestionPreviewResponse:
+        stats_per_key, gaps = finalize_stats_and_gaps(result.stats_agg)
+        return AllocationSuggestionPreviewResponse(
+            suggestions=[
+                AllocationSuggestionResponse.model_validate(s, from_attributes=True)
+                for s in suggestions
+            ],
+            stats=create_stats_summary(
+                result.total_forecast, result.total_allocated, result.total_shortage, stats_per_key
+            ),
+            gaps=gaps,
+        )
@@ -1,6 +1,8 @@
 """Period-based allocation suggestion service (期間別引当推奨).
 
 Handles bulk regeneration of allocation suggestions for forecast periods.
+This is the full-rebuild fallback; routine updates after forecast changes go
+through IncrementalAllocationSuggestionService.
 """
 
 from sqlalchemy.orm import Session
@@ -53,6 +55,7 @@ class PeriodAllocationSuggestionService(AllocationSuggestionBase):
         lots_by_product = self._fetch_available_lots(product_ids)
 
         # 3. Process forecasts using shared method
+        #    （ロット在庫は全期間で共有: 前の期間が使った分は後の期間に回らない）
         result = self._process_forecasts(forecasts, lots_by_product, source="forecast_import")
 
         # 4. Finalize stats & gaps
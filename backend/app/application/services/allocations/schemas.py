@@ -162,6 +162,7 @@ class FefoPreviewResult:
     order_id: int
     lines: list[FefoLinePlan]
     warnings: list[str] = field(default_factory=list)
+    timings: dict[str, float] = field(default_factory=dict)  # phase -> elapsed ms
 
 
 @dataclass
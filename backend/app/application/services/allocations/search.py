@@ -2,6 +2,8 @@
 Allocation candidates service - unified lot candidate query logic.
 
 Refactored: Uses database views (v2.5) for simplified logic and better performance.
+Candidate details (lot, warehouse, product units, confirmed reservations) are
+fetched in the same statement as the candidates themselves.
 """
 
 from __future__ import annotations
@@ -10,9 +12,11 @@ import logging
 from decimal import Decimal
 from typing import Any, cast
 
+from sqlalchemy import func
 from sqlalchemy.orm import Query, Session
 
-from app.application.services.inventory.stock_calculation import get_available_quantity
+from app.application.services.inventory.stock_calculation import reserved_quantity_subquery
+from app.infrastructure.persistence.models import LotMaster, LotReceipt, SupplierItem, Warehouse
 from app.infrastructure.persistence.models.views_models import (
     VDeliveryPlaceCodeToId,
     VLotAvailableQty,
@@ -83,10 +87,51 @@ def _get_delivery_place_name(db: Session, delivery_place_id: int | None) -> str
     return dp.delivery_place_name if dp else None
 
 
+def _candidate_detail_columns(reserved_subq: Any) -> tuple[Any, ...]:
+    """Columns shared by both candidate sources (lot, warehouse, product details).
+
+    Args:
+        reserved_subq: Subquery from reserved_quantity_subquery()
+
+    Returns:
+        Labeled columns for the candidate result set
+    """
+    return (
+        LotMaster.lot_number.label("lot_number"),
+        LotReceipt.current_quantity.label("current_quantity"),
+        func.coalesce(reserved_subq.c.reserved_qty, 0).label("allocated_quantity"),
+        LotReceipt.status.label("status"),
+        LotReceipt.lock_reason.label("lock_reason"),
+        Warehouse.warehouse_name.label("warehouse_name"),
+        SupplierItem.id.label("product_id"),
+        SupplierItem.internal_unit.label("internal_unit"),
+        SupplierItem.external_unit.label("external_unit"),
+        SupplierItem.qty_per_internal_unit.label("qty_per_internal_unit"),
+    )
+
+
+def _join_candidate_details(query: Query, reserved_subq: Any) -> Query:
+    """Outer join lot master, reservation aggregate, warehouse and product.
+
+    Args:
+        query: Query that already has LotReceipt in its FROM clause
+        reserved_subq: Subquery from reserved_quantity_subquery()
+
+    Returns:
+        Query with detail tables joined
+    """
+    return (
+        query.outerjoin(LotMaster, LotMaster.id == LotReceipt.lot_master_id)
+        .outerjoin(reserved_subq, reserved_subq.c.lot_id == LotReceipt.id)
+        .outerjoin(Warehouse, Warehouse.id == LotReceipt.warehouse_id)
+        .outerjoin(SupplierItem, SupplierItem.id == LotReceipt.supplier_item_id)
+    )
+
+
 def _query_lots_from_view(
     db: Session, supplier_item_id: int, strategy: str, limit: int
 ) -> list[Any]:
-    """Query lots from VLotAvailableQty view.
+    """Query lots from VLotAvailableQty view together with candidate details.
 
     Args:
         db: Database session
@@ -95,9 +140,23 @@ def _query_lots_from_view(
         limit: Maximum results
 
     Returns:
-        List of lot view results
+        List of candidate rows (see _convert_to_candidate_item)
     """
-    query = db.query(VLotAvailableQty).filter(
+    reserved_subq = reserved_quantity_subquery(db)
+    query = (
+        db.query(
+            VLotAvailableQty.lot_id.label("lot_id"),
+            VLotAvailableQty.supplier_item_id.label("supplier_item_id"),
+            VLotAvailableQty.warehouse_id.label("warehouse_id"),
+            VLotAvailableQty.available_qty.label("available_qty"),
+            VLotAvailableQty.receipt_date.label("received_date"),
+            VLotAvailableQty.expiry_date.label("expiry_date"),
+            *_candidate_detail_columns(reserved_subq),
+        )
+        .select_from(VLotAvailableQty)
+        .join(LotReceipt, LotReceipt.id == VLotAvailableQty.lot_id)
+    )
+    query = _join_candidate_details(query, reserved_subq).filter(
         VLotAvailableQty.supplier_item_id == supplier_item_id,
         VLotAvailableQty.available_qty > 0,
     )
@@ -113,6 +172,10 @@ def _query_lots_with_fallback(
 ) -> list[Any]:
     """Query lots with fallback to Lot model if view returns no results.
 
+    The fallback computes availability in SQL
+    (received - confirmed reserved - locked, same as get_available_quantity)
+    so that filtering and the limit are applied by the database.
+
     Args:
         db: Database session
         supplier_item_id: Product ID to filter
@@ -120,172 +183,79 @@ def _query_lots_with_fallback(
         limit: Maximum results
 
     Returns:
-        List of lot results (from view or model)
+        List of candidate rows (see _convert_to_candidate_item)
     """
     results = _query_lots_from_view(db, supplier_item_id, strategy, limit)
-
-    if not results:
-        from app.infrastructure.persistence.models import LotReceipt
-
-        # Query lots (filtering will happen in Python)
-        lot_query = db.query(LotReceipt).filter(
-            LotReceipt.supplier_item_id == supplier_item_id,
+    if results:
+        return results
+
+    reserved_subq = reserved_quantity_subquery(db)
+    available_qty = (
+        LotReceipt.received_quantity
+        - func.coalesce(reserved_subq.c.reserved_qty, 0)
+        - func.coalesce(LotReceipt.locked_quantity, 0)
+    )
+    query = db.query(
+        LotReceipt.id.label("lot_id"),
+        LotReceipt.supplier_item_id.label("supplier_item_id"),
+        LotReceipt.warehouse_id.label("warehouse_id"),
+        available_qty.label("available_qty"),
+        LotReceipt.received_date.label("received_date"),
+        LotReceipt.expiry_date.label("expiry_date"),
+        *_candidate_detail_columns(reserved_subq),
+    )
+    query = _join_candidate_details(query, reserved_subq).filter(
+        LotReceipt.supplier_item_id == supplier_item_id,
+        available_qty > 0,
+    )
+    if strategy == "fefo":
+        query = query.order_by(
+            LotReceipt.expiry_date.asc().nulls_last(),
+            LotReceipt.received_date.asc(),
+            LotReceipt.id.asc(),
         )
-        if strategy == "fefo":
-            lot_query = lot_query.order_by(
-                LotReceipt.expiry_date.asc().nulls_last(),
-                LotReceipt.received_date.asc(),
-                LotReceipt.id.asc(),
-            )
-        all_lots = lot_query.limit(limit * 2).all()  # Get more to filter
-        # Filter using lot_reservations
-        results = [lot for lot in all_lots if get_available_quantity(db, lot) > 0][:limit]
 
-    return results
+    return cast(list[Any], query.limit(limit).all())
 
 
 def _convert_to_candidate_item(
-    lot_view: Any,
+    row: Any,
     delivery_place_id: int | None = None,
     delivery_place_name: str | None = None,
 ) -> CandidateLotItem:
-    """Convert lot view or model to CandidateLotItem.
+    """Convert a candidate row to CandidateLotItem.
 
     Args:
-        lot_view: Lot from view or Lot model
+        row: Row from _query_lots_from_view / _query_lots_with_fallback
         delivery_place_id: Delivery place ID (optional)
         delivery_place_name: Delivery place name (optional)
 
     Returns:
-        CandidateLotItem with basic info
+        CandidateLotItem with lot, warehouse and product details
     """
-    # Determine source and extract fields
-    if hasattr(lot_view, "available_qty"):
-        # From VLotAvailableQty view
-        available_qty = float(lot_view.available_qty or 0)
-        lot_id = lot_view.lot_id
-        received_date = lot_view.receipt_date
-        status = lot_view.lot_status
-    else:
-        # From Lot model - use lot_reservations dynamically
-        # Note: We don't have db context here, so this is a fallback approximation
-        # The actual available_qty should be calculated from lot_reservations
-        available_qty = float(lot_view.current_quantity or 0)
-        lot_id = lot_view.id
-        received_date = lot_view.received_date
-        status = lot_view.status
-
     return CandidateLotItem(
-        lot_id=lot_id,
-        lot_number="",  # Will be enriched later
-        supplier_item_id=lot_view.supplier_item_id,
-        warehouse_id=lot_view.warehouse_id,
-        received_date=received_date,
-        expiry_date=lot_view.expiry_date,
-        current_quantity=Decimal("0"),  # Will be enriched later
-        allocated_quantity=Decimal("0"),  # Will be enriched later
-        available_quantity=Decimal(str(available_qty)),
+        lot_id=row.lot_id,
+        lot_number=row.lot_number or "",
+        supplier_item_id=row.supplier_item_id,
+        warehouse_id=row.warehouse_id,
+        warehouse_name=row.warehouse_name,
+        received_date=row.received_date,
+        expiry_date=row.expiry_date,
+        current_quantity=row.current_quantity,
+        allocated_quantity=Decimal(str(row.allocated_quantity)),
+        available_quantity=Decimal(str(row.available_qty or 0)),
         delivery_place_id=delivery_place_id,
         delivery_place_name=delivery_place_name,
-        status=status,
+        internal_unit=row.internal_unit,
+        external_unit=row.external_unit,
+        qty_per_internal_unit=(
+            float(row.qty_per_internal_unit or 1.0) if row.product_id is not None else None
+        ),
+        status=row.status,
+        lock_reason=row.lock_reason,
     )
 
 
-def _enrich_lot_details(db: Session, candidates: list[CandidateLotItem]) -> None:
-    """Enrich candidates with lot details (lot_number, quantities, status).
-
-    Args:
-        db: Database session
-        candidates: List of candidate items to enrich
-    """
-    if not candidates:
-        return
-
-    lot_ids = [c.lot_id for c in candidates]
-    from app.infrastructure.persistence.models import LotReceipt
-
-    lots = db.query(LotReceipt).filter(LotReceipt.id.in_(lot_ids)).all()
-    lot_map = {lot.id: lot for lot in lots}
-
-    for candidate in candidates:
-        lot = lot_map.get(candidate.lot_id)
-        if lot:
-            candidate.lot_number = lot.lot_number or ""
-            candidate.current_quantity = lot.current_quantity
-            # Calculate reserved quantity dynamically
-            from app.application.services.inventory.stock_calculation import (
-                get_reserved_quantity,
-            )
-
-            candidate.allocated_quantity = get_reserved_quantity(db, lot.id)
-            candidate.status = lot.status
-            candidate.lock_reason = lot.lock_reason
-
-
-def _enrich_warehouse_names(db: Session, candidates: list[CandidateLotItem]) -> None:
-    """Enrich candidates with warehouse names.
-
-    Args:
-        db: Database session
-        candidates: List of candidate items to enrich
-    """
-    warehouse_ids = {c.warehouse_id for c in candidates if c.warehouse_id}
-    if not warehouse_ids:
-        return
-
-    from app.infrastructure.persistence.models import Warehouse
-
-    warehouses = db.query(Warehouse).filter(Warehouse.id.in_(warehouse_ids)).all()
-    warehouse_map = {w.id: w.warehouse_name for w in warehouses}
-
-    for candidate in candidates:
-        if candidate.warehouse_id:
-            candidate.warehouse_name = warehouse_map.get(candidate.warehouse_id)
-
-
-def _enrich_product_units(db: Session, candidates: list[CandidateLotItem]) -> None:
-    """Enrich candidates with product unit information.
-
-    Args:
-        db: Database session
-        candidates: List of candidate items to enrich
-    """
-    supplier_item_ids = {c.supplier_item_id for c in candidates if c.supplier_item_id}
-    if not supplier_item_ids:
-        return
-
-    from app.infrastructure.persistence.models import SupplierItem
-
-    products = db.query(SupplierItem).filter(SupplierItem.id.in_(supplier_item_ids)).all()
-    product_map = {p.id: p for p in products}
-
-    for candidate in candidates:
-        if candidate.supplier_item_id:
-            product = product_map.get(candidate.supplier_item_id)
-            if product:
-                candidate.internal_unit = product.internal_unit
-                candidate.external_unit = product.external_unit
-                candidate.qty_per_internal_unit = float(product.qty_per_internal_unit or 1.0)
-
-
-def _enrich_candidate_details(db: Session, candidates: list[CandidateLotItem]) -> None:
-    """Enrich candidates with missing details from Lot, Warehouse, and Product
-    models.
-
-    Modifies candidates in place.
-
-    Args:
-        db: Database session
-        candidates: List of candidate items to enrich
-    """
-    if not candidates:
-        return
-
-    _enrich_lot_details(db, candidates)
-    _enrich_warehouse_names(db, candidates)
-    _enrich_product_units(db, candidates)
-
-
 def execute_candidate_lot_query(
     db: Session,
     supplier_item_id: int | None = None,
@@ -298,6 +268,8 @@ def execute_candidate_lot_query(
 
     v2.6 Refactored: Simplified using extracted helper functions.
     Uses v_lot_available_qty as the main source with fallback to Lot model.
+    Lot, warehouse and product details are joined into the candidate query,
+    so the number of queries does not depend on the number of candidates.
 
     Args:
         db: Database session
@@ -358,7 +330,4 @@ def execute_candidate_lot_query(
         # Convert to candidates (no delivery place info)
         candidates = [_convert_to_candidate_item(row) for row in results]
 
-    # Enrich candidates with missing details
-    _enrich_candidate_details(db, candidates)
-
     return candidates
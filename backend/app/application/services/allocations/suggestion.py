@@ -6,6 +6,7 @@ functionality from specialized sub-services.
 For direct usage:
 - PeriodAllocationSuggestionService: period-based operations
 - GroupAllocationSuggestionService: customer/product group operations
+- IncrementalAllocationSuggestionService: diff-applied regeneration of changed keys/lots
 """
 
 import logging
@@ -19,6 +20,10 @@ from sqlalchemy.orm import Session
 from app.application.services.allocations.group_suggestion import (
     GroupAllocationSuggestionService,
 )
+from app.application.services.allocations.incremental_suggestion import (
+    IncrementalAllocationSuggestionService,
+    SuggestionDirtySet,
+)
 from app.application.services.allocations.period_suggestion import (
     PeriodAllocationSuggestionService,
 )
@@ -49,6 +54,7 @@ class AllocationSuggestionService(AllocationSuggestionBase):
         super().__init__(db)
         self._period_service = PeriodAllocationSuggestionService(db)
         self._group_service = GroupAllocationSuggestionService(db)
+        self._incremental_service = IncrementalAllocationSuggestionService(db)
 
     def regenerate_for_periods(
         self, forecast_periods: list[str]
@@ -63,6 +69,19 @@ class AllocationSuggestionService(AllocationSuggestionBase):
         """
         return self._period_service.regenerate_for_periods(forecast_periods)
 
+    def regenerate_incremental(
+        self, dirty: SuggestionDirtySet
+    ) -> AllocationSuggestionPreviewResponse:
+        """Regenerate only the suggestions affected by changed forecast keys / lots.
+
+        Args:
+            dirty: Changed (customer, delivery_place, supplier_item, period) keys and lot IDs
+
+        Returns:
+            AllocationSuggestionPreviewResponse for the recomputed units.
+        """
+        return self._incremental_service.regenerate(dirty)
+
     def regenerate_for_group(
         self,
         customer_id: int,
@@ -49,6 +49,7 @@ class AllocationSuggestionBase:
         """Fetch available lots for given products, sorted by FEFO.
 
         v3.0: Delegates to AllocationCandidateService (SSOT).
+        Candidates for all products are fetched in one query.
         """
         return self._candidate_service.get_candidates_for_products(
             supplier_item_ids=supplier_item_ids,
@@ -66,8 +67,11 @@ class AllocationSuggestionBase:
     ) -> ProcessingResult:
         """Process forecasts and generate allocation suggestions using FEFO.
 
+        Lot quantities consumed by earlier forecasts (in list order) are not
+        available to later ones, also across periods of the same product.
+
         Args:
-            forecasts: List of forecast records to process
+            forecasts: Forecast records to process, ordered by (forecast_date, id)
             lots_by_product: Available lots grouped by supplier_item_id (LotCandidate)
             source: Source identifier for suggestions (e.g., "forecast_import", "group_regenerate")
 
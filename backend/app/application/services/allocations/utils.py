@@ -121,6 +121,8 @@ Shared utilities for allocation operations:
 
 from __future__ import annotations
 
+from collections import defaultdict
+from collections.abc import Iterable
 from decimal import Decimal
 from typing import cast
 
@@ -173,9 +175,8 @@ def _existing_allocated_qty(line: OrderLine) -> float:
     P3: Uses lot_reservations instead of allocations.
     """
     reservations = getattr(line, "_lot_reservations", []) or []
-    return cast(
-        float,
-        sum(res.reserved_qty for res in reservations if res.status != ReservationStatus.RELEASED),
+    return float(
+        sum(res.reserved_qty for res in reservations if res.status != ReservationStatus.RELEASED)
     )
 
 
@@ -190,6 +191,13 @@ def _resolve_next_div(db: Session, order: Order, line: OrderLine) -> tuple[str |
         if product_code:
             stmt = select(SupplierItem).where(SupplierItem.maker_part_no == product_code)
             product = db.execute(stmt).scalar_one_or_none()
+    return _next_div_for_product(order, line, product)
+
+
+def _next_div_for_product(
+    order: Order, line: OrderLine, product: SupplierItem | None
+) -> tuple[str | None, str | None]:
+    """Resolve next_div from an already loaded product (no DB access)."""
     next_div = getattr(product, "next_div", None) if product else None
     if next_div:
         return next_div, None
@@ -307,3 +315,122 @@ def update_order_allocation_status(db: Session, order_id: int) -> None:
         from sqlalchemy import update
 
         db.execute(update(Order).where(Order.id == order_id).values(status=new_status))
+
+
+def update_order_line_statuses(db: Session, order_line_ids: Iterable[int]) -> None:
+    """Batch version of update_order_line_status.
+
+    予約合計を1クエリで集計し、ステータスごとに1回のUPDATEで反映する。
+    判定ルールは update_order_line_status() と同一。
+
+    Args:
+        db: Database session
+        order_line_ids: Order line IDs
+    """
+    EPSILON = Decimal("1e-6")
+
+    line_ids = sorted(set(order_line_ids))
+    if not line_ids:
+        return
+
+    stmt = (
+        select(
+            OrderLine.id,
+            func.coalesce(func.sum(LotReservation.reserved_qty), 0.0),
+            OrderLine.converted_quantity,
+            OrderLine.order_quantity,
+        )
+        .outerjoin(
+            LotReservation,
+            (LotReservation.source_type == ReservationSourceType.ORDER)
+            & (LotReservation.source_id == OrderLine.id)
+            & (LotReservation.status != ReservationStatus.RELEASED),
+        )
+        .where(OrderLine.id.in_(line_ids))
+        .group_by(OrderLine.id, OrderLine.converted_quantity, OrderLine.order_quantity)
+    )
+
+    ids_by_status: dict[str, list[int]] = defaultdict(list)
+    for line_id, reserved_total, converted_qty, order_qty in db.execute(stmt).all():
+        reserved_qty = Decimal(str(reserved_total or 0.0))
+        required_qty = Decimal(str(converted_qty if converted_qty else order_qty or 0))
+        new_status = "allocated" if reserved_qty + EPSILON >= required_qty else "pending"
+        ids_by_status[new_status].append(line_id)
+
+    from sqlalchemy import update
+
+    for new_status, ids in ids_by_status.items():
+        db.execute(update(OrderLine).where(OrderLine.id.in_(ids)).values(status=new_status))
+
+
+def update_order_allocation_statuses(db: Session, order_ids: Iterable[int]) -> None:
+    """Batch version of update_order_allocation_status.
+
+    全注文の明細別予約合計と現在ステータスをそれぞれ1クエリで取得し、
+    update_order_allocation_status() と同じ遷移ルール（H-06 Fix含む）で一括更新する。
+
+    Args:
+        db: Database session
+        order_ids: Order IDs
+    """
+    EPSILON = 1e-6
+
+    target_ids = sorted(set(order_ids))
+    if not target_ids:
+        return
+
+    totals_stmt = (
+        select(
+            OrderLine.order_id,
+            func.coalesce(func.sum(LotReservation.reserved_qty), 0.0),
+            func.coalesce(OrderLine.converted_quantity, OrderLine.order_quantity),
+        )
+        .outerjoin(
+            LotReservation,
+            (LotReservation.source_type == ReservationSourceType.ORDER)
+            & (LotReservation.source_id == OrderLine.id)
+            & (LotReservation.status != ReservationStatus.RELEASED),
+        )
+        .where(OrderLine.order_id.in_(target_ids))
+        .group_by(
+            OrderLine.order_id,
+            OrderLine.id,
+            OrderLine.order_quantity,
+            OrderLine.converted_quantity,
+        )
+    )
+
+    fully_allocated = dict.fromkeys(target_ids, True)
+    any_allocated = dict.fromkeys(target_ids, False)
+    for order_id, reserved_total, required_total in db.execute(totals_stmt).all():
+        reserved = float(reserved_total)
+        required = float(required_total or 0.0)
+        if reserved > EPSILON:
+            any_allocated[order_id] = True
+        if reserved + EPSILON < required:
+            fully_allocated[order_id] = False
+
+    current_statuses: dict[int, str] = {
+        order_id: status
+        for order_id, status in db.execute(
+            select(Order.id, Order.status).where(Order.id.in_(target_ids))
+        ).all()
+    }
+
+    ids_by_status: dict[str, list[int]] = defaultdict(list)
+    for order_id, current_status in current_statuses.items():
+        new_status = None
+        if fully_allocated[order_id] and any_allocated[order_id]:
+            new_status = "allocated"
+        elif any_allocated[order_id]:
+            new_status = "part_allocated"
+        elif current_status in {"allocated", "part_allocated"}:
+            new_status = "open"
+
+        if new_status and new_status != current_status:
+            ids_by_status[new_status].append(order_id)
+
+    from sqlalchemy import update
+
+    for new_status, ids in ids_by_status.items():
+        db.execute(update(Order).where(Order.id.in_(ids)).values(status=new_status))
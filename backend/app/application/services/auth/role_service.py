@@ -1,9 +1,11 @@
 """Role service (ロール管理サービス)."""
 
+from datetime import date
 from typing import cast
 
 from sqlalchemy.orm import Session
 
+from app.application.services.auth.user_principal_cache import user_principal_cache
 from app.application.services.common.base_service import BaseService
 from app.infrastructure.persistence.models.auth_models import Role
 from app.presentation.schemas.system.roles_schema import RoleCreate, RoleUpdate
@@ -19,6 +21,7 @@ class RoleService(BaseService[Role, RoleCreate, RoleUpdate, int]):
     - delete(role_id) -> None
 
     Custom business logic is implemented below.
+    Role changes clear user_principal_cache (role codes are cached per user).
     """
 
     def __init__(self, db: Session):
@@ -34,3 +37,19 @@ class RoleService(BaseService[Role, RoleCreate, RoleUpdate, int]):
     def get_by_code(self, role_code: str) -> Role | None:
         """Get role by code."""
         return cast(Role | None, self.db.query(Role).filter(Role.role_code == role_code).first())
+
+    def update(self, id: int, payload: RoleUpdate, *, auto_commit: bool = True) -> Role:
+        """Update role and clear cached principals."""
+        role = super().update(id, payload, auto_commit=auto_commit)
+        user_principal_cache.clear()
+        return role
+
+    def delete(self, id: int, *, end_date: date | None = None, auto_commit: bool = True) -> None:
+        """Delete role and clear cached principals."""
+        super().delete(id, end_date=end_date, auto_commit=auto_commit)
+        user_principal_cache.clear()
+
+    def hard_delete(self, id: int) -> None:
+        """Hard delete role and clear cached principals."""
+        super().hard_delete(id)
+        user_principal_cache.clear()
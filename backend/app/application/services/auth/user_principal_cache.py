@@ -0,0 +1,118 @@
+"""Authenticated user principal cache (認証ユーザーキャッシュ).
+
+get_current_user_optional で解決したユーザー（＋ロール）をプロセス内に保持する。
+
+【設計意図】なぜユーザーをキャッシュするのか:
+- 認証付きエンドポイントはすべて get_current_user_optional を経由し、
+  毎回 users / user_roles / roles を問い合わせていた
+  → ダッシュボードの短周期ポーリングで最も多く実行されるクエリになっていた
+- キャッシュヒット時は Session.merge(load=False) でリクエストのセッションに
+  取り込むため、SQL を発行せずに require_roles 等のロール判定ができる
+
+【設計意図】キーと無効化:
+- キーは (user_id, token_version)。token_version はアクセストークンの exp
+  → 再ログイン・リフレッシュで発行された新しいトークンは別エントリになる
+- UserService（更新・ロール割当・削除）・RoleService（更新・削除）・ログアウトで無効化
+- 他ワーカーでの変更は TTL（既定30秒）で反映される
+- エントリはスナップショット（users列 + user_roles/roles のみ）。
+  supplier_assignments 等は未ロードのまま残し、参照時に通常どおり遅延ロードする
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.config import settings
+from app.infrastructure.persistence.models.auth_models import Role, User, UserRole
+
+
+logger = logging.getLogger(__name__)
+
+
+def _copy_columns(instance: object, model: type) -> dict[str, object]:
+    return {attr.key: getattr(instance, attr.key) for attr in model.__mapper__.column_attrs}  # type: ignore[attr-defined]
+
+
+def _snapshot(user: User) -> User:
+    """Build a detached copy of user with roles (no session, no SQL).
+
+    関連は set_committed_value で設定し、backref（Role.user_roles 等）を部分的に
+    埋めない・変更履歴を残さない（merge(load=False) は dirty なオブジェクトを受け付けない）。
+    """
+    snapshot = User(**_copy_columns(user, User))
+    make_transient_to_detached(snapshot)
+    user_roles = []
+    for ur in user.user_roles:
+        role = Role(**_copy_columns(ur.role, Role))
+        make_transient_to_detached(role)
+        user_role = UserRole(**_copy_columns(ur, UserRole))
+        make_transient_to_detached(user_role)
+        set_committed_value(user_role, "role", role)
+        user_roles.append(user_role)
+    set_committed_value(snapshot, "user_roles", user_roles)
+    return snapshot
+
+
+class UserPrincipalCache:
+    """Bounded LRU + TTL cache of user snapshots keyed by (user_id, token_version)."""
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        """Initialize with capacity and entry lifetime."""
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple[int, str], tuple[User, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, user_id: int, token_version: str) -> User | None:
+        """Return the cached user attached to db, or None on miss."""
+        key = (user_id, token_version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            snapshot, stored_at = entry
+            if time.monotonic() - stored_at >= self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return db.merge(snapshot, load=False)
+
+    def put(self, user: User, token_version: str) -> None:
+        """Cache a snapshot of user (roles must already be loaded)."""
+        if self.maxsize <= 0:
+            return
+        snapshot = _snapshot(user)
+        with self._lock:
+            self._entries[(user.id, token_version)] = (snapshot, time.monotonic())
+            self._entries.move_to_end((user.id, token_version))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every cached token of user_id."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == user_id]:
+                del self._entries[key]
+        logger.debug("User principal cache invalidated", extra={"user_id": user_id})
+
+    def clear(self) -> None:
+        """Drop all entries (e.g. role definitions changed)."""
+        with self._lock:
+            self._entries.clear()
+        logger.debug("User principal cache cleared")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+user_principal_cache = UserPrincipalCache(
+    maxsize=settings.USER_PRINCIPAL_CACHE_MAXSIZE,
+    ttl_seconds=settings.USER_PRINCIPAL_CACHE_TTL_SECONDS,
+)
@@ -1,9 +1,11 @@
 """User service (ユーザー管理サービス)."""
 
+from datetime import date
 from typing import cast
 
 from sqlalchemy.orm import Session, joinedload
 
+from app.application.services.auth.user_principal_cache import user_principal_cache
 from app.application.services.common.base_service import BaseService
 from app.core.time_utils import utcnow
 from app.infrastructure.persistence.models.auth_models import Role, User, UserRole
@@ -20,6 +22,7 @@ class UserService(BaseService[User, UserCreate, UserUpdate, int]):
     - delete(user_id) -> None
 
     Custom business logic is implemented below.
+    Updates, role assignments and deletes invalidate user_principal_cache.
     """
 
     def __init__(self, db: Session):
@@ -124,6 +127,7 @@ class UserService(BaseService[User, UserCreate, UserUpdate, int]):
         else:
             self.db.flush()
             self.db.refresh(db_user)
+        user_principal_cache.invalidate_user(user_id)
         return db_user
 
     def assign_roles(self, user_id: int, assignment: UserRoleAssignment) -> User | None:
@@ -142,8 +146,19 @@ class UserService(BaseService[User, UserCreate, UserUpdate, int]):
 
         self.db.commit()
         self.db.refresh(db_user)
+        user_principal_cache.invalidate_user(user_id)
         return db_user
 
+    def delete(self, id: int, *, end_date: date | None = None, auto_commit: bool = True) -> None:
+        """Delete user and drop its cached principal."""
+        super().delete(id, end_date=end_date, auto_commit=auto_commit)
+        user_principal_cache.invalidate_user(id)
+
+    def hard_delete(self, id: int) -> None:
+        """Hard delete user and drop its cached principal."""
+        super().hard_delete(id)
+        user_principal_cache.invalidate_user(id)
+
     def get_user_roles(self, user_id: int) -> list[str]:
         """Get role codes assigned to a user."""
         user = self.get_by_id(user_id, raise_404=False)
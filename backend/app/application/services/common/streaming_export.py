@@ -0,0 +1,172 @@
+"""Streaming ZIP export (一括エクスポートのストリーミング出力).
+
+行イテレータを CSV / XLSX に変換しながら ZIP に書き込み、
+書き込まれたバイト列をチャンク単位で呼び出し元へ返す。
+
+【設計意図】なぜストリーミングにするのか:
+- 以前は全対象を dict のリストとして読み込み、pandas でファイル化し、
+  さらに BytesIO 上の ZIP に書き込んでから getvalue() で返していた
+  → アーカイブ全体が少なくとも2回メモリ上に載り、件数に比例して増える
+- ZipFile を「書き込まれたバイトを溜めるだけのシンク」に対して開き、
+  行を書くたびにシンクを吐き出す（yield）ことで、ピークメモリを
+  テーブルサイズに依存しない大きさに抑える
+- シンクは seek できないため、ZipFile はデータディスクリプタ形式で書き込む
+
+【設計意図】XLSX の扱い:
+- openpyxl の write_only ブックは行をディスク上の一時ファイルへ書き出す
+- 保存結果（それ自体が ZIP）は SpooledTemporaryFile に受け、チャンク単位で
+  外側の ZIP エントリへコピーする
+- CSV はサイズが事前に分からないため ZIP64 を強制する（2GB 超でも書き込める）
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import tempfile
+import zipfile
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+
+
+STREAM_CHUNK_SIZE = 64 * 1024
+"""ZIP シンクを吐き出す目安のバイト数."""
+
+_XLSX_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+class _ZipStreamSink(io.RawIOBase):
+    """Write-only, unseekable sink that buffers bytes until drained."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        self._buffer += data
+        return len(data)
+
+    def pending(self) -> int:
+        """Return the number of buffered bytes."""
+        return len(self._buffer)
+
+    def drain(self) -> bytes:
+        """Return and clear the buffered bytes."""
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _excel_value(value: Any) -> Any:
+    """Convert a value into something openpyxl can store."""
+    if value is None or isinstance(value, bool | int | float | str):
+        return value
+    if isinstance(value, datetime):
+        # Excel はタイムゾーンを扱えないため壁時計時刻のまま naive にする
+        return value.replace(tzinfo=None) if value.tzinfo is not None else value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, date | time):
+        return value
+    return str(value)
+
+
+def _peek_columns(rows: Iterator[dict[str, Any]]) -> tuple[list[str], dict[str, Any]] | None:
+    """Read the first row to fix the header; None when there are no rows."""
+    first = next(rows, None)
+    if first is None:
+        return None
+    return list(first.keys()), first
+
+
+class StreamingZipExport:
+    """Build a ZIP archive entry by entry and yield it in chunks.
+
+    Example:
+        export = StreamingZipExport()
+        yield from export.add_csv("customers.csv", rows)
+        yield from export.close()
+    """
+
+    def __init__(self, chunk_size: int = STREAM_CHUNK_SIZE) -> None:
+        self.chunk_size = chunk_size
+        self._sink = _ZipStreamSink()
+        self._zip = zipfile.ZipFile(self._sink, mode="w", compression=zipfile.ZIP_DEFLATED)
+
+    def _drain(self, *, force: bool = False) -> Iterator[bytes]:
+        if self._sink.pending() and (force or self._sink.pending() >= self.chunk_size):
+            yield self._sink.drain()
+
+    def add_csv(self, name: str, rows: Iterable[dict[str, Any]]) -> Iterator[bytes]:
+        """Stream rows as a UTF-8 (BOM) CSV entry; no entry is written for zero rows."""
+        row_iter = iter(rows)
+        peeked = _peek_columns(row_iter)
+        if peeked is None:
+            return
+        columns, first = peeked
+
+        with self._zip.open(name, mode="w", force_zip64=True) as entry:
+            text = io.TextIOWrapper(entry, encoding="utf-8-sig", newline="")
+            writer = csv.writer(text)
+            writer.writerow(columns)
+            writer.writerow([_csv_value(first.get(c)) for c in columns])
+            for row in row_iter:
+                writer.writerow([_csv_value(row.get(c)) for c in columns])
+                if self._sink.pending() >= self.chunk_size:
+                    text.flush()
+                    yield from self._drain()
+            text.flush()
+            text.detach()
+        yield from self._drain()
+
+    def add_xlsx(
+        self, name: str, rows: Iterable[dict[str, Any]], sheet_name: str = "Sheet1"
+    ) -> Iterator[bytes]:
+        """Stream rows as an XLSX entry via an openpyxl write-only workbook."""
+        from openpyxl import Workbook
+
+        row_iter = iter(rows)
+        peeked = _peek_columns(row_iter)
+        if peeked is None:
+            return
+        columns, first = peeked
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(title=sheet_name)
+        sheet.append(columns)
+        sheet.append([_excel_value(first.get(c)) for c in columns])
+        for row in row_iter:
+            sheet.append([_excel_value(row.get(c)) for c in columns])
+
+        with tempfile.SpooledTemporaryFile(max_size=_XLSX_SPOOL_MAX_SIZE) as spool:
+            workbook.save(spool)
+            info = zipfile.ZipInfo(name, date_time=datetime.now().timetuple()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.file_size = spool.seek(0, io.SEEK_END)
+            spool.seek(0)
+            with self._zip.open(info, mode="w") as entry:
+                while chunk := spool.read(self.chunk_size):
+                    entry.write(chunk)
+                    yield from self._drain()
+        yield from self._drain()
+
+    def close(self) -> Iterator[bytes]:
+        """Write the central directory and yield the remaining bytes."""
+        self._zip.close()
+        yield from self._drain(force=True)
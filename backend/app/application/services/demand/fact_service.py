@@ -0,0 +1,154 @@
+"""Daily demand fact maintenance service.
+
+daily_demand_facts（出庫実績の日次集計）の差分更新と再構築。
+
+【設計意図】なぜサービス側で差分更新するのか:
+- 出庫の登録・取消は WithdrawalService のみが行い、1件の出庫は1ロット = 1粒度に対応する
+  → 登録時に (数量, 1件) を加算、取消時に減算する UPSERT 1文で維持できる
+- 同一トランザクション内で更新するため、出庫とファクトがずれた状態はコミットされない
+- 同時更新は ON CONFLICT DO UPDATE の行ロックで直列化される（加算なので後勝ちの取りこぼしがない）
+
+【設計意図】なぜ再構築が必要なのか:
+- テストデータ生成や直接のデータ修正など、WithdrawalService を経由しない書き込みは反映されない
+- rebuild() は指定期間のファクトを削除し、ライブ集計から INSERT ... SELECT で作り直す
+  （scripts/rebuild_daily_demand_facts.py から実行）
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.time_utils import utcnow
+from app.infrastructure.persistence.models import (
+    DailyDemandFact,
+    LotReceipt,
+    Withdrawal,
+    WithdrawalLine,
+)
+
+
+logger = logging.getLogger(__name__)
+
+GRAIN_COLUMNS = ["supplier_item_id", "ship_date", "warehouse_id", "withdrawal_type", "supplier_id"]
+
+
+def _type_value(withdrawal: Withdrawal) -> str:
+    return getattr(withdrawal.withdrawal_type, "value", withdrawal.withdrawal_type)
+
+
+class DailyDemandFactService:
+    """Incremental maintenance and rebuild for daily_demand_facts."""
+
+    def __init__(self, db: Session):
+        """Initialize with database session."""
+        self.db = db
+
+    def record_withdrawal(self, withdrawal: Withdrawal, lot: LotReceipt, quantity: Decimal) -> None:
+        """Add a newly created withdrawal to its fact row."""
+        self._apply(withdrawal, lot, quantity, 1)
+
+    def reverse_withdrawal(
+        self, withdrawal: Withdrawal, lot: LotReceipt, quantity: Decimal
+    ) -> None:
+        """Subtract a cancelled withdrawal from its fact row (empty rows are removed)."""
+        if self._apply(withdrawal, lot, -quantity, -1):
+            self.db.execute(
+                delete(DailyDemandFact).where(
+                    DailyDemandFact.supplier_item_id.is_not_distinct_from(lot.supplier_item_id),
+                    DailyDemandFact.ship_date == withdrawal.ship_date,
+                    DailyDemandFact.warehouse_id == lot.warehouse_id,
+                    DailyDemandFact.withdrawal_type == _type_value(withdrawal),
+                    DailyDemandFact.supplier_id.is_not_distinct_from(lot.supplier_id),
+                    DailyDemandFact.withdrawal_count <= 0,
+                )
+            )
+
+    def _apply(
+        self, withdrawal: Withdrawal, lot: LotReceipt, quantity: Decimal, count: int
+    ) -> bool:
+        """UPSERT the delta; returns False when the withdrawal is out of scope (ship_date 未設定)."""
+        if withdrawal.ship_date is None:
+            return False
+
+        stmt = pg_insert(DailyDemandFact).values(
+            supplier_item_id=lot.supplier_item_id,
+            ship_date=withdrawal.ship_date,
+            warehouse_id=lot.warehouse_id,
+            withdrawal_type=_type_value(withdrawal),
+            supplier_id=lot.supplier_id,
+            quantity=quantity,
+            withdrawal_count=count,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=GRAIN_COLUMNS,
+            set_={
+                "quantity": DailyDemandFact.quantity + stmt.excluded.quantity,
+                "withdrawal_count": DailyDemandFact.withdrawal_count
+                + stmt.excluded.withdrawal_count,
+                "updated_at": utcnow(),
+            },
+        )
+        self.db.execute(stmt)
+        return True
+
+    def rebuild(self, start_date: date | None = None, end_date: date | None = None) -> int:
+        """Recompute facts for ship_date in [start_date, end_date] from live withdrawals.
+
+        Args:
+            start_date: 開始日（None なら下限なし）
+            end_date: 終了日（None なら上限なし）
+
+        Returns:
+            Number of fact rows written
+        """
+        live = (
+            select(
+                LotReceipt.supplier_item_id,
+                Withdrawal.ship_date,
+                LotReceipt.warehouse_id,
+                Withdrawal.withdrawal_type,
+                LotReceipt.supplier_id,
+                func.sum(WithdrawalLine.quantity),
+                func.count(func.distinct(Withdrawal.id)),
+            )
+            .join(WithdrawalLine, WithdrawalLine.withdrawal_id == Withdrawal.id)
+            .join(LotReceipt, WithdrawalLine.lot_receipt_id == LotReceipt.id)
+            .where(Withdrawal.cancelled_at.is_(None), Withdrawal.ship_date.is_not(None))
+            .group_by(
+                LotReceipt.supplier_item_id,
+                Withdrawal.ship_date,
+                LotReceipt.warehouse_id,
+                Withdrawal.withdrawal_type,
+                LotReceipt.supplier_id,
+            )
+        )
+        purge = delete(DailyDemandFact)
+        if start_date is not None:
+            live = live.where(Withdrawal.ship_date >= start_date)
+            purge = purge.where(DailyDemandFact.ship_date >= start_date)
+        if end_date is not None:
+            live = live.where(Withdrawal.ship_date <= end_date)
+            purge = purge.where(DailyDemandFact.ship_date <= end_date)
+
+        self.db.execute(purge)
+        result = self.db.execute(
+            insert(DailyDemandFact).from_select(
+                [*GRAIN_COLUMNS, "quantity", "withdrawal_count"], live
+            )
+        )
+        written = int(result.rowcount or 0)  # type: ignore[attr-defined]
+        logger.info(
+            "Daily demand facts rebuilt",
+            extra={
+                "start_date": start_date.isoformat() if start_date else None,
+                "end_date": end_date.isoformat() if end_date else None,
+                "row_count": written,
+            },
+        )
+        return written
@@ -1,12 +1,19 @@
+"""需要履歴リポジトリ.
+
+【設計意図】需要履歴は daily_demand_facts（日次集計済み）から読む:
+- 以前は withdrawals → withdrawal_lines → lot_receipts を毎回結合して ship_date ごとに集計していた
+- ファクトは (supplier_item_id, ship_date, ...) の一意索引を持つため、
+  製品・期間の範囲走査1回で日別数量が得られる
+- ファクトは取消済み出庫を含まない（取消時に減算される）
+"""
+
 from datetime import date
 from decimal import Decimal
 
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.infrastructure.persistence.models.lot_receipt_models import LotReceipt
-from app.infrastructure.persistence.models.withdrawal_line_model import WithdrawalLine
-from app.infrastructure.persistence.models.withdrawal_models import Withdrawal
+from app.infrastructure.persistence.models import DailyDemandFact
 
 
 class DemandRepository:
@@ -28,27 +35,69 @@ class DemandRepository:
         Returns:
             List[tuple[date, Decimal]]: (日付, 数量) のリスト
         """
-        # Withdrawal -> WithdrawalLine -> LotReceipt (where supplier_item_id)
-        # Sum quantity by date
         stmt = (
             select(
-                Withdrawal.ship_date,
-                func.sum(WithdrawalLine.quantity).label("total_quantity"),
+                DailyDemandFact.ship_date,
+                func.sum(DailyDemandFact.quantity).label("total_quantity"),
             )
-            .join(WithdrawalLine, Withdrawal.id == WithdrawalLine.withdrawal_id)
-            .join(LotReceipt, WithdrawalLine.lot_receipt_id == LotReceipt.id)
             .where(
-                LotReceipt.supplier_item_id == supplier_item_id,
-                Withdrawal.ship_date >= start_date,
-                Withdrawal.ship_date <= end_date,
-                Withdrawal.withdrawal_type.in_(demand_types),
+                DailyDemandFact.supplier_item_id == supplier_item_id,
+                DailyDemandFact.ship_date >= start_date,
+                DailyDemandFact.ship_date <= end_date,
+                DailyDemandFact.withdrawal_type.in_(demand_types),
             )
-            .group_by(Withdrawal.ship_date)
-            .order_by(Withdrawal.ship_date)
+            .group_by(DailyDemandFact.ship_date)
+            .order_by(DailyDemandFact.ship_date)
         )
 
         if warehouse_id:
-            stmt = stmt.where(LotReceipt.warehouse_id == warehouse_id)
+            stmt = stmt.where(DailyDemandFact.warehouse_id == warehouse_id)
 
         result = self.db.execute(stmt).all()
         return [(row.ship_date, row.total_quantity) for row in result]
+
+    def get_demand_history_batch(
+        self,
+        supplier_item_ids: list[int] | None,
+        warehouse_id: int | None,
+        start_date: date,
+        end_date: date,
+        demand_types: list[str],
+    ) -> dict[int, list[tuple[date, Decimal]]]:
+        """複数製品の需要履歴を1回の集計クエリで取得する.
+
+        Args:
+            supplier_item_ids: 対象製品ID（Noneなら倉庫内の全製品）
+            warehouse_id: 倉庫ID（Noneなら全倉庫）
+            start_date: 開始日
+            end_date: 終了日
+            demand_types: 需要としてカウントする出庫タイプ
+
+        Returns:
+            dict[int, list[tuple[date, Decimal]]]: 製品ID → (日付, 数量) のリスト
+        """
+        stmt = (
+            select(
+                DailyDemandFact.supplier_item_id,
+                DailyDemandFact.ship_date,
+                func.sum(DailyDemandFact.quantity).label("total_quantity"),
+            )
+            .where(
+                DailyDemandFact.supplier_item_id.is_not(None),
+                DailyDemandFact.ship_date >= start_date,
+                DailyDemandFact.ship_date <= end_date,
+                DailyDemandFact.withdrawal_type.in_(demand_types),
+            )
+            .group_by(DailyDemandFact.supplier_item_id, DailyDemandFact.ship_date)
+            .order_by(DailyDemandFact.supplier_item_id, DailyDemandFact.ship_date)
+        )
+
+        if supplier_item_ids is not None:
+            stmt = stmt.where(DailyDemandFact.supplier_item_id.in_(supplier_item_ids))
+        if warehouse_id:
+            stmt = stmt.where(DailyDemandFact.warehouse_id == warehouse_id)
+
+        history: dict[int, list[tuple[date, Decimal]]] = {}
+        for row in self.db.execute(stmt):
+            history.setdefault(row.supplier_item_id, []).append((row.ship_date, row.total_quantity))
+        return history
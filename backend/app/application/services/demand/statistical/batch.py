@@ -0,0 +1,213 @@
+"""複数製品をまとめて計算する需要予測（NumPy によるベクトル化）。.
+
+【設計意図】なぜバッチ予測が必要なのか:
+- 製品ごとの予測器（MovingAverageEstimator 等）は製品1件ごとに履歴クエリを発行し、
+  日別の Decimal ループで計算する → 倉庫全体の発注提案では製品数 × 数クエリになる
+- バッチ予測は全製品の履歴を1回の集計クエリで取得し、(製品 × 日) の密行列にして
+  移動平均・EWMA・季節係数・外れ値キャップを全製品同時に計算する
+
+【設計意図】結果の互換性:
+- 手法・係数・判定は製品ごとの予測器と同じ（seasonal_factor / OUTLIER_CAP_MULTIPLIER を共有）
+- 計算は float64 で行い、結果のみ Decimal に変換する（末尾桁の丸め差はあり得る）
+- 発注提案では日別予測を使わないため daily_forecasts は生成しない
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any
+
+import numpy as np
+
+from app.application.services.demand.estimator import DemandForecast
+from app.application.services.demand.repository import DemandRepository
+from app.application.services.demand.statistical.outlier import OUTLIER_CAP_MULTIPLIER
+from app.application.services.demand.statistical.seasonal import seasonal_factor
+
+
+DEMAND_TYPES = ["order_auto", "order_manual"]
+
+
+def _to_decimal(value: Any) -> Decimal:
+    return Decimal(repr(float(value)))
+
+
+def build_demand_matrix(
+    supplier_item_ids: Sequence[int],
+    history: dict[int, list[tuple[date, Decimal]]],
+    start_date: date,
+    days: int,
+) -> np.ndarray:
+    """履歴を (製品 × 日) の密行列に展開する（実績のない日は0）."""
+    matrix = np.zeros((len(supplier_item_ids), days), dtype=np.float64)
+    for row, supplier_item_id in enumerate(supplier_item_ids):
+        for day, quantity in history.get(supplier_item_id, ()):
+            offset = (day - start_date).days
+            if 0 <= offset < days:
+                matrix[row, offset] = float(quantity)
+    return matrix
+
+
+class BatchDemandEstimator:
+    """製品ごとの予測器と同じ手法を全製品同時に計算する。.
+
+    method:
+        - "ewma": EWMAEstimator 相当
+        - それ以外: MovingAverageEstimator + SeasonalEstimator + OutlierHandler 相当
+    """
+
+    def __init__(
+        self,
+        repository: DemandRepository,
+        method: str = "moving_average_seasonal",
+        window_days: int = 30,
+        alpha: float = 0.3,
+        lookback_days: int = 90,
+    ):
+        self.repository = repository
+        self.method = method
+        self.window_days = window_days
+        self.alpha = alpha
+        self.lookback_days = lookback_days
+
+    def estimate_many(
+        self,
+        supplier_item_ids: Sequence[int],
+        warehouse_id: int | None,
+        horizon_days: int,
+        as_of_date: date,
+    ) -> dict[int, DemandForecast]:
+        """全製品の需要予測を返す（製品ID → DemandForecast）。."""
+        if not supplier_item_ids:
+            return {}
+
+        days = self.lookback_days if self.method == "ewma" else self.window_days
+        start_date = as_of_date - timedelta(days=days)
+        history = self.repository.get_demand_history_batch(
+            supplier_item_ids=list(supplier_item_ids),
+            warehouse_id=warehouse_id,
+            start_date=start_date,
+            end_date=as_of_date,
+            demand_types=DEMAND_TYPES,
+        )
+        # as_of_date 当日は含めない（前日まで）
+        matrix = build_demand_matrix(supplier_item_ids, history, start_date, days)
+
+        if self.method == "ewma":
+            return self._ewma(supplier_item_ids, matrix, warehouse_id, horizon_days, as_of_date)
+        return self._moving_average_seasonal(
+            supplier_item_ids, matrix, warehouse_id, horizon_days, as_of_date
+        )
+
+    def _moving_average_seasonal(
+        self,
+        supplier_item_ids: Sequence[int],
+        matrix: np.ndarray,
+        warehouse_id: int | None,
+        horizon_days: int,
+        as_of_date: date,
+    ) -> dict[int, DemandForecast]:
+        n_days = matrix.shape[1]
+        points_used = np.count_nonzero(matrix > 0, axis=1)
+        if n_days:
+            avg = matrix.mean(axis=1)
+            std = matrix.std(axis=1, ddof=1) if n_days > 1 else np.zeros(len(matrix))
+        else:
+            avg = np.zeros(len(matrix))
+            std = np.zeros(len(matrix))
+
+        # 季節係数: 予測日の月ごとの係数ベクトル
+        factors = np.array(
+            [
+                float(seasonal_factor((as_of_date + timedelta(days=i)).month))
+                for i in range(horizon_days)
+            ],
+            dtype=np.float64,
+        )
+        daily = avg[:, None] * factors[None, :]
+        seasonal_total = daily.sum(axis=1)
+        seasonal_avg = seasonal_total / horizon_days if horizon_days > 0 else seasonal_total * 0
+
+        # 外れ値キャップ: 日平均 × 倍率 を上限にする（日平均 > 0 の製品のみ）
+        capped = seasonal_avg > 0
+        cap = seasonal_avg * float(OUTLIER_CAP_MULTIPLIER)
+        daily = np.where(capped[:, None], np.minimum(daily, cap[:, None]), daily)
+        total = daily.sum(axis=1)
+        final_avg = np.where(
+            capped, total / horizon_days if horizon_days > 0 else 0.0, seasonal_avg
+        )
+
+        history_start = (as_of_date - timedelta(days=self.window_days)).isoformat()
+        forecasts: dict[int, DemandForecast] = {}
+        for row, supplier_item_id in enumerate(supplier_item_ids):
+            details: dict[str, Any] = {
+                "window_days": self.window_days,
+                "history_start": history_start,
+                "history_end": as_of_date.isoformat(),
+                "seasonal_applied": True,
+            }
+            method = "moving_average+seasonal"
+            if capped[row]:
+                method += "+outlier_cap"
+                details["outlier_capped"] = True
+            points = int(points_used[row])
+            forecasts[supplier_item_id] = DemandForecast(
+                supplier_item_id=supplier_item_id,
+                warehouse_id=warehouse_id,
+                as_of_date=as_of_date,
+                horizon_days=horizon_days,
+                total=_to_decimal(total[row]),
+                avg_daily=_to_decimal(final_avg[row]),
+                std_daily=_to_decimal(std[row]),
+                method=method,
+                confidence=0.5 if points < 10 else 0.8,
+                data_points_used=points,
+                details=details,
+            )
+        return forecasts
+
+    def _ewma(
+        self,
+        supplier_item_ids: Sequence[int],
+        matrix: np.ndarray,
+        warehouse_id: int | None,
+        horizon_days: int,
+        as_of_date: date,
+    ) -> dict[int, DemandForecast]:
+        n_items, n_days = matrix.shape
+        ewma = np.zeros(n_items, dtype=np.float64)
+        initialized = np.zeros(n_items, dtype=bool)
+        # 漸化式は日方向に逐次だが、製品方向はベクトル演算（ループは日数回のみ）
+        for t in range(n_days):
+            qty = matrix[:, t]
+            smoothed = self.alpha * qty + (1.0 - self.alpha) * ewma
+            ewma = np.where(initialized, smoothed, np.where(qty > 0, qty, ewma))
+            initialized |= qty > 0
+
+        points_used = np.count_nonzero(matrix > 0, axis=1)
+        std = np.where(points_used > 5, ewma * 0.2, 0.0)
+        total = ewma * horizon_days
+
+        forecasts: dict[int, DemandForecast] = {}
+        for row, supplier_item_id in enumerate(supplier_item_ids):
+            points = int(points_used[row])
+            forecasts[supplier_item_id] = DemandForecast(
+                supplier_item_id=supplier_item_id,
+                warehouse_id=warehouse_id,
+                as_of_date=as_of_date,
+                horizon_days=horizon_days,
+                total=_to_decimal(total[row]),
+                avg_daily=_to_decimal(ewma[row]),
+                std_daily=_to_decimal(std[row]),
+                method="ewma",
+                confidence=0.6 if points < 10 else 0.85,
+                data_points_used=points,
+                details={
+                    "alpha": self.alpha,
+                    "lookback_days": self.lookback_days,
+                    "final_smoothed_value": float(ewma[row]),
+                },
+            )
+        return forecasts
@@ -4,6 +4,10 @@ from decimal import Decimal
 from app.application.services.demand.estimator import DemandEstimator, DemandForecast
 
 
+# 予測値の上限 = 日平均 × この倍率（バッチ予測と共通）
+OUTLIER_CAP_MULTIPLIER = Decimal("3.0")
+
+
 class OutlierHandler(DemandEstimator):
     """外れ値処理（Winsorizing）を行うラッパー予測器。."""
 
@@ -37,7 +41,7 @@ class OutlierHandler(DemandEstimator):
         # 予測値なので未来の値。ここでは極端なスパイク（例えば他手法のバグや異常値）を抑制
         # 平均の3倍をキャップとする簡易ロジック
         if base_forecast.avg_daily > 0:
-            cap = base_forecast.avg_daily * Decimal("3.0")
+            cap = base_forecast.avg_daily * OUTLIER_CAP_MULTIPLIER
 
             adjusted_forecasts = []
             total_adjusted = Decimal("0")
@@ -4,6 +4,17 @@ from decimal import Decimal
 from app.application.services.demand.estimator import DemandEstimator, DemandForecast
 
 
+def seasonal_factor(month: int) -> Decimal:
+    """月ごとの季節係数（バッチ予測と共通）."""
+    # TODO: 製品ごとの季節性フラグを見るべきだが、一旦全適用または設定で制御
+    # ここでは「夏ピーク」「冬ピーク」の両方を考慮した汎用的な係数を入れる（デモ用）
+    if month in [6, 7, 8]:
+        return Decimal("1.2")  # 夏は少し増える
+    if month in [11, 12, 1]:
+        return Decimal("1.2")  # 冬も少し増える
+    return Decimal("1.0")
+
+
 class SeasonalEstimator(DemandEstimator):
     """季節係数を適用するラッパー予測器。."""
 
@@ -36,15 +47,7 @@ class SeasonalEstimator(DemandEstimator):
         total_adjusted = Decimal("0")
 
         for daily in base_forecast.daily_forecasts:
-            month = daily.date.month
-            factor = Decimal("1.0")
-
-            # TODO: 製品ごとの季節性フラグを見るべきだが、一旦全適用または設定で制御
-            # ここでは「夏ピーク」「冬ピーク」の両方を考慮した汎用的な係数を入れる（デモ用）
-            if month in [6, 7, 8]:
-                factor = Decimal("1.2")  # 夏は少し増える
-            elif month in [11, 12, 1]:
-                factor = Decimal("1.2")  # 冬も少し増える
+            factor = seasonal_factor(daily.date.month)
 
             new_qty = daily.quantity * factor
             daily.quantity = new_qty
@@ -1,12 +1,27 @@
-"""Execution Queue Service."""
+"""Execution Queue Service.
+
+【設計意図】executor の2方式:
+- inline: API プロセス内（BackgroundTasks 等）で実行する従来方式。
+  リソースが空いていれば enqueue 時点で running になり、完了時に process_next で次を起動する
+- worker: ジョブワーカー（app.application.services.jobs.JobWorker）が実行する方式。
+  常に pending で登録し、ワーカーが claim_pending で取得する。
+  process_next は worker 行を起動しない（実行主体のいない running 行を作らないため）
+
+【設計意図】失敗・キャンセル時の後始末:
+- fail_task / cancel_pending / detect_stale でタスクが完了せずに終わった場合、
+  job_registry の失敗フック（resource_type ごと）を呼ぶ
+- キャンセルや stale 回収ではハンドラが動いていないため、業務側の状態
+  （PAD 実行の RUNNING 等）はキュー側から終わらせないと残り続ける
+"""
 
 from __future__ import annotations
 
+from collections.abc import Mapping, Sequence
 from datetime import datetime, timedelta
 from typing import Any
 
-from sqlalchemy import func, select, update
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, func, select, text, update
+from sqlalchemy.orm import Session, aliased
 
 from app.infrastructure.persistence.models.auth_models import User
 from app.infrastructure.persistence.models.execution_queue_model import ExecutionQueue
@@ -31,8 +46,13 @@ class ExecutionQueueService:
         parameters: dict[str, Any],
         priority: int = 0,
         timeout_seconds: int = 300,
+        *,
+        executor: str = "inline",
     ) -> EnqueueResult:
-        """タスクをキューに追加."""
+        """タスクをキューに追加.
+
+        executor="worker" の場合は実行中タスクの有無に関わらず pending で登録する。
+        """
         # Check for running task
         running_task = self.db.execute(
             select(ExecutionQueue)
@@ -48,8 +68,8 @@ class ExecutionQueueService:
         position = None
         running_by_user_name = None
 
-        if running_task:
-            # Already running, so queue it
+        if running_task or executor == "worker":
+            # Already running (or deferred to the worker), so queue it
             status = "pending"
             # Get max position
             max_pos = self.db.scalar(
@@ -62,9 +82,10 @@ class ExecutionQueueService:
             position = (max_pos or 0) + 1
 
             # Get running user name
-            running_user = self.db.get(User, running_task.requested_by_user_id)
-            if running_user:
-                running_by_user_name = running_user.display_name
+            if running_task:
+                running_user = self.db.get(User, running_task.requested_by_user_id)
+                if running_user:
+                    running_by_user_name = running_user.display_name
         else:
             # Not running, start immediately
             status = "running"
@@ -74,6 +95,7 @@ class ExecutionQueueService:
             resource_type=resource_type,
             resource_id=resource_id,
             status=status,
+            executor=executor,
             requested_by_user_id=user_id,
             parameters=parameters,
             priority=priority,
@@ -119,6 +141,7 @@ class ExecutionQueueService:
         task.completed_at = datetime.now()
         task.error_message = error_message
         self.db.commit()
+        self._run_failure_hook(task)
 
         # Process next
         return self.process_next(task.resource_type, task.resource_id)
@@ -133,6 +156,7 @@ class ExecutionQueueService:
                 ExecutionQueue.resource_type == resource_type,
                 ExecutionQueue.resource_id == resource_id,
                 ExecutionQueue.status == "pending",
+                ExecutionQueue.executor == "inline",
             )
             .order_by(ExecutionQueue.priority.desc(), ExecutionQueue.created_at.asc())
             .limit(1)
@@ -151,6 +175,106 @@ class ExecutionQueueService:
 
         return None
 
+    def claim_pending(
+        self,
+        resource_types: Sequence[str],
+        limit: int,
+        worker_id: str,
+        concurrency_limits: Mapping[str, int] | None = None,
+    ) -> list[ExecutionQueue]:
+        """Worker 実行（executor='worker'）の pending タスクを最大 limit 件取得して running にする.
+
+        - FOR UPDATE SKIP LOCKED で他ワーカーがロック中の行を飛ばす
+        - 同一リソースで running のタスクがあれば取得しない（1リソース1実行）
+        - concurrency_limits で resource_type ごとの同時実行数を制限する
+        """
+        if limit <= 0 or not resource_types:
+            return []
+
+        # 取得処理をワーカー間で直列化する（同時実行数の判定と更新の間に他が割り込まないように）
+        self.db.execute(text("SELECT pg_advisory_xact_lock(hashtext('execution_queue_claim'))"))
+
+        limits = dict(concurrency_limits or {})
+        running_counts: dict[str, int] = {}
+        if limits:
+            running_counts = {
+                resource_type: running_count
+                for resource_type, running_count in self.db.execute(
+                    select(ExecutionQueue.resource_type, func.count())
+                    .where(
+                        ExecutionQueue.status == "running",
+                        ExecutionQueue.resource_type.in_(list(resource_types)),
+                    )
+                    .group_by(ExecutionQueue.resource_type)
+                )
+            }
+
+        running = aliased(ExecutionQueue)
+        candidates = self.db.scalars(
+            select(ExecutionQueue)
+            .where(
+                ExecutionQueue.status == "pending",
+                ExecutionQueue.executor == "worker",
+                ExecutionQueue.resource_type.in_(list(resource_types)),
+                ~exists().where(
+                    running.resource_type == ExecutionQueue.resource_type,
+                    running.resource_id == ExecutionQueue.resource_id,
+                    running.status == "running",
+                ),
+            )
+            .order_by(
+                ExecutionQueue.priority.desc(),
+                ExecutionQueue.created_at.asc(),
+                ExecutionQueue.id.asc(),
+            )
+            # 同一リソース・上限到達分を除外するため多めに取得する
+            .limit(limit * 4)
+            .with_for_update(skip_locked=True)
+        ).all()
+
+        now = datetime.now()
+        claimed: list[ExecutionQueue] = []
+        seen_resources: set[tuple[str, str]] = set()
+        for task in candidates:
+            resource = (task.resource_type, task.resource_id)
+            if resource in seen_resources:
+                continue
+            cap = limits.get(task.resource_type)
+            if cap is not None and running_counts.get(task.resource_type, 0) >= cap:
+                continue
+            seen_resources.add(resource)
+            running_counts[task.resource_type] = running_counts.get(task.resource_type, 0) + 1
+
+            task.status = "running"
+            task.started_at = now
+            task.heartbeat_at = now
+            task.position = 0
+            task.worker_id = worker_id
+            claimed.append(task)
+            if len(claimed) >= limit:
+                break
+
+        self.db.commit()
+        return claimed
+
+    def update_progress(
+        self, queue_id: int, progress: int | None, message: str | None = None
+    ) -> None:
+        """進捗を更新（ハートビートも兼ねる）."""
+        values: dict[str, Any] = {"heartbeat_at": datetime.now(), "progress_message": message}
+        if progress is not None:
+            values["progress"] = max(0, min(100, progress))
+        self.db.execute(
+            update(ExecutionQueue)
+            .where(ExecutionQueue.id == queue_id, ExecutionQueue.status == "running")
+            .values(**values)
+        )
+        self.db.commit()
+
+    def get_entry(self, queue_id: int) -> ExecutionQueue | None:
+        """キューエントリを取得."""
+        return self.db.get(ExecutionQueue, queue_id)
+
     def get_status(
         self, resource_type: str, resource_id: str, user_id: int | None = None
     ) -> QueueStatusResponse:
@@ -231,6 +355,7 @@ class ExecutionQueueService:
 
         task.status = "cancelled"
         self.db.commit()
+        self._run_failure_hook(task)
         return True
 
     def update_heartbeat(self, queue_id: int) -> None:
@@ -258,6 +383,7 @@ class ExecutionQueueService:
             task.completed_at = datetime.now()
             task.error_message = f"Stale task detected (no heartbeat since {task.heartbeat_at})"
             self.db.commit()
+            self._run_failure_hook(task)
 
             # Try process next
             next_task = self.process_next(task.resource_type, task.resource_id)
@@ -265,3 +391,10 @@ class ExecutionQueueService:
                 processed.append(next_task)
 
         return processed
+
+    def _run_failure_hook(self, task: ExecutionQueue) -> None:
+        """失敗・キャンセルで終わったタスクの後始末（resource_type ごとのフック）."""
+        # jobs パッケージは本サービスに依存するため遅延 import
+        from app.application.services.jobs import job_registry
+
+        job_registry.run_failure_hook(self.db, task)
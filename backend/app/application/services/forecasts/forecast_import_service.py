@@ -1,23 +1,70 @@
-"""Forecast import service layer."""
+"""Forecast import service layer.
 
-from collections import defaultdict
+【設計意図】なぜ集合演算で取り込むのか:
+- 以前は得意先・納入先・製品マスタを全件 dict に読み込み、
+  (得意先, 納入先, 製品) グループごとに forecast_current を SELECT し、
+  既存行を1件ずつ ForecastHistory にコピー・削除し、新規行を1件ずつ db.add していた
+  → 月次の大量インポートで往復回数が行数に比例し、ロック保持時間も長くなる
+- 現在は以下の固定回数のステートメントで処理する
+  1. 取り込み行を COPY で一時テーブル（ステージング）へ投入
+  2. コード → ID の解決を UPDATE ... FROM で一括実行（取り込み対象のコードのみ参照）
+  3. 既存行のアーカイブを DELETE ... USING ... RETURNING → INSERT INTO forecast_history の1文で実行
+  4. 新規行を INSERT ... SELECT で一括投入
+- 引当提案は、アーカイブ・投入された (得意先, 納入先, 製品, 期間) キーのみを
+  差分再生成する（AllocationSuggestionService.regenerate_incremental）
+"""
 
-from sqlalchemy import and_
+from sqlalchemy import text
+from sqlalchemy.engine import Result
 from sqlalchemy.orm import Session
 
+from app.application.services.allocations.incremental_suggestion import SuggestionDirtySet
 from app.core.time_utils import utcnow
-from app.infrastructure.persistence.models.forecast_models import ForecastCurrent, ForecastHistory
-from app.infrastructure.persistence.models.masters_models import (
-    Customer,
-    DeliveryPlace,
-)
-from app.infrastructure.persistence.models.supplier_item_model import SupplierItem
+from app.infrastructure.persistence.copy_utils import copy_rows
 from app.presentation.schemas.forecasts.forecast_schema import (
     ForecastBulkImportItem,
     ForecastBulkImportSummary,
 )
 
 
+STAGING_TABLE = "forecast_import_staging"
+
+_STAGING_COLUMNS = [
+    "row_no",
+    "customer_code",
+    "delivery_place_code",
+    "product_code",
+    "forecast_date",
+    "forecast_quantity",
+    "unit",
+    "forecast_period",
+]
+
+_RESOLVED = (
+    "s.customer_id IS NOT NULL "
+    "AND s.delivery_place_id IS NOT NULL "
+    "AND s.supplier_item_id IS NOT NULL"
+)
+
+# 変更行を (得意先, 納入先, 製品, 期間) キーごとの件数に集約して返す
+_KEY_COUNTS = """
+SELECT customer_id, delivery_place_id, supplier_item_id, forecast_period, COUNT(*) AS row_count
+FROM {source}
+GROUP BY customer_id, delivery_place_id, supplier_item_id, forecast_period
+"""
+
+
+def _collect_keys(result: Result, dirty: SuggestionDirtySet) -> int:
+    """Mark the returned keys dirty and return the total row count."""
+    total = 0
+    for row in result:
+        dirty.mark_forecast(
+            row.customer_id, row.delivery_place_id, row.supplier_item_id, row.forecast_period
+        )
+        total += row.row_count
+    return total
+
+
 class ForecastImportService:
     """Business logic for forecast bulk import."""
 
@@ -34,130 +81,185 @@ class ForecastImportService:
         1. Move existing forecast_current rows to forecast_history
         2. Insert new snapshot into forecast_current
         """
-        errors: list[str] = []
-        imported_count = 0
-        archived_count = 0
-        skipped_count = 0
-
-        # Resolve codes to IDs
-        code_to_id: dict[str, dict[str, int]] = {
-            "customer": {},
-            "delivery_place": {},
-            "product": {},
-        }
-
-        # Load all customers
-        customers = self.db.query(Customer).all()
-        for c in customers:
-            code_to_id["customer"][c.customer_code] = c.id
-
-        # Load all delivery places
-        delivery_places = self.db.query(DeliveryPlace).all()
-        for dp in delivery_places:
-            code_to_id["delivery_place"][dp.delivery_place_code] = dp.id
-
-        # Load all products
-        products = self.db.query(SupplierItem).all()
-        for p in products:
-            code_to_id["product"][p.maker_part_no] = p.id
-
-        # Group items by customer × delivery_place × product
-        grouped: dict[tuple[int, int, int], list[ForecastBulkImportItem]] = defaultdict(list)
-
-        for i, item in enumerate(items):
-            # Resolve codes to IDs
-            customer_id = code_to_id["customer"].get(item.customer_code)
-            if customer_id is None:
-                errors.append(f"Row {i + 1}: Unknown customer_code '{item.customer_code}'")
-                skipped_count += 1
-                continue
-
-            delivery_place_id = code_to_id["delivery_place"].get(item.delivery_place_code)
-            if delivery_place_id is None:
-                errors.append(
-                    f"Row {i + 1}: Unknown delivery_place_code '{item.delivery_place_code}'"
-                )
-                skipped_count += 1
-                continue
-
-            supplier_item_id = code_to_id["product"].get(item.product_code)
-            if supplier_item_id is None:
-                errors.append(f"Row {i + 1}: Unknown product_code '{item.product_code}'")
-                skipped_count += 1
-                continue
-
-            key = (customer_id, delivery_place_id, supplier_item_id)
-            grouped[key].append(item)
-
-        # Process each group
-        snapshot_at = utcnow()
-
-        for (customer_id, delivery_place_id, supplier_item_id), group_items in grouped.items():
-            if replace_existing:
-                # Archive existing forecasts
-                existing = (
-                    self.db.query(ForecastCurrent)
-                    .filter(
-                        and_(
-                            ForecastCurrent.customer_id == customer_id,
-                            ForecastCurrent.delivery_place_id == delivery_place_id,
-                            ForecastCurrent.supplier_item_id == supplier_item_id,
-                        )
-                    )
-                    .all()
-                )
+        if not items:
+            return ForecastBulkImportSummary(imported_count=0, archived_count=0)
 
-                for existing_fc in existing:
-                    # Move to history
-                    history = ForecastHistory(
-                        customer_id=existing_fc.customer_id,
-                        delivery_place_id=existing_fc.delivery_place_id,
-                        supplier_item_id=existing_fc.supplier_item_id,
-                        forecast_date=existing_fc.forecast_date,
-                        forecast_quantity=existing_fc.forecast_quantity,
-                        unit=existing_fc.unit,
-                        forecast_period=existing_fc.forecast_period,
-                        snapshot_at=existing_fc.snapshot_at,
-                        created_at=existing_fc.created_at,
-                        updated_at=existing_fc.updated_at,
-                    )
-                    self.db.add(history)
-                    self.db.delete(existing_fc)
-                    archived_count += 1
-
-            # Insert new forecasts
-            for item in group_items:
-                db_forecast = ForecastCurrent(
-                    customer_id=customer_id,
-                    delivery_place_id=delivery_place_id,
-                    supplier_item_id=code_to_id["product"][item.product_code],
-                    forecast_date=item.forecast_date,
-                    forecast_quantity=item.forecast_quantity,
-                    unit=item.unit,
-                    forecast_period=item.forecast_period,
-                    snapshot_at=snapshot_at,
-                )
-                self.db.add(db_forecast)
-                imported_count += 1
+        # ステージングは ON COMMIT DROP（失敗時はロールバックで消える）。
+        # 同一トランザクションでの再実行に備えて成功時も明示的に削除する
+        dirty = SuggestionDirtySet()
+        self._stage(items)
+        errors, skipped_rows = self._resolve_codes()
+        archived_count = self._archive_existing(dirty) if replace_existing else 0
+        imported_count = self._insert_current(dirty)
+        self.db.execute(text(f"DROP TABLE {STAGING_TABLE}"))
 
         self.db.commit()
 
-        # Trigger allocation suggestion regeneration
+        # Trigger allocation suggestion regeneration (changed keys only)
         if imported_count > 0:
             # Import here to avoid circular dependency
             from app.application.services.allocations.suggestion import (
                 AllocationSuggestionService,
             )
 
-            # Collect unique periods
-            periods = list({item.forecast_period for item in items})
-            if periods:
-                service = AllocationSuggestionService(self.db)
-                service.regenerate_for_periods(periods)
+            AllocationSuggestionService(self.db).regenerate_incremental(dirty)
 
         return ForecastBulkImportSummary(
             imported_count=imported_count,
             archived_count=archived_count,
-            skipped_count=skipped_count,
+            skipped_count=len(skipped_rows),
             errors=errors,
         )
+
+    def _stage(self, items: list[ForecastBulkImportItem]) -> None:
+        """Create the staging table and COPY the import rows into it."""
+        self.db.execute(
+            text(
+                f"""
+                CREATE TEMP TABLE {STAGING_TABLE} (
+                    row_no INTEGER NOT NULL,
+                    customer_code TEXT NOT NULL,
+                    delivery_place_code TEXT NOT NULL,
+                    product_code TEXT NOT NULL,
+                    forecast_date DATE NOT NULL,
+                    forecast_quantity NUMERIC NOT NULL,
+                    unit TEXT,
+                    forecast_period VARCHAR(7) NOT NULL,
+                    customer_id BIGINT,
+                    delivery_place_id BIGINT,
+                    supplier_item_id BIGINT
+                ) ON COMMIT DROP
+                """
+            )
+        )
+        copy_rows(
+            self.db,
+            STAGING_TABLE,
+            _STAGING_COLUMNS,
+            (
+                (
+                    i,
+                    item.customer_code,
+                    item.delivery_place_code,
+                    item.product_code,
+                    item.forecast_date,
+                    item.forecast_quantity,
+                    item.unit,
+                    item.forecast_period,
+                )
+                for i, item in enumerate(items)
+            ),
+        )
+
+    def _resolve_codes(self) -> tuple[list[str], set[int]]:
+        """Resolve codes to IDs in the staging table.
+
+        Returns:
+            (error messages in row order, 0-based row numbers that were skipped)
+        """
+        # コード重複時は ID の大きい方を採用する
+        for target, table, code_column in (
+            ("customer_id", "customers", "customer_code"),
+            ("delivery_place_id", "delivery_places", "delivery_place_code"),
+            ("supplier_item_id", "supplier_items", "maker_part_no"),
+        ):
+            staging_code = "product_code" if target == "supplier_item_id" else code_column
+            self.db.execute(
+                text(
+                    f"""
+                    UPDATE {STAGING_TABLE} s
+                    SET {target} = m.id
+                    FROM (
+                        SELECT {code_column} AS code, MAX(id) AS id
+                        FROM {table}
+                        WHERE {code_column} IN (SELECT {staging_code} FROM {STAGING_TABLE})
+                        GROUP BY {code_column}
+                    ) m
+                    WHERE m.code = s.{staging_code}
+                    """
+                )
+            )
+
+        errors: list[str] = []
+        skipped_rows: set[int] = set()
+        unresolved = self.db.execute(
+            text(
+                f"""
+                SELECT row_no, customer_code, delivery_place_code, product_code,
+                       customer_id, delivery_place_id, supplier_item_id
+                FROM {STAGING_TABLE} s
+                WHERE NOT ({_RESOLVED})
+                ORDER BY row_no
+                """
+            )
+        )
+        for row in unresolved:
+            if row.customer_id is None:
+                errors.append(f"Row {row.row_no + 1}: Unknown customer_code '{row.customer_code}'")
+            elif row.delivery_place_id is None:
+                errors.append(
+                    f"Row {row.row_no + 1}: Unknown delivery_place_code '{row.delivery_place_code}'"
+                )
+            else:
+                errors.append(f"Row {row.row_no + 1}: Unknown product_code '{row.product_code}'")
+            skipped_rows.add(row.row_no)
+        return errors, skipped_rows
+
+    def _archive_existing(self, dirty: SuggestionDirtySet) -> int:
+        """Move forecast_current rows of the imported groups to forecast_history."""
+        result = self.db.execute(
+            text(
+                f"""
+                WITH import_keys AS (
+                    SELECT DISTINCT customer_id, delivery_place_id, supplier_item_id
+                    FROM {STAGING_TABLE} s
+                    WHERE {_RESOLVED}
+                ),
+                moved AS (
+                    DELETE FROM forecast_current fc
+                    USING import_keys k
+                    WHERE fc.customer_id = k.customer_id
+                      AND fc.delivery_place_id = k.delivery_place_id
+                      AND fc.supplier_item_id = k.supplier_item_id
+                    RETURNING fc.customer_id, fc.delivery_place_id, fc.supplier_item_id,
+                              fc.forecast_date, fc.forecast_quantity, fc.unit,
+                              fc.forecast_period, fc.snapshot_at, fc.created_at, fc.updated_at
+                ),
+                archived AS (
+                    INSERT INTO forecast_history (
+                        customer_id, delivery_place_id, supplier_item_id,
+                        forecast_date, forecast_quantity, unit,
+                        forecast_period, snapshot_at, created_at, updated_at
+                    )
+                    SELECT * FROM moved
+                    RETURNING customer_id, delivery_place_id, supplier_item_id, forecast_period
+                )
+                {_KEY_COUNTS.format(source="archived")}
+                """
+            )
+        )
+        return _collect_keys(result, dirty)
+
+    def _insert_current(self, dirty: SuggestionDirtySet) -> int:
+        """Insert resolved staging rows into forecast_current."""
+        result = self.db.execute(
+            text(
+                f"""
+                WITH inserted AS (
+                    INSERT INTO forecast_current (
+                        customer_id, delivery_place_id, supplier_item_id,
+                        forecast_date, forecast_quantity, unit, forecast_period, snapshot_at
+                    )
+                    SELECT customer_id, delivery_place_id, supplier_item_id,
+                           forecast_date, forecast_quantity, unit, forecast_period, :snapshot_at
+                    FROM {STAGING_TABLE} s
+                    WHERE {_RESOLVED}
+                    ORDER BY row_no
+                    RETURNING customer_id, delivery_place_id, supplier_item_id, forecast_period
+                )
+                {_KEY_COUNTS.format(source="inserted")}
+                """
+            ),
+            {"snapshot_at": utcnow()},
+        )
+        return _collect_keys(result, dirty)
@@ -135,7 +135,7 @@
 import logging
 from collections import defaultdict
 from decimal import Decimal
-from typing import cast
+from typing import NamedTuple, cast
 
 from sqlalchemy import and_, tuple_
 from sqlalchemy.exc import SQLAlchemyError
@@ -167,6 +167,15 @@ from app.presentation.schemas.forecasts.forecast_schema import (
 logger = logging.getLogger(__name__)
 
 
+class ForecastKey(NamedTuple):
+    """(customer, delivery_place, supplier_item, period) key of a forecast."""
+
+    customer_id: int
+    delivery_place_id: int
+    supplier_item_id: int
+    forecast_period: str
+
+
 class ForecastService(BaseService[ForecastCurrent, ForecastCreate, ForecastUpdate, int]):
     """Business logic for forecast_current and forecast_history.
 
@@ -450,10 +459,8 @@ class ForecastService(BaseService[ForecastCurrent, ForecastCreate, ForecastUpdat
             self._create_provisional_order(db_forecast)
             self.db.commit()
 
-            # Regenerate allocation suggestions for this period
-            product_code = get_product_code(db_forecast.supplier_item)
-            if product_code:
-                self._regenerate_allocation_suggestions(product_code)
+            # Regenerate allocation suggestions for this forecast key
+            self._regenerate_allocation_suggestions(db_forecast)
 
         created = self.get_forecast_by_id(db_forecast.id)
         if created is None:
@@ -479,7 +486,6 @@ class ForecastService(BaseService[ForecastCurrent, ForecastCreate, ForecastUpdat
                 "update_fields": list(data.model_dump(exclude_unset=True).keys()),
             },
         )
-        forecast_period = db_forecast.forecast_period  # Capture before update
         update_data = data.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             setattr(db_forecast, key, value)
@@ -499,8 +505,8 @@ class ForecastService(BaseService[ForecastCurrent, ForecastCreate, ForecastUpdat
                     self._delete_provisional_order(db_forecast)
                 self.db.commit()
 
-                # Regenerate allocation suggestions for this period
-                self._regenerate_allocation_suggestions(forecast_period)
+                # Regenerate allocation suggestions for this forecast key
+                self._regenerate_allocation_suggestions(db_forecast)
 
         return self.get_forecast_by_id(forecast_id)
 
@@ -522,7 +528,13 @@ class ForecastService(BaseService[ForecastCurrent, ForecastCreate, ForecastUpdat
                 "supplier_item_id": db_forecast.supplier_item_id,
             },
         )
-        forecast_period = db_forecast.forecast_period  # Capture before delete
+        # Capture key before delete
+        forecast_key = ForecastKey(
+            db_forecast.customer_id,
+            db_forecast.delivery_place_id,
+            db_forecast.supplier_item_id,
+            db_forecast.forecast_period,
+        )
 
         # Delete associated provisional order first
         self._delete_provisional_order(db_forecast)
@@ -530,8 +542,8 @@ class ForecastService(BaseService[ForecastCurrent, ForecastCreate, ForecastUpdat
         self.db.delete(db_forecast)
         self.db.commit()
 
-        # Regenerate allocation suggestions for this period
-        self._regenerate_allocation_suggestions(forecast_period)
+        # Regenerate allocation suggestions for this forecast key
+        self._regenerate_allocation_suggestions(forecast_key)
 
         return True
 
@@ -576,22 +588,31 @@ class ForecastService(BaseService[ForecastCurrent, ForecastCreate, ForecastUpdat
 
     # --- Provisional Order Management ---
 
-    def _regenerate_allocation_suggestions(self, forecast_period: str) -> None:
-        """Regenerate allocation suggestions for a forecast period.
+    def _regenerate_allocation_suggestions(self, key: "ForecastCurrent | ForecastKey") -> None:
+        """Regenerate allocation suggestions affected by one forecast key.
 
         This is called after forecast create/update/delete to keep
-        the planning allocation summary in sync.
+        the planning allocation summary in sync. Only the (product, period)
+        unit of the key is recomputed and the diff is applied.
         """
+        if isinstance(key, ForecastCurrent):
+            key = ForecastKey(
+                key.customer_id, key.delivery_place_id, key.supplier_item_id, key.forecast_period
+            )
         try:
+            from app.application.services.allocations.incremental_suggestion import (
+                SuggestionDirtySet,
+            )
             from app.application.services.allocations.suggestion import AllocationSuggestionService
 
-            suggestion_service = AllocationSuggestionService(self.db)
-            suggestion_service.regenerate_for_periods([forecast_period])
+            dirty = SuggestionDirtySet()
+            dirty.mark_forecast(*key)
+            AllocationSuggestionService(self.db).regenerate_incremental(dirty)
         except (ImportError, SQLAlchemyError, ValueError) as e:
             # Log but don't fail the forecast operation
             logger.warning(
                 "Failed to regenerate allocation suggestions for period %s: %s",
-                forecast_period,
+                key.forecast_period,
                 e,
             )
 
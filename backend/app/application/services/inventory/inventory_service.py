@@ -31,29 +31,26 @@ providing product × warehouse summary information.
    - supplier_id フィルタ時は若干遅い（リアルタイム集計）
    → ただし、フィルタにより対象ロット数が減るため、実用上問題なし
 
-3. なぜ2段階クエリ（サマリー + 引当内訳）を使うのか（L116-163）
-   理由: ソフト/ハード引当の内訳を追加取得
-   業務的背景:
-   - v_inventory_summary: allocated_quantity（合計のみ）
+3. なぜ1クエリ（CTE）でサマリー・引当内訳・ロット数を取得するのか
+   理由: ページ取得ごとのラウンドトリップ削減
+   背景:
+   - 以前は COUNT → ページ → 引当内訳 → ロット数 の4クエリを順に実行していた
    - 業務要件: ソフト引当とハード引当を区別して表示
-   → 2段階クエリで引当内訳を追加取得
    実装:
-   - クエリ1: v_inventory_summary で基本情報取得
-   - クエリ2: lot_reservations で引当内訳取得（soft/hard別）
+   - page: 製品×倉庫（×仕入先）集計をキーセット（cursor）または OFFSET で切り出し
+   - pair_stats: ページ内の製品×倉庫のみ soft/hard 引当とロット数を集計
+     （reserved_quantity_active / reserved_quantity は lot_stock_snapshot の集計済み値）
+   - 総件数は別の COUNT で求める（1ページ目が limit 未満なら件数から確定し省略）
    メリット:
-   - v_inventory_summary を変更せずに、引当内訳を追加取得
-   → ビューの再作成が不要
-
-4. なぜ O(1) ルックアップ用の辞書を作るのか（L164-174）
-   理由: N×M の突合を高速化
-   パフォーマンス:
-   - N件の在庫サマリー × M件の引当内訳 → O(N×M) = 遅い
-   - 辞書化: {(supplier_item_id, warehouse_id): {soft, hard}} → O(1) ルックアップ
+   - ページ本体は1クエリ
+
+4. なぜ引当内訳をページと LEFT JOIN するのか
+   理由: N×M の突合をDB側で完結させる
    実装:
-   - alloc_map: キー = (supplier_item_id, warehouse_id)、値 = {soft, hard}
-   - ループ内で alloc_map.get(key) → O(1) で取得
+   - pair_stats をキー (supplier_item_id, warehouse_id) でページに LEFT JOIN
+   - アプリ側の alloc_map / count_map による突合は不要
    メリット:
-   - 100件の在庫×100件の引当でも、200回のループで完了
+   - 行ごとに soft/hard/ロット数が揃った状態で返る
 
 5. なぜ CASE式で allocation_type を判定するのか（L137-153）
    理由: lot_reservations.status を soft/hard に変換
@@ -90,16 +87,20 @@ providing product × warehouse summary information.
    業務影響:
    - 引当がない新規入荷製品も、正しく在庫として表示
 
-8. なぜ IN句でフィルタするのか（L146-147）
-   理由: 最初のクエリで取得した製品×倉庫のみを対象
-   パフォーマンス:
-   - 全引当レコードを取得すると、膨大な行数（数十万件）
-   → IN句でページング対象のみに絞る
+8. なぜキーセットページングと概算件数を用意するのか
+   理由: 深いページで OFFSET が読み飛ばし行を毎回集計するため
    実装:
-   - found_products: 最初のクエリで取得した製品IDリスト
-   - WHERE l.supplier_item_id IN :supplier_item_ids AND l.warehouse_id IN :warehouse_ids
-   メリット:
-   - 100件の在庫サマリーに対して、100件分の引当のみ取得
+   - cursor: 直前ページ最終行の (supplier_id,) supplier_item_id, warehouse_id
+     → 行比較 (key) > (:cursor) で次ページを取得（next_cursor を返却）
+   - キーは GROUP BY 列そのものなので、行比較は集計前の WHERE に置く
+     （集計後やウィンドウ関数の外に置くと全グループを集計してから捨てることになり、
+     深いページのコストが OFFSET と変わらなくなる）
+   - supplier_id は NULL になりうるため (IS NULL, COALESCE(supplier_id, 0)) をキーにする
+   - total_mode="auto"（既定）: カーソルなしのページは COUNT、カーソルページは推定値
+   - total_mode="exact": 常に COUNT / "estimate": 常に EXPLAIN の推定行数
+     （推定値の場合は total_is_estimate=True）
+   互換性:
+   - skip/limit による従来のページングもそのまま利用可能
 
 9. なぜ text() で生SQLを使うのか（L50-117, L214-264）
    理由: SQLAlchemy ORM では表現困難なクエリ
@@ -145,6 +146,46 @@ from app.presentation.schemas.inventory.inventory_schema import (
 )
 
 
+_CURSOR_NULL = "null"
+
+
+def _encode_inventory_cursor(
+    supplier_item_id: int,
+    warehouse_id: int,
+    supplier_id: int | None,
+    use_supplier_grouping: bool,
+) -> str:
+    """Encode the sort key of the last row as an opaque keyset cursor."""
+    parts = [str(supplier_item_id), str(warehouse_id)]
+    if use_supplier_grouping:
+        parts.insert(0, _CURSOR_NULL if supplier_id is None else str(supplier_id))
+    return ":".join(parts)
+
+
+def _decode_inventory_cursor(cursor: str, use_supplier_grouping: bool) -> dict[str, int | bool]:
+    """Decode a keyset cursor into bind parameters.
+
+    Raises:
+        ValueError: If the cursor does not match the grouping mode
+    """
+    parts = cursor.split(":")
+    expected = 3 if use_supplier_grouping else 2
+    if len(parts) != expected:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    try:
+        params: dict[str, int | bool] = {
+            "c_supplier_item_id": int(parts[-2]),
+            "c_warehouse_id": int(parts[-1]),
+        }
+        if use_supplier_grouping:
+            supplier_null = parts[0] == _CURSOR_NULL
+            params["c_supplier_null"] = supplier_null
+            params["c_supplier_id"] = 0 if supplier_null else int(parts[0])
+    except ValueError as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    return params
+
+
 class InventoryService:
     """Business logic for inventory items (aggregated summary from lots)."""
 
@@ -167,11 +208,15 @@ class InventoryService:
         assigned_staff_only: bool = False,
         current_user_id: int | None = None,
         group_by: str = "product_warehouse",
+        cursor: str | None = None,
+        total_mode: str = "auto",
     ) -> InventoryListResponse:
         """Get inventory items from v_lot_receipt_stock view with grouping.
 
+        ページ・引当内訳（soft/hard）・ロット数は1クエリ（CTE）で取得する。
+
         Args:
-            skip: Number of records to skip (pagination)
+            skip: Number of records to skip (pagination, ignored when cursor is given)
             limit: Maximum number of records to return
             supplier_item_id: Filter by product ID
             warehouse_id: Filter by warehouse ID
@@ -180,20 +225,25 @@ class InventoryService:
             assigned_staff_only: Filter by primary staff (current user)
             current_user_id: Current user ID (required if assigned_staff_only=True)
             group_by: Grouping mode - 'product_warehouse' (default) or 'supplier_product_warehouse'
+            cursor: Keyset cursor (next_cursor of the previous page)
+            total_mode: 'auto' (exact without cursor, estimate on cursor pages),
+                'exact' (COUNT over groups) or 'estimate' (planner row estimate)
 
         Returns:
-            InventoryListResponse containing items and total count
-        """
-        from sqlalchemy import text
+            InventoryListResponse containing items, total count and next_cursor
 
-        total = 0
+        Raises:
+            ValueError: If cursor or total_mode is invalid
+        """
+        if total_mode not in ("auto", "exact", "estimate"):
+            raise ValueError(f"Invalid total_mode: {total_mode}")
 
         # Always use v_lot_receipt_stock view which handles B-Plan logic
         # and includes supplier information needed for group_by modes
 
         # Base logic for WHERE clause
         where_clauses = ["v.remaining_quantity > 0", "v.status = 'active'"]
-        params: dict[str, int | str] = {}
+        params: dict[str, int | str | bool] = {}
 
         if supplier_id is not None:
             where_clauses.append("v.supplier_id = :supplier_id")
@@ -233,35 +283,33 @@ class InventoryService:
             group_by_cols = "v.supplier_id, v.supplier_item_id, v.warehouse_id"
             group_by_full = f"{group_by_cols}, v.display_name, v.product_code, v.capacity, v.warranty_period_days, v.warehouse_name, v.warehouse_code, v.supplier_name, v.supplier_code"
             select_supplier = ", v.supplier_id, v.supplier_name, v.supplier_code"
-            order_by = "v.supplier_id, v.supplier_item_id, v.warehouse_id"
+            # supplier_id は NULL になりうるため (IS NULL, COALESCE) でキー化（NULLS LAST 相当）
+            sort_key = (
+                "(g.supplier_id IS NULL), COALESCE(g.supplier_id, 0), "
+                "g.supplier_item_id, g.warehouse_id"
+            )
+            cursor_key = "(:c_supplier_null, :c_supplier_id, :c_supplier_item_id, :c_warehouse_id)"
+            row_key = (
+                "(v.supplier_id IS NULL), COALESCE(v.supplier_id, 0), "
+                "v.supplier_item_id, v.warehouse_id"
+            )
         else:
             # Product × Warehouse grouping (default, aggregates across suppliers)
             group_by_cols = "v.supplier_item_id, v.warehouse_id"
             group_by_full = f"{group_by_cols}, v.display_name, v.product_code, v.capacity, v.warranty_period_days, v.warehouse_name, v.warehouse_code"
             select_supplier = ""
-            order_by = "v.supplier_item_id, v.warehouse_id"
-
-        # --- Total Count Query ---
-        count_query = f"""
-            SELECT COUNT(*) FROM (
-                SELECT 1 FROM v_lot_receipt_stock v
-                {join_assignment}
-                WHERE {where_str}
-                GROUP BY {group_by_cols}
-                {having_clause}
-            ) as sub
-        """
-        total = self.db.execute(text(count_query), params).scalar() or 0
+            sort_key = "g.supplier_item_id, g.warehouse_id"
+            cursor_key = "(:c_supplier_item_id, :c_warehouse_id)"
+            row_key = "v.supplier_item_id, v.warehouse_id"
 
-        # --- Data Query ---
-        query = f"""
-            SELECT 
-                v.supplier_item_id, 
-                v.warehouse_id, 
+        def build_grouped_query(where_sql: str) -> str:
+            return f"""
+            SELECT
+                v.supplier_item_id,
+                v.warehouse_id,
                 SUM(v.remaining_quantity) as total_quantity,
                 SUM(v.reserved_quantity) as allocated_quantity,
                 SUM(v.available_quantity) as available_quantity,
-                COUNT(v.receipt_id) as lot_count,
                 MAX(v.updated_at) as last_updated,
                 v.display_name,
                 v.product_code,
@@ -272,148 +320,155 @@ class InventoryService:
                 {select_supplier}
             FROM v_lot_receipt_stock v
             {join_assignment}
-            WHERE {where_str}
+            WHERE {where_sql}
             GROUP BY {group_by_full}
             {having_clause}
-            ORDER BY {order_by}
-            LIMIT :limit OFFSET :skip
         """
-        params["limit"] = limit
-        params["skip"] = skip
 
-        # 1. Base Summary Query
-        result = self.db.execute(text(query), params).fetchall()
+        grouped_query = build_grouped_query(where_str)
 
-        responses = []
-        if result:
-            # 2. Detail Allocation Aggregation Query
-            # Fetch detailed allocation breakdown for these products/warehouses
-            # We need to filter exactly the items we found in the first page
-            found_supplier_items = [r.supplier_item_id for r in result]
-            found_warehouses = [r.warehouse_id for r in result]
-
-            # P3: allocations table replaced by lot_reservations
-            # soft = active, hard = confirmed
-            alloc_query = """
-                SELECT 
-                    r.lot_id,
-                    l.supplier_item_id,
-                    l.warehouse_id,
-                    CASE 
-                        WHEN r.status = 'active' THEN 'soft'
-                        WHEN r.status = 'confirmed' THEN 'hard'
-                        ELSE 'soft'
-                    END as allocation_type,
-                    SUM(r.reserved_qty) as qty
-                FROM lot_reservations r
-                JOIN v_lot_receipt_stock l ON l.receipt_id = r.lot_id
-                WHERE r.status IN ('active', 'confirmed')
-                  AND l.supplier_item_id IN :supplier_item_ids
-                  AND l.warehouse_id IN :warehouse_ids
-                GROUP BY r.lot_id, l.supplier_item_id, l.warehouse_id, 
-                    CASE 
-                        WHEN r.status = 'active' THEN 'soft'
-                        WHEN r.status = 'confirmed' THEN 'hard'
-                        ELSE 'soft'
-                    END
-            """
+        # Keyset pagination: (supplier_id,) supplier_item_id, warehouse_id の行比較。
+        # キーは GROUP BY 列なので集計前の WHERE で絞り込む（通過したグループだけを集計する）
+        page_where = where_str
+        offset_clause = " OFFSET :skip"
+        if cursor is not None:
+            params.update(_decode_inventory_cursor(cursor, use_supplier_grouping))
+            page_where = f"{where_str} AND ({row_key}) > {cursor_key}"
+            offset_clause = ""
+        else:
+            params["skip"] = skip
+        params["limit"] = limit
 
-            alloc_rows = self.db.execute(
-                text(alloc_query),
-                {
-                    "supplier_item_ids": tuple(set(found_supplier_items)),
-                    "warehouse_ids": tuple(set(found_warehouses)),
-                },
-            ).fetchall()
-
-            # 2b. Lot Count Aggregation Query
-            # IMPORTANT: This must match the /api/lots endpoint's default behavior
-            # which is with_stock=True (current_quantity > 0)
-            count_query_details = """
+        # 【設計意図】1クエリ化（CTE）:
+        # - page: 製品×倉庫（×仕入先）の集計をキーセット（またはOFFSET）で切り出し
+        # - pair_stats: ページ内の製品×倉庫に限定して soft/hard 引当とロット数を集計
+        #   （v_lot_receipt_stock の予約数量は lot_stock_snapshot の集計済み値）
+        # 総件数（COUNT(*) OVER ()）を同じ文に含めるとカーソル条件を集計の内側に
+        # 押し込めなくなるため、件数は別クエリにする
+        query = f"""
+            WITH page AS (
+                SELECT g.*
+                FROM ({build_grouped_query(page_where)}) g
+                ORDER BY {sort_key}
+                LIMIT :limit{offset_clause}
+            ),
+            pair_stats AS (
                 SELECT
                     v.supplier_item_id,
                     v.warehouse_id,
-                    COUNT(v.receipt_id) as lot_count
+                    SUM(v.reserved_quantity_active) AS soft_allocated_quantity,
+                    SUM(v.reserved_quantity) AS hard_allocated_quantity,
+                    COUNT(*) FILTER (
+                        WHERE v.remaining_quantity > 0 AND v.status = 'active'
+                    ) AS active_lot_count
                 FROM v_lot_receipt_stock v
-                WHERE v.supplier_item_id IN :supplier_item_ids
-                  AND v.warehouse_id IN :warehouse_ids
-                  AND v.remaining_quantity > 0 AND v.status = 'active'
+                WHERE (v.supplier_item_id, v.warehouse_id) IN (
+                    SELECT supplier_item_id, warehouse_id FROM page
+                )
                 GROUP BY v.supplier_item_id, v.warehouse_id
-            """
-            count_rows_details = self.db.execute(
-                text(count_query_details),
-                {
-                    "supplier_item_ids": tuple(set(found_supplier_items)),
-                    "warehouse_ids": tuple(set(found_warehouses)),
-                },
-            ).fetchall()
-
-            # Map counts
-            count_map = {}
-            for row in count_rows_details:
-                key = (row.supplier_item_id, row.warehouse_id)
-                count_map[key] = row.lot_count
-            alloc_map = {}
-            for row in alloc_rows:
-                key = (row.supplier_item_id, row.warehouse_id)
-                if key not in alloc_map:
-                    alloc_map[key] = {"soft": 0.0, "hard": 0.0}
-
-                atype = row.allocation_type  # 'soft' or 'hard'
-                if atype in alloc_map[key]:
-                    alloc_map[key][atype] += float(row.qty)
-
-            # 3. Construct Response
-            for idx, row in enumerate(result):
-                key = (row.supplier_item_id, row.warehouse_id)
-                allocs = alloc_map.get(key, {"soft": 0.0, "hard": 0.0})
-                # Use active_lot_count from view, fallback to count_map for supplier-filtered query
-                active_lot_count = getattr(row, "active_lot_count", count_map.get(key, 0))
-
-                # Compute inventory_state from available data if not in result
-                if hasattr(row, "inventory_state") and row.inventory_state:
-                    inventory_state = row.inventory_state
-                else:
-                    # Determine state based on available_quantity and lot_count
-                    available_qty = float(row.available_quantity or 0)
-                    lot_cnt = active_lot_count or 0
-                    if lot_cnt == 0:
-                        inventory_state = "no_lots"
-                    elif available_qty > 0:
-                        inventory_state = "in_stock"
-                    else:
-                        inventory_state = "depleted_only"
-
-                responses.append(
-                    InventoryItemResponse(
-                        id=idx + 1,
-                        supplier_item_id=row.supplier_item_id,
-                        warehouse_id=row.warehouse_id,
-                        total_quantity=row.total_quantity,
-                        allocated_quantity=row.allocated_quantity,
-                        available_quantity=row.available_quantity,
-                        soft_allocated_quantity=Decimal(str(allocs["soft"])),
-                        hard_allocated_quantity=Decimal(str(allocs["hard"])),
-                        active_lot_count=active_lot_count,
-                        inventory_state=InventoryState(inventory_state),
-                        last_updated=row.last_updated,
-                        product_name=row.display_name,
-                        product_code=row.product_code,
-                        capacity=getattr(row, "capacity", None),
-                        warranty_period_days=getattr(row, "warranty_period_days", None),
-                        warehouse_name=row.warehouse_name,
-                        warehouse_code=row.warehouse_code,
-                        # Supplier fields (present when group_by='supplier_product_warehouse')
-                        supplier_id=getattr(row, "supplier_id", None),
-                        supplier_name=getattr(row, "supplier_name", None),
-                        supplier_code=getattr(row, "supplier_code", None),
-                    )
+            )
+            SELECT
+                g.*,
+                COALESCE(ps.soft_allocated_quantity, 0) AS soft_allocated_quantity,
+                COALESCE(ps.hard_allocated_quantity, 0) AS hard_allocated_quantity,
+                COALESCE(ps.active_lot_count, 0) AS active_lot_count
+            FROM page g
+            LEFT JOIN pair_stats ps
+                ON ps.supplier_item_id = g.supplier_item_id
+                AND ps.warehouse_id = g.warehouse_id
+            ORDER BY {sort_key}
+        """
+
+        result = self.db.execute(text(query), params).fetchall()
+
+        exact_total = total_mode == "exact" or (total_mode == "auto" and cursor is None)
+        if not exact_total:
+            total = self._estimate_row_count(grouped_query, params)
+        elif cursor is None and skip == 0 and len(result) < limit:
+            # 1ページに収まる場合は件数が確定しているため COUNT を省略
+            total = len(result)
+        else:
+            total = self._count_grouped(grouped_query, params)
+
+        responses = []
+        for idx, row in enumerate(result):
+            active_lot_count = int(row.active_lot_count)
+
+            # Determine state based on available_quantity and lot_count
+            available_qty = float(row.available_quantity or 0)
+            if active_lot_count == 0:
+                inventory_state = "no_lots"
+            elif available_qty > 0:
+                inventory_state = "in_stock"
+            else:
+                inventory_state = "depleted_only"
+
+            responses.append(
+                InventoryItemResponse(
+                    id=idx + 1,
+                    supplier_item_id=row.supplier_item_id,
+                    warehouse_id=row.warehouse_id,
+                    total_quantity=row.total_quantity,
+                    allocated_quantity=row.allocated_quantity,
+                    available_quantity=row.available_quantity,
+                    soft_allocated_quantity=Decimal(str(row.soft_allocated_quantity)),
+                    hard_allocated_quantity=Decimal(str(row.hard_allocated_quantity)),
+                    active_lot_count=active_lot_count,
+                    inventory_state=InventoryState(inventory_state),
+                    last_updated=row.last_updated,
+                    product_name=row.display_name,
+                    product_code=row.product_code,
+                    capacity=getattr(row, "capacity", None),
+                    warranty_period_days=getattr(row, "warranty_period_days", None),
+                    warehouse_name=row.warehouse_name,
+                    warehouse_code=row.warehouse_code,
+                    # Supplier fields (present when group_by='supplier_product_warehouse')
+                    supplier_id=getattr(row, "supplier_id", None),
+                    supplier_name=getattr(row, "supplier_name", None),
+                    supplier_code=getattr(row, "supplier_code", None),
                 )
+            )
+
+        next_cursor = None
+        if result and len(result) == limit:
+            last = result[-1]
+            next_cursor = _encode_inventory_cursor(
+                last.supplier_item_id,
+                last.warehouse_id,
+                getattr(last, "supplier_id", None),
+                use_supplier_grouping,
+            )
 
         return InventoryListResponse(
-            items=responses, total=total, page=skip // limit + 1 if limit > 0 else 1, size=limit
+            items=responses,
+            total=total,
+            page=skip // limit + 1 if limit > 0 and cursor is None else 1,
+            size=limit,
+            next_cursor=next_cursor,
+            total_is_estimate=not exact_total,
         )
 
+    def _count_grouped(self, grouped_query: str, params: dict[str, int | str | bool]) -> int:
+        """Exact number of groups for the grouped inventory query."""
+        count_query = f"SELECT COUNT(*) FROM ({grouped_query}) AS sub"
+        return int(self.db.execute(text(count_query), params).scalar() or 0)
+
+    def _estimate_row_count(self, grouped_query: str, params: dict[str, int | str | bool]) -> int:
+        """Planner row estimate for the grouped inventory query (no execution).
+
+        【設計意図】深いページングで毎回 COUNT(*) を実行しないよう、
+        EXPLAIN の推定行数を概算件数として返す（total_is_estimate=True）。
+        """
+        plan: Any = self.db.execute(text(f"EXPLAIN (FORMAT JSON) {grouped_query}"), params).scalar()
+        if isinstance(plan, str):
+            import json
+
+            plan = json.loads(plan)
+        try:
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except (TypeError, KeyError, IndexError, ValueError):
+            return 0
+
     def get_inventory_item_by_product_warehouse(
         self, supplier_item_id: int, warehouse_id: int
     ) -> InventoryItemResponse | None:
@@ -132,6 +132,7 @@ v2.2: lot_current_stock 依存を削除。Lot モデルを直接使用。
 from __future__ import annotations
 
 import logging
+from collections.abc import Iterator
 from datetime import date, timedelta
 from decimal import Decimal
 
@@ -156,6 +157,7 @@ from app.domain.lot import (
     LotWarehouseNotFoundError,
     StockValidator,
 )
+from app.infrastructure.monitoring.sql_profiler import sql_budget
 from app.infrastructure.persistence.models import (
     LotMaster,
     LotReceipt,
@@ -397,6 +399,8 @@ class LotService:
         """全ロットを取得します (一括エクスポート用)。."""
         return self.list_lots(skip=skip, limit=limit)
 
+    # 本体 1 + 仕入先・倉庫コードの解決 2
+    @sql_budget(max_queries=3, max_repeats=1)
     def list_lots(
         self,
         skip: int = 0,
@@ -487,47 +491,62 @@ class LotService:
             )
 
         lot_views = query.offset(skip).limit(limit).all()
-
-        responses: list[LotResponse] = []
-        for lot_view in lot_views:
-            response = LotResponse(
-                id=lot_view.lot_id,
-                lot_number=lot_view.lot_number or "",
-                order_no=getattr(lot_view, "order_no", None),
-                supplier_item_id=lot_view.supplier_item_id or 0,
-                product_code=lot_view.maker_part_no or "",
-                product_name=lot_view.display_name,
-                supplier_id=lot_view.supplier_id,
-                supplier_code=lot_view.supplier_code,
-                supplier_name=lot_view.supplier_name or "",
-                warehouse_id=lot_view.warehouse_id,
-                warehouse_code=lot_view.warehouse_code,
-                warehouse_name=lot_view.warehouse_name,
-                received_quantity=lot_view.received_quantity,
-                remaining_quantity=lot_view.remaining_quantity or Decimal("0"),
-                current_quantity=lot_view.remaining_quantity or Decimal("0"),
-                allocated_quantity=lot_view.allocated_quantity or Decimal("0"),
-                reserved_quantity_active=getattr(
-                    lot_view, "reserved_quantity_active", Decimal("0")
-                ),
-                available_quantity=getattr(lot_view, "available_quantity", Decimal("0")),
-                unit=lot_view.unit,
-                received_date=lot_view.received_date,
-                expiry_date=lot_view.expiry_date,
-                remarks=lot_view.remarks,
-                status=LotStatus(lot_view.status) if lot_view.status else LotStatus.ACTIVE,
-                created_at=lot_view.created_at,
-                updated_at=lot_view.updated_at,
-                is_assigned_supplier=bool(
-                    assigned_supplier_ids and lot_view.supplier_id in assigned_supplier_ids
-                ),
-                # Phase 2 Mapping
-                maker_part_no=lot_view.supplier_maker_part_no,
-                customer_part_no=lot_view.customer_part_no,
-                mapping_status=lot_view.mapping_status,
+        return [self._to_lot_response(lot_view, assigned_supplier_ids) for lot_view in lot_views]
+
+    def iter_all(self, chunk_size: int = 1000) -> Iterator[LotResponse]:
+        """在庫ありの全ロットをサーバーサイドカーソルで順に返します (一括エクスポート用)。."""
+        query = (
+            self.db.query(VLotDetails)
+            .filter(VLotDetails.available_quantity > 0)
+            .order_by(
+                VLotDetails.maker_part_no.asc(),
+                VLotDetails.supplier_name.asc(),
+                VLotDetails.expiry_date.asc().nullslast(),
+                VLotDetails.lot_id.asc(),
             )
-            responses.append(response)
-        return responses
+            .yield_per(chunk_size)
+        )
+        for lot_view in query:
+            yield self._to_lot_response(lot_view)
+
+    @staticmethod
+    def _to_lot_response(
+        lot_view: VLotDetails, assigned_supplier_ids: list[int] | None = None
+    ) -> LotResponse:
+        return LotResponse(
+            id=lot_view.lot_id,
+            lot_number=lot_view.lot_number or "",
+            order_no=getattr(lot_view, "order_no", None),
+            supplier_item_id=lot_view.supplier_item_id or 0,
+            product_code=lot_view.maker_part_no or "",
+            product_name=lot_view.display_name,
+            supplier_id=lot_view.supplier_id,
+            supplier_code=lot_view.supplier_code,
+            supplier_name=lot_view.supplier_name or "",
+            warehouse_id=lot_view.warehouse_id,
+            warehouse_code=lot_view.warehouse_code,
+            warehouse_name=lot_view.warehouse_name,
+            received_quantity=lot_view.received_quantity,
+            remaining_quantity=lot_view.remaining_quantity or Decimal("0"),
+            current_quantity=lot_view.remaining_quantity or Decimal("0"),
+            allocated_quantity=lot_view.allocated_quantity or Decimal("0"),
+            reserved_quantity_active=getattr(lot_view, "reserved_quantity_active", Decimal("0")),
+            available_quantity=getattr(lot_view, "available_quantity", Decimal("0")),
+            unit=lot_view.unit,
+            received_date=lot_view.received_date,
+            expiry_date=lot_view.expiry_date,
+            remarks=lot_view.remarks,
+            status=LotStatus(lot_view.status) if lot_view.status else LotStatus.ACTIVE,
+            created_at=lot_view.created_at,
+            updated_at=lot_view.updated_at,
+            is_assigned_supplier=bool(
+                assigned_supplier_ids and lot_view.supplier_id in assigned_supplier_ids
+            ),
+            # Phase 2 Mapping
+            maker_part_no=lot_view.supplier_maker_part_no,
+            customer_part_no=lot_view.customer_part_no,
+            mapping_status=lot_view.mapping_status,
+        )
 
     def search_lots(
         self,
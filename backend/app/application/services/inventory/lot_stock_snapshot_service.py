@@ -0,0 +1,174 @@
+"""Lot stock snapshot consistency service.
+
+lot_stock_snapshot（トリガー維持の集計テーブル）とライブ集計の整合性チェック・差分リフレッシュ。
+
+【設計意図】なぜ整合性チェッカーが必要なのか:
+- スナップショットはトリガーで同一トランザクション更新されるため通常は一致する
+- ただし以下のケースでズレが生じうる
+  - トリガー導入前のデータ（マイグレーションの初期集計で補完済み）
+  - トリガーを無効化した状態での直接データ修正・リストア
+  → find_drift() でライブ集計（lot_reservations / withdrawal_lines）と比較し、
+    refresh() でズレたロットのみ再集計する（差分リフレッシュ）
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Sequence
+from dataclasses import dataclass
+from decimal import Decimal
+
+from sqlalchemy import BigInteger, bindparam, func, or_, select, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+
+from app.infrastructure.persistence.models import (
+    LotReceipt,
+    LotStockSnapshot,
+    Withdrawal,
+    WithdrawalLine,
+)
+from app.infrastructure.persistence.models.lot_reservations_model import (
+    LotReservation,
+    ReservationStatus,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class LotStockDrift:
+    """Snapshot vs live aggregate mismatch for one lot."""
+
+    lot_id: int
+    snapshot_withdrawn: Decimal
+    live_withdrawn: Decimal
+    snapshot_confirmed: Decimal
+    live_confirmed: Decimal
+    snapshot_active: Decimal
+    live_active: Decimal
+
+
+class LotStockSnapshotService:
+    """Consistency checker and delta refresh for lot_stock_snapshot."""
+
+    def __init__(self, db: Session):
+        """Initialize with database session."""
+        self.db = db
+
+    def find_drift(
+        self, lot_ids: Sequence[int] | None = None, *, limit: int | None = None
+    ) -> list[LotStockDrift]:
+        """Compare snapshot values with the live aggregate.
+
+        Args:
+            lot_ids: Lots to check (None = all lots)
+            limit: Maximum number of mismatches to return
+
+        Returns:
+            Mismatching lots ordered by lot_id (missing snapshot rows count as 0)
+        """
+        reservations = (
+            select(
+                LotReservation.lot_id.label("lot_id"),
+                func.sum(LotReservation.reserved_qty)
+                .filter(LotReservation.status == ReservationStatus.CONFIRMED)
+                .label("confirmed"),
+                func.sum(LotReservation.reserved_qty)
+                .filter(LotReservation.status == ReservationStatus.ACTIVE)
+                .label("active"),
+            )
+            .group_by(LotReservation.lot_id)
+            .subquery()
+        )
+        withdrawals = (
+            select(
+                WithdrawalLine.lot_receipt_id.label("lot_id"),
+                func.sum(WithdrawalLine.quantity).label("withdrawn"),
+            )
+            .join(Withdrawal, WithdrawalLine.withdrawal_id == Withdrawal.id)
+            .where(Withdrawal.cancelled_at.is_(None))
+            .group_by(WithdrawalLine.lot_receipt_id)
+            .subquery()
+        )
+
+        snapshot_withdrawn = func.coalesce(LotStockSnapshot.withdrawn_quantity, 0)
+        live_withdrawn = func.coalesce(withdrawals.c.withdrawn, 0)
+        snapshot_confirmed = func.coalesce(LotStockSnapshot.confirmed_reserved_quantity, 0)
+        live_confirmed = func.coalesce(reservations.c.confirmed, 0)
+        snapshot_active = func.coalesce(LotStockSnapshot.active_reserved_quantity, 0)
+        live_active = func.coalesce(reservations.c.active, 0)
+
+        stmt = (
+            select(
+                LotReceipt.id,
+                snapshot_withdrawn,
+                live_withdrawn,
+                snapshot_confirmed,
+                live_confirmed,
+                snapshot_active,
+                live_active,
+            )
+            .outerjoin(LotStockSnapshot, LotStockSnapshot.lot_id == LotReceipt.id)
+            .outerjoin(reservations, reservations.c.lot_id == LotReceipt.id)
+            .outerjoin(withdrawals, withdrawals.c.lot_id == LotReceipt.id)
+            .where(
+                or_(
+                    snapshot_withdrawn != live_withdrawn,
+                    snapshot_confirmed != live_confirmed,
+                    snapshot_active != live_active,
+                )
+            )
+            .order_by(LotReceipt.id)
+        )
+        if lot_ids is not None:
+            stmt = stmt.where(LotReceipt.id.in_(lot_ids))
+        if limit is not None:
+            stmt = stmt.limit(limit)
+
+        drifts = [
+            LotStockDrift(
+                lot_id=row[0],
+                snapshot_withdrawn=Decimal(row[1]),
+                live_withdrawn=Decimal(row[2]),
+                snapshot_confirmed=Decimal(row[3]),
+                live_confirmed=Decimal(row[4]),
+                snapshot_active=Decimal(row[5]),
+                live_active=Decimal(row[6]),
+            )
+            for row in self.db.execute(stmt).all()
+        ]
+        if drifts:
+            logger.warning(
+                "Lot stock snapshot drift detected",
+                extra={
+                    "drift_count": len(drifts),
+                    "sample_lot_ids": [d.lot_id for d in drifts[:10]],
+                },
+            )
+        return drifts
+
+    def refresh(self, lot_ids: Sequence[int] | None = None) -> int:
+        """Recompute snapshot rows (delta refresh).
+
+        Args:
+            lot_ids: Lots to recompute (None = only lots reported by find_drift())
+
+        Returns:
+            Number of lots recomputed
+        """
+        if lot_ids is None:
+            lot_ids = [drift.lot_id for drift in self.find_drift()]
+        ids = sorted(set(lot_ids))
+        if not ids:
+            return 0
+
+        self.db.execute(
+            text("SELECT refresh_lot_stock_snapshot(:lot_ids)").bindparams(
+                bindparam("lot_ids", type_=ARRAY(BigInteger))
+            ),
+            {"lot_ids": ids},
+        )
+        logger.info("Lot stock snapshot refreshed", extra={"lot_count": len(ids)})
+        return len(ids)
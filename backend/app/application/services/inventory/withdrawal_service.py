@@ -59,6 +59,7 @@ from app.application.services.common.soft_delete_utils import (
     get_product_code,
     get_product_name,
 )
+from app.application.services.demand.fact_service import DailyDemandFactService
 from app.application.services.inventory.lot_reservation_service import (
     ReservationInsufficientStockError,
     ReservationLotNotFoundError,
@@ -69,6 +70,7 @@ from app.domain.errors import UnmappedItemError
 from app.domain.events import EventDispatcher, StockChangedEvent
 from app.infrastructure.persistence.models import (
     Customer,
+    DailyDemandFact,
     DeliveryPlace,
     LotMaster,
     LotReceipt,
@@ -330,6 +332,9 @@ class WithdrawalService:
         )
         self.db.add(withdrawal_line)
 
+        # 日次需要ファクトに加算（同一トランザクション）
+        DailyDemandFactService(self.db).record_withdrawal(withdrawal, lot, data.quantity)
+
         # B-Plan: current_quantityは計算フィールドなので直接更新しない
         # received_quantityベースで残量はViewで計算される
         lot.consumed_quantity = (lot.consumed_quantity or Decimal("0")) + data.quantity
@@ -497,6 +502,8 @@ class WithdrawalService:
             lot.consumed_quantity = max(
                 (lot.consumed_quantity or Decimal("0")) - reverse_quantity, Decimal("0")
             )
+            # 日次需要ファクトから減算（同一トランザクション）
+            DailyDemandFactService(self.db).reverse_withdrawal(withdrawal, lot, reverse_quantity)
 
         # B-Plan: 在庫計算のためquantity_beforeとnew_quantityは計算するが、
         # lot.current_quantityへの代入は行わない（計算フィールドのため）
@@ -585,25 +592,21 @@ class WithdrawalService:
             next_month = date(year, month + 1, 1)
         end_date = next_month - timedelta(days=1)
 
-        stmt = (
-            select(
-                Withdrawal.ship_date,
-                func.count(Withdrawal.id).label("withdrawal_count"),
-                func.sum(Withdrawal.quantity).label("total_quantity"),
-            )
-            .join(LotReceipt, Withdrawal.lot_id == LotReceipt.id)
-            .where(Withdrawal.ship_date >= start_date)
-            .where(Withdrawal.ship_date <= end_date)
-        )
+        # 日次需要ファクト（取消済み出庫を含まない）の範囲走査で集計する
+        stmt = select(
+            DailyDemandFact.ship_date,
+            func.sum(DailyDemandFact.withdrawal_count).label("withdrawal_count"),
+            func.sum(DailyDemandFact.quantity).label("total_quantity"),
+        ).where(DailyDemandFact.ship_date >= start_date, DailyDemandFact.ship_date <= end_date)
 
         if warehouse_id:
-            stmt = stmt.where(LotReceipt.warehouse_id == warehouse_id)
+            stmt = stmt.where(DailyDemandFact.warehouse_id == warehouse_id)
         if supplier_item_id:
-            stmt = stmt.where(LotReceipt.supplier_item_id == supplier_item_id)
+            stmt = stmt.where(DailyDemandFact.supplier_item_id == supplier_item_id)
         if supplier_id:
-            stmt = stmt.where(LotReceipt.supplier_id == supplier_id)
+            stmt = stmt.where(DailyDemandFact.supplier_id == supplier_id)
 
-        stmt = stmt.group_by(Withdrawal.ship_date).order_by(Withdrawal.ship_date)
+        stmt = stmt.group_by(DailyDemandFact.ship_date).order_by(DailyDemandFact.ship_date)
 
         rows = self.db.execute(stmt).all()
 
@@ -0,0 +1,16 @@
+"""DB-backed job runner (execution_queue ベースのジョブワーカー)."""
+
+from app.application.services.jobs.handlers import MASTER_IMPORT, SMARTREAD_PAD_RUN
+from app.application.services.jobs.registry import JobContext, JobHandler, JobRegistry, job_registry
+from app.application.services.jobs.worker import JobWorker
+
+
+__all__ = [
+    "MASTER_IMPORT",
+    "SMARTREAD_PAD_RUN",
+    "JobContext",
+    "JobHandler",
+    "JobRegistry",
+    "JobWorker",
+    "job_registry",
+]
@@ -0,0 +1,118 @@
+"""Built-in job handlers (ワーカーで実行するジョブ)."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from sqlalchemy.orm import Session
+
+from app.application.services.jobs.registry import JobContext, job_registry
+from app.infrastructure.persistence.models.execution_queue_model import ExecutionQueue
+
+
+SMARTREAD_PAD_RUN = "smartread_pad_run"
+"""PAD互換フロー実行ジョブ（parameters: run_id）."""
+
+MASTER_IMPORT = "master_import"
+"""マスタ一括取込ジョブ（parameters: path, filename, dry_run）."""
+
+# PAD互換フローの工程 → 進捗率
+_PAD_STEP_PROGRESS = {
+    "TASK_CREATED": 10,
+    "UPLOADED": 25,
+    "REQUEST_DONE": 40,
+    "TASK_DONE": 55,
+    "EXPORT_STARTED": 65,
+    "EXPORT_DONE": 75,
+    "DOWNLOADED": 85,
+    "POSTPROCESSED": 95,
+}
+
+
+@job_registry.handler(SMARTREAD_PAD_RUN)
+def run_smartread_pad_run(context: JobContext) -> str | None:
+    """Execute a SmartRead PAD-compatible run created by start_run / retry_run."""
+    from app.application.services.smartread.pad_runner_service import (
+        SmartReadPadRunnerService,
+    )
+
+    run_id = context.parameters["run_id"]
+
+    def on_step(step: str) -> None:
+        context.report_progress(_PAD_STEP_PROGRESS.get(step), step)
+
+    with context.session_factory() as session:
+        runner = SmartReadPadRunnerService(session)
+        runner.execute_run(run_id, on_step=on_step)
+        run_status = runner.get_run_status(run_id)
+
+    # 実行結果の詳細は smartread_pad_runs 側に記録される。キュー上も失敗として扱う
+    if run_status is None or run_status["status"] != "SUCCEEDED":
+        status = run_status["status"] if run_status else "NOT_FOUND"
+        error = run_status.get("error_message") if run_status else None
+        raise RuntimeError(f"PAD run {run_id} ended with {status}: {error}")
+    return f"PAD run {run_id} succeeded"
+
+
+@job_registry.failure_hook(SMARTREAD_PAD_RUN)
+def fail_smartread_pad_run(session: Session, task: ExecutionQueue) -> None:
+    """Mark the PAD run FAILED when its queue task is cancelled or fails before finishing.
+
+    ワーカー取得前のキャンセル・stale 回収では execute_run が動かないため、
+    RUNNING（工程 CREATED 等）のまま残りリトライもできなくなるのを防ぐ。
+    """
+    from app.application.services.smartread.pad_runner_service import (
+        SmartReadPadRunnerService,
+    )
+
+    if task.status == "cancelled":
+        message = "実行キューでキャンセルされました"
+    else:
+        message = f"実行キューで失敗しました: {task.error_message}"
+    SmartReadPadRunnerService(session).fail_unfinished_run(task.parameters["run_id"], message)
+
+
+@job_registry.handler(MASTER_IMPORT)
+def run_master_import(context: JobContext) -> str | None:
+    """Import a master file saved by POST /master-import/upload/async.
+
+    進捗はチャンクごとに処理済み行数で報告する（コミット完了までは 99% 止まり）。
+    取込結果（MasterImportResponse）は JSON で result_message に保存する。
+    """
+    from app.application.services.master_import import ImportRowReader, MasterImportService
+
+    path = Path(context.parameters["path"])
+
+    def on_progress(processed: int, total: int | None) -> None:
+        progress = min(processed * 100 // total, 99) if total else None
+        context.report_progress(progress, f"{processed} rows processed")
+
+    try:
+        with (
+            path.open("rb") as stream,
+            ImportRowReader(context.parameters["filename"], stream) as reader,
+            context.session_factory() as session,
+        ):
+            response = MasterImportService(session).import_rows(
+                reader,
+                dry_run=bool(context.parameters.get("dry_run", False)),
+                total_rows=reader.total_rows,
+                on_progress=on_progress,
+            )
+    finally:
+        path.unlink(missing_ok=True)
+
+    summary = response.model_dump_json()
+    if response.status == "failed":
+        raise RuntimeError(f"Master import failed: {summary}")
+    return summary
+
+
+@job_registry.failure_hook(MASTER_IMPORT)
+def remove_master_import_upload(session: Session, task: ExecutionQueue) -> None:
+    """Delete the uploaded file when the import task is cancelled or fails.
+
+    ワーカー取得前のキャンセル・stale 回収では run_master_import の finally が
+    動かないため、UPLOAD_DIR/master_import にファイルが残り続けるのを防ぐ。
+    """
+    Path(task.parameters["path"]).unlink(missing_ok=True)
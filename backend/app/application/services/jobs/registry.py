@@ -0,0 +1,120 @@
+"""Job handler registry (ジョブハンドラ登録).
+
+execution_queue.resource_type ごとに、ジョブワーカーが実行するハンドラを登録する。
+
+Usage:
+    @job_registry.handler("smartread_pad_run")
+    def run_pad(context: JobContext) -> str | None:
+        context.report_progress(50, "処理中")
+        return "完了"  # result_message
+
+    @job_registry.failure_hook("smartread_pad_run")
+    def on_pad_failed(session: Session, task: ExecutionQueue) -> None:
+        ...  # キャンセル・失敗・stale 回収時の後始末
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy.orm import Session
+
+from app.application.services.execution_queue_service import ExecutionQueueService
+
+
+if TYPE_CHECKING:
+    from app.infrastructure.persistence.models.execution_queue_model import ExecutionQueue
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class JobContext:
+    """Execution context passed to a job handler."""
+
+    queue_id: int
+    resource_type: str
+    resource_id: str
+    requested_by_user_id: int
+    parameters: dict[str, Any]
+    session_factory: Callable[[], Session] = field(repr=False)
+
+    def report_progress(self, progress: int | None, message: str | None = None) -> None:
+        """Record progress (0-100) and an optional message; also refreshes the heartbeat."""
+        with self.session_factory() as session:
+            ExecutionQueueService(session).update_progress(self.queue_id, progress, message)
+
+
+JobHandler = Callable[[JobContext], str | None]
+"""ジョブハンドラ: 戻り値は result_message として保存される."""
+
+JobFailureHook = Callable[[Session, "ExecutionQueue"], None]
+"""失敗フック: キューのタスクが完了せずに終わったとき（failed / cancelled）に呼ばれる."""
+
+
+class JobRegistry:
+    """Mapping of resource_type to job handler."""
+
+    def __init__(self) -> None:
+        self._handlers: dict[str, JobHandler] = {}
+        self._failure_hooks: dict[str, JobFailureHook] = {}
+
+    def register(self, resource_type: str, handler: JobHandler) -> None:
+        """Register a handler for resource_type (replaces an existing one)."""
+        self._handlers[resource_type] = handler
+        logger.debug(
+            "Registered job handler",
+            extra={"resource_type": resource_type, "handler": handler.__name__},
+        )
+
+    def handler(self, resource_type: str) -> Callable[[JobHandler], JobHandler]:
+        """Decorator form of register."""
+
+        def decorator(func: JobHandler) -> JobHandler:
+            self.register(resource_type, func)
+            return func
+
+        return decorator
+
+    def get(self, resource_type: str) -> JobHandler | None:
+        """Return the handler for resource_type, if any."""
+        return self._handlers.get(resource_type)
+
+    def failure_hook(self, resource_type: str) -> Callable[[JobFailureHook], JobFailureHook]:
+        """Register a hook called when a queue task of resource_type fails or is cancelled.
+
+        ハンドラの例外・キャンセル・stale 回収のいずれでも呼ばれる。ハンドラが途中まで
+        作った状態（業務テーブルの実行中ステータス、一時ファイル等）の後始末に使う。
+        """
+
+        def decorator(func: JobFailureHook) -> JobFailureHook:
+            self._failure_hooks[resource_type] = func
+            return func
+
+        return decorator
+
+    def run_failure_hook(self, session: Session, task: ExecutionQueue) -> None:
+        """Call the failure hook for task.resource_type; hook errors are logged, not raised."""
+        hook = self._failure_hooks.get(task.resource_type)
+        if hook is None:
+            return
+        try:
+            hook(session, task)
+        except Exception:
+            session.rollback()
+            logger.exception(
+                "Job failure hook failed",
+                extra={"queue_id": task.id, "resource_type": task.resource_type},
+            )
+
+    @property
+    def resource_types(self) -> list[str]:
+        """Registered resource types."""
+        return sorted(self._handlers)
+
+
+job_registry = JobRegistry()
@@ -0,0 +1,243 @@
+"""Job worker (execution_queue を実行するワーカー).
+
+【設計意図】なぜ DB ベースのワーカーにするのか:
+- 以前は PAD 互換フローを API プロセス内の daemon スレッドで実行し、
+  ジョブ状態もプロセス内の dict（JobManager）に保持していた
+  → プロセス再起動でジョブが消え、uvicorn の複数ワーカー間で状態を共有できず、
+    同時実行数の上限もなかった
+- 現在は execution_queue（executor='worker'）をジョブの唯一の状態として扱う
+  - 取得: ExecutionQueueService.claim_pending（FOR UPDATE SKIP LOCKED）
+    → 複数プロセス・複数ワーカーが同時にポーリングしても同じジョブを取らない
+  - 同時実行数: スレッドプール（max_workers）と resource_type ごとの上限
+  - 生存確認: 実行中ジョブの heartbeat_at を定期更新（update_heartbeat）
+  - 回収: heartbeat が途絶えたジョブを detect_stale で失敗扱いにする
+    （ワーカープロセスが落ちた場合も他のワーカーが検出する）
+
+実行方法:
+- API プロセス内: settings.JOB_WORKER_EMBEDDED=True で lifespan から start()
+- 単独プロセス: python backend/scripts/run_job_worker.py
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from collections.abc import Callable, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+
+from sqlalchemy.orm import Session
+
+from app.application.services.execution_queue_service import ExecutionQueueService
+from app.application.services.jobs.registry import JobContext, JobRegistry, job_registry
+from app.core.config import settings
+from app.core.database import SessionLocal
+
+
+logger = logging.getLogger(__name__)
+
+
+def _default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class JobWorker:
+    """Bounded worker pool that claims and runs execution_queue jobs."""
+
+    def __init__(
+        self,
+        registry: JobRegistry = job_registry,
+        *,
+        session_factory: Callable[[], Session] = SessionLocal,
+        max_workers: int | None = None,
+        poll_interval: float | None = None,
+        heartbeat_interval: float | None = None,
+        stale_seconds: int | None = None,
+        concurrency_limits: Mapping[str, int] | None = None,
+        worker_id: str | None = None,
+    ) -> None:
+        self.registry = registry
+        self.session_factory = session_factory
+        self.max_workers = max_workers or settings.JOB_WORKER_MAX_WORKERS
+        self.poll_interval = (
+            poll_interval
+            if poll_interval is not None
+            else settings.JOB_WORKER_POLL_INTERVAL_SECONDS
+        )
+        self.heartbeat_interval = (
+            heartbeat_interval
+            if heartbeat_interval is not None
+            else settings.JOB_WORKER_HEARTBEAT_INTERVAL_SECONDS
+        )
+        self.stale_seconds = stale_seconds or settings.JOB_WORKER_STALE_SECONDS
+        self.concurrency_limits = dict(
+            concurrency_limits
+            if concurrency_limits is not None
+            else settings.JOB_WORKER_CONCURRENCY_LIMITS
+        )
+        self.worker_id = worker_id or _default_worker_id()
+
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="job-worker"
+        )
+        self._active: dict[int, Future[None]] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._last_heartbeat = 0.0
+        self._last_reclaim = 0.0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Run the dispatch loop in a background thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self.run_forever, name=f"job-dispatcher-{self.worker_id}", daemon=True
+        )
+        self._thread.start()
+
+    def request_stop(self) -> None:
+        """Ask the dispatch loop to exit after the current pass (signal-safe)."""
+        self._stop_event.set()
+
+    def stop(self, *, wait: bool = True) -> None:
+        """Stop claiming new jobs; optionally wait for running jobs to finish."""
+        self.request_stop()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+            self._thread = None
+        self._pool.shutdown(wait=wait)
+        logger.info("Job worker stopped", extra={"worker_id": self.worker_id})
+
+    def run_forever(self) -> None:
+        """Dispatch loop: poll, heartbeat and reclaim until stop() is called."""
+        logger.info(
+            "Job worker started",
+            extra={
+                "worker_id": self.worker_id,
+                "max_workers": self.max_workers,
+                "resource_types": self.registry.resource_types,
+            },
+        )
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Job worker loop failed", extra={"worker_id": self.worker_id})
+            self._stop_event.wait(self.poll_interval)
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+
+    @property
+    def active_ids(self) -> list[int]:
+        """Queue ids currently executing in this worker."""
+        with self._lock:
+            return sorted(self._active)
+
+    def run_once(self) -> int:
+        """Run one dispatch pass and return the number of jobs claimed."""
+        now = time.monotonic()
+        if now - self._last_heartbeat >= self.heartbeat_interval:
+            self._send_heartbeats()
+            self._last_heartbeat = now
+        if now - self._last_reclaim >= self.heartbeat_interval:
+            self._reclaim_stale()
+            self._last_reclaim = now
+
+        resource_types = self.registry.resource_types
+        free = self.max_workers - len(self.active_ids)
+        if free <= 0 or not resource_types or self._stop_event.is_set():
+            return 0
+
+        with self.session_factory() as session:
+            tasks = ExecutionQueueService(session).claim_pending(
+                resource_types, free, self.worker_id, self.concurrency_limits
+            )
+            contexts = [
+                JobContext(
+                    queue_id=task.id,
+                    resource_type=task.resource_type,
+                    resource_id=task.resource_id,
+                    requested_by_user_id=task.requested_by_user_id,
+                    parameters=dict(task.parameters or {}),
+                    session_factory=self.session_factory,
+                )
+                for task in tasks
+            ]
+
+        for context in contexts:
+            logger.info(
+                "Job claimed",
+                extra={
+                    "worker_id": self.worker_id,
+                    "queue_id": context.queue_id,
+                    "resource_type": context.resource_type,
+                    "resource_id": context.resource_id,
+                },
+            )
+            with self._lock:
+                future = self._pool.submit(self._execute, context)
+                self._active[context.queue_id] = future
+            future.add_done_callback(partial(self._release, context.queue_id))
+        return len(contexts)
+
+    def _release(self, queue_id: int, _future: Future[None] | None = None) -> None:
+        with self._lock:
+            self._active.pop(queue_id, None)
+
+    def _execute(self, context: JobContext) -> None:
+        handler = self.registry.get(context.resource_type)
+        started = time.monotonic()
+        try:
+            if handler is None:
+                raise LookupError(f"No job handler for {context.resource_type}")
+            result_message = handler(context)
+        except Exception as e:
+            logger.exception(
+                "Job failed",
+                extra={"queue_id": context.queue_id, "resource_type": context.resource_type},
+            )
+            with self.session_factory() as session:
+                ExecutionQueueService(session).fail_task(context.queue_id, error_message=str(e))
+            return
+
+        with self.session_factory() as session:
+            service = ExecutionQueueService(session)
+            service.update_progress(context.queue_id, 100, result_message)
+            service.complete_task(context.queue_id, result_message=result_message)
+        logger.info(
+            "Job completed",
+            extra={
+                "queue_id": context.queue_id,
+                "resource_type": context.resource_type,
+                "elapsed_seconds": round(time.monotonic() - started, 3),
+            },
+        )
+
+    def _send_heartbeats(self) -> None:
+        queue_ids = self.active_ids
+        if not queue_ids:
+            return
+        with self.session_factory() as session:
+            service = ExecutionQueueService(session)
+            for queue_id in queue_ids:
+                service.update_heartbeat(queue_id)
+
+    def _reclaim_stale(self) -> None:
+        with self.session_factory() as session:
+            started = ExecutionQueueService(session).detect_stale(self.stale_seconds)
+        if started:
+            logger.warning(
+                "Stale queue tasks reclaimed",
+                extra={"worker_id": self.worker_id, "next_task_ids": [t.id for t in started]},
+            )
@@ -2,6 +2,8 @@
 
 from app.application.services.master_import.file_handlers import (
     FileParseError,
+    ImportRow,
+    ImportRowReader,
     UnsupportedFileFormatError,
     parse_import_file,
 )
@@ -10,6 +12,8 @@ from app.application.services.master_import.import_service import MasterImportSe
 
 __all__ = [
     "FileParseError",
+    "ImportRow",
+    "ImportRowReader",
     "MasterImportService",
     "UnsupportedFileFormatError",
     "parse_import_file",
@@ -2,14 +2,25 @@
 
 Supports JSON, YAML, and Excel file formats.
 CSV is explicitly NOT supported.
+
+【設計意図】ストリーミング取込（ImportRowReader）:
+    parse_import_file はファイル全体を MasterImportRequest に組み立てるため、
+    大きなマスタファイルでは行数に比例してメモリを消費する。
+    ImportRowReader は 1 行ずつ ImportRow を返し、チャンク単位の取込
+    （MasterImportService.import_rows）と組み合わせてメモリ使用量を抑える。
+    - Excel: openpyxl の read_only モードでシートを逐次読み込む
+    - JSON / YAML: 文書全体のパースは避けられないが、入れ子構造を行に
+      展開する処理は遅延評価にし、取込用の中間オブジェクトを溜め込まない
 """
 
 from __future__ import annotations
 
 import json
+from collections.abc import Iterator
+from dataclasses import dataclass
 from io import BytesIO
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import IO, TYPE_CHECKING, Any, Literal
 
 import yaml
 
@@ -19,6 +30,11 @@ from app.presentation.schemas.import_schema import MasterImportRequest
 if TYPE_CHECKING:
     from fastapi import UploadFile
 
+ImportSheet = Literal["suppliers", "customers", "product_mappings"]
+"""ストリーミング取込の行種別（Excel のシート名に対応）."""
+
+SUPPORTED_EXTENSIONS = (".xlsx", ".json", ".yaml", ".yml")
+
 
 class UnsupportedFileFormatError(Exception):
     """Raised when an unsupported file format is uploaded."""
@@ -37,6 +53,30 @@ def get_file_extension(filename: str) -> str:
     return Path(filename).suffix.lower()
 
 
+def validate_import_filename(filename: str | None) -> str:
+    """Validate the upload filename and return its extension.
+
+    Raises:
+        FileParseError: Filename is missing
+        UnsupportedFileFormatError: CSV or an unknown extension
+    """
+    if not filename:
+        raise FileParseError("Filename is required")
+
+    ext = get_file_extension(filename)
+
+    # Explicitly reject CSV
+    if ext == ".csv":
+        raise UnsupportedFileFormatError(
+            "CSV format is not supported. Please use Excel (.xlsx), JSON, or YAML."
+        )
+    if ext not in SUPPORTED_EXTENSIONS:
+        raise UnsupportedFileFormatError(
+            f"Unsupported file format: {ext}. Supported formats: .xlsx, .json, .yaml, .yml"
+        )
+    return ext
+
+
 def parse_json(content: bytes) -> dict:
     """Parse JSON content."""
     try:
@@ -255,16 +295,7 @@ async def parse_import_file(file: UploadFile) -> MasterImportRequest:
     Supports: .json, .yaml, .yml, .xlsx
     Does NOT support: .csv (will raise UnsupportedFileFormatError)
     """
-    if not file.filename:
-        raise FileParseError("Filename is required")
-
-    ext = get_file_extension(file.filename)
-
-    # Explicitly reject CSV
-    if ext == ".csv":
-        raise UnsupportedFileFormatError(
-            "CSV format is not supported. Please use Excel (.xlsx), JSON, or YAML."
-        )
+    ext = validate_import_filename(file.filename)
 
     content = await file.read()
 
@@ -272,11 +303,214 @@ async def parse_import_file(file: UploadFile) -> MasterImportRequest:
         data = parse_json(content)
     elif ext in (".yaml", ".yml"):
         data = parse_yaml(content)
-    elif ext == ".xlsx":
-        data = parse_excel(content)
     else:
-        raise UnsupportedFileFormatError(
-            f"Unsupported file format: {ext}. Supported formats: .xlsx, .json, .yaml, .yml"
-        )
+        data = parse_excel(content)
 
     return MasterImportRequest.model_validate(data)
+
+
+# ============================================================
+# Streaming rows
+# ============================================================
+
+
+@dataclass(frozen=True, slots=True)
+class ImportRow:
+    """取込ファイルの1行.
+
+    row_number は Excel ではシート上の行番号、JSON / YAML では
+    行種別ごとの 1 始まりの通し番号。
+    """
+
+    sheet: ImportSheet
+    row_number: int
+    values: dict[str, Any]
+
+    @property
+    def location(self) -> str:
+        """Human-readable row reference for error messages."""
+        return f"{self.sheet} row {self.row_number}"
+
+
+class ImportRowReader:
+    """Read an import file row by row.
+
+    Usage:
+        with ImportRowReader("masters.xlsx", stream) as reader:
+            for row in reader:
+                ...
+
+    total_rows は進捗表示用の見積もり（Excel はシートの dimension 情報から
+    求めるため、dimension を持たないファイルでは None）。
+    """
+
+    def __init__(self, filename: str | None, stream: IO[bytes]):
+        self.extension = validate_import_filename(filename)
+        self.total_rows: int | None = None
+        self._workbook: Any = None
+        self._document: dict | None = None
+
+        if self.extension == ".xlsx":
+            self._workbook = _open_workbook(stream)
+            self.total_rows = _estimate_excel_rows(self._workbook)
+        else:
+            content = stream.read()
+            self._document = (
+                parse_json(content) if self.extension == ".json" else parse_yaml(content)
+            )
+            self.total_rows = sum(1 for _ in iter_document_rows(self._document))
+
+    def __iter__(self) -> Iterator[ImportRow]:
+        if self._workbook is not None:
+            return iter_workbook_rows(self._workbook)
+        assert self._document is not None
+        return iter_document_rows(self._document)
+
+    def close(self) -> None:
+        """Release the workbook (read_only mode keeps the file open)."""
+        if self._workbook is not None:
+            self._workbook.close()
+            self._workbook = None
+        self._document = None
+
+    def __enter__(self) -> ImportRowReader:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def _open_workbook(stream: IO[bytes]) -> Any:
+    try:
+        import openpyxl
+    except ImportError:
+        raise FileParseError(
+            "openpyxl is required for Excel parsing. Install with: pip install openpyxl"
+        )
+
+    try:
+        return openpyxl.load_workbook(stream, read_only=True, data_only=True)
+    except Exception as e:
+        raise FileParseError(f"Failed to open Excel file: {e}")
+
+
+def _import_sheets(workbook: Any) -> list[tuple[ImportSheet, Any]]:
+    """Resolve worksheets to row kinds (same rules as parse_excel)."""
+    sheets: list[tuple[ImportSheet, Any]] = [
+        (name, workbook[name])
+        for name in ("suppliers", "customers", "product_mappings")
+        if name in workbook.sheetnames
+    ]
+    if sheets:
+        return sheets
+
+    for name in ("Template", "Sheet1"):
+        if name in workbook.sheetnames:
+            sheet = workbook[name]
+            headers = _header_names(next(sheet.iter_rows(max_row=1, values_only=True), ()))
+            # customer テンプレートは items 用に supplier_code 列も持つため customer_code を先に判定
+            if "customer_code" in headers:
+                return [("customers", sheet)]
+            if "supplier_code" in headers:
+                return [("suppliers", sheet)]
+            return []
+    return []
+
+
+def _estimate_excel_rows(workbook: Any) -> int | None:
+    total = 0
+    for _, sheet in _import_sheets(workbook):
+        if sheet.max_row is None:
+            return None
+        total += max(sheet.max_row - 1, 0)
+    return total
+
+
+def _header_names(header_row: tuple) -> list[str]:
+    return [str(h).lower().strip() if h is not None else "" for h in header_row]
+
+
+def _cell_text(value: Any) -> str | None:
+    """Normalize a cell value to text (blank cells become None).
+
+    コード列に数値が入っていても文字列として扱えるよう、整数値の float は
+    小数点なしで文字列化する。bool / int 列は pydantic 側で変換する。
+    """
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    text = str(value).strip()
+    return text or None
+
+
+def iter_workbook_rows(workbook: Any) -> Iterator[ImportRow]:
+    """Yield rows from an openpyxl workbook opened in read_only mode.
+
+    Expects sheets named 'suppliers', 'customers' and/or 'product_mappings'
+    (or a single 'Template' / 'Sheet1' sheet) with headers in the first row.
+    Blank rows are skipped; blank cells are omitted from ImportRow.values.
+    """
+    for sheet_name, sheet in _import_sheets(workbook):
+        rows = sheet.iter_rows(values_only=True)
+        headers = _header_names(next(rows, ()))
+        for row_number, row in enumerate(rows, start=2):
+            values = {
+                header: text
+                for header, cell in zip(headers, row, strict=False)
+                if header and (text := _cell_text(cell)) is not None
+            }
+            if values:
+                yield ImportRow(sheet_name, row_number, values)
+
+
+def iter_document_rows(data: dict) -> Iterator[ImportRow]:
+    """Flatten a JSON / YAML import document into rows.
+
+    仕入先は製品ごと、得意先は納入先・得意先品番・商品マッピングごとに
+    1 行へ展開する（親のコード・名称は各行に複製する）。
+    """
+    counters: dict[ImportSheet, int] = {"suppliers": 0, "customers": 0, "product_mappings": 0}
+
+    def row(sheet: ImportSheet, values: dict[str, Any]) -> ImportRow:
+        counters[sheet] += 1
+        return ImportRow(sheet, counters[sheet], values)
+
+    for supplier in _records(data.get("supply_data"), "suppliers"):
+        parent = {k: v for k, v in supplier.items() if k != "products"}
+        products = _as_list(supplier.get("products"))
+        if not products:
+            yield row("suppliers", parent)
+        for product in products:
+            yield row("suppliers", {**parent, **_as_dict(product)})
+
+    for customer in _records(data.get("customer_data"), "customers"):
+        parent = {
+            k: v
+            for k, v in customer.items()
+            if k not in ("delivery_places", "items", "product_mappings")
+        }
+        children: list[tuple[ImportSheet, Any]] = [
+            *(("customers", dp) for dp in _as_list(customer.get("delivery_places"))),
+            *(("customers", item) for item in _as_list(customer.get("items"))),
+            *(("product_mappings", pm) for pm in _as_list(customer.get("product_mappings"))),
+        ]
+        if not children:
+            yield row("customers", parent)
+        for sheet, child in children:
+            yield row(sheet, {**parent, **_as_dict(child)})
+
+
+def _records(section: Any, key: str) -> Iterator[dict[str, Any]]:
+    for record in _as_list(_as_dict(section).get(key)):
+        yield _as_dict(record)
+
+
+def _as_list(value: Any) -> list:
+    return value if isinstance(value, list) else []
+
+
+def _as_dict(value: Any) -> dict[str, Any]:
+    return value if isinstance(value, dict) else {}
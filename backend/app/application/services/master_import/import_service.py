@@ -2,15 +2,40 @@
 
 Handles the business logic for importing related master data
 across multiple tables in the correct order.
+
+【設計意図】チャンク単位のセットベース取込:
+    旧実装は行ごとに _upsert_* が検索・INSERT を繰り返しており、
+    クエリ数が取込行数に比例していた。
+    取込行（ImportRow）を IMPORT_CHUNK_ROWS 行ずつ検証し、チャンクごと・
+    エンティティごとに既存レコードを IN 句でまとめて読み込んでから作成・更新する。
+    - 処理順: suppliers → products(supplier_items) → customers →
+      delivery_places → customer_items → product_mappings（各段階の後に flush）
+    - 行の検証エラーは行番号付きで該当テーブルの failed に計上し、取込は続行する
+    - トランザクションはファイル全体で 1 つ（dry_run はまとめてロールバック）
+    - created / updated は業務キー単位で数える（同じキーが複数行・
+      複数チャンクに現れても 1 件）
+    チャンクの処理が終わると ORM オブジェクトへの参照を手放すため、
+    Session の identity map（弱参照）も含めてメモリ使用量はチャンクサイズで頭打ちになる。
 """
 
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING
-
+import time
+from collections import defaultdict
+from collections.abc import Callable, Hashable, Iterable
+from itertools import batched
+from typing import Any
+
+from pydantic import ValidationError
+from sqlalchemy import select, tuple_
 from sqlalchemy.orm import Session
 
+from app.application.services.master_import.file_handlers import (
+    ImportRow,
+    ImportSheet,
+    iter_document_rows,
+)
 from app.infrastructure.persistence.models.masters_models import (
     Customer,
     CustomerItem,
@@ -20,19 +45,96 @@ from app.infrastructure.persistence.models.masters_models import (
 )
 from app.infrastructure.persistence.models.supplier_item_model import SupplierItem
 from app.presentation.schemas.import_schema import (
-    CustomerDataImport,
+    CustomerImportRow,
     ImportResultDetail,
     MasterImportRequest,
     MasterImportResponse,
-    SupplyDataImport,
+    SupplierImportRow,
 )
 
 
-if TYPE_CHECKING:
-    pass
-
 logger = logging.getLogger(__name__)
 
+IMPORT_CHUNK_ROWS = 1000
+"""1 チャンクあたりの取込行数."""
+
+MAX_ERRORS_PER_TABLE = 100
+"""テーブルごとに保持するエラーメッセージの上限（failed には全件計上する）."""
+
+ProgressCallback = Callable[[int, int | None], None]
+"""進捗コールバック: (処理済み行数, 総行数の見積もり)."""
+
+SUPPLY_TABLES = ("suppliers", "products")
+CUSTOMER_TABLES = ("customers", "delivery_places", "customer_items", "product_mappings")
+
+# 行の検証エラーを計上するテーブル
+_SHEET_TABLES: dict[ImportSheet, str] = {
+    "suppliers": "suppliers",
+    "customers": "customers",
+    "product_mappings": "product_mappings",
+}
+
+_Located = tuple[str, Any]
+"""(行の位置, 検証済みの行)."""
+
+
+class _ImportTally:
+    """Per-table import counts (each business key is counted once)."""
+
+    def __init__(self) -> None:
+        self.details = {
+            name: ImportResultDetail(table_name=name) for name in SUPPLY_TABLES + CUSTOMER_TABLES
+        }
+        self.has_supply = False
+        self.has_customer = False
+        self._seen: defaultdict[str, set[Hashable]] = defaultdict(set)
+
+    def touch(self, sheet: ImportSheet) -> None:
+        if sheet == "suppliers":
+            self.has_supply = True
+        else:
+            self.has_customer = True
+
+    def created(self, table: str, key: Hashable) -> None:
+        self._seen[table].add(key)
+        self.details[table].created += 1
+
+    def updated(self, table: str, key: Hashable) -> None:
+        if key not in self._seen[table]:
+            self._seen[table].add(key)
+            self.details[table].updated += 1
+
+    def failed(self, table: str, message: str) -> None:
+        detail = self.details[table]
+        detail.failed += 1
+        if len(detail.errors) < MAX_ERRORS_PER_TABLE:
+            detail.errors.append(message)
+
+    def results(self) -> list[ImportResultDetail]:
+        tables = (SUPPLY_TABLES if self.has_supply else ()) + (
+            CUSTOMER_TABLES if self.has_customer else ()
+        )
+        return [self.details[name] for name in tables]
+
+
+class _SupplierItemIndex:
+    """Supplier items looked up by maker part code (optionally narrowed by supplier)."""
+
+    def __init__(self, rows: Iterable[tuple[SupplierItem, str]]):
+        self._by_part: dict[str, SupplierItem] = {}
+        self._by_supplier_part: dict[tuple[str, str], SupplierItem] = {}
+        for item, supplier_code in rows:
+            self._by_part.setdefault(item.maker_part_no, item)
+            self._by_supplier_part.setdefault((supplier_code, item.maker_part_no), item)
+
+    def resolve(self, maker_part_code: str, supplier_code: str | None) -> SupplierItem | None:
+        """仕入先コードが一致する品目を優先し、なければ品番のみで最初の品目を返す."""
+        if supplier_code:
+            item = self._by_supplier_part.get((supplier_code, maker_part_code))
+            if item is not None:
+                return item
+        return self._by_part.get(maker_part_code)
+
 
 class MasterImportService:
     """Service for importing master data across multiple tables."""
@@ -44,34 +146,52 @@ class MasterImportService:
         """Execute master data import.
 
         Processing order:
-        1. Supply-side (suppliers, products, product_suppliers)
-        2. Customer-side (customers, delivery_places, customer_items)
+        1. Supply-side (suppliers, products)
+        2. Customer-side (customers, delivery_places, customer_items, product_mappings)
+
+        リクエストは行に展開し、import_rows と同じチャンク単位の処理で取り込む。
         """
-        results: list[ImportResultDetail] = []
+        rows = iter_document_rows(request.model_dump(include={"supply_data", "customer_data"}))
+        return self.import_rows(rows, dry_run=request.dry_run)
+
+    def import_rows(
+        self,
+        rows: Iterable[ImportRow],
+        *,
+        dry_run: bool = False,
+        total_rows: int | None = None,
+        on_progress: ProgressCallback | None = None,
+    ) -> MasterImportResponse:
+        """Import streamed rows chunk by chunk.
+
+        Args:
+            rows: Rows from ImportRowReader or iter_document_rows
+            dry_run: If true, roll back after processing every row
+            total_rows: Estimated row count (passed through to on_progress)
+            on_progress: Called after each chunk with (processed rows, total_rows)
+
+        Returns:
+            Import result with status and details per table
+        """
+        tally = _ImportTally()
         global_errors: list[str] = []
+        processed = 0
+        started = time.perf_counter()
 
         logger.info(
             "Master import started",
-            extra={
-                "dry_run": request.dry_run,
-                "has_supply_data": request.supply_data is not None,
-                "has_customer_data": request.customer_data is not None,
-            },
+            extra={"dry_run": dry_run, "total_rows": total_rows, "chunk_rows": IMPORT_CHUNK_ROWS},
         )
 
         try:
-            # Process supply-side first (products are needed for customer_items)
-            if request.supply_data:
-                supply_results = self._import_supply_data(request.supply_data)
-                results.extend(supply_results)
-
-            # Then process customer-side
-            if request.customer_data:
-                customer_results = self._import_customer_data(request.customer_data)
-                results.extend(customer_results)
+            for chunk in batched(rows, IMPORT_CHUNK_ROWS):
+                self._import_chunk(chunk, tally)
+                processed += len(chunk)
+                if on_progress is not None:
+                    on_progress(processed, total_rows)
 
             # Commit or rollback based on dry_run
-            if request.dry_run:
+            if dry_run:
                 self.db.rollback()
                 logger.info("Master import dry_run completed, changes rolled back")
             else:
@@ -83,6 +203,8 @@ class MasterImportService:
             global_errors.append(f"Import failed: {e!s}")
             logger.exception("Import failed")
 
+        results = tally.results()
+
         # Determine overall status
         total_failed = sum(r.failed for r in results)
 
@@ -97,6 +219,8 @@ class MasterImportService:
             "Master import finished",
             extra={
                 "status": status,
+                "rows": processed,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000),
                 "total_created": sum(r.created for r in results),
                 "total_updated": sum(r.updated for r in results),
                 "total_failed": total_failed,
@@ -105,339 +229,368 @@ class MasterImportService:
         )
         return MasterImportResponse(
             status=status,
-            dry_run=request.dry_run,
+            dry_run=dry_run,
             results=results,
             errors=global_errors,
         )
 
-    def _import_supply_data(self, data: SupplyDataImport) -> list[ImportResultDetail]:
-        """Import supply-side data."""
-        results: list[ImportResultDetail] = []
-
-        supplier_result = ImportResultDetail(table_name="suppliers")
-        product_result = ImportResultDetail(table_name="products")
-        ps_result = ImportResultDetail(table_name="product_suppliers")
-
-        for supplier_row in data.suppliers:
-            # Upsert supplier
-            supplier = self._upsert_supplier(supplier_row.supplier_code, supplier_row.supplier_name)
-            if supplier:
-                if supplier.id is None:
-                    supplier_result.created += 1
-                else:
-                    supplier_result.updated += 1
-
-                # Process products
-                for product_row in supplier_row.products:
-                    product = self._upsert_product(
-                        product_row.maker_part_code,
-                        product_row.product_name or "",
-                        product_row.base_unit,
-                    )
-                    if product:
-                        if product.id is None:
-                            product_result.created += 1
-                        else:
-                            product_result.updated += 1
-
-                        # Create product-supplier relationship
-                        self.db.flush()  # Ensure IDs are assigned
-                        ps = self._upsert_product_supplier(
-                            product.id,
-                            supplier.id,
-                            product_row.is_primary,
-                            product_row.lead_time_days,
-                        )
-                        if ps:
-                            ps_result.created += 1
-
-        results.extend([supplier_result, product_result, ps_result])
-        return results
-
-    def _import_customer_data(self, data: CustomerDataImport) -> list[ImportResultDetail]:
-        """Import customer-side data."""
-        results: list[ImportResultDetail] = []
-
-        customer_result = ImportResultDetail(table_name="customers")
-        dp_result = ImportResultDetail(table_name="delivery_places")
-        ci_result = ImportResultDetail(table_name="customer_items")
-        pm_result = ImportResultDetail(table_name="product_mappings")
-
-        for customer_row in data.customers:
-            # Upsert customer
-            customer = self._upsert_customer(customer_row.customer_code, customer_row.customer_name)
-            if customer:
-                if customer.id is None:
-                    customer_result.created += 1
-                else:
-                    customer_result.updated += 1
-
-                self.db.flush()  # Ensure customer ID is assigned
-
-                # Process delivery places
-                for dp_row in customer_row.delivery_places:
-                    dp = self._upsert_delivery_place(
-                        customer.id,
-                        dp_row.delivery_place_code,
-                        dp_row.delivery_place_name,
-                        dp_row.jiku_code,
-                    )
-                    if dp:
-                        dp_result.created += 1
-
-                # Process customer items
-                for item_row in customer_row.items:
-                    ci = self._upsert_customer_item(
-                        customer.id,
-                        item_row.customer_part_no,
-                        item_row.maker_part_code,
-                        item_row.supplier_code,
-                        item_row.base_unit,
-                        item_row.pack_unit,
-                        item_row.pack_quantity,
-                        item_row.special_instructions,
-                    )
-                    if ci:
-                        ci_result.created += 1
-                    else:
-                        ci_result.failed += 1
-                        ci_result.errors.append(
-                            f"Failed to create customer_item: {item_row.customer_part_no}"
-                        )
-
-                # Process product mappings
-                for pm_row in customer_row.product_mappings:
-                    pm = self._upsert_product_mapping(
-                        customer.id,
-                        pm_row.customer_part_code,
-                        pm_row.maker_part_code,
-                        pm_row.supplier_code,
-                        pm_row.base_unit,
-                        pm_row.pack_unit,
-                        pm_row.pack_quantity,
-                        pm_row.special_instructions,
-                        pm_row.is_active,
-                    )
-                    if pm:
-                        pm_result.created += 1
-                    else:
-                        pm_result.failed += 1
-                        pm_result.errors.append(
-                            f"Failed to create product_mapping: {pm_row.customer_part_code}"
-                        )
-
-        results.extend([customer_result, dp_result, ci_result, pm_result])
-        return results
-
-    def _upsert_supplier(self, code: str, name: str) -> Supplier | None:
-        """Upsert supplier by code."""
-        existing = self.db.query(Supplier).filter(Supplier.supplier_code == code).first()
-        if existing:
-            existing.supplier_name = name
-            return existing
-        supplier = Supplier(supplier_code=code, supplier_name=name)
-        self.db.add(supplier)
-        return supplier
-
-    def _upsert_product(
-        self, code: str, name: str | None, base_unit: str | None
-    ) -> SupplierItem | None:
-        """Upsert product by maker_part_code."""
-        existing = self.db.query(SupplierItem).filter(SupplierItem.maker_part_no == code).first()
-        if existing:
-            if name:
-                existing.display_name = name
-            if base_unit:
-                existing.internal_unit = base_unit
-            return existing
-        product = SupplierItem(
-            maker_part_no=code,
-            display_name=name or code,
-            internal_unit=base_unit or "EA",
+    # ------------------------------------------------------------------
+    # Chunk processing
+    # ------------------------------------------------------------------
+
+    def _import_chunk(self, chunk: tuple[ImportRow, ...], tally: _ImportTally) -> None:
+        """Validate one chunk and apply set-based upserts per entity."""
+        suppliers: list[_Located] = []
+        customers: list[_Located] = []
+        for row in chunk:
+            tally.touch(row.sheet)
+            try:
+                parsed = _validate_row(row)
+            except ValidationError as e:
+                tally.failed(_SHEET_TABLES[row.sheet], f"{row.location}: {_format_errors(e)}")
+                continue
+            if isinstance(parsed, SupplierImportRow):
+                suppliers.append((row.location, parsed))
+            else:
+                customers.append((row.location, parsed))
+
+        # Process supply-side first (products are needed for customer_items)
+        if suppliers:
+            supplier_map = self._upsert_suppliers(suppliers, tally)
+            self._upsert_products(suppliers, supplier_map, tally)
+
+        if customers:
+            customer_map = self._upsert_customers(customers, tally)
+            self._upsert_delivery_places(customers, customer_map, tally)
+            items = self._load_supplier_items(customers)
+            self._upsert_customer_items(customers, customer_map, items, tally)
+            self._upsert_product_mappings(customers, customer_map, items, tally)
+
+    def _load_by(self, model: Any, column: Any, values: set[str]) -> dict[str, Any]:
+        """Load rows whose column is in values, keyed by that column (first by id wins)."""
+        if not values:
+            return {}
+        found: dict[str, Any] = {}
+        for obj in self.db.scalars(select(model).where(column.in_(values)).order_by(model.id)):
+            found.setdefault(getattr(obj, column.key), obj)
+        return found
+
+    def _upsert_suppliers(self, rows: list[_Located], tally: _ImportTally) -> dict[str, Supplier]:
+        """Upsert suppliers by code."""
+        suppliers = self._load_by(
+            Supplier, Supplier.supplier_code, {row.supplier_code for _, row in rows}
         )
-        self.db.add(product)
-        return product
-
-    def _upsert_product_supplier(
-        self,
-        supplier_item_id: int,
-        supplier_id: int,
-        is_primary: bool,
-        lead_time_days: int | None,
-    ) -> SupplierItem | None:
-        """Upsert product-supplier relationship."""
-        existing = (
-            self.db.query(SupplierItem)
-            .filter(
-                SupplierItem.supplier_id == supplier_id,
-                SupplierItem.id == supplier_item_id,
+        for _, row in rows:
+            code = row.supplier_code
+            supplier = suppliers.get(code)
+            if supplier is None:
+                supplier = Supplier(supplier_code=code, supplier_name=row.supplier_name or code)
+                self.db.add(supplier)
+                suppliers[code] = supplier
+                tally.created("suppliers", code)
+            else:
+                if row.supplier_name:
+                    supplier.supplier_name = row.supplier_name
+                tally.updated("suppliers", code)
+        self.db.flush()
+        return suppliers
+
+    def _upsert_products(
+        self, rows: list[_Located], suppliers: dict[str, Supplier], tally: _ImportTally
+    ) -> None:
+        """Upsert supplier items by (supplier_id, maker_part_no)."""
+        keys = {
+            (suppliers[row.supplier_code].id, product.maker_part_code)
+            for _, row in rows
+            for product in row.products
+        }
+        if not keys:
+            return
+        existing = {
+            (item.supplier_id, item.maker_part_no): item
+            for item in self.db.scalars(
+                select(SupplierItem).where(
+                    tuple_(SupplierItem.supplier_id, SupplierItem.maker_part_no).in_(keys)
+                )
             )
-            .first()
-        )
-        if existing:
-            # existing.is_primary = is_primary  # Phase1: is_primary is removed from SupplierItem
-            if lead_time_days is not None:
-                existing.lead_time_days = lead_time_days
-            return existing
-        # Phase1: SupplierItem is the product itself, not a link table.
-        # This logic might be obsolete but keeping it for compatibility with ID-based lookup.
-        return None
-
-    def _upsert_customer(self, code: str, name: str) -> Customer | None:
-        """Upsert customer by code."""
-        existing = self.db.query(Customer).filter(Customer.customer_code == code).first()
-        if existing:
-            existing.customer_name = name
-            return existing
-        customer = Customer(customer_code=code, customer_name=name)
-        self.db.add(customer)
-        return customer
-
-    def _upsert_delivery_place(
-        self,
-        customer_id: int,
-        code: str,
-        name: str,
-        jiku_code: str | None,
-    ) -> DeliveryPlace | None:
-        """Upsert delivery place."""
-        existing = (
-            self.db.query(DeliveryPlace).filter(DeliveryPlace.delivery_place_code == code).first()
+        }
+        for _, row in rows:
+            supplier_id = suppliers[row.supplier_code].id
+            for product in row.products:
+                key = (supplier_id, product.maker_part_code)
+                item = existing.get(key)
+                if item is None:
+                    item = SupplierItem(
+                        supplier_id=supplier_id,
+                        maker_part_no=product.maker_part_code,
+                        display_name=product.product_name or product.maker_part_code,
+                        base_unit=product.base_unit or "EA",
+                        internal_unit=product.base_unit or "EA",
+                        lead_time_days=product.lead_time_days,
+                    )
+                    self.db.add(item)
+                    existing[key] = item
+                    tally.created("products", key)
+                    continue
+                if product.product_name:
+                    item.display_name = product.product_name
+                if product.base_unit:
+                    item.internal_unit = product.base_unit
+                if product.lead_time_days is not None:
+                    item.lead_time_days = product.lead_time_days
+                tally.updated("products", key)
+        self.db.flush()
+
+    def _upsert_customers(self, rows: list[_Located], tally: _ImportTally) -> dict[str, Customer]:
+        """Upsert customers by code."""
+        customers = self._load_by(
+            Customer, Customer.customer_code, {row.customer_code for _, row in rows}
         )
-        if existing:
-            existing.delivery_place_name = name
-            existing.customer_id = customer_id
-            if jiku_code:
-                existing.jiku_code = jiku_code
-            return existing
-        dp = DeliveryPlace(
-            customer_id=customer_id,
-            delivery_place_code=code,
-            delivery_place_name=name,
-            jiku_code=jiku_code,
+        for _, row in rows:
+            code = row.customer_code
+            customer = customers.get(code)
+            if customer is None:
+                customer = Customer(customer_code=code, customer_name=row.customer_name or code)
+                self.db.add(customer)
+                customers[code] = customer
+                tally.created("customers", code)
+            else:
+                if row.customer_name:
+                    customer.customer_name = row.customer_name
+                tally.updated("customers", code)
+        self.db.flush()
+        return customers
+
+    def _upsert_delivery_places(
+        self, rows: list[_Located], customers: dict[str, Customer], tally: _ImportTally
+    ) -> None:
+        """Upsert delivery places by code."""
+        codes = {dp.delivery_place_code for _, row in rows for dp in row.delivery_places}
+        if not codes:
+            return
+        places = self._load_by(DeliveryPlace, DeliveryPlace.delivery_place_code, codes)
+        for _, row in rows:
+            customer_id = customers[row.customer_code].id
+            for dp_row in row.delivery_places:
+                code = dp_row.delivery_place_code
+                place = places.get(code)
+                if place is None:
+                    place = DeliveryPlace(
+                        customer_id=customer_id,
+                        delivery_place_code=code,
+                        delivery_place_name=dp_row.delivery_place_name,
+                        jiku_code=dp_row.jiku_code,
+                        jiku_match_pattern=dp_row.jiku_match_pattern,
+                    )
+                    self.db.add(place)
+                    places[code] = place
+                    tally.created("delivery_places", code)
+                    continue
+                place.delivery_place_name = dp_row.delivery_place_name
+                place.customer_id = customer_id
+                if dp_row.jiku_code:
+                    place.jiku_code = dp_row.jiku_code
+                if dp_row.jiku_match_pattern:
+                    place.jiku_match_pattern = dp_row.jiku_match_pattern
+                tally.updated("delivery_places", code)
+        self.db.flush()
+
+    def _load_supplier_items(self, rows: list[_Located]) -> _SupplierItemIndex:
+        """Load supplier items referenced by customer items and product mappings."""
+        parts = {item.maker_part_code for _, row in rows for item in row.items} | {
+            pm.maker_part_code for _, row in rows for pm in row.product_mappings
+        }
+        if not parts:
+            return _SupplierItemIndex([])
+        result = self.db.execute(
+            select(SupplierItem, Supplier.supplier_code)
+            .join(Supplier, Supplier.id == SupplierItem.supplier_id)
+            .where(SupplierItem.maker_part_no.in_(parts))
+            .order_by(SupplierItem.id)
         )
-        self.db.add(dp)
-        return dp
+        return _SupplierItemIndex(result.tuples())
 
-    def _upsert_customer_item(
+    def _upsert_customer_items(
         self,
-        customer_id: int,
-        customer_part_no: str,
-        maker_part_code: str,
-        supplier_code: str | None,
-        base_unit: str | None,
-        pack_unit: str | None,
-        pack_quantity: int | None,
-        special_instructions: str | None,
-    ) -> CustomerItem | None:
-        """Upsert customer item."""
-        # Phase1: Find supplier_item by maker_part_code
-        supplier_item = (
-            self.db.query(SupplierItem)
-            .filter(SupplierItem.maker_part_no == maker_part_code)
-            .first()
-        )
-        if not supplier_item:
-            return None
-
-        # Phase1: supplier_id is removed from customer_items
-        # It's available via supplier_item.supplier_id if needed
-
-        # Check for existing
-        existing = (
-            self.db.query(CustomerItem)
-            .filter(
-                CustomerItem.customer_id == customer_id,
-                CustomerItem.customer_part_no == customer_part_no,
+        rows: list[_Located],
+        customers: dict[str, Customer],
+        supplier_items: _SupplierItemIndex,
+        tally: _ImportTally,
+    ) -> None:
+        """Upsert customer items by (customer_id, customer_part_no)."""
+        keys = {
+            (customers[row.customer_code].id, item.customer_part_no)
+            for _, row in rows
+            for item in row.items
+        }
+        if not keys:
+            return
+        existing = {
+            (ci.customer_id, ci.customer_part_no): ci
+            for ci in self.db.scalars(
+                select(CustomerItem).where(
+                    tuple_(CustomerItem.customer_id, CustomerItem.customer_part_no).in_(keys)
+                )
             )
-            .first()
-        )
-
-        if existing:
-            existing.supplier_item_id = supplier_item.id
-            if base_unit:
-                existing.base_unit = base_unit
-            if pack_unit:
-                existing.pack_unit = pack_unit
-            if pack_quantity is not None:
-                existing.pack_quantity = pack_quantity
-            if special_instructions:
-                existing.special_instructions = special_instructions
-            return existing
-        ci = CustomerItem(
-            customer_id=customer_id,
-            customer_part_no=customer_part_no,
-            supplier_item_id=supplier_item.id,
-            base_unit=base_unit or "個",  # Phase1: base_unit is required
-            pack_unit=pack_unit,
-            pack_quantity=pack_quantity,
-            special_instructions=special_instructions,
-        )
-        self.db.add(ci)
-        return ci
-
-    def _upsert_product_mapping(
+        }
+        for location, row in rows:
+            customer_id = customers[row.customer_code].id
+            for item_row in row.items:
+                supplier_item = supplier_items.resolve(
+                    item_row.maker_part_code, item_row.supplier_code
+                )
+                if supplier_item is None:
+                    tally.failed(
+                        "customer_items",
+                        f"{location}: Failed to create customer_item: "
+                        f"{item_row.customer_part_no} (product not found: "
+                        f"{item_row.maker_part_code})",
+                    )
+                    continue
+                key = (customer_id, item_row.customer_part_no)
+                ci = existing.get(key)
+                if ci is None:
+                    ci = CustomerItem(
+                        customer_id=customer_id,
+                        customer_part_no=item_row.customer_part_no,
+                        supplier_item_id=supplier_item.id,
+                        base_unit=item_row.base_unit or "個",  # Phase1: base_unit is required
+                        pack_unit=item_row.pack_unit,
+                        pack_quantity=item_row.pack_quantity,
+                        special_instructions=item_row.special_instructions,
+                    )
+                    self.db.add(ci)
+                    existing[key] = ci
+                    tally.created("customer_items", key)
+                    continue
+                ci.supplier_item_id = supplier_item.id
+                if item_row.base_unit:
+                    ci.base_unit = item_row.base_unit
+                if item_row.pack_unit:
+                    ci.pack_unit = item_row.pack_unit
+                if item_row.pack_quantity is not None:
+                    ci.pack_quantity = item_row.pack_quantity
+                if item_row.special_instructions:
+                    ci.special_instructions = item_row.special_instructions
+                tally.updated("customer_items", key)
+        self.db.flush()
+
+    def _upsert_product_mappings(
         self,
-        customer_id: int,
-        customer_part_code: str,
-        maker_part_code: str,
-        supplier_code: str,
-        base_unit: str,
-        pack_unit: str | None,
-        pack_quantity: int | None,
-        special_instructions: str | None,
-        is_active: bool,
-    ) -> ProductMapping | None:
-        """Upsert product mapping (4-party relationship)."""
-        # Find product by maker_part_code
-        product = (
-            self.db.query(SupplierItem)
-            .filter(SupplierItem.maker_part_no == maker_part_code)
-            .first()
-        )
-        if not product:
-            return None
-
-        # Find supplier (required for product_mappings)
-        supplier = self.db.query(Supplier).filter(Supplier.supplier_code == supplier_code).first()
-        if not supplier:
-            return None
-
-        # Check for existing mapping
+        rows: list[_Located],
+        customers: dict[str, Customer],
+        supplier_items: _SupplierItemIndex,
+        tally: _ImportTally,
+    ) -> None:
+        """Upsert product mappings (4-party relationship)."""
+        supplier_codes = {pm.supplier_code for _, row in rows for pm in row.product_mappings}
+        if not supplier_codes:
+            return
+        suppliers = self._load_by(Supplier, Supplier.supplier_code, supplier_codes)
+        keys = {
+            (customers[row.customer_code].id, pm.customer_part_code, suppliers[pm.supplier_code].id)
+            for _, row in rows
+            for pm in row.product_mappings
+            if pm.supplier_code in suppliers
+        }
         existing = (
-            self.db.query(ProductMapping)
-            .filter(
-                ProductMapping.customer_id == customer_id,
-                ProductMapping.customer_part_code == customer_part_code,
-                ProductMapping.supplier_id == supplier.id,
-            )
-            .first()
+            {
+                (pm.customer_id, pm.customer_part_code, pm.supplier_id): pm
+                for pm in self.db.scalars(
+                    select(ProductMapping).where(
+                        tuple_(
+                            ProductMapping.customer_id,
+                            ProductMapping.customer_part_code,
+                            ProductMapping.supplier_id,
+                        ).in_(keys)
+                    )
+                )
+            }
+            if keys
+            else {}
         )
-
-        if existing:
-            existing.supplier_item_id = product.id
-            existing.base_unit = base_unit
-            if pack_unit:
-                existing.pack_unit = pack_unit
-            if pack_quantity is not None:
-                existing.pack_quantity = pack_quantity
-            if special_instructions:
-                existing.special_instructions = special_instructions
-            if is_active:
-                existing.restore()
-            else:
-                existing.soft_delete()
-            return existing
-        pm = ProductMapping(
-            customer_id=customer_id,
-            customer_part_code=customer_part_code,
-            supplier_id=supplier.id,
-            supplier_item_id=product.id,
-            base_unit=base_unit,
-            pack_unit=pack_unit,
-            pack_quantity=pack_quantity,
-            special_instructions=special_instructions,
-            is_active=is_active,
+        for location, row in rows:
+            customer_id = customers[row.customer_code].id
+            for pm_row in row.product_mappings:
+                # Supplier is required for product_mappings
+                supplier = suppliers.get(pm_row.supplier_code)
+                product = supplier_items.resolve(pm_row.maker_part_code, pm_row.supplier_code)
+                if supplier is None or product is None:
+                    missing = "supplier" if supplier is None else "product"
+                    tally.failed(
+                        "product_mappings",
+                        f"{location}: Failed to create product_mapping: "
+                        f"{pm_row.customer_part_code} ({missing} not found)",
+                    )
+                    continue
+                key = (customer_id, pm_row.customer_part_code, supplier.id)
+                pm = existing.get(key)
+                if pm is None:
+                    pm = ProductMapping(
+                        customer_id=customer_id,
+                        customer_part_code=pm_row.customer_part_code,
+                        supplier_id=supplier.id,
+                        supplier_item_id=product.id,
+                        base_unit=pm_row.base_unit,
+                        pack_unit=pm_row.pack_unit,
+                        pack_quantity=pm_row.pack_quantity,
+                        special_instructions=pm_row.special_instructions,
+                    )
+                    if not pm_row.is_active:
+                        pm.soft_delete()
+                    self.db.add(pm)
+                    existing[key] = pm
+                    tally.created("product_mappings", key)
+                    continue
+                pm.supplier_item_id = product.id
+                pm.base_unit = pm_row.base_unit
+                if pm_row.pack_unit:
+                    pm.pack_unit = pm_row.pack_unit
+                if pm_row.pack_quantity is not None:
+                    pm.pack_quantity = pm_row.pack_quantity
+                if pm_row.special_instructions:
+                    pm.special_instructions = pm_row.special_instructions
+                if pm_row.is_active:
+                    pm.restore()
+                else:
+                    pm.soft_delete()
+                tally.updated("product_mappings", key)
+        self.db.flush()
+
+
+def _validate_row(row: ImportRow) -> SupplierImportRow | CustomerImportRow:
+    """Validate one row into a single-child SupplierImportRow / CustomerImportRow.
+
+    名称が空の行は既存レコードの名称を上書きしない（新規作成時はコードを名称にする）。
+    """
+    values = row.values
+    if row.sheet == "suppliers":
+        return SupplierImportRow.model_validate(
+            {
+                "supplier_code": values.get("supplier_code"),
+                "supplier_name": values.get("supplier_name") or "",
+                "products": [values] if values.get("maker_part_code") else [],
+            }
         )
-        self.db.add(pm)
-        return pm
+
+    customer: dict[str, Any] = {
+        "customer_code": values.get("customer_code"),
+        "customer_name": values.get("customer_name") or "",
+    }
+    if row.sheet == "product_mappings":
+        customer["product_mappings"] = [values]
+        return CustomerImportRow.model_validate(customer)
+
+    if values.get("delivery_place_code"):
+        customer["delivery_places"] = [values]
+    part_no = values.get("customer_part_no") or values.get("external_product_code")
+    if part_no:
+        customer["items"] = [{**values, "customer_part_no": part_no}]
+    return CustomerImportRow.model_validate(customer)
+
+
+def _format_errors(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    )
@@ -6,9 +6,11 @@ Updated: サロゲートキー（id）ベースに移行
 - Composite key methods maintained for backward compatibility
 """
 
+from collections.abc import Iterator
 from datetime import date
 from typing import cast
 
+from sqlalchemy import Row, Select
 from sqlalchemy.orm import Session
 
 from app.application.services.common.base_service import BaseService
@@ -98,6 +100,24 @@ class CustomerItemsService(BaseService[CustomerItem, CustomerItemCreate, Custome
 
         Phase1: Filter by supplier_item_id instead of supplier_item_id.
         """
+        query = self._enriched_query(customer_id, supplier_item_id, supplier_id, include_inactive)
+        results = self.db.execute(query.offset(skip).limit(limit)).all()
+        return [self._enriched_row(r) for r in results]
+
+    def iter_enriched(self, chunk_size: int = 1000) -> Iterator[dict]:
+        """Yield active enriched mappings through a server-side cursor (bulk export)."""
+        query = self._enriched_query().order_by(CustomerItem.id)
+        result = self.db.execute(query.execution_options(yield_per=chunk_size))
+        for r in result:
+            yield self._enriched_row(r)
+
+    @staticmethod
+    def _enriched_query(
+        customer_id: int | None = None,
+        supplier_item_id: int | None = None,
+        supplier_id: int | None = None,
+        include_inactive: bool = False,
+    ) -> Select:
         from sqlalchemy import select
 
         from app.infrastructure.persistence.models.masters_models import (
@@ -137,41 +157,40 @@ class CustomerItemsService(BaseService[CustomerItem, CustomerItemCreate, Custome
         if not include_inactive:
             query = query.filter(CustomerItem.get_active_filter())
 
-        results = self.db.execute(query.offset(skip).limit(limit)).all()
+        return query
 
+    @staticmethod
+    def _enriched_row(r: Row) -> dict:
         # Convert to dict with enriched data
         # Phase1: Return maker_part_no and display_name instead of product_code/product_name
-        return [
-            {
-                "id": r.CustomerItem.id,
-                "customer_id": r.CustomerItem.customer_id,
-                "customer_code": r.customer_code,
-                "customer_name": r.customer_name,
-                "customer_part_no": r.CustomerItem.customer_part_no,
-                "supplier_item_id": r.CustomerItem.supplier_item_id,
-                "maker_part_no": r.maker_part_no,
-                "display_name": r.display_name,
-                "supplier_id": r.supplier_id,
-                "supplier_code": r.supplier_code,
-                "supplier_name": r.supplier_name,
-                "base_unit": r.CustomerItem.base_unit,
-                "pack_unit": r.CustomerItem.pack_unit,
-                "pack_quantity": float(r.CustomerItem.pack_quantity)
-                if r.CustomerItem.pack_quantity
-                else None,
-                "special_instructions": r.CustomerItem.special_instructions,
-                # Metadata
-                "created_at": r.CustomerItem.created_at.isoformat()
-                if r.CustomerItem.created_at
-                else None,
-                "updated_at": r.CustomerItem.updated_at.isoformat()
-                if r.CustomerItem.updated_at
-                else None,
-                "valid_to": r.CustomerItem.valid_to,
-                "version": r.CustomerItem.version,
-            }
-            for r in results
-        ]
+        return {
+            "id": r.CustomerItem.id,
+            "customer_id": r.CustomerItem.customer_id,
+            "customer_code": r.customer_code,
+            "customer_name": r.customer_name,
+            "customer_part_no": r.CustomerItem.customer_part_no,
+            "supplier_item_id": r.CustomerItem.supplier_item_id,
+            "maker_part_no": r.maker_part_no,
+            "display_name": r.display_name,
+            "supplier_id": r.supplier_id,
+            "supplier_code": r.supplier_code,
+            "supplier_name": r.supplier_name,
+            "base_unit": r.CustomerItem.base_unit,
+            "pack_unit": r.CustomerItem.pack_unit,
+            "pack_quantity": float(r.CustomerItem.pack_quantity)
+            if r.CustomerItem.pack_quantity
+            else None,
+            "special_instructions": r.CustomerItem.special_instructions,
+            # Metadata
+            "created_at": r.CustomerItem.created_at.isoformat()
+            if r.CustomerItem.created_at
+            else None,
+            "updated_at": r.CustomerItem.updated_at.isoformat()
+            if r.CustomerItem.updated_at
+            else None,
+            "valid_to": r.CustomerItem.valid_to,
+            "version": r.CustomerItem.version,
+        }
 
     def get_by_customer(self, customer_id: int) -> list[dict]:
         """Get all customer item mappings for a specific customer."""
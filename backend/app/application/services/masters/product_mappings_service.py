@@ -1,5 +1,6 @@
 """Product mappings service (商品マスタ明細連携)."""
 
+from collections.abc import Iterator
 from typing import Any
 
 from sqlalchemy.orm import Session
@@ -28,6 +29,10 @@ class ProductMappingsService(
 
     def get_export_data(self) -> list[dict[str, Any]]:
         """Get data formatted for export."""
+        return list(self.iter_export_data())
+
+    def iter_export_data(self, chunk_size: int = 1000) -> Iterator[dict[str, Any]]:
+        """Yield export rows through a server-side cursor (bulk export streaming)."""
         query = (
             self.db.query(
                 ProductMapping.id,
@@ -46,12 +51,12 @@ class ProductMappingsService(
             .join(Customer, ProductMapping.customer_id == Customer.id)
             .join(Supplier, ProductMapping.supplier_id == Supplier.id)
             .join(SupplierItem, ProductMapping.supplier_item_id == SupplierItem.id)
+            .order_by(ProductMapping.id)
+            .yield_per(chunk_size)
         )
 
-        results = query.all()
-
-        return [
-            {
+        for r in query:
+            yield {
                 "customer_code": r.customer_code,
                 "customer_name": r.customer_name,
                 "customer_part_code": r.customer_part_code,
@@ -64,5 +69,3 @@ class ProductMappingsService(
                 "pack_quantity": r.pack_quantity,
                 "special_instructions": r.special_instructions,
             }
-            for r in results
-        ]
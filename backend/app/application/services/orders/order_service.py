@@ -133,6 +133,7 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterator, Sequence
 from datetime import date, timedelta
 from typing import Any, cast
 
@@ -340,7 +341,26 @@ class OrderService:
 
         stmt = stmt.order_by(OrderLine.delivery_date.asc()).offset(skip).limit(limit)
         lines = self.db.execute(stmt).scalars().all()
+        return self._build_line_responses(lines)
 
+    def iter_all_lines(self, chunk_size: int = 1000) -> Iterator[OrderLineResponse]:
+        """Yield every order line through a server-side cursor (bulk export).
+
+        selectinload と追加情報の補完はチャンク（partition）単位で行う。
+        """
+        stmt = (
+            select(OrderLine)
+            .options(
+                selectinload(OrderLine.order).selectinload(Order.customer),
+                selectinload(OrderLine.supplier_item),
+            )
+            .order_by(OrderLine.delivery_date.asc(), OrderLine.id.asc())
+            .execution_options(yield_per=chunk_size)
+        )
+        for partition in self.db.execute(stmt).scalars().partitions():
+            yield from self._build_line_responses(partition)
+
+    def _build_line_responses(self, lines: Sequence[OrderLine]) -> list[OrderLineResponse]:
         # Convert to Pydantic models
         response_lines = []
         for line in lines:
@@ -1,11 +1,22 @@
+"""発注提案エンジン.
+
+【設計意図】バッチモード:
+- 製品ごとのモードは製品1件につき 在庫・予約・入荷予定・需要履歴 の4クエリ以上を発行する
+- バッチモード（既定）は 需要履歴1回 + 在庫・予約・入荷予定の
+  集計クエリ各1回 で全製品分を取得し、需要予測は BatchDemandEstimator で一括計算する
+  → 倉庫全体の実行でもクエリ数は製品数に依存しない
+"""
+
+from collections.abc import Sequence
 from datetime import date
 from decimal import Decimal
 
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.application.services.demand.estimator import DemandEstimator
+from app.application.services.demand.estimator import DemandEstimator, DemandForecast
 from app.application.services.demand.repository import DemandRepository
+from app.application.services.demand.statistical.batch import BatchDemandEstimator
 from app.application.services.demand.statistical.ewma import EWMAEstimator
 from app.application.services.demand.statistical.moving_average import MovingAverageEstimator
 from app.application.services.demand.statistical.outlier import OutlierHandler
@@ -36,8 +47,17 @@ class ReplenishmentEngine:
         supplier_item_ids: list[int] | None = None,
         as_of_date: date | None = None,
         method: str = "moving_average_seasonal",  # default per D11
+        batch: bool = True,
     ) -> list[ReplenishmentRecommendation]:
-        """発注提案を実行."""
+        """発注提案を実行.
+
+        Args:
+            warehouse_id: 倉庫ID
+            supplier_item_ids: 対象製品ID（Noneなら有効な全製品）
+            as_of_date: 基準日（Noneなら今日）
+            method: 需要予測手法（"ewma" または移動平均+季節係数）
+            batch: 全製品を一括計算するか（False なら製品ごとに計算）
+        """
         if as_of_date is None:
             from app.core.time_utils import utcnow
 
@@ -53,6 +73,9 @@ class ReplenishmentEngine:
 
         product_suppliers = self.db.execute(stmt).scalars().all()
 
+        if batch:
+            return self._run_batch(product_suppliers, warehouse_id, as_of_date, method)
+
         recommendations = []
 
         # 2. DemandEstimatorの準備
@@ -76,49 +99,113 @@ class ReplenishmentEngine:
                 as_of_date=as_of_date,
             )
 
-            # 5. LT統計 (簡易版: マスタ設定値を採用し、ばらつきはデフォルト値とする)
-            # 本来は InboundPlan から実績LTの統計を取る (D14)
-            # ここでは実装簡略化のため、マスタ値 + 固定の分散 を使用
-            # TODO: 実装が進んだら InboundPlan から計算するロジックへ差し替え
-            lead_time_days = int(ps.lead_time_days or 7)
-            lead_time_std = float(lead_time_days * 0.2)  # 仮: LTの20%を標準偏差とする
-
-            # 6. 計算
-            # Product情報からロットサイズなどを取得したい場合はProductをjoinまたは取得
-            # ここでは ps.supplier_item を使う (eager loadされていれば)
-            # ロットサイズ等の制約は ProductMapping などにあるかもしれないが、
-            # 現状の Product モデルにはないので、qty_scale 等を使用
-            # D12: MOQ -> ロット丸め
-            # 今回は MOQ=なし, LotSize=qty_scale * 10 などを仮定、またはマスタにあれば使う
-            # Productにqty_scaleを追加したのでそれを使う
-
-            # ps (SupplierItem) 自体が以前の ProductGroup の役割を兼ねている
-            lot_size = None
-            if ps.qty_per_internal_unit:  # 代わりの属性を使用、または null 許容
-                lot_size = ps.qty_per_internal_unit
-
-            rec = self.calculator.calculate(
-                supplier_item_id=supplier_item_id,
+            rec = self._recommend(
+                ps,
                 warehouse_id=warehouse_id,
-                supplier_id=supplier_id,
                 as_of_date=as_of_date,
-                demand=forecast,
-                lead_time_days=lead_time_days,
-                lead_time_std=lead_time_std,
+                forecast=forecast,
                 on_hand=on_hand,
                 reserved=reserved,
                 inbound=inbound,
-                moq=None,  # マスタにないためNone
-                lot_size=lot_size,
             )
-
             if rec:
-                # 説明文生成
-                rec.explanation = self.explainer.explain(rec)
                 recommendations.append(rec)
 
         return recommendations
 
+    def _run_batch(
+        self,
+        product_suppliers: Sequence[SupplierItem],
+        warehouse_id: int,
+        as_of_date: date,
+        method: str,
+    ) -> list[ReplenishmentRecommendation]:
+        """全製品分の在庫・需要をまとめて取得して発注提案を計算."""
+        supplier_item_ids = [int(ps.id) for ps in product_suppliers]
+        if not supplier_item_ids:
+            return []
+
+        on_hand_map = self._get_on_hand_batch(supplier_item_ids, warehouse_id)
+        reserved_map = self._get_reserved_batch(supplier_item_ids, warehouse_id)
+        inbound_map = self._get_pending_inbound_batch(supplier_item_ids)
+
+        # D13: 予測期間 30日
+        horizon_days = 30
+        forecasts = BatchDemandEstimator(self.demand_repo, method=method).estimate_many(
+            supplier_item_ids, warehouse_id, horizon_days, as_of_date
+        )
+
+        recommendations = []
+        for ps in product_suppliers:
+            supplier_item_id = int(ps.id)
+            supplier_id = int(ps.supplier_id)
+            rec = self._recommend(
+                ps,
+                warehouse_id=warehouse_id,
+                as_of_date=as_of_date,
+                forecast=forecasts[supplier_item_id],
+                on_hand=on_hand_map.get(supplier_item_id, Decimal("0")),
+                reserved=reserved_map.get(supplier_item_id, Decimal("0")),
+                inbound=inbound_map.get((supplier_item_id, supplier_id), Decimal("0")),
+            )
+            if rec:
+                recommendations.append(rec)
+        return recommendations
+
+    def _recommend(
+        self,
+        ps: SupplierItem,
+        *,
+        warehouse_id: int,
+        as_of_date: date,
+        forecast: DemandForecast,
+        on_hand: Decimal,
+        reserved: Decimal,
+        inbound: Decimal,
+    ) -> ReplenishmentRecommendation | None:
+        supplier_item_id = int(ps.id)
+        supplier_id = int(ps.supplier_id)
+        # 5. LT統計 (簡易版: マスタ設定値を採用し、ばらつきはデフォルト値とする)
+        # 本来は InboundPlan から実績LTの統計を取る (D14)
+        # ここでは実装簡略化のため、マスタ値 + 固定の分散 を使用
+        # TODO: 実装が進んだら InboundPlan から計算するロジックへ差し替え
+        lead_time_days = int(ps.lead_time_days or 7)
+        lead_time_std = float(lead_time_days * 0.2)  # 仮: LTの20%を標準偏差とする
+
+        # 6. 計算
+        # Product情報からロットサイズなどを取得したい場合はProductをjoinまたは取得
+        # ここでは ps.supplier_item を使う (eager loadされていれば)
+        # ロットサイズ等の制約は ProductMapping などにあるかもしれないが、
+        # 現状の Product モデルにはないので、qty_scale 等を使用
+        # D12: MOQ -> ロット丸め
+        # 今回は MOQ=なし, LotSize=qty_scale * 10 などを仮定、またはマスタにあれば使う
+        # Productにqty_scaleを追加したのでそれを使う
+
+        # ps (SupplierItem) 自体が以前の ProductGroup の役割を兼ねている
+        lot_size = None
+        if ps.qty_per_internal_unit:  # 代わりの属性を使用、または null 許容
+            lot_size = ps.qty_per_internal_unit
+
+        rec = self.calculator.calculate(
+            supplier_item_id=supplier_item_id,
+            warehouse_id=warehouse_id,
+            supplier_id=supplier_id,
+            as_of_date=as_of_date,
+            demand=forecast,
+            lead_time_days=lead_time_days,
+            lead_time_std=lead_time_std,
+            on_hand=on_hand,
+            reserved=reserved,
+            inbound=inbound,
+            moq=None,  # マスタにないためNone
+            lot_size=lot_size,
+        )
+
+        if rec:
+            # 説明文生成
+            rec.explanation = self.explainer.explain(rec)
+        return rec
+
     def _create_estimator(self, method: str) -> DemandEstimator:
         # Default: Moving Average + Seasonal (D11)
         use_seasonal = True
@@ -184,3 +271,61 @@ class ReplenishmentEngine:
             )
         )
         return self.db.execute(stmt).scalar() or Decimal("0")
+
+    def _get_on_hand_batch(
+        self, supplier_item_ids: list[int], warehouse_id: int
+    ) -> dict[int, Decimal]:
+        stmt = (
+            select(LotReceipt.supplier_item_id, func.sum(LotReceipt.current_quantity))
+            .where(
+                LotReceipt.supplier_item_id.in_(supplier_item_ids),
+                LotReceipt.warehouse_id == warehouse_id,
+                LotReceipt.current_quantity > 0,
+            )
+            .group_by(LotReceipt.supplier_item_id)
+        )
+        return {
+            int(supplier_item_id): total or Decimal("0")
+            for supplier_item_id, total in self.db.execute(stmt).tuples()
+            if supplier_item_id is not None
+        }
+
+    def _get_reserved_batch(
+        self, supplier_item_ids: list[int], warehouse_id: int
+    ) -> dict[int, Decimal]:
+        stmt = (
+            select(LotReceipt.supplier_item_id, func.sum(LotReservation.reserved_qty))
+            .join(LotReceipt, LotReservation.lot_id == LotReceipt.id)
+            .where(
+                LotReceipt.supplier_item_id.in_(supplier_item_ids),
+                LotReceipt.warehouse_id == warehouse_id,
+                LotReservation.status == "active",
+            )
+            .group_by(LotReceipt.supplier_item_id)
+        )
+        return {
+            int(supplier_item_id): total or Decimal("0")
+            for supplier_item_id, total in self.db.execute(stmt).tuples()
+            if supplier_item_id is not None
+        }
+
+    def _get_pending_inbound_batch(
+        self, supplier_item_ids: list[int]
+    ) -> dict[tuple[int, int], Decimal]:
+        """(製品ID, 仕入先ID) ごとの入荷予定数量."""
+        from app.infrastructure.persistence.models.inbound_models import InboundPlanLine
+
+        stmt = (
+            select(
+                InboundPlanLine.supplier_item_id,
+                InboundPlan.supplier_id,
+                func.sum(InboundPlanLine.planned_quantity),
+            )
+            .join(InboundPlan, InboundPlanLine.inbound_plan_id == InboundPlan.id)
+            .where(
+                InboundPlanLine.supplier_item_id.in_(supplier_item_ids),
+                InboundPlan.status.in_(["planned", "in_transit"]),
+            )
+            .group_by(InboundPlanLine.supplier_item_id, InboundPlan.supplier_id)
+        )
+        return {(row[0], row[1]): row[2] or Decimal("0") for row in self.db.execute(stmt)}
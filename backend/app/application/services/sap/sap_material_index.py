@@ -0,0 +1,146 @@
+"""SAP material index (SAPキャッシュの共有インデックス).
+
+SapReconciliationService が突合に使う SAP 先方品番（ZKDMAT_B）の
+インメモリ索引を、プロセス内で (kunnr, connection_id) ごとに共有する。
+
+【設計意図】なぜ共有・バージョン付きにするのか:
+- 以前は OCR 一覧の各リクエストで sap_material_cache を全件 SELECT して
+  dict を作り直していた（突合自体は1ページ分しか行わないのに）
+- 索引はバージョン（件数 + 最大 updated_at）付きで保持し、リクエストごとの
+  確認は集計クエリ1回のみ。バージョンが変われば再構築する
+  → 他ワーカーでの洗い替え（upsert + 旧バッチ削除）も次のリクエストで反映される
+- SapMaterialService がキャッシュを書き換えた時はプロセス内でも即時に無効化する
+
+【設計意図】前方一致の探索:
+- 以前は全キーに対して startswith を線形走査していた
+- キーをソート済みリストで保持し、bisect で接頭辞の開始位置を求めて
+  一致が続く範囲だけを走査する（一意判定に必要な件数で打ち切る）
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from bisect import bisect_left
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.infrastructure.persistence.models.sap_models import SapMaterialCache
+
+
+logger = logging.getLogger(__name__)
+
+IndexKey = tuple[str, int | None]
+IndexVersion = tuple[int, datetime | None]
+
+
+@dataclass(frozen=True, slots=True)
+class SapMaterialEntry:
+    """突合に必要な SAP キャッシュ1件分（セッションに依存しない値）."""
+
+    zkdmat_b: str
+    raw_data: dict[str, Any] | None
+
+
+class SapMaterialIndex:
+    """Exact / prefix lookup over SAP customer item codes (ZKDMAT_B)."""
+
+    def __init__(self, entries: Iterable[SapMaterialEntry]):
+        """Build the index; later entries win on duplicate codes (複数接続時)."""
+        self._by_code: dict[str, SapMaterialEntry] = {e.zkdmat_b: e for e in entries}
+        self._sorted_codes: list[str] = sorted(self._by_code)
+
+    def __len__(self) -> int:
+        return len(self._by_code)
+
+    def __contains__(self, code: object) -> bool:
+        return code in self._by_code
+
+    def get(self, code: str) -> SapMaterialEntry | None:
+        """Return the entry whose ZKDMAT_B equals code."""
+        return self._by_code.get(code)
+
+    def prefix_matches(self, prefix: str, limit: int | None = None) -> list[SapMaterialEntry]:
+        """Return entries whose ZKDMAT_B starts with prefix (ZKDMAT_B 昇順).
+
+        Args:
+            prefix: 接頭辞
+            limit: 最大件数（None なら全件）
+        """
+        matches: list[SapMaterialEntry] = []
+        codes = self._sorted_codes
+        for i in range(bisect_left(codes, prefix), len(codes)):
+            code = codes[i]
+            if not code.startswith(prefix):
+                break
+            matches.append(self._by_code[code])
+            if limit is not None and len(matches) >= limit:
+                break
+        return matches
+
+
+class SapMaterialIndexCache:
+    """Process-wide, versioned SapMaterialIndex store (thread-safe)."""
+
+    def __init__(self) -> None:
+        """Initialize an empty store."""
+        self._entries: dict[IndexKey, tuple[IndexVersion, SapMaterialIndex]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _filters(kunnr: str, connection_id: int | None) -> list[Any]:
+        filters = [SapMaterialCache.kunnr == kunnr]
+        if connection_id:
+            filters.append(SapMaterialCache.connection_id == connection_id)
+        return filters
+
+    def _current_version(self, db: Session, kunnr: str, connection_id: int | None) -> IndexVersion:
+        stmt = select(func.count(), func.max(SapMaterialCache.updated_at)).where(
+            *self._filters(kunnr, connection_id)
+        )
+        count, max_updated_at = db.execute(stmt).one()
+        return int(count), max_updated_at
+
+    def get(self, db: Session, kunnr: str, connection_id: int | None = None) -> SapMaterialIndex:
+        """Return the index for (kunnr, connection_id), rebuilding it when the version changed."""
+        key: IndexKey = (kunnr, connection_id or None)
+        version = self._current_version(db, kunnr, connection_id)
+        with self._lock:
+            cached = self._entries.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        stmt = (
+            select(SapMaterialCache.zkdmat_b, SapMaterialCache.raw_data)
+            .where(*self._filters(kunnr, connection_id))
+            .order_by(SapMaterialCache.connection_id, SapMaterialCache.id)
+        )
+        index = SapMaterialIndex(
+            SapMaterialEntry(zkdmat_b=row.zkdmat_b, raw_data=row.raw_data)
+            for row in db.execute(stmt)
+        )
+        with self._lock:
+            self._entries[key] = (version, index)
+
+        logger.info(
+            "SAP material index rebuilt",
+            extra={"kunnr": kunnr, "connection_id": connection_id, "entry_count": len(index)},
+        )
+        return index
+
+    def invalidate(self, kunnr: str | None = None) -> None:
+        """Drop indexes for kunnr (None = all)."""
+        with self._lock:
+            if kunnr is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == kunnr]:
+                    del self._entries[key]
+
+
+sap_material_index_cache = SapMaterialIndexCache()
@@ -3,6 +3,13 @@
 Z_SCM1_RFC_MATERIAL_DOWNLOADを呼び出し、ET_DATAをキャッシュに保存する。
 
 Phase 1: 手動トリガーでSAPからデータ取得 → DBキャッシュ保存
+
+【設計意図】キャッシュ保存を複数行 upsert にする理由:
+- 以前は ET_DATA を df.iterrows() で1行ずつ辿り、1行ごとに INSERT ... ON CONFLICT を
+  実行していた → 得意先の品番マスタ全件（数万行）で数万回の往復
+- 現在は raw_data を列単位で組み立て、CACHE_UPSERT_CHUNK_ROWS 行ずつの
+  複数行 INSERT ... ON CONFLICT DO UPDATE で保存する
+- 保存と旧バッチ削除（洗い替え）は同一トランザクションで確定する
 """
 
 from __future__ import annotations
@@ -17,6 +24,7 @@ from sqlalchemy import select
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
+from app.application.services.sap.sap_material_index import sap_material_index_cache
 from app.infrastructure.persistence.models.sap_models import (
     SapConnection,
     SapFetchLog,
@@ -51,6 +59,9 @@ SAP_COLS = {
     "ship_note": "ZSHIPTE_H",  # idx=31, 出荷票テキスト(100)
 }
 
+CACHE_UPSERT_CHUNK_ROWS = 1000
+"""キャッシュ保存で1回の INSERT ... ON CONFLICT に含める最大行数."""
+
 
 class SapMaterialFetchResult:
     """SAP取得結果."""
@@ -207,7 +218,9 @@ class SapMaterialService:
             # キャッシュに保存
             cached_count = 0
             deleted_count = 0
+            save_seconds = 0.0
             if df is not None and not df.empty:
+                save_start = time.perf_counter()
                 try:
                     cached_count = self._save_to_cache(connection.id, df, kunnr_f, fetch_batch_id)
 
@@ -222,6 +235,7 @@ class SapMaterialService:
                 except Exception:
                     self.db.rollback()
                     raise
+                save_seconds = time.perf_counter() - save_start
 
             duration_ms = int((time.time() - start_time) * 1000)
 
@@ -238,7 +252,14 @@ class SapMaterialService:
             logger.info(
                 f"[SapMaterialService] Fetch completed: "
                 f"trigger={trigger}, batch={fetch_batch_id}, records={record_count}, "
-                f"cached={cached_count}, deleted={deleted_count}, duration={duration_ms}ms"
+                f"cached={cached_count}, deleted={deleted_count}, duration={duration_ms}ms",
+                extra={
+                    "fetch_batch_id": fetch_batch_id,
+                    "cached_count": cached_count,
+                    "cache_rows_per_sec": (
+                        round(cached_count / save_seconds) if save_seconds > 0 else None
+                    ),
+                },
             )
 
             return SapMaterialFetchResult(
@@ -444,6 +465,8 @@ class SapMaterialService:
     ) -> int:
         """キャッシュに保存.
 
+        コミットは呼び出し元で行う（_delete_old_cache と同一トランザクション）。
+
         Args:
             connection_id: 接続ID
             df: ET_DATA DataFrame
@@ -451,7 +474,7 @@ class SapMaterialService:
             fetch_batch_id: 取得バッチID
 
         Returns:
-            保存件数
+            保存件数（重複品番は1件として数える）
         """
         if df.empty:
             return 0
@@ -463,31 +486,36 @@ class SapMaterialService:
             logger.warning(f"[SapMaterialService] Column {zkdmat_b_col} not found in DataFrame")
             return 0
 
-        now = datetime.now(UTC)
-        cached_count = 0
+        # 先方品番（空は除外）と raw_data（ZKDMAT_B以外の列、欠損値は格納しない）を列単位で作る
+        codes = df[zkdmat_b_col].fillna("").astype(str).str.strip()
+        valid = codes != ""
+        others = df.loc[valid].drop(columns=[zkdmat_b_col]).astype(object)
+        records = others.where(others.notna(), None).to_dict(orient="records")
 
-        for _, row in df.iterrows():
-            zkdmat_b = str(row.get(zkdmat_b_col, "")).strip()
-            if not zkdmat_b:
-                continue
+        # 同一取得内の重複品番は後勝ち
+        # （1文の ON CONFLICT DO UPDATE は同じキーを2回更新できないため事前に集約する）
+        raw_data_by_code: dict[str, dict[str, Any]] = {}
+        for zkdmat_b, record in zip(codes[valid], records, strict=True):
+            raw_data_by_code[zkdmat_b] = {k: v for k, v in record.items() if v is not None}
 
-            # ZKDMAT_B以外の列をraw_dataに格納
-            raw_data = {
-                k: v for k, v in row.to_dict().items() if k != zkdmat_b_col and v is not None
+        now = datetime.now(UTC)
+        values = [
+            {
+                "connection_id": connection_id,
+                "zkdmat_b": zkdmat_b,
+                "kunnr": kunnr,
+                "raw_data": raw_data,
+                "fetched_at": now,
+                "fetch_batch_id": fetch_batch_id,
+                "created_at": now,
+                "updated_at": now,
             }
+            for zkdmat_b, raw_data in raw_data_by_code.items()
+        ]
 
-            # Upsert（PostgreSQL INSERT ON CONFLICT）
-            stmt = insert(SapMaterialCache).values(
-                connection_id=connection_id,
-                zkdmat_b=zkdmat_b,
-                kunnr=kunnr,
-                raw_data=raw_data,
-                fetched_at=now,
-                fetch_batch_id=fetch_batch_id,
-                created_at=now,
-                updated_at=now,
-            )
-
+        # Upsert（PostgreSQL INSERT ON CONFLICT）を CACHE_UPSERT_CHUNK_ROWS 行ずつの複数行文で実行
+        for start in range(0, len(values), CACHE_UPSERT_CHUNK_ROWS):
+            stmt = insert(SapMaterialCache).values(values[start : start + CACHE_UPSERT_CHUNK_ROWS])
             stmt = stmt.on_conflict_do_update(
                 constraint="uq_sap_material_cache_key",
                 set_={
@@ -497,11 +525,11 @@ class SapMaterialService:
                     "updated_at": stmt.excluded.updated_at,
                 },
             )
-
             self.db.execute(stmt)
-            cached_count += 1
 
-        return cached_count
+        # 突合用の共有インデックスを破棄（他ワーカーはバージョン確認で再構築される）
+        sap_material_index_cache.invalidate(kunnr)
+        return len(values)
 
     def _log_fetch(
         self,
@@ -603,6 +631,7 @@ class SapMaterialService:
             stmt = stmt.where(SapMaterialCache.kunnr == kunnr)
 
         result = self.db.execute(stmt)
+        sap_material_index_cache.invalidate(kunnr)
         # SQLAlchemy 2.0 の Result オブジェクトから rowcount を取得（DMLの場合）
         return getattr(result, "rowcount", 0) or 0
 
@@ -615,6 +644,8 @@ class SapMaterialService:
     ) -> int:
         """古いfetch_batch_idのキャッシュを削除（洗い替え）.
 
+        コミットは呼び出し元で行う（_save_to_cache と同一トランザクション）。
+
         Args:
             connection_id: 接続ID
             kunnr_f: 得意先コードFrom
@@ -641,7 +672,7 @@ class SapMaterialService:
         )
 
         result = self.db.execute(stmt)
-        self.db.commit()
+        sap_material_index_cache.invalidate(kunnr_f if kunnr_t == kunnr_f else None)
 
         deleted_count = getattr(result, "rowcount", 0) or 0
 
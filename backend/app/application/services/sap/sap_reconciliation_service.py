@@ -4,6 +4,12 @@ OCRデータとSAPキャッシュ・マスタを突合して、
 ステータス（完全一致/前方一致/未一致）を判定する。
 
 Phase 1: 手動トリガーで突合確認 + ログ出力
+
+【設計意図】突合はメモリ上で完結させる:
+- SAPキャッシュはプロセス共有の SapMaterialIndex（sap_material_index 参照）を使う
+- 出荷用マスタは得意先ごとに1回だけ読み込み、
+  (材質コード, 次区) と (先方品番, 次区) の辞書で引く
+  → 1ページ分（例: 1000行）の突合で行ごとのクエリを発行しない
 """
 
 from __future__ import annotations
@@ -18,8 +24,11 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.application.services.sap.sap_cache_manager import SapCacheManager
+from app.application.services.sap.sap_material_index import (
+    SapMaterialIndex,
+    sap_material_index_cache,
+)
 from app.application.services.sap.sap_material_service import SapMaterialService
-from app.infrastructure.persistence.models.sap_models import SapMaterialCache
 from app.infrastructure.persistence.models.shipping_master_models import (
     ShippingMasterCurated,
 )
@@ -136,6 +145,16 @@ class ReconciliationSummary:
         }
 
 
+@dataclass
+class _ShippingMasterLookup:
+    """1得意先分の出荷用マスタ突合用辞書."""
+
+    # (材質コード, 次区) → (マスタID, 先方品番)
+    by_material: dict[tuple[str, str], tuple[int, str | None]] = field(default_factory=dict)
+    # (先方品番, 次区) → 材質コード（重複時は ID の小さい方）
+    by_customer_part_no: dict[tuple[str, str], str] = field(default_factory=dict)
+
+
 class SapReconciliationService:
     """SAP突合サービス.
 
@@ -161,8 +180,9 @@ class SapReconciliationService:
             db: データベースセッション
         """
         self.db = db
-        self._sap_cache: dict[str, SapMaterialCache] | None = None
+        self._sap_cache: SapMaterialIndex | None = None
         self._sap_cache_kunnr: str | None = None
+        self._master_lookups: dict[str, _ShippingMasterLookup] = {}
         self.cache_manager = SapCacheManager(db)
         self.material_service = SapMaterialService(db)
 
@@ -247,21 +267,45 @@ class SapReconciliationService:
         if auto_refresh:
             self._refresh_cache_if_stale(kunnr, connection_id)
 
-        stmt = select(SapMaterialCache).where(SapMaterialCache.kunnr == kunnr)
-
-        if connection_id:
-            stmt = stmt.where(SapMaterialCache.connection_id == connection_id)
-
-        cache_list = list(self.db.execute(stmt).scalars().all())
-        self._sap_cache = {item.zkdmat_b: item for item in cache_list}
+        self._sap_cache = sap_material_index_cache.get(self.db, kunnr, connection_id)
         self._sap_cache_kunnr = kunnr
 
-        logger.info(
-            f"[SapReconciliationService] Loaded {len(self._sap_cache)} "
+        logger.debug(
+            f"[SapReconciliationService] Using {len(self._sap_cache)} "
             f"SAP cache entries for kunnr={kunnr}"
         )
         return len(self._sap_cache)
 
+    def _get_master_lookup(self, customer_code: str) -> _ShippingMasterLookup:
+        """得意先の出荷用マスタを1回のクエリで読み込み、辞書化して保持."""
+        lookup = self._master_lookups.get(customer_code)
+        if lookup is not None:
+            return lookup
+
+        lookup = _ShippingMasterLookup()
+        stmt = (
+            select(
+                ShippingMasterCurated.id,
+                ShippingMasterCurated.material_code,
+                ShippingMasterCurated.jiku_code,
+                ShippingMasterCurated.customer_part_no,
+            )
+            .where(ShippingMasterCurated.customer_code == customer_code)
+            .order_by(ShippingMasterCurated.id)
+        )
+        for row in self.db.execute(stmt):
+            lookup.by_material[(row.material_code, row.jiku_code)] = (
+                row.id,
+                row.customer_part_no,
+            )
+            if row.customer_part_no is not None:
+                lookup.by_customer_part_no.setdefault(
+                    (row.customer_part_no, row.jiku_code), row.material_code
+                )
+
+        self._master_lookups[customer_code] = lookup
+        return lookup
+
     def reconcile_single(
         self,
         material_code: str | None,
@@ -321,12 +365,8 @@ class SapReconciliationService:
         Returns:
             マスタの材質コード（メーカー品番）
         """
-        stmt = select(ShippingMasterCurated.material_code).where(
-            ShippingMasterCurated.customer_code == customer_code,
-            ShippingMasterCurated.customer_part_no == customer_part_no,
-            ShippingMasterCurated.jiku_code == (jiku_code or ""),
-        )
-        result_code = self.db.execute(stmt).scalar()
+        lookup = self._get_master_lookup(customer_code)
+        result_code = lookup.by_customer_part_no.get((customer_part_no, jiku_code or ""))
 
         if result_code:
             logger.debug(
@@ -358,8 +398,8 @@ class SapReconciliationService:
             return
 
         # 1. 直接一致チェック: SAP先方品番 == OCR材質コード
-        if material_code in self._sap_cache:
-            cache_item = self._sap_cache[material_code]
+        cache_item = self._sap_cache.get(material_code)
+        if cache_item is not None:
             result.sap_match_type = SapMatchType.EXACT
             result.sap_matched_zkdmat_b = cache_item.zkdmat_b
             result.sap_raw_data = cache_item.raw_data
@@ -375,8 +415,8 @@ class SapReconciliationService:
         )
 
         # 取得した材質コードでSAPと再マッチング
-        if master_material_code and master_material_code in self._sap_cache:
-            cache_item = self._sap_cache[master_material_code]
+        cache_item = self._sap_cache.get(master_material_code) if master_material_code else None
+        if cache_item is not None:
             result.sap_match_type = SapMatchType.MASTER_REVERSE
             result.sap_matched_zkdmat_b = cache_item.zkdmat_b
             result.sap_raw_data = cache_item.raw_data
@@ -389,10 +429,8 @@ class SapReconciliationService:
             )
             return
 
-        # 3. 前方一致チェック
-        prefix_matches = [
-            item for zkdmat_b, item in self._sap_cache.items() if zkdmat_b.startswith(material_code)
-        ]
+        # 3. 前方一致チェック（一意判定とメッセージ表示に必要な5件まで）
+        prefix_matches = self._sap_cache.prefix_matches(material_code, limit=5)
 
         if len(prefix_matches) == 1:
             # 一意に絞れた場合のみ採用
@@ -435,21 +473,16 @@ class SapReconciliationService:
 
         jiku_code = jiku_code.strip()
 
-        stmt = select(ShippingMasterCurated).where(
-            ShippingMasterCurated.customer_code == customer_code,
-            ShippingMasterCurated.material_code == material_code,
-            ShippingMasterCurated.jiku_code == jiku_code,
-        )
-
-        master = self.db.execute(stmt).scalar_one_or_none()
+        master = self._get_master_lookup(customer_code).by_material.get((material_code, jiku_code))
 
         if master:
+            master_id, customer_part_no = master
             result.master_match_type = MasterMatchType.MATCHED
-            result.master_id = master.id
-            result.master_customer_part_no = master.customer_part_no
+            result.master_id = master_id
+            result.master_customer_part_no = customer_part_no
             logger.debug(
                 f"[Master] Matched: ({customer_code}, {material_code}, {jiku_code}) "
-                f"→ id={master.id}, customer_part_no={master.customer_part_no}"
+                f"→ id={master_id}, customer_part_no={customer_part_no}"
             )
         else:
             result.master_match_type = MasterMatchType.NOT_FOUND
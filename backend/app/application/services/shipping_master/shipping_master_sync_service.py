@@ -1,13 +1,33 @@
-"""出荷用マスタ同期サービス."""
+"""出荷用マスタ同期サービス.
+
+【設計意図】一括同期モード（mode="bulk"、既定）:
+- 行モード（mode="row"）は整形済みマスタ1行ごとに SAVEPOINT を張り、
+  各マスタを1件ずつ SELECT / INSERT / flush する
+  → 1万行規模では数十万回の往復になる
+- 一括モードはマスタ種別ごとに依存順（独立マスタ → 納入先・仕入先品目 →
+  得意先品目 → 次区・納入設定・品番マッピング・配送ルート・担当者）に処理する
+  1. 対象行が参照するマスタをコード（複合キー）で一括ロードして辞書化
+  2. 全行分の新規作成・更新を辞書上で計算（_upsert_* は行モードと共通）
+  3. 段階ごとに1回 flush（INSERT は複数行、UPDATE は executemany にまとめられる）
+- 一括モードの段階はマスタ種別単位のため、1行の途中失敗で
+  その行の前段（作成・更新済みのマスタ）だけを取り消すことはできない
+  → 行単位の判定エラー（納入先の顧客競合など）や flush 時の DB エラーが
+  1件でも起きたら一括分をロールバックし、行モードで再実行する
+  （行ごとの SAVEPOINT による原子性とエラー報告を維持する。
+  エラーのない通常の同期のみ一括で処理される）
+"""
 
 from __future__ import annotations
 
 import logging
+from collections import defaultdict
+from collections.abc import Iterable
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any, Literal
 
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.exc import MultipleResultsFound
+from sqlalchemy.orm import InstrumentedAttribute, Session
 
 from app.infrastructure.persistence.models.assignments.assignment_models import (
     UserSupplierAssignment,
@@ -37,6 +57,7 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 SyncPolicy = Literal["create-only", "upsert", "update-if-empty"]
+SyncMode = Literal["bulk", "row"]
 
 
 class SkipRow(Exception):
@@ -55,6 +76,19 @@ class SyncSummary:
     warnings: list[str] = field(default_factory=list)
 
 
+@dataclass
+class _BulkRow:
+    """一括同期での1行分の解決済みマスタ."""
+
+    curated: ShippingMasterCurated
+    customer: Customer | None = None
+    supplier: Supplier | None = None
+    warehouse: Warehouse | None = None
+    delivery_place: DeliveryPlace | None = None
+    supplier_item: SupplierItem | None = None
+    customer_item: CustomerItem | None = None
+
+
 class ShippingMasterSyncService:
     """出荷用マスタデータを各種マスタへ同期するサービス."""
 
@@ -65,12 +99,14 @@ class ShippingMasterSyncService:
         self,
         curated_ids: list[int] | None = None,
         policy: SyncPolicy = "create-only",
+        mode: SyncMode = "bulk",
     ) -> SyncSummary:
         """指定された整形済みマスタをベースマスタへ同期する.
 
         Args:
             curated_ids: 同期対象のIDリスト。Noneの場合は全件（最新）
             policy: 反映ポリシー ('create-only', 'upsert', 'update-if-empty')
+            mode: 'bulk'（マスタ種別ごとの一括同期）または 'row'（1行ずつ同期）
 
         Returns:
             SyncSummary: 実行結果のサマリ
@@ -81,6 +117,7 @@ class ShippingMasterSyncService:
             extra={
                 "curated_ids_count": len(curated_ids) if curated_ids else "all",
                 "policy": policy,
+                "mode": mode,
             },
         )
 
@@ -89,24 +126,23 @@ class ShippingMasterSyncService:
         if curated_ids:
             stmt = stmt.where(ShippingMasterCurated.id.in_(curated_ids))
 
-        curated_list = self.session.execute(stmt).scalars().all()
+        curated_list = list(self.session.execute(stmt).scalars().all())
         summary.processed_count = len(curated_list)
 
         # 2. 依存順に同期処理
-        # ループ内でキャッシュを活用してクエリ回数を抑制
-        id_cache: dict[str, int] = {}
-
-        for curated in curated_list:
+        if mode == "bulk":
             try:
                 with self.session.begin_nested():
-                    self._sync_row(curated, policy, summary, id_cache)
-            except SkipRow as e:
-                summary.warnings.append(str(e))
-                summary.skipped_count += 1
-            except Exception as e:
-                logger.exception(f"Sync error for curated_id {curated.id}")
-                summary.errors.append(f"ID {curated.id} ({curated.customer_code}): {e!s}")
-                summary.skipped_count += 1
+                    self._sync_bulk(curated_list, policy, summary)
+            except Exception:
+                # 行単位のスキップも含め、行モードで再実行して行ごとに記録する
+                logger.warning(
+                    "Bulk shipping master sync failed, retrying row by row", exc_info=True
+                )
+                summary = SyncSummary(processed_count=len(curated_list))
+                self._sync_rows(curated_list, policy, summary)
+        else:
+            self._sync_rows(curated_list, policy, summary)
 
         self.session.commit()
         logger.info(
@@ -121,12 +157,37 @@ class ShippingMasterSyncService:
         )
         return summary
 
+    @staticmethod
+    def _record_row_error(
+        curated: ShippingMasterCurated, error: Exception, summary: SyncSummary
+    ) -> None:
+        """行単位のスキップ・エラーをサマリに記録."""
+        if isinstance(error, SkipRow):
+            summary.warnings.append(str(error))
+        else:
+            logger.error(f"Sync error for curated_id {curated.id}", exc_info=error)
+            summary.errors.append(f"ID {curated.id} ({curated.customer_code}): {error!s}")
+        summary.skipped_count += 1
+
+    def _sync_rows(
+        self,
+        curated_list: list[ShippingMasterCurated],
+        policy: SyncPolicy,
+        summary: SyncSummary,
+    ) -> None:
+        """行モード: 1行ずつ SAVEPOINT 内で同期する."""
+        for curated in curated_list:
+            try:
+                with self.session.begin_nested():
+                    self._sync_row(curated, policy, summary)
+            except Exception as e:
+                self._record_row_error(curated, e, summary)
+
     def _sync_row(
         self,
         curated: ShippingMasterCurated,
         policy: SyncPolicy,
         summary: SyncSummary,
-        id_cache: dict[str, int],
     ) -> None:
         """1行分の同期処理."""
         # 1. Top-level masters (independent)
@@ -166,6 +227,237 @@ class ShippingMasterSyncService:
         if supplier_id and curated.staff_name:
             self._sync_staff_assignment(curated, supplier_id, policy, summary)
 
+    # -------------------- 一括同期 --------------------
+
+    def _load_by(self, column: InstrumentedAttribute[Any], values: Iterable[Any]) -> list[Any]:
+        """値の集合でエンティティを一括ロード（WHERE column IN values）."""
+        keys = {v for v in values if v is not None and v != ""}
+        if not keys:
+            return []
+        entity = column.class_
+        return list(self.session.execute(select(entity).where(column.in_(keys))).scalars())
+
+    def _sync_bulk(
+        self,
+        curated_list: list[ShippingMasterCurated],
+        policy: SyncPolicy,
+        summary: SyncSummary,
+    ) -> None:
+        """一括モード: マスタ種別ごとに依存順で同期する.
+
+        行単位の失敗も含め例外はそのまま送出する（呼び出し側が行モードで再実行する）。
+        """
+        rows = [_BulkRow(curated) for curated in curated_list]
+        self._bulk_sync_top_level(rows, policy, summary)
+        self.session.flush()
+        self._bulk_sync_places_and_items(rows, policy, summary)
+        self.session.flush()
+        self._bulk_sync_customer_items(rows, policy, summary)
+        self.session.flush()
+        self._bulk_sync_mappings(rows, policy, summary)
+        self.session.flush()
+
+    def _bulk_sync_top_level(
+        self, rows: list[_BulkRow], policy: SyncPolicy, summary: SyncSummary
+    ) -> None:
+        """得意先・仕入先・倉庫・メーカー（独立マスタ）."""
+        curated = [row.curated for row in rows]
+        customers = {
+            c.customer_code: c
+            for c in self._load_by(Customer.customer_code, (r.customer_code for r in curated))
+        }
+        suppliers = {
+            s.supplier_code: s
+            for s in self._load_by(Supplier.supplier_code, (r.supplier_code for r in curated))
+        }
+        warehouses = {
+            w.warehouse_code: w
+            for w in self._load_by(Warehouse.warehouse_code, (r.warehouse_code for r in curated))
+        }
+        makers = {
+            m.maker_code: m
+            for m in self._load_by(Maker.maker_code, (r.maker_code for r in curated))
+        }
+
+        for row in rows:
+            c = row.curated
+            if c.customer_code:
+                row.customer = customers[c.customer_code] = self._upsert_customer(
+                    c, customers.get(c.customer_code), policy, summary
+                )
+            if c.supplier_code:
+                row.supplier = suppliers[c.supplier_code] = self._upsert_supplier(
+                    c, suppliers.get(c.supplier_code), policy, summary
+                )
+            if c.warehouse_code:
+                row.warehouse = warehouses[c.warehouse_code] = self._upsert_warehouse(
+                    c, warehouses.get(c.warehouse_code), policy, summary
+                )
+            if c.maker_code:
+                makers[c.maker_code] = self._upsert_maker(
+                    c, makers.get(c.maker_code), policy, summary
+                )
+
+    def _bulk_sync_places_and_items(
+        self, rows: list[_BulkRow], policy: SyncPolicy, summary: SyncSummary
+    ) -> None:
+        """納入先（得意先に依存）・仕入先品目（仕入先に依存）."""
+        dp_by_key: dict[tuple[int, str], DeliveryPlace] = {}
+        dp_by_code: dict[str, list[DeliveryPlace]] = defaultdict(list)
+        for dp in self._load_by(
+            DeliveryPlace.delivery_place_code, (r.curated.delivery_place_code for r in rows)
+        ):
+            dp_by_key[(dp.customer_id, dp.delivery_place_code)] = dp
+            dp_by_code[dp.delivery_place_code].append(dp)
+        supplier_items = {
+            (si.supplier_id, si.maker_part_no): si
+            for si in self._load_by(
+                SupplierItem.supplier_id, (r.supplier.id for r in rows if r.supplier)
+            )
+        }
+
+        for row in rows:
+            c = row.curated
+            if row.customer and c.delivery_place_code:
+                customer_id = row.customer.id
+                dp = dp_by_key.get((customer_id, c.delivery_place_code))
+                if dp is None:
+                    # 旧データ互換: コードのみで検索（行モードの scalar_one_or_none と同じ判定）
+                    candidates = dp_by_code.get(c.delivery_place_code, [])
+                    if len(candidates) > 1:
+                        raise MultipleResultsFound(
+                            "Multiple rows were found when one or none was required"
+                        )
+                    dp = candidates[0] if candidates else None
+                dp = self._upsert_delivery_place(c, customer_id, dp, policy, summary)
+                if (customer_id, c.delivery_place_code) not in dp_by_key:
+                    dp_by_key[(customer_id, c.delivery_place_code)] = dp
+                    dp_by_code[c.delivery_place_code].append(dp)
+                row.delivery_place = dp
+
+            if row.supplier and c.maker_part_no:
+                key = (row.supplier.id, c.maker_part_no)
+                si = self._upsert_supplier_item(
+                    c, row.supplier.id, supplier_items.get(key), policy, summary
+                )
+                if si is not None:
+                    supplier_items[key] = si
+                row.supplier_item = si
+
+    def _bulk_sync_customer_items(
+        self, rows: list[_BulkRow], policy: SyncPolicy, summary: SyncSummary
+    ) -> None:
+        """得意先品目（得意先・仕入先品目に依存）."""
+        active = [row for row in rows if row.customer and row.supplier_item]
+        customer_items = {
+            (ci.customer_id, ci.customer_part_no): ci
+            for ci in self._load_by(
+                CustomerItem.customer_id, (r.customer.id for r in active if r.customer)
+            )
+        }
+
+        for row in active:
+            c = row.curated
+            part_no = c.customer_part_no or c.maker_part_no
+            if not part_no or row.customer is None or row.supplier_item is None:
+                continue
+            key = (row.customer.id, part_no)
+            row.customer_item = customer_items[key] = self._upsert_customer_item(
+                c,
+                row.customer.id,
+                row.supplier_item.id,
+                customer_items.get(key),
+                policy,
+                summary,
+            )
+
+    def _bulk_sync_mappings(
+        self, rows: list[_BulkRow], policy: SyncPolicy, summary: SyncSummary
+    ) -> None:
+        """次区マッピング・納入設定・品番マッピング・配送ルート・担当者割当."""
+        ci_ids = [r.customer_item.id for r in rows if r.customer_item]
+        jiku_mappings = {
+            (m.customer_item_id, m.jiku_code): m
+            for m in self._load_by(CustomerItemJikuMapping.customer_item_id, ci_ids)
+        }
+        settings = {
+            (s.customer_item_id, s.delivery_place_id, s.jiku_code): s
+            for s in self._load_by(CustomerItemDeliverySetting.customer_item_id, ci_ids)
+        }
+        product_mappings = {
+            (m.customer_id, m.customer_part_code, m.supplier_id): m
+            for m in self._load_by(
+                ProductMapping.customer_id, (r.customer.id for r in rows if r.customer)
+            )
+        }
+        routes = {
+            (route.warehouse_id, route.delivery_place_id, route.supplier_item_id): route
+            for route in self._load_by(
+                WarehouseDeliveryRoute.warehouse_id,
+                (r.warehouse.id for r in rows if r.warehouse),
+            )
+        }
+        supplier_ids = [r.supplier.id for r in rows if r.supplier and r.curated.staff_name]
+        assignments = {
+            (a.user_id, a.supplier_id): a
+            for a in self._load_by(UserSupplierAssignment.supplier_id, supplier_ids)
+        }
+        users: list[User] = []
+        if supplier_ids:
+            users = list(
+                self.session.execute(
+                    select(User)
+                    .where(User.is_active, User.display_name.is_not(None))
+                    .order_by(User.id)
+                ).scalars()
+            )
+        user_by_staff_name: dict[str, User | None] = {}
+
+        for row in rows:
+            c = row.curated
+            ci, dp, si = row.customer_item, row.delivery_place, row.supplier_item
+            if ci and dp:
+                jiku_key = (ci.id, c.jiku_code)
+                if jiku_key not in jiku_mappings:
+                    jiku_mappings[jiku_key] = self._create_jiku_mapping(c, ci.id, dp.id, summary)
+                setting_key = (ci.id, dp.id, c.jiku_code)
+                settings[setting_key] = self._upsert_delivery_setting(
+                    c, ci.id, dp.id, settings.get(setting_key), policy, summary
+                )
+
+            part_no = c.customer_part_no or c.maker_part_no
+            if ci and row.customer and row.supplier and si is not None and part_no:
+                mapping_key = (row.customer.id, part_no, row.supplier.id)
+                product_mappings[mapping_key] = self._upsert_product_mapping(
+                    c,
+                    row.customer.id,
+                    row.supplier.id,
+                    si.id,
+                    product_mappings.get(mapping_key),
+                    policy,
+                    summary,
+                )
+
+            if row.warehouse and dp and si and c.transport_lt_days is not None:
+                route_key = (row.warehouse.id, dp.id, si.id)
+                routes[route_key] = self._upsert_delivery_route(
+                    c, row.warehouse.id, dp.id, si.id, routes.get(route_key), policy, summary
+                )
+
+            if row.supplier and c.staff_name:
+                if c.staff_name not in user_by_staff_name:
+                    # 行モードの display_name LIKE '%苗字%'（id 順の先頭1件）と同じ判定
+                    user_by_staff_name[c.staff_name] = next(
+                        (u for u in users if c.staff_name in (u.display_name or "")), None
+                    )
+                user = user_by_staff_name[c.staff_name]
+                if user is None:
+                    self._warn_staff_not_found(c.staff_name, summary)
+                elif (user.id, row.supplier.id) not in assignments:
+                    assignments[(user.id, row.supplier.id)] = self._create_staff_assignment(
+                        user.id, row.supplier.id, summary
+                    )
+
     # -------------------- 各マスタ同期メソッド --------------------
 
     def _should_update(self, entity: Any, data: dict[str, Any], policy: SyncPolicy) -> bool:
@@ -218,8 +510,19 @@ class ShippingMasterSyncService:
             return None
 
         stmt = select(Customer).where(Customer.customer_code == curated.customer_code)
-        customer = self.session.execute(stmt).scalar_one_or_none()
+        customer = self._upsert_customer(
+            curated, self.session.execute(stmt).scalar_one_or_none(), policy, summary
+        )
+        self.session.flush()
+        return customer.id
 
+    def _upsert_customer(
+        self,
+        curated: ShippingMasterCurated,
+        customer: Customer | None,
+        policy: SyncPolicy,
+        summary: SyncSummary,
+    ) -> Customer:
         if not customer:
             name = curated.customer_name or curated.customer_code
             customer = Customer(
@@ -228,9 +531,8 @@ class ShippingMasterSyncService:
                 display_name=name,
             )
             self.session.add(customer)
-            self.session.flush()
             summary.created_count += 1
-            return customer.id
+            return customer
 
         data: dict[str, Any] = {}
         if curated.customer_name:
@@ -252,9 +554,8 @@ class ShippingMasterSyncService:
 
         if forced_update or self._apply_update(customer, data, policy):
             summary.updated_count += 1
-            self.session.flush()
 
-        return customer.id
+        return customer
 
     def _sync_supplier(
         self, curated: ShippingMasterCurated, policy: SyncPolicy, summary: SyncSummary
@@ -263,8 +564,19 @@ class ShippingMasterSyncService:
             return None
 
         stmt = select(Supplier).where(Supplier.supplier_code == curated.supplier_code)
-        supplier = self.session.execute(stmt).scalar_one_or_none()
+        supplier = self._upsert_supplier(
+            curated, self.session.execute(stmt).scalar_one_or_none(), policy, summary
+        )
+        self.session.flush()
+        return supplier.id
 
+    def _upsert_supplier(
+        self,
+        curated: ShippingMasterCurated,
+        supplier: Supplier | None,
+        policy: SyncPolicy,
+        summary: SyncSummary,
+    ) -> Supplier:
         if not supplier:
             name = curated.supplier_name or curated.supplier_code
             supplier = Supplier(
@@ -273,9 +585,8 @@ class ShippingMasterSyncService:
                 display_name=name,
             )
             self.session.add(supplier)
-            self.session.flush()
             summary.created_count += 1
-            return supplier.id
+            return supplier
 
         data: dict[str, Any] = {}
         if curated.supplier_name:
@@ -297,9 +608,8 @@ class ShippingMasterSyncService:
 
         if forced_update or self._apply_update(supplier, data, policy):
             summary.updated_count += 1
-            self.session.flush()
 
-        return supplier.id
+        return supplier
 
     def _sync_warehouse(
         self, curated: ShippingMasterCurated, policy: SyncPolicy, summary: SyncSummary
@@ -308,8 +618,19 @@ class ShippingMasterSyncService:
             return None
 
         stmt = select(Warehouse).where(Warehouse.warehouse_code == curated.warehouse_code)
-        warehouse = self.session.execute(stmt).scalar_one_or_none()
+        warehouse = self._upsert_warehouse(
+            curated, self.session.execute(stmt).scalar_one_or_none(), policy, summary
+        )
+        self.session.flush()
+        return warehouse.id
 
+    def _upsert_warehouse(
+        self,
+        curated: ShippingMasterCurated,
+        warehouse: Warehouse | None,
+        policy: SyncPolicy,
+        summary: SyncSummary,
+    ) -> Warehouse:
         if not warehouse:
             name = curated.shipping_warehouse or curated.warehouse_code
             warehouse = Warehouse(
@@ -319,9 +640,8 @@ class ShippingMasterSyncService:
                 warehouse_type="external",
             )
             self.session.add(warehouse)
-            self.session.flush()
             summary.created_count += 1
-            return warehouse.id
+            return warehouse
 
         data: dict[str, Any] = {}
         if curated.shipping_warehouse:
@@ -330,9 +650,8 @@ class ShippingMasterSyncService:
 
         if self._apply_update(warehouse, data, policy):
             summary.updated_count += 1
-            self.session.flush()
 
-        return warehouse.id
+        return warehouse
 
     def _sync_maker(
         self, curated: ShippingMasterCurated, policy: SyncPolicy, summary: SyncSummary
@@ -342,8 +661,19 @@ class ShippingMasterSyncService:
             return None
 
         stmt = select(Maker).where(Maker.maker_code == curated.maker_code)
-        maker = self.session.execute(stmt).scalar_one_or_none()
+        maker = self._upsert_maker(
+            curated, self.session.execute(stmt).scalar_one_or_none(), policy, summary
+        )
+        self.session.flush()
+        return maker.id
 
+    def _upsert_maker(
+        self,
+        curated: ShippingMasterCurated,
+        maker: Maker | None,
+        policy: SyncPolicy,
+        summary: SyncSummary,
+    ) -> Maker:
         if not maker:
             name = curated.maker_name or curated.maker_code
             maker = Maker(
@@ -352,9 +682,8 @@ class ShippingMasterSyncService:
                 display_name=name,
             )
             self.session.add(maker)
-            self.session.flush()
             summary.created_count += 1
-            return maker.id
+            return maker
 
         data: dict[str, Any] = {}
         if curated.maker_name:
@@ -363,9 +692,8 @@ class ShippingMasterSyncService:
 
         if self._apply_update(maker, data, policy):
             summary.updated_count += 1
-            self.session.flush()
 
-        return maker.id
+        return maker
 
     def _sync_delivery_place(
         self,
@@ -392,6 +720,18 @@ class ShippingMasterSyncService:
             )
             dp = self.session.execute(fallback_stmt).scalar_one_or_none()
 
+        dp = self._upsert_delivery_place(curated, customer_id, dp, policy, summary)
+        self.session.flush()
+        return dp.id
+
+    def _upsert_delivery_place(
+        self,
+        curated: ShippingMasterCurated,
+        customer_id: int,
+        dp: DeliveryPlace | None,
+        policy: SyncPolicy,
+        summary: SyncSummary,
+    ) -> DeliveryPlace:
         if not dp:
             name = curated.delivery_place_name or curated.delivery_place_code
             dp = DeliveryPlace(
@@ -403,9 +743,8 @@ class ShippingMasterSyncService:
                 display_name=curated.delivery_place_abbr or name,
             )
             self.session.add(dp)
-            self.session.flush()
             summary.created_count += 1
-            return dp.id
+            return dp
         if dp.customer_id != customer_id:
             raise SkipRow(
                 "DeliveryPlace conflict: "
@@ -425,9 +764,8 @@ class ShippingMasterSyncService:
 
         if self._apply_update(dp, data, policy):
             summary.updated_count += 1
-            self.session.flush()
 
-        return dp.id
+        return dp
 
     def _sync_supplier_item(
         self,
@@ -443,8 +781,22 @@ class ShippingMasterSyncService:
             SupplierItem.supplier_id == supplier_id,
             SupplierItem.maker_part_no == curated.maker_part_no,
         )
-        si = self.session.execute(stmt).scalar_one_or_none()
+        si = self._upsert_supplier_item(
+            curated, supplier_id, self.session.execute(stmt).scalar_one_or_none(), policy, summary
+        )
+        if si is None:
+            return None
+        self.session.flush()
+        return si.id
 
+    def _upsert_supplier_item(
+        self,
+        curated: ShippingMasterCurated,
+        supplier_id: int,
+        si: SupplierItem | None,
+        policy: SyncPolicy,
+        summary: SyncSummary,
+    ) -> SupplierItem | None:
         if not si:
             # 設計: 品名欠落時はスキップ
             if not curated.delivery_note_product_name:
@@ -462,9 +814,8 @@ class ShippingMasterSyncService:
                 maker_name=curated.maker_name,
             )
             self.session.add(si)
-            self.session.flush()
             summary.created_count += 1
-            return si.id
+            return si
 
         data: dict[str, Any] = {}
         if curated.delivery_note_product_name:
@@ -476,9 +827,8 @@ class ShippingMasterSyncService:
 
         if self._apply_update(si, data, policy):
             summary.updated_count += 1
-            self.session.flush()
 
-        return si.id
+        return si
 
     def _sync_customer_item(
         self,
@@ -496,8 +846,27 @@ class ShippingMasterSyncService:
         stmt = select(CustomerItem).where(
             CustomerItem.customer_id == customer_id, CustomerItem.customer_part_no == part_no
         )
-        ci = self.session.execute(stmt).scalar_one_or_none()
+        ci = self._upsert_customer_item(
+            curated,
+            customer_id,
+            si_id,
+            self.session.execute(stmt).scalar_one_or_none(),
+            policy,
+            summary,
+        )
+        self.session.flush()
+        return ci.id
 
+    def _upsert_customer_item(
+        self,
+        curated: ShippingMasterCurated,
+        customer_id: int,
+        si_id: int,
+        ci: CustomerItem | None,
+        policy: SyncPolicy,
+        summary: SyncSummary,
+    ) -> CustomerItem:
+        part_no = curated.customer_part_no or curated.maker_part_no
         if not ci:
             ci = CustomerItem(
                 customer_id=customer_id,
@@ -510,9 +879,8 @@ class ShippingMasterSyncService:
                 order_existence=curated.order_existence,
             )
             self.session.add(ci)
-            self.session.flush()
             summary.created_count += 1
-            return ci.id
+            return ci
 
         data: dict[str, Any] = {}
         if curated.remarks:
@@ -526,9 +894,8 @@ class ShippingMasterSyncService:
 
         if self._apply_update(ci, data, policy):
             summary.updated_count += 1
-            self.session.flush()
 
-        return ci.id
+        return ci
 
     def _sync_jiku_mapping(
         self,
@@ -542,19 +909,23 @@ class ShippingMasterSyncService:
             CustomerItemJikuMapping.customer_item_id == ci_id,
             CustomerItemJikuMapping.jiku_code == curated.jiku_code,
         )
-        mapping = self.session.execute(stmt).scalar_one_or_none()
-
-        if not mapping:
-            mapping = CustomerItemJikuMapping(
-                customer_item_id=ci_id,
-                jiku_code=curated.jiku_code,
-                delivery_place_id=dp_id,
-                is_default=True,  # 初回同期時はデフォルトとする方針
-            )
-            self.session.add(mapping)
-            summary.created_count += 1
+        if self.session.execute(stmt).scalar_one_or_none() is None:
+            self._create_jiku_mapping(curated, ci_id, dp_id, summary)
             self.session.flush()
 
+    def _create_jiku_mapping(
+        self, curated: ShippingMasterCurated, ci_id: int, dp_id: int, summary: SyncSummary
+    ) -> CustomerItemJikuMapping:
+        mapping = CustomerItemJikuMapping(
+            customer_item_id=ci_id,
+            jiku_code=curated.jiku_code,
+            delivery_place_id=dp_id,
+            is_default=True,  # 初回同期時はデフォルトとする方針
+        )
+        self.session.add(mapping)
+        summary.created_count += 1
+        return mapping
+
     def _sync_delivery_setting(
         self,
         curated: ShippingMasterCurated,
@@ -569,8 +940,20 @@ class ShippingMasterSyncService:
             CustomerItemDeliverySetting.delivery_place_id == dp_id,
             CustomerItemDeliverySetting.jiku_code == curated.jiku_code,
         )
-        setting = self.session.execute(stmt).scalar_one_or_none()
+        self._upsert_delivery_setting(
+            curated, ci_id, dp_id, self.session.execute(stmt).scalar_one_or_none(), policy, summary
+        )
+        self.session.flush()
 
+    def _upsert_delivery_setting(
+        self,
+        curated: ShippingMasterCurated,
+        ci_id: int,
+        dp_id: int,
+        setting: CustomerItemDeliverySetting | None,
+        policy: SyncPolicy,
+        summary: SyncSummary,
+    ) -> CustomerItemDeliverySetting:
         if not setting:
             setting = CustomerItemDeliverySetting(
                 customer_item_id=ci_id,
@@ -582,7 +965,6 @@ class ShippingMasterSyncService:
             )
             self.session.add(setting)
             summary.created_count += 1
-            self.session.flush()
         else:
             data: dict[str, Any] = {}
             if curated.shipping_slip_text:
@@ -592,7 +974,7 @@ class ShippingMasterSyncService:
 
             if self._apply_update(setting, data, policy):
                 summary.updated_count += 1
-                self.session.flush()
+        return setting
 
     def _sync_delivery_route(
         self,
@@ -611,8 +993,27 @@ class ShippingMasterSyncService:
             WarehouseDeliveryRoute.delivery_place_id == dp_id,
             WarehouseDeliveryRoute.supplier_item_id == si_id,
         )
-        route = self.session.execute(stmt).scalar_one_or_none()
+        self._upsert_delivery_route(
+            curated,
+            warehouse_id,
+            dp_id,
+            si_id,
+            self.session.execute(stmt).scalar_one_or_none(),
+            policy,
+            summary,
+        )
+        self.session.flush()
 
+    def _upsert_delivery_route(
+        self,
+        curated: ShippingMasterCurated,
+        warehouse_id: int,
+        dp_id: int,
+        si_id: int,
+        route: WarehouseDeliveryRoute | None,
+        policy: SyncPolicy,
+        summary: SyncSummary,
+    ) -> WarehouseDeliveryRoute:
         if not route:
             route = WarehouseDeliveryRoute(
                 warehouse_id=warehouse_id,
@@ -622,12 +1023,11 @@ class ShippingMasterSyncService:
             )
             self.session.add(route)
             summary.created_count += 1
-            self.session.flush()
         else:
             data: dict[str, Any] = {"transport_lead_time_days": curated.transport_lt_days}
             if self._apply_update(route, data, policy):
                 summary.updated_count += 1
-                self.session.flush()
+        return route
 
     def _sync_product_mapping(
         self,
@@ -647,12 +1047,31 @@ class ShippingMasterSyncService:
             ProductMapping.customer_part_code == part_no,
             ProductMapping.supplier_id == supplier_id,
         )
-        mapping = self.session.execute(stmt).scalar_one_or_none()
+        self._upsert_product_mapping(
+            curated,
+            customer_id,
+            supplier_id,
+            si_id,
+            self.session.execute(stmt).scalar_one_or_none(),
+            policy,
+            summary,
+        )
+        self.session.flush()
 
+    def _upsert_product_mapping(
+        self,
+        curated: ShippingMasterCurated,
+        customer_id: int,
+        supplier_id: int,
+        si_id: int,
+        mapping: ProductMapping | None,
+        policy: SyncPolicy,
+        summary: SyncSummary,
+    ) -> ProductMapping:
         if not mapping:
             mapping = ProductMapping(
                 customer_id=customer_id,
-                customer_part_code=part_no,
+                customer_part_code=curated.customer_part_no or curated.maker_part_no,
                 supplier_id=supplier_id,
                 supplier_item_id=si_id,
                 base_unit="KG",
@@ -660,7 +1079,6 @@ class ShippingMasterSyncService:
             )
             self.session.add(mapping)
             summary.created_count += 1
-            self.session.flush()
         else:
             data: dict[str, Any] = {}
             if curated.remarks:
@@ -668,7 +1086,7 @@ class ShippingMasterSyncService:
 
             if self._apply_update(mapping, data, policy):
                 summary.updated_count += 1
-                self.session.flush()
+        return mapping
 
     def _sync_staff_assignment(
         self,
@@ -692,9 +1110,7 @@ class ShippingMasterSyncService:
         user = self.session.execute(user_stmt).scalar_one_or_none()
 
         if not user:
-            # 警告を残すが、エラーにはしない
-            if f"User not found for staff_name: {curated.staff_name}" not in summary.warnings:
-                summary.warnings.append(f"User not found for staff_name: {curated.staff_name}")
+            self._warn_staff_not_found(curated.staff_name, summary)
             return
 
         # 2. 既存の割り当てを確認
@@ -702,15 +1118,25 @@ class ShippingMasterSyncService:
             UserSupplierAssignment.user_id == user.id,
             UserSupplierAssignment.supplier_id == supplier_id,
         )
-        assignment = self.session.execute(assignment_stmt).scalar_one_or_none()
-
-        if not assignment:
+        if self.session.execute(assignment_stmt).scalar_one_or_none() is None:
             # 3. 割り当て作成
-            assignment = UserSupplierAssignment(
-                user_id=user.id,
-                supplier_id=supplier_id,
-                is_primary=False,  # 自動同期時は主担当にはしない方針
-            )
-            self.session.add(assignment)
-            summary.created_count += 1
+            self._create_staff_assignment(user.id, supplier_id, summary)
             self.session.flush()
+
+    @staticmethod
+    def _warn_staff_not_found(staff_name: str, summary: SyncSummary) -> None:
+        # 警告を残すが、エラーにはしない
+        if f"User not found for staff_name: {staff_name}" not in summary.warnings:
+            summary.warnings.append(f"User not found for staff_name: {staff_name}")
+
+    def _create_staff_assignment(
+        self, user_id: int, supplier_id: int, summary: SyncSummary
+    ) -> UserSupplierAssignment:
+        assignment = UserSupplierAssignment(
+            user_id=user_id,
+            supplier_id=supplier_id,
+            is_primary=False,  # 自動同期時は主担当にはしない方針
+        )
+        self.session.add(assignment)
+        summary.created_count += 1
+        return assignment
@@ -5,6 +5,8 @@ from __future__ import annotations
 import logging
 from typing import TYPE_CHECKING
 
+from starlette.concurrency import run_in_threadpool
+
 from app.application.services.smartread.base import SmartReadBaseService
 from app.infrastructure.smartread.client import SmartReadClient, SmartReadResult
 
@@ -41,7 +43,8 @@ class SmartReadAnalyzeService(SmartReadBaseService):
         Returns:
             解析結果
         """
-        config = self.get_config(config_id)
+        # 設定取得は同期 Session のためスレッドプールで実行（イベントループをブロックしない）
+        config = await run_in_threadpool(self.get_config, config_id)
         if not config:
             logger.warning("SmartRead config not found", extra={"config_id": config_id})
             return AnalyzeResult(
@@ -132,6 +132,7 @@ class SmartReadAutoSyncRunner:
                     pending.config_id,
                     task_id,
                     force=True,
+                    include_rows=False,
                 )
             except Exception:
                 logger.exception(
@@ -175,8 +176,8 @@ class SmartReadAutoSyncRunner:
                     "task_id": task_id,
                     "config_id": pending.config_id,
                     "state": state,
-                    "wide_row_count": len(result.get("wide_data", [])),
-                    "long_row_count": len(result.get("long_data", [])),
+                    "wide_row_count": result.get("wide_row_count", 0),
+                    "long_row_count": result.get("long_row_count", 0),
                 },
             )
             session.commit()
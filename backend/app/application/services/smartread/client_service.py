@@ -9,6 +9,7 @@ from datetime import date, datetime
 from typing import TYPE_CHECKING, Any
 
 from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
 
 from app.application.services.smartread.base import SmartReadBaseService
 from app.infrastructure.persistence.models import SmartReadConfig
@@ -50,6 +51,8 @@ class SmartReadClientService(SmartReadBaseService):
             export_id: str,
             save_to_db: bool = True,
             task_date: date | None = None,
+            *,
+            include_rows: bool = True,
         ) -> dict[str, Any] | None: ...
 
     def _get_client(self, config_id: int) -> tuple[SmartReadClient | None, SmartReadConfig | None]:
@@ -78,13 +81,18 @@ class SmartReadClientService(SmartReadBaseService):
         Returns:
             タスク一覧
         """
-        client, _ = self._get_client(config_id)
+        client, _ = await run_in_threadpool(self._get_client, config_id)
         if not client:
             return []
 
         api_tasks = await client.get_tasks()
 
-        # DBに同期
+        # DBに同期（同期 Session のためスレッドプールで実行）
+        await run_in_threadpool(self._save_api_tasks, config_id, api_tasks)
+        return api_tasks
+
+    def _save_api_tasks(self, config_id: int, api_tasks: list) -> None:
+        """APIから取得したタスクをDBに登録（既存タスクは状態を更新）."""
         for api_task in api_tasks:
             # 日付のパース
             task_date = date.today()
@@ -104,8 +112,6 @@ class SmartReadClientService(SmartReadBaseService):
                 state=api_task.status,
             )
 
-        return api_tasks
-
     async def sync_task_results(
         self,
         config_id: int,
@@ -113,6 +119,8 @@ class SmartReadClientService(SmartReadBaseService):
         export_type: str = "csv",
         timeout_sec: float = 240.0,
         force: bool = False,
+        *,
+        include_rows: bool = True,
     ) -> dict[str, Any] | None:
         """タスクの結果をAPIから同期してDBに保存.
 
@@ -126,6 +134,7 @@ class SmartReadClientService(SmartReadBaseService):
             export_type: エクスポート形式
             timeout_sec: リクエストポーリングタイムアウト秒数（デフォルト240秒）
             force: 強制的に再取得するか
+            include_rows: 取得した行データを結果に含めるか（False の場合は件数のみ）
 
         Returns:
             同期結果、またはNone
@@ -134,29 +143,11 @@ class SmartReadClientService(SmartReadBaseService):
 
         # 0. 既存データの確認 (force=Falseの場合)
         if not force:
-            # WideDataがあるか確認
-            stmt_wide = select(SmartReadWideData).where(SmartReadWideData.task_id == task_id)
-            existing_wide = self.session.execute(stmt_wide).scalars().all()
-
-            if existing_wide:
-                logger.info(
-                    f"[SmartRead] Task {task_id} already has {len(existing_wide)} wide rows in DB. Fetching long data..."
-                )
-                stmt_long = select(SmartReadLongData).where(SmartReadLongData.task_id == task_id)
-                existing_long = self.session.execute(stmt_long).scalars().all()
-                stmt_task = select(SmartReadTask).where(SmartReadTask.task_id == task_id)
-                task = self.session.execute(stmt_task).scalar_one_or_none()
-
-                return {
-                    "wide_data": [w.content for w in existing_wide],
-                    "long_data": [l.content for l in existing_long],
-                    "errors": [],
-                    "filename": existing_wide[0].filename if existing_wide else None,
-                    "data_version": task.data_version if task else None,
-                    "from_cache": True,
-                }
+            cached = await run_in_threadpool(self._load_synced_result, task_id)
+            if cached is not None:
+                return cached
 
-        client, config = self._get_client(config_id)
+        client, config = await run_in_threadpool(self._get_client, config_id)
         if not client or not config:
             logger.error(f"[SmartRead] Could not initialize client for config {config_id}")
             return None
@@ -244,8 +235,34 @@ class SmartReadClientService(SmartReadBaseService):
             task_id=task_id,
             export_id=export.export_id,
             save_to_db=True,
+            include_rows=include_rows,
         )
 
+    def _load_synced_result(self, task_id: str) -> dict[str, Any] | None:
+        """DBに保存済みの横持ち・縦持ちデータを同期結果の形式で返す（未保存なら None）."""
+        # WideDataがあるか確認
+        stmt_wide = select(SmartReadWideData).where(SmartReadWideData.task_id == task_id)
+        existing_wide = self.session.execute(stmt_wide).scalars().all()
+        if not existing_wide:
+            return None
+
+        logger.info(
+            f"[SmartRead] Task {task_id} already has {len(existing_wide)} wide rows in DB. Fetching long data..."
+        )
+        stmt_long = select(SmartReadLongData).where(SmartReadLongData.task_id == task_id)
+        existing_long = self.session.execute(stmt_long).scalars().all()
+        stmt_task = select(SmartReadTask).where(SmartReadTask.task_id == task_id)
+        task = self.session.execute(stmt_task).scalar_one_or_none()
+
+        return {
+            "wide_data": [w.content for w in existing_wide],
+            "long_data": [l.content for l in existing_long],
+            "errors": [],
+            "filename": existing_wide[0].filename,
+            "data_version": task.data_version if task else None,
+            "from_cache": True,
+        }
+
     async def _poll_task_requests_until_ready(
         self,
         client: SmartReadClient,
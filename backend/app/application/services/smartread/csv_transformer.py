@@ -1,12 +1,28 @@
 """SmartRead CSV変換器.
 
 横持ちCSV→縦持ちCSV変換とバリデーションを行う。
+
+【設計意図】なぜ列プランをコンパイルするのか:
+- 以前は1行ごとに max_details(20) 明細 × DETAIL_FIELDS × 複数の列名表記
+  （材質コード1 / 材質コード 1 / 材質コード）と、明細ごとのサブ明細4枠を
+  辞書引きで総当たりしていた → 列名は CSV 内で共通なのに毎行同じ探索を繰り返す
+- 現在は列名の並び（ヘッダ）ごとに「ヘッダ → (明細番号, 項目)」の対応表
+  （ColumnPlan）を一度だけ作り、各行はプランにある列だけを読む
+- 空欄の列は正規化しない（明細枠の大半は空欄）
+- 日付は同じ値が繰り返し現れるため、パース結果を値ごとにキャッシュする
+- pandas による列単位の正規化も検討したが、値が object 型の文字列のため
+  str.strip / translate は結局 Python レベルで実行され、行単位のプラン適用より遅かった
+
+【設計意図】出力の互換性:
+- プランは従来の探索順（表記の優先順位、同じ正規化キーは後勝ち、
+  納入量小数点の結合順、縦持ち判定）をそのまま再現し、出力は従来と完全に一致する
 """
 
 from __future__ import annotations
 
 import logging
 import re
+from collections.abc import Mapping, Sequence
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
@@ -66,6 +82,63 @@ SUB_DETAIL_FIELDS = [
     "数量",
 ]
 
+# 日付として受け付ける形式（先頭から順に試行）
+DATE_FORMATS = [
+    "%Y/%m/%d",
+    "%Y-%m-%d",
+    "%Y年%m月%d日",
+    "%Y.%m.%d",
+    "%Y/%m",
+    "%Y-%m",
+    "%Y年%m月",
+    "%Y年",
+    "%Y",
+]
+
+_PLAN_CACHE_MAX = 64
+_DATE_CACHE_MAX = 4096
+
+_FULLWIDTH_DIGITS = str.maketrans("０１２３４５６７８９", "0123456789")
+_FULLWIDTH_ALNUM = str.maketrans(
+    "０１２３４５６７８９ＡＢＣＤＥＦＧＨＩＪＫＬＭＮＯＰＱＲＳＴＵＶＷＸＹＺａｂｃｄｅｆｇｈｉｊｋｌｍｎｏｐｑｒｓｔｕｖｗｘｙｚ",
+    "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz",
+)
+_JIKU_PATTERN = re.compile(r"^[A-Za-z0-9]+$")
+
+
+@dataclass(frozen=True)
+class DetailSlot:
+    """1明細分の列対応.
+
+    Attributes:
+        number: 明細の枠番号（材質コード{number}）
+        fields: (明細の項目名, ヘッダ) の並び（DETAIL_FIELDS の順）
+        sub_fields: (サブ明細の項目名 例: Lot No1, ヘッダ) の並び
+        headers: fields / sub_fields のヘッダ
+    """
+
+    number: int
+    fields: tuple[tuple[str, str], ...]
+    sub_fields: tuple[tuple[str, str], ...]
+    headers: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class ColumnPlan:
+    """ヘッダ（列名の並び）ごとにコンパイルした列対応.
+
+    Attributes:
+        common: (共通項目名, ヘッダ) の並び（COMMON_FIELDS の順）
+        slots: 列が1つ以上ある明細枠（番号順）
+        vertical: 番号なしの明細列のみを持つ（縦持ち）形式か
+        columns: プランが参照するヘッダ
+    """
+
+    common: tuple[tuple[str, str], ...]
+    slots: tuple[DetailSlot, ...]
+    vertical: bool
+    columns: tuple[str, ...]
+
 
 class SmartReadCsvTransformer:
     """SmartRead CSV変換器."""
@@ -77,6 +150,8 @@ class SmartReadCsvTransformer:
             max_details: 検出する明細の最大数
         """
         self.max_details = max_details
+        self._plans: dict[tuple[str, ...], ColumnPlan] = {}
+        self._date_cache: dict[str, tuple[str, bool]] = {}
 
     def transform_to_long(
         self,
@@ -100,125 +175,167 @@ class SmartReadCsvTransformer:
                 f"[Transformer] First row keys ({len(wide_data[0])} total): {list(wide_data[0].keys())[:15]}..."
             )
 
-        long_data: list[dict[str, Any]] = []
-        errors: list[ValidationError] = []
-
+        result = TransformResult(long_data=[])
         for row_idx, row in enumerate(wide_data):
-            # 共通項目を抽出
-            common = self._extract_common_fields(row)
-            logger.debug(
-                f"[Transformer] Row {row_idx}: Common fields extracted: {list(common.keys())}"
-            )
-
-            # 共通項目のバリデーション
-            common, row_errors = self._validate_common_fields(common, row_idx)
-            errors.extend(row_errors)
-
-            # 明細を抽出
-            details = self._extract_details(row)
-            logger.info(f"[Transformer] Row {row_idx}: {len(details)} details extracted")
-
-            for detail_idx, detail in enumerate(details):
-                # 空明細スキップ
-                if skip_empty and self._is_empty_detail(detail):
-                    logger.debug(
-                        f"[Transformer] Row {row_idx}, Detail {detail_idx}: SKIPPED (empty)"
-                    )
-                    continue
-
-                # 明細のバリデーション
-                detail, detail_errors = self._validate_detail(detail, row_idx, detail_idx + 1)
-                errors.extend(detail_errors)
-
-                # 共通項目と明細をマージ
-                long_row = {
-                    **common,
-                    "明細番号": detail_idx + 1,
-                    **detail,
-                }
-                long_data.append(long_row)
-                logger.debug(
-                    f"[Transformer] Row {row_idx}, Detail {detail_idx}: ADDED to long_data"
-                )
+            row_result = self.transform_row(row, row_idx, skip_empty=skip_empty)
+            result.long_data.extend(row_result.long_data)
+            result.errors.extend(row_result.errors)
 
         logger.info(
-            f"[Transformer] COMPLETE: {len(wide_data)} wide rows -> {len(long_data)} long rows, {len(errors)} errors"
+            f"[Transformer] COMPLETE: {len(wide_data)} wide rows -> {len(result.long_data)} long rows, {len(result.errors)} errors"
         )
-        return TransformResult(long_data=long_data, errors=errors)
+        return result
 
-    def _extract_common_fields(self, row: dict[str, Any]) -> dict[str, Any]:
-        """共通項目を抽出."""
-        common = {}
-        normalized_row = self._create_normalized_row(row)
-        for field_name in COMMON_FIELDS:
-            if field_name in normalized_row:
-                common[field_name] = self._normalize_value(normalized_row[field_name])
-        return common
+    def transform_row(
+        self,
+        row: dict[str, Any],
+        row_idx: int,
+        skip_empty: bool = True,
+    ) -> TransformResult:
+        """横持ち1行を縦持ちに変換.
+
+        ストリーミング取込で横持ち行ごとに縦持ち行を紐付けるために使う。
 
-    def _extract_details(self, row: dict[str, Any]) -> list[dict[str, Any]]:
-        """明細項目を抽出.
+        Args:
+            row: 横持ちデータ1行
+            row_idx: 行インデックス（エラーの行番号に使う）
+            skip_empty: 空明細をスキップするか
 
-        横持ちの「材質コード1」「材質コード2」... を
-        [{"材質コード": "...", ...}, {"材質コード": "...", ...}] に変換。
+        Returns:
+            変換結果
         """
-        details: list[dict[str, Any]] = []
+        plan = self.plan_for(row)
+        # 空欄（None / 空文字）は正規化しても空文字のため、値のある列だけ正規化する
+        values = {
+            header: self._normalize_value(value)
+            for header in plan.columns
+            if (value := row[header]) is not None and value != ""
+        }
+        return self._assemble_row(plan, values, row_idx, skip_empty)
+
+    def plan_for(self, row: Mapping[str, Any]) -> ColumnPlan:
+        """行の列名に対応する列プランを返す（ヘッダごとにキャッシュ）."""
+        headers = tuple(row)
+        plan = self._plans.get(headers)
+        if plan is None:
+            if len(self._plans) >= _PLAN_CACHE_MAX:
+                self._plans.clear()
+            plan = self._plans[headers] = self.compile_plan(headers)
+        return plan
+
+    def compile_plan(self, headers: Sequence[str]) -> ColumnPlan:
+        """ヘッダから列プランを作成.
+
+        正規化後の列名が重複する場合は後の列を採用する。明細項目は
+        「材質コード1」「材質コード 1」（1番目の明細のみ「材質コード」も）の順、
+        サブ明細は「Lot No1-1」「Lot No 1-1」（1番目の明細のみ「Lot No-1」も）の順に探す。
+        """
+        by_key: dict[str, str] = {}
+        for header in headers:
+            by_key[self._normalize_key(header)] = header
 
-        normalized_row = self._create_normalized_row(row)
+        def first_header(keys: list[str]) -> str | None:
+            for key in keys:
+                if key in by_key:
+                    return by_key[key]
+            return None
 
-        for n in range(1, self.max_details + 1):
-            detail: dict[str, Any] = {}
+        common = tuple((name, by_key[name]) for name in COMMON_FIELDS if name in by_key)
 
-            # 通常の明細項目（材質コード1, 材質コード 1, 納入量1, etc）
+        slots: list[DetailSlot] = []
+        for n in range(1, self.max_details + 1):
+            fields: list[tuple[str, str]] = []
             for field_name in DETAIL_FIELDS:
-                # 複数のパターンを試行
-                keys_to_try = [f"{field_name}{n}", f"{field_name} {n}"]
+                keys = [f"{field_name}{n}", f"{field_name} {n}"]
                 if n == 1:
-                    keys_to_try.append(field_name)
+                    keys.append(field_name)
+                found = first_header(keys)
+                if found is not None:
+                    fields.append((field_name, found))
+
+            sub_fields: list[tuple[str, str]] = []
+            for sub_field in SUB_DETAIL_FIELDS:
+                for sub_n in range(1, 5):  # 最大4つのサブ明細
+                    keys = [f"{sub_field}{n}-{sub_n}", f"{sub_field} {n}-{sub_n}"]
+                    if n == 1:
+                        keys.append(f"{sub_field}-{sub_n}")
+                    found = first_header(keys)
+                    if found is not None:
+                        sub_fields.append((f"{sub_field}{sub_n}", found))
+
+            # 列が1つもない枠は常に空明細になるため除外する
+            if fields or sub_fields:
+                headers_in_slot = tuple(h for _name, h in fields + sub_fields)
+                slots.append(DetailSlot(n, tuple(fields), tuple(sub_fields), headers_in_slot))
+
+        # 番号付きが見つからず、番号なしの列がある場合は縦持ちと判断する
+        vertical = any(
+            field_name in by_key
+            and f"{field_name}1" not in by_key
+            and f"{field_name} 1" not in by_key
+            for field_name in DETAIL_FIELDS
+        )
+
+        columns = dict.fromkeys(h for _name, h in common)
+        for slot in slots:
+            columns.update(dict.fromkeys(slot.headers))
+
+        return ColumnPlan(
+            common=common, slots=tuple(slots), vertical=vertical, columns=tuple(columns)
+        )
 
-                for key in keys_to_try:
-                    if key in normalized_row:
-                        detail[field_name] = self._normalize_value(normalized_row[key])
-                        break
+    def _assemble_row(
+        self,
+        plan: ColumnPlan,
+        values: Mapping[str, str],
+        row_idx: int,
+        skip_empty: bool,
+    ) -> TransformResult:
+        """正規化済みの値（ヘッダ → 値、空欄の列は省略可）から縦持ち行を組み立てる."""
+        long_data: list[dict[str, Any]] = []
+        errors: list[ValidationError] = []
+
+        # 共通項目を抽出・バリデーション
+        common = {name: values.get(header, "") for name, header in plan.common}
+        common, row_errors = self._validate_common_fields(common, row_idx)
+        errors.extend(row_errors)
 
+        # 明細を抽出
+        details: list[dict[str, Any]] = []
+        for slot in plan.slots:
+            # 値がすべて空の明細は除外（正規化済みの値は前後空白なし）
+            if not any(values.get(header) for header in slot.headers):
+                continue
+            detail: dict[str, Any] = {name: values.get(header, "") for name, header in slot.fields}
             # 納入量と納入量小数点を結合
             self._combine_quantity_and_decimal(detail)
+            for name, header in slot.sub_fields:
+                detail[name] = values.get(header, "")
+            details.append(detail)
+            if plan.vertical and slot.number == 1:
+                break
 
-            # サブ明細項目（Lot No1-1, Lot No 1-1, Lot No-1, etc）
-            for sub_field in SUB_DETAIL_FIELDS:
-                for sub_n in range(1, 5):  # 最大4つのサブ明細
-                    keys_to_try = [f"{sub_field}{n}-{sub_n}", f"{sub_field} {n}-{sub_n}"]
-                    if n == 1:
-                        keys_to_try.append(f"{sub_field}-{sub_n}")
-
-                    for key in keys_to_try:
-                        if key in normalized_row:
-                            detail[f"{sub_field}{sub_n}"] = self._normalize_value(
-                                normalized_row[key]
-                            )
-                            break
-
-            # 明細が存在する場合のみ追加
-            is_empty = self._is_empty_detail(detail)
-            if not is_empty:
-                details.append(detail)
-                logger.debug(
-                    f"[Transformer] Detail n={n}: NOT empty, extracted: {list(detail.keys())}"
-                )
-                # 番号付きが見つからず、かつn=1で番号なしでヒットした場合は縦持ちと判断して打ち切り
-                is_vertical = any(
-                    field_name in normalized_row
-                    and f"{field_name}1" not in normalized_row
-                    and f"{field_name} 1" not in normalized_row
-                    for field_name in DETAIL_FIELDS
-                )
-                if is_vertical and n == 1:
-                    logger.debug("[Transformer] Detected vertical format, stopping at n=1")
-                    break
-            else:
-                logger.debug(f"[Transformer] Detail n={n}: EMPTY, detail contents: {detail}")
+        logger.debug(f"[Transformer] Row {row_idx}: {len(details)} details extracted")
+
+        for detail_idx, detail in enumerate(details):
+            # 空明細スキップ
+            if skip_empty and self._is_empty_detail(detail):
+                continue
 
-        logger.debug(f"[Transformer] Total details extracted: {len(details)}")
-        return details
+            # 明細のバリデーション
+            detail, detail_errors = self._validate_detail(detail, row_idx, detail_idx + 1)
+            errors.extend(detail_errors)
+
+            # 共通項目と明細をマージ
+            long_data.append(
+                {
+                    **common,
+                    "明細番号": detail_idx + 1,
+                    **detail,
+                }
+            )
+
+        return TransformResult(long_data=long_data, errors=errors)
 
     def _combine_quantity_and_decimal(self, detail: dict[str, Any]) -> None:
         """納入量と納入量小数点を結合.
@@ -260,18 +377,13 @@ class SmartReadCsvTransformer:
 
         return True
 
-    def _create_normalized_row(self, row: dict[str, Any]) -> dict[str, Any]:
-        """キーを正規化したrowを返す."""
-        return {self._normalize_key(key): value for key, value in row.items()}
-
     def _normalize_key(self, key: str) -> str:
         """列名を正規化.
 
         - 前後空白トリム
         - 全角数字→半角数字
         """
-        trimmed = key.strip()
-        return trimmed.translate(str.maketrans("０１２３４５６７８９", "0123456789"))
+        return key.strip().translate(_FULLWIDTH_DIGITS)
 
     def _normalize_value(self, value: Any) -> str:
         """値を正規化.
@@ -283,17 +395,8 @@ class SmartReadCsvTransformer:
         if value is None:
             return ""
 
-        s = str(value).strip()
-
-        # 全角→半角変換（数字、英字、一部記号）
-        s = s.translate(
-            str.maketrans(
-                "０１２３４５６７８９ＡＢＣＤＥＦＧＨＩＪＫＬＭＮＯＰＱＲＳＴＵＶＷＸＹＺａｂｃｄｅｆｇｈｉｊｋｌｍｎｏｐｑｒｓｔｕｖｗｘｙｚ",
-                "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz",
-            )
-        )
-
-        return s
+        # 全角→半角変換（数字、英字）
+        return str(value).strip().translate(_FULLWIDTH_ALNUM)
 
     def _validate_common_fields(
         self, common: dict[str, Any], row_idx: int
@@ -348,7 +451,7 @@ class SmartReadCsvTransformer:
         # 次区のバリデーション（英数字のみ）
         if "次区" in detail:
             jiku = detail["次区"]
-            if jiku and not re.match(r"^[A-Za-z0-9]+$", jiku):
+            if jiku and not _JIKU_PATTERN.match(jiku):
                 errors.append(
                     ValidationError(
                         row=row_idx,
@@ -383,7 +486,7 @@ class SmartReadCsvTransformer:
         return detail, errors
 
     def _parse_date(self, value: str) -> tuple[str, bool]:
-        """日付をパース.
+        """日付をパース（値ごとにキャッシュ）.
 
         Args:
             value: 日付文字列
@@ -394,23 +497,19 @@ class SmartReadCsvTransformer:
         if not value:
             return "", False
 
+        cached = self._date_cache.get(value)
+        if cached is None:
+            if len(self._date_cache) >= _DATE_CACHE_MAX:
+                self._date_cache.clear()
+            cached = self._date_cache[value] = self._parse_date_uncached(value)
+        return cached
+
+    def _parse_date_uncached(self, value: str) -> tuple[str, bool]:
         # 正規化
         s = self._normalize_value(value)
 
         # 各種形式を試行
-        formats = [
-            "%Y/%m/%d",
-            "%Y-%m-%d",
-            "%Y年%m月%d日",
-            "%Y.%m.%d",
-            "%Y/%m",
-            "%Y-%m",
-            "%Y年%m月",
-            "%Y年",
-            "%Y",
-        ]
-
-        for fmt in formats:
+        for fmt in DATE_FORMATS:
             try:
                 dt = datetime.strptime(s, fmt)
                 # 範囲チェック
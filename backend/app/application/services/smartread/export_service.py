@@ -1,4 +1,23 @@
-"""SmartRead export service."""
+"""SmartRead export service.
+
+【設計意図】なぜストリーミング取込にするのか:
+- 以前はエクスポートZIP内のCSVを list(reader) で全行読み込み、横持ち・縦持ちの
+  全行をメモリに保持したまま、横持ちを1行ずつ ORM で追加し、縦持ちも1行ずつ追加していた
+  → 日次の大きなエクスポートで行数に比例してメモリと往復回数が増える
+- 現在はCSVを INGEST_CHUNK_ROWS 行ずつ読み進め、チャンクごとに
+  1. 横持ちを INSERT ... ON CONFLICT (config_id, task_date, row_fingerprint)
+     DO NOTHING RETURNING id で一括登録（既存行は指紋で ID を引き直す）
+  2. 対象の横持ちIDの縦持ちを一括削除し、縦持ちを COPY で一括投入
+  する。保持するのは処理中のチャンクと処理済み横持ちIDの集合のみ
+- 行データを呼び出し元へ返す必要がない経路（自動同期）は include_rows=False で
+  行データを蓄積しない
+
+【設計意図】なぜ取込をスレッドプールで実行するのか:
+- get_export_csv_data は async ルートや同期ループから await されるが、await するのは
+  ZIP ダウンロードだけで、設定取得・ZIP展開・CSV変換・DB保存はすべて同期処理
+- イベントループ上で実行すると取込が終わるまで他のリクエストが止まるため、
+  設定取得と取込（_ingest_export_zip）は run_in_threadpool で実行する
+"""
 
 from __future__ import annotations
 
@@ -7,15 +26,22 @@ import hashlib
 import io
 import json
 import logging
+from collections.abc import Iterable, Iterator
 from datetime import date, datetime
-from typing import TYPE_CHECKING, Any
+from itertools import islice
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
 
 from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from starlette.concurrency import run_in_threadpool
 
 from app.application.services.smartread.base import SmartReadBaseService
+from app.infrastructure.persistence.copy_utils import copy_rows
 
 
 if TYPE_CHECKING:
+    from app.application.services.smartread.csv_transformer import ValidationError
     from app.infrastructure.persistence.models import SmartReadConfig
     from app.infrastructure.smartread.client import SmartReadClient
 
@@ -30,6 +56,70 @@ from .types import ExportResult
 
 logger = logging.getLogger(__name__)
 
+INGEST_CHUNK_ROWS = 1000
+"""ストリーミング取込で1回に処理する横持ち行数."""
+
+_LONG_COPY_COLUMNS = [
+    "wide_data_id",
+    "config_id",
+    "task_id",
+    "task_date",
+    "row_index",
+    "content",
+    "status",
+]
+
+
+def _chunked(
+    rows: Iterable[dict[str, Any]], size: int | None = None
+) -> Iterator[tuple[int, list[dict[str, Any]]]]:
+    """Yield (start row index, chunk) pairs of at most size (default INGEST_CHUNK_ROWS) rows."""
+    size = size or INGEST_CHUNK_ROWS
+    iterator = iter(rows)
+    start = 0
+    while chunk := list(islice(iterator, size)):
+        yield start, chunk
+        start += len(chunk)
+
+
+class _LongDataCsvWriter:
+    """縦持ちデータを export_dir のCSVへ逐次書き出す.
+
+    列は最初の縦持ち行のキーで確定する。書き込みに失敗した場合はログを出して以降を無視する
+    （取込自体は失敗させない）。
+    """
+
+    def __init__(self, export_dir: str, task_id: str, task_date: date) -> None:
+        date_str = task_date.strftime("%Y%m%d")
+        self.path = Path(export_dir) / f"long_data_{task_id}_{date_str}.csv"
+        self._file: IO[str] | None = None
+        self._writer: csv.DictWriter[str] | None = None
+        self._failed = False
+
+    def write(self, rows: list[dict[str, Any]]) -> None:
+        if self._failed or not rows:
+            return
+        try:
+            if self._writer is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                # close() で閉じる（チャンクをまたいで書き込むため with は使えない）
+                self._file = open(self.path, "w", encoding="utf-8-sig", newline="")  # noqa: SIM115
+                self._writer = csv.DictWriter(self._file, fieldnames=rows[0].keys())
+                self._writer.writeheader()
+            self._writer.writerows(rows)
+        except Exception as e:
+            logger.error(f"Failed to save long data to CSV: {e}")
+            self._failed = True
+            self.close()
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        if not self._failed:
+            logger.info(f"Saved long data to CSV: {self.path}")
+
 
 class SmartReadExportService(SmartReadBaseService):
     """SmartRead export関連のサービス."""
@@ -127,7 +217,7 @@ class SmartReadExportService(SmartReadBaseService):
         Returns:
             エクスポート情報
         """
-        client, config = self._get_client(config_id)
+        client, config = await run_in_threadpool(self._get_client, config_id)
         if not client or not config:
             return None
 
@@ -153,7 +243,7 @@ class SmartReadExportService(SmartReadBaseService):
         Returns:
             エクスポート情報
         """
-        client, _ = self._get_client(config_id)
+        client, _ = await run_in_threadpool(self._get_client, config_id)
         if not client:
             return None
 
@@ -166,32 +256,64 @@ class SmartReadExportService(SmartReadBaseService):
         export_id: str,
         save_to_db: bool = True,
         task_date: date | None = None,
+        *,
+        include_rows: bool = True,
     ) -> dict[str, Any] | None:
         """エクスポートからCSVデータを取得し、横持ち・縦持ち両方を返す.
 
+        CSVは INGEST_CHUNK_ROWS 行ずつ読み進め、チャンクごとに変換・保存する。
+
         Args:
             config_id: 設定ID
             task_id: タスクID
             export_id: エクスポートID
             save_to_db: DBに保存するか
             task_date: タスク日付（指定がない場合は今日）
+            include_rows: 横持ち・縦持ちの行データを結果に含めるか
+                （False の場合は件数のみ返し、行データをメモリに蓄積しない）
 
         Returns:
             横持ち・縦持ちデータとエラー
         """
-        import zipfile
-
-        from app.application.services.smartread.csv_transformer import (
-            SmartReadCsvTransformer,
-        )
-
-        client, _ = self._get_client(config_id)
+        client, config = await run_in_threadpool(self._get_client, config_id)
         if not client:
             return None
 
         # ZIPダウンロード
         zip_data = await client.download_export(task_id, export_id)
 
+        # ZIP展開・CSV変換・DB保存は同期処理のためスレッドプールで実行する
+        return await run_in_threadpool(
+            self._ingest_export_zip,
+            config,
+            config_id,
+            task_id,
+            export_id,
+            zip_data,
+            save_to_db=save_to_db,
+            task_date=task_date,
+            include_rows=include_rows,
+        )
+
+    def _ingest_export_zip(
+        self,
+        config: SmartReadConfig | None,
+        config_id: int,
+        task_id: str,
+        export_id: str,
+        zip_data: bytes | None,
+        *,
+        save_to_db: bool,
+        task_date: date | None,
+        include_rows: bool,
+    ) -> dict[str, Any] | None:
+        """ダウンロードしたエクスポートZIPを展開し、CSVをチャンク単位で変換・保存する."""
+        import zipfile
+
+        from app.application.services.smartread.csv_transformer import (
+            SmartReadCsvTransformer,
+        )
+
         # データ検証1: ZIPが取得できたか
         if not zip_data:
             logger.error(
@@ -235,51 +357,20 @@ class SmartReadExportService(SmartReadBaseService):
             },
         )
 
-        # ZIP展開→CSV抽出
+        # ZIP展開→CSVをチャンク単位で読み進めながら変換・保存
+        transformer = SmartReadCsvTransformer()
         wide_data: list[dict[str, Any]] = []
+        long_data: list[dict[str, Any]] = []
+        errors: list[ValidationError] = []
         csv_filename: str | None = None
-        csv_files_found = 0
+        wide_row_count = 0
+        long_row_count = 0
+        data_version = None
+        long_writer: _LongDataCsvWriter | None = None
+        ingested_ids: set[int] = set()
 
         try:
-            with zipfile.ZipFile(io.BytesIO(zip_data)) as zf:
-                csv_files_in_zip = [name for name in zf.namelist() if name.endswith(".csv")]
-                csv_files_found = len(csv_files_in_zip)
-
-                # データ検証3: ZIP内にCSVファイルが存在するか
-                if csv_files_found == 0:
-                    logger.error(
-                        "[SmartRead] No CSV files found in ZIP",
-                        extra={
-                            "task_id": task_id,
-                            "export_id": export_id,
-                            "config_id": config_id,
-                            "zip_size": zip_size,
-                            "files_in_zip": zf.namelist(),
-                        },
-                    )
-                    return {
-                        "state": "EMPTY",
-                        "message": "ZIPファイル内にCSVが見つかりません",
-                        "wide_data": [],
-                        "long_data": [],
-                        "errors": [],
-                        "filename": None,
-                    }
-
-                for name in csv_files_in_zip:
-                    csv_filename = name
-                    with zf.open(name) as f:
-                        # CSVを読み込み
-                        reader = csv.DictReader(io.TextIOWrapper(f, encoding="utf-8-sig"))
-                        rows = list(reader)
-                        if rows:
-                            logger.info(f"[SmartRead] CSV columns found: {list(rows[0].keys())}")
-                            for row in rows:
-                                wide_data.append(dict(row))
-                        else:
-                            logger.warning(f"[SmartRead] CSV file {name} is empty (no rows)")
-                    break  # 最初のCSVのみ処理
-
+            zf = zipfile.ZipFile(io.BytesIO(zip_data))
         except Exception as e:
             logger.error(
                 f"[SmartRead] Failed to extract CSV from ZIP: {e}",
@@ -292,8 +383,105 @@ class SmartReadExportService(SmartReadBaseService):
             )
             return None
 
+        with zf:
+            csv_files_in_zip = [name for name in zf.namelist() if name.endswith(".csv")]
+            csv_files_found = len(csv_files_in_zip)
+
+            # データ検証3: ZIP内にCSVファイルが存在するか
+            if csv_files_found == 0:
+                logger.error(
+                    "[SmartRead] No CSV files found in ZIP",
+                    extra={
+                        "task_id": task_id,
+                        "export_id": export_id,
+                        "config_id": config_id,
+                        "zip_size": zip_size,
+                        "files_in_zip": zf.namelist(),
+                    },
+                )
+                return {
+                    "state": "EMPTY",
+                    "message": "ZIPファイル内にCSVが見つかりません",
+                    "wide_data": [],
+                    "long_data": [],
+                    "errors": [],
+                    "filename": None,
+                }
+
+            # 最初のCSVのみ処理
+            csv_filename = csv_files_in_zip[0]
+            with zf.open(csv_filename) as f:
+                reader = csv.DictReader(io.TextIOWrapper(f, encoding="utf-8-sig"))
+                chunks = _chunked(reader)
+                while True:
+                    # 読み込み（ZIP展開・デコード・CSV解析）の失敗のみここで扱う
+                    try:
+                        start, chunk = next(chunks, (wide_row_count, []))
+                    except Exception as e:
+                        logger.error(
+                            f"[SmartRead] Failed to extract CSV from ZIP: {e}",
+                            extra={
+                                "task_id": task_id,
+                                "export_id": export_id,
+                                "config_id": config_id,
+                                "zip_size": zip_size,
+                            },
+                        )
+                        if long_writer:
+                            long_writer.close()
+                        return None
+                    if not chunk:
+                        break
+
+                    if start == 0:
+                        logger.info(f"[SmartRead] CSV columns found: {list(chunk[0].keys())}")
+                        if save_to_db:
+                            if task_date is None:
+                                task_date = date.today()
+                            self.get_or_create_task(
+                                config_id=config_id,
+                                task_id=task_id,
+                                task_date=task_date,
+                            )
+                        # export_dirが設定されている場合、縦持ちデータをCSV出力
+                        if config and config.export_dir:
+                            long_writer = _LongDataCsvWriter(
+                                config.export_dir, task_id, task_date or date.today()
+                            )
+
+                    long_rows_per_row = []
+                    for offset, row in enumerate(chunk):
+                        row_result = transformer.transform_row(row, start + offset)
+                        long_rows_per_row.append(row_result.long_data)
+                        errors.extend(row_result.errors)
+
+                    if save_to_db and task_date is not None:
+                        self._ingest_wide_chunk(
+                            config_id=config_id,
+                            task_id=task_id,
+                            export_id=export_id,
+                            task_date=task_date,
+                            filename=csv_filename,
+                            rows=chunk,
+                            start_index=start,
+                            long_rows_per_row=long_rows_per_row,
+                            ingested_ids=ingested_ids,
+                        )
+
+                    chunk_long = [lr for rows in long_rows_per_row for lr in rows]
+                    if long_writer:
+                        long_writer.write(chunk_long)
+                    if include_rows:
+                        wide_data.extend(chunk)
+                        long_data.extend(chunk_long)
+                    wide_row_count += len(chunk)
+                    long_row_count += len(chunk_long)
+
+        if long_writer:
+            long_writer.close()
+
         # データ検証4: CSVに行データがあるか（ヘッダのみではない）
-        if len(wide_data) == 0:
+        if wide_row_count == 0:
             logger.warning(
                 "[SmartRead] CSV file has no data rows (header only or empty)",
                 extra={
@@ -314,76 +502,39 @@ class SmartReadExportService(SmartReadBaseService):
                 "filename": csv_filename,
             }
 
-        # 横持ち→縦持ち変換
-        logger.info(f"[SmartRead] Transforming {len(wide_data)} wide rows to long format...")
-        transformer = SmartReadCsvTransformer()
-        result = transformer.transform_to_long(wide_data)
         logger.info(
-            f"[SmartRead] Transformation complete: {len(wide_data)} wide -> {len(result.long_data)} long rows",
+            f"[SmartRead] Transformation complete: {wide_row_count} wide -> {long_row_count} long rows",
             extra={
                 "task_id": task_id,
                 "export_id": export_id,
                 "config_id": config_id,
                 "zip_size": zip_size,
                 "csv_files": csv_files_found,
-                "rows_count": len(wide_data),
-                "long_rows_count": len(result.long_data),
+                "rows_count": wide_row_count,
+                "long_rows_count": long_row_count,
             },
         )
 
-        if len(wide_data) > 0 and len(result.long_data) == 0:
+        if long_row_count == 0:
             logger.warning(
-                f"[SmartRead] TRANSFORMATION RESULT IS EMPTY! Check column names. "
-                f"Available columns: {list(wide_data[0].keys()) if wide_data else 'None'}",
+                "[SmartRead] TRANSFORMATION RESULT IS EMPTY! Check column names.",
                 extra={
                     "task_id": task_id,
                     "export_id": export_id,
                     "config_id": config_id,
-                    "available_columns": list(wide_data[0].keys()) if wide_data else [],
                 },
             )
 
-        data_version = None
-
-        # DBに保存
-        if save_to_db and wide_data:
-            if task_date is None:
-                task_date = date.today()
-
-            self.get_or_create_task(
-                config_id=config_id,
-                task_id=task_id,
-                task_date=task_date,
-            )
-
-            self._save_wide_and_long_data(
-                config_id=config_id,
-                task_id=task_id,
-                export_id=export_id,
-                task_date=task_date,
-                wide_data=wide_data,
-                long_data=result.long_data,
-                filename=csv_filename,
-            )
+        if save_to_db:
             data_version = self.bump_data_version(task_id)
 
-        # export_dirが設定されている場合、縦持ちデータをCSV出力
-        config = self.get_config(config_id)
-        if config and config.export_dir and result.long_data:
-            self._save_long_data_to_csv(
-                export_dir=config.export_dir,
-                long_data=result.long_data,
-                task_id=task_id,
-                task_date=task_date if task_date else date.today(),
-            )
-
         # request_id調査用ログ出力
         self._log_export_investigation(
             task_id=task_id,
             export_id=export_id,
             csv_filename=csv_filename,
-            wide_row_count=len(wide_data),
-            long_row_count=len(result.long_data),
+            wide_row_count=wide_row_count,
+            long_row_count=long_row_count,
         )
 
         # エクスポート履歴をDBに記録
@@ -393,17 +544,19 @@ class SmartReadExportService(SmartReadBaseService):
             export_id=export_id,
             task_date=task_date if task_date else date.today(),
             filename=csv_filename,
-            wide_row_count=len(wide_data),
-            long_row_count=len(result.long_data),
+            wide_row_count=wide_row_count,
+            long_row_count=long_row_count,
             status="SUCCESS",
         )
 
         return {
             "wide_data": wide_data,
-            "long_data": result.long_data,
-            "errors": result.errors,
+            "long_data": long_data,
+            "errors": errors,
             "filename": csv_filename,
             "data_version": data_version,
+            "wide_row_count": wide_row_count,
+            "long_row_count": long_row_count,
         }
 
     def _calculate_row_fingerprint(self, row_data: dict[str, Any]) -> str:
@@ -425,11 +578,14 @@ class SmartReadExportService(SmartReadBaseService):
         task_id: str,
         export_id: str,
         task_date: date,
-        wide_data: list[dict[str, Any]],
+        wide_data: Iterable[dict[str, Any]],
         long_data: list[dict[str, Any]],
         filename: str | None,
     ) -> None:
-        """横持ち・縦持ちデータをDBに保存（高速化版）.
+        """横持ち・縦持ちデータをDBに保存.
+
+        縦持ちは横持ち行ごとに再変換して保存する（long_data は使用しない）。
+        wide_data はイテラブルでよく、INGEST_CHUNK_ROWS 行ずつ保存する。
 
         Args:
             config_id: 設定ID
@@ -442,155 +598,162 @@ class SmartReadExportService(SmartReadBaseService):
         """
         import time
 
-        start_time = time.time()
-
-        # 1. すべての指紋を事前に計算
-        fingerprints = [self._calculate_row_fingerprint(row) for row in wide_data]
-
-        # 2. 既存の指紋を一括取得してキャッシュ (N+1解消)
-        stmt = select(SmartReadWideData.id, SmartReadWideData.row_fingerprint).where(
-            SmartReadWideData.config_id == config_id,
-            SmartReadWideData.task_date == task_date,
-            SmartReadWideData.row_fingerprint.in_(fingerprints),
-        )
-        existing_rows = self.session.execute(stmt).all()
-        # fingerprint -> id
-        fingerprint_to_id: dict[str, int] = {r.row_fingerprint: r.id for r in existing_rows}
-
-        # 3. 新規横持ちレコードの作成と保存
-        # 挿入後のIDを取得するため、個別または小バッチでflushする必要があるが、
-        # ここでは1行ずつ追加して最後にまとめてflushする
-        wide_id_by_index: dict[int, int] = {}
-        new_wide_count = 0
-
-        for row_index, (row, fingerprint) in enumerate(zip(wide_data, fingerprints, strict=True)):
-            if fingerprint in fingerprint_to_id:
-                wide_id_by_index[row_index] = fingerprint_to_id[fingerprint]
-            else:
-                wide_record = SmartReadWideData(
-                    config_id=config_id,
-                    task_id=task_id,
-                    export_id=export_id,
-                    task_date=task_date,
-                    filename=filename,
-                    row_index=row_index,
-                    content=row,
-                    row_fingerprint=fingerprint,
-                )
-                self.session.add(wide_record)
-                # ループ内での flush() は極力避ける。
-                # ただし、wide_record.id が後続の縦持ち保存で必要なため、一括して後で行う。
-                new_wide_count += 1
-                # IDが必要な新規レコードを一旦リストへ保持
-                if not hasattr(self, "_pending_wide_records"):
-                    self._pending_wide_records = []
-                self._pending_wide_records.append((row_index, wide_record, fingerprint))
-
-        # まとめて flush して ID を確定
-        if new_wide_count > 0:
-            self.session.flush()
-            # IDをDBから取得してキャッシュを更新
-            for row_idx, record, fp in getattr(self, "_pending_wide_records", []):
-                wide_id_by_index[row_idx] = record.id
-                fingerprint_to_id[fp] = record.id
-            delattr(self, "_pending_wide_records")
-
-        # 4. 縦持ちデータの保存（重複防止付き）
-        # 既存の縦持ちデータを削除（同じwide_data_idに対する再変換に対応）
-        wide_ids_to_process = list(wide_id_by_index.values())
-        deleted_count = 0
-        if wide_ids_to_process:
-            delete_stmt = delete(SmartReadLongData).where(
-                SmartReadLongData.wide_data_id.in_(wide_ids_to_process)
-            )
-            result = self.session.execute(delete_stmt)
-            # SQLAlchemy 2.0: CursorResult has rowcount attribute
-            # We use int() and handle exceptions for robust testing with mocks
-            try:
-                deleted_count = int(result.rowcount) if hasattr(result, "rowcount") else 0
-            except (TypeError, ValueError):
-                deleted_count = 0
-
-            if deleted_count > 0:
-                logger.info(
-                    f"[SmartRead] Deleted {deleted_count} existing long data rows for wide_data_ids={wide_ids_to_process}"
-                )
-
-        # 縦持ちデータを再生成して保存
         from app.application.services.smartread.csv_transformer import SmartReadCsvTransformer
 
+        start_time = time.time()
         transformer = SmartReadCsvTransformer()
+        ingested_ids: set[int] = set()
+        wide_count = new_wide_count = long_count = 0
+
+        for start, chunk in _chunked(wide_data):
+            long_rows_per_row = [
+                transformer.transform_row(row, start + offset).long_data
+                for offset, row in enumerate(chunk)
+            ]
+            new_rows, long_rows = self._ingest_wide_chunk(
+                config_id=config_id,
+                task_id=task_id,
+                export_id=export_id,
+                task_date=task_date,
+                filename=filename,
+                rows=chunk,
+                start_index=start,
+                long_rows_per_row=long_rows_per_row,
+                ingested_ids=ingested_ids,
+            )
+            wide_count += len(chunk)
+            new_wide_count += new_rows
+            long_count += long_rows
 
-        long_count = 0
-        for row_idx, row in enumerate(wide_data):
-            wide_data_id = wide_id_by_index.get(row_idx)
-            # 各行ごとに変換して wide_data_id を紐付け
-            res = transformer.transform_to_long([row])
-            for long_row in res.long_data:
-                long_record = SmartReadLongData(
-                    wide_data_id=wide_data_id,
-                    config_id=config_id,
-                    task_id=task_id,
-                    task_date=task_date,
-                    row_index=row_idx,  # 元の行インデックス
-                    content=long_row,
-                    status="PENDING",
-                )
-                self.session.add(long_record)
-                long_count += 1
-
-        self.session.flush()
         elapsed = time.time() - start_time
         logger.info(
             f"[SmartRead] DB SAVE SUCCESS: Config={config_id}, Task={task_id}, Date={task_date}\n"
-            f" - Wide Rows: {new_wide_count} newly inserted / {len(wide_data)} total\n"
+            f" - Wide Rows: {new_wide_count} newly inserted / {wide_count} total\n"
             f" - Long Rows: {long_count} inserted\n"
             f" - Filename: {filename}\n"
             f" - Elapsed: {elapsed:.2f}s"
         )
 
-    def _save_long_data_to_csv(
+    def _ingest_wide_chunk(
         self,
-        export_dir: str,
-        long_data: list[dict[str, Any]],
+        *,
+        config_id: int,
         task_id: str,
+        export_id: str,
         task_date: date,
-    ) -> None:
-        """縦持ちデータをCSVファイルに保存.
+        filename: str | None,
+        rows: list[dict[str, Any]],
+        start_index: int,
+        long_rows_per_row: list[list[dict[str, Any]]],
+        ingested_ids: set[int],
+    ) -> tuple[int, int]:
+        """横持ち1チャンクを登録し、その縦持ちを置き換える.
+
+        同じ (config_id, task_date, row_fingerprint) の横持ちは既存行を再利用する。
+        同一取込内で同じ指紋の行が再度現れた場合（ingested_ids に含まれる）は縦持ちを重複登録しない。
 
         Args:
-            export_dir: 出力先ディレクトリ
-            long_data: 縦持ちデータ
+            config_id: 設定ID
             task_id: タスクID
+            export_id: エクスポートID
             task_date: タスク日付
-        """
-        import os
-        from pathlib import Path
-
-        if not long_data:
-            return
-
-        try:
-            export_path = Path(export_dir)
-            if not export_path.exists():
-                os.makedirs(export_path, exist_ok=True)
-
-            # ファイル名: long_data_{task_id}_{YYYYMMDD}.csv
-            date_str = task_date.strftime("%Y%m%d")
-            csv_filename = f"long_data_{task_id}_{date_str}.csv"
-            csv_path = export_path / csv_filename
+            filename: ファイル名
+            rows: 横持ちデータ（チャンク）
+            start_index: チャンク先頭行の行インデックス
+            long_rows_per_row: rows の各行に対応する縦持ちデータ
+            ingested_ids: この取込で処理済みの横持ちID（更新される）
 
-            # CSVとして出力
-            with open(csv_path, "w", encoding="utf-8-sig", newline="") as f:
-                if long_data:
-                    writer = csv.DictWriter(f, fieldnames=long_data[0].keys())
-                    writer.writeheader()
-                    writer.writerows(long_data)
+        Returns:
+            (新規登録した横持ち行数, 登録した縦持ち行数)
+        """
+        fingerprints = [self._calculate_row_fingerprint(row) for row in rows]
+
+        # 1. 横持ちを一括登録（チャンク内の重複指紋は先頭行のみ）
+        values: dict[str, dict[str, Any]] = {}
+        for offset, (row, fingerprint) in enumerate(zip(rows, fingerprints, strict=True)):
+            values.setdefault(
+                fingerprint,
+                {
+                    "config_id": config_id,
+                    "task_id": task_id,
+                    "export_id": export_id,
+                    "task_date": task_date,
+                    "filename": filename,
+                    "row_index": start_index + offset,
+                    "content": row,
+                    "row_fingerprint": fingerprint,
+                },
+            )
+        stmt = (
+            insert(SmartReadWideData)
+            .values(list(values.values()))
+            .on_conflict_do_nothing(index_elements=["config_id", "task_date", "row_fingerprint"])
+            .returning(SmartReadWideData.id, SmartReadWideData.row_fingerprint)
+        )
+        fingerprint_to_id: dict[str, int] = {
+            r.row_fingerprint: r.id for r in self.session.execute(stmt)
+        }
+        new_wide_count = len(fingerprint_to_id)
+
+        # 2. 既存の横持ち（ON CONFLICT で返らなかった行）のIDを指紋で取得
+        missing = [fp for fp in values if fp not in fingerprint_to_id]
+        if missing:
+            existing = self.session.execute(
+                select(SmartReadWideData.id, SmartReadWideData.row_fingerprint).where(
+                    SmartReadWideData.config_id == config_id,
+                    SmartReadWideData.task_date == task_date,
+                    SmartReadWideData.row_fingerprint.in_(missing),
+                )
+            )
+            fingerprint_to_id.update({r.row_fingerprint: r.id for r in existing})
+
+        # 3. 縦持ちの置き換え対象（この取込で初めて処理する横持ち行）
+        targets: list[tuple[int, int, list[dict[str, Any]]]] = []
+        for offset, (fingerprint, long_rows) in enumerate(
+            zip(fingerprints, long_rows_per_row, strict=True)
+        ):
+            wide_id = fingerprint_to_id[fingerprint]
+            if wide_id in ingested_ids:
+                continue
+            ingested_ids.add(wide_id)
+            targets.append((wide_id, start_index + offset, long_rows))
+
+        if not targets:
+            return new_wide_count, 0
 
-            logger.info(f"Saved long data to CSV: {csv_path}")
+        # 既存の縦持ちデータを削除（同じwide_data_idに対する再変換に対応）
+        result = self.session.execute(
+            delete(SmartReadLongData).where(
+                SmartReadLongData.wide_data_id.in_([wide_id for wide_id, _i, _r in targets])
+            )
+        )
+        deleted_count = getattr(result, "rowcount", 0)
+        if isinstance(deleted_count, int) and deleted_count > 0:
+            logger.info(
+                "[SmartRead] Deleted existing long data rows",
+                extra={"config_id": config_id, "task_id": task_id, "deleted": deleted_count},
+            )
 
-        except Exception as e:
-            logger.error(f"Failed to save long data to CSV: {e}")
+        # 4. 縦持ちを COPY で一括投入
+        long_count = copy_rows(
+            self.session,
+            SmartReadLongData.__tablename__,
+            _LONG_COPY_COLUMNS,
+            (
+                (
+                    wide_id,
+                    config_id,
+                    task_id,
+                    task_date,
+                    row_index,
+                    json.dumps(long_row, ensure_ascii=False),
+                    "PENDING",
+                )
+                for wide_id, row_index, long_rows in targets
+                for long_row in long_rows
+            ),
+        )
+        return new_wide_count, long_count
 
     def _log_export_investigation(
         self,
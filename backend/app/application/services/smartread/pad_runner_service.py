@@ -41,11 +41,13 @@ class SmartReadPadRunnerService:
     """PAD互換フローのオーケストレータ.
 
     重要: execute_run は同期関数。HTTP I/O や ZIP処理など重い処理を含むため、
-    threading.Thread で実行すること。BackgroundTasks は使用しない。
+    ジョブワーカー（app.application.services.jobs、resource_type=smartread_pad_run）
+    で実行すること。BackgroundTasks は使用しない。
     """
 
     def __init__(self, session: Session):
         self.session = session
+        self._on_step: Callable[[str], None] | None = None
 
     def start_run(
         self,
@@ -80,12 +82,17 @@ class SmartReadPadRunnerService:
         logger.info(f"[PAD Run {run_id}] Started with {len(filenames)} files")
         return run_id
 
-    def execute_run(self, run_id: str) -> None:
-        """PAD互換フローを実行（同期関数・スレッドで実行すること）.
+    def execute_run(self, run_id: str, on_step: Callable[[str], None] | None = None) -> None:
+        """PAD互換フローを実行（同期関数・ジョブワーカーで実行すること）.
 
         重要: この関数は同期I/O（requests, ZIP処理）を含むため、
-        threading.Thread で呼び出すこと。
+        イベントループ上では呼び出さないこと。
+
+        Args:
+            run_id: 実行ID
+            on_step: 工程が進むたびに工程名で呼ばれるコールバック（進捗報告用）
         """
+        self._on_step = on_step
         run = self._get_run(run_id)
         if not run:
             logger.error(f"[PAD Run {run_id}] Run not found")
@@ -230,7 +237,9 @@ class SmartReadPadRunnerService:
             return None
 
         # Stale検出: RUNNINGで一定時間heartbeatが更新されていない場合
-        if run.status == "RUNNING":
+        # CREATED はジョブワーカーの取得待ち（実行キュー側で管理）のため対象外。
+        # キューでキャンセル・失敗した場合は失敗フックで FAILED になる（fail_unfinished_run）
+        if run.status == "RUNNING" and run.step != "CREATED":
             threshold = datetime.now() - timedelta(seconds=HEARTBEAT_STALE_THRESHOLD_SECONDS)
             if run.heartbeat_at < threshold:
                 run.status = "STALE"
@@ -260,6 +269,18 @@ class SmartReadPadRunnerService:
             "max_retries": run.max_retries,
         }
 
+    def fail_unfinished_run(self, run_id: str, error_message: str) -> bool:
+        """実行中（RUNNING）のままの実行を FAILED にする（実行キュー側の失敗・キャンセル用）.
+
+        Returns:
+            FAILED にした場合 True（既に終了済み・存在しない場合は False）
+        """
+        run = self._get_run(run_id)
+        if not run or run.status != "RUNNING":
+            return False
+        self._fail_run(run, error_message)
+        return True
+
     def retry_run(self, run_id: str) -> str | None:
         """失敗/Staleの実行をリトライ（新しいrun_idを返す）."""
         run = self._get_run(run_id)
@@ -332,6 +353,8 @@ class SmartReadPadRunnerService:
         run.updated_at = datetime.now()
         self.session.commit()
         logger.info(f"[PAD Run {run.run_id}] Step: {step}")
+        if self._on_step is not None:
+            self._on_step(step)
 
     def _update_heartbeat(self, run: SmartReadPadRun) -> None:
         run.heartbeat_at = datetime.now()
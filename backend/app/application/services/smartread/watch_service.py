@@ -9,6 +9,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
+from starlette.concurrency import run_in_threadpool
+
 from app.application.services.smartread.base import SmartReadBaseService
 
 from .types import AnalyzeResult, WatchDirProcessOutcome
@@ -234,7 +236,7 @@ class SmartReadWatchService(SmartReadBaseService):
 
         requestId方式とexport方式の両方を試し、結果を返す。
         """
-        config = self.get_config(config_id)
+        config = await run_in_threadpool(self.get_config, config_id)
         if not config or not config.watch_dir:
             return {
                 "request_flow": {
@@ -283,7 +285,7 @@ class SmartReadWatchService(SmartReadBaseService):
                 },
             }
 
-        client, _ = self._get_client(config_id)
+        client, _ = await run_in_threadpool(self._get_client, config_id)
         if not client:
             return {
                 "request_flow": {
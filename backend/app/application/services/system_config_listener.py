@@ -0,0 +1,120 @@
+"""System config change listener.
+
+他ワーカーの SystemConfigService.set() が発行する NOTIFY を受信し、
+プロセス内の system_config_cache を無効化する。
+
+【設計意図】なぜ専用スレッドで LISTEN するのか:
+- LISTEN はセッション単位のため、プールから切り離した専用コネクションを保持する
+- 受信待ちは select() でブロックするため、イベントループではなくデーモンスレッドで行う
+- 接続断時はキャッシュを全消去してから再接続する（取りこぼした通知の代わり）
+"""
+
+from __future__ import annotations
+
+import logging
+import select
+import socket
+import threading
+from typing import Any
+
+from sqlalchemy.engine import Engine
+
+from app.application.services.system_config_service import (
+    SYSTEM_CONFIG_CHANNEL,
+    system_config_cache,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class SystemConfigChangeListener:
+    """LISTEN system_config_changed and invalidate the local config cache."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        *,
+        poll_interval: float = 1.0,
+        reconnect_delay: float = 5.0,
+    ) -> None:
+        self._engine = engine
+        self._poll_interval = poll_interval
+        self._reconnect_delay = reconnect_delay
+        self._stop_event = threading.Event()
+        self._ready_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        # stop() から select() 待ちを即時に起こすための自己パイプ
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+
+    def start(self) -> None:
+        """Start the background listener thread."""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="system-config-listener", daemon=True
+        )
+        self._thread.start()
+        logger.info("[SystemConfig] Change listener started")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the listener thread."""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._wakeup_w.send(b"\0")
+        self._thread.join(timeout=timeout)
+        self._thread = None
+        self._ready_event.clear()
+        logger.info("[SystemConfig] Change listener stopped")
+
+    def wait_until_listening(self, timeout: float | None = None) -> bool:
+        """Block until LISTEN has been issued (for startup checks and tests)."""
+        return self._ready_event.wait(timeout)
+
+    @staticmethod
+    def handle_notification(payload: str | None) -> None:
+        """Invalidate the key named in the payload (empty payload = all keys)."""
+        system_config_cache.invalidate(payload or None)
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.warning(
+                    "[SystemConfig] Change listener disconnected; retrying",
+                    exc_info=True,
+                    extra={"reconnect_delay": self._reconnect_delay},
+                )
+            finally:
+                self._ready_event.clear()
+                system_config_cache.invalidate()
+            self._stop_event.wait(self._reconnect_delay)
+
+    def _listen(self) -> None:
+        raw = self._engine.raw_connection()
+        conn: Any = raw.driver_connection
+        # LISTEN 状態のコネクションをプールへ返さない
+        raw.detach()
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {SYSTEM_CONFIG_CHANNEL}")
+            # LISTEN 開始前の変更を取りこぼさないよう一度全消去
+            system_config_cache.invalidate()
+            self._ready_event.set()
+
+            while not self._stop_event.is_set():
+                readable, _, _ = select.select([conn, self._wakeup_r], [], [], self._poll_interval)
+                if self._wakeup_r in readable:
+                    self._wakeup_r.recv(64)
+                if conn not in readable:
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    self.handle_notification(notify.payload)
+        finally:
+            raw.close()
@@ -1,13 +1,86 @@
 """System Config Service.
 
 システム設定値の取得・更新を行うサービス。
+
+【設計意図】なぜプロセス内キャッシュ + NOTIFY なのか:
+- MaintenanceMiddleware は全APIリクエストで maintenance_mode を参照する
+  → 毎回 DB 問い合わせ（＋コネクションプールのチェックアウト）が発生していた
+- 設定値はプロセス内の TTL キャッシュ（system_config_cache）に保持する
+  → キャッシュヒット時はセッションを開かずに判定できる
+- set() は自プロセスのキャッシュを即時無効化し、同一トランザクションで
+  pg_notify('system_config_changed', key) を発行する
+  → 他ワーカーは SystemConfigChangeListener（LISTEN）で受信して無効化する
+- リスナー未起動・接続断の場合でも TTL（既定5秒）で最新値に収束する
 """
 
+from __future__ import annotations
+
+import threading
+import time
+
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.infrastructure.persistence.models.system_config_model import SystemConfig
 
 
+SYSTEM_CONFIG_CHANNEL = "system_config_changed"
+
+_TRUE_VALUES = ("true", "1", "yes", "on", "t")
+
+
+class _Missing:
+    """Cache miss marker (None is a valid cached value: key not stored)."""
+
+
+MISSING = _Missing()
+
+
+class SystemConfigCache:
+    """プロセス内 TTL キャッシュ（スレッドセーフ）.
+
+    DB上の生の値（未登録は None）を保持し、デフォルト値の適用は呼び出し側で行う。
+    """
+
+    def __init__(self, ttl_seconds: float):
+        """Initialize with entry lifetime in seconds."""
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[str, tuple[str | None, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | _Missing | None:
+        """Return the cached raw value, or MISSING when absent/expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        value, stored_at = entry
+        if time.monotonic() - stored_at >= self.ttl_seconds:
+            return MISSING
+        return value
+
+    def put(self, key: str, value: str | None) -> None:
+        """Store the raw value for key."""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+
+    def invalidate(self, key: str | None = None) -> None:
+        """Drop one key, or every key when key is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+system_config_cache = SystemConfigCache(ttl_seconds=settings.SYSTEM_CONFIG_CACHE_TTL_SECONDS)
+
+
+def _resolve(raw: str | None, default: str) -> str:
+    return raw if raw else default
+
+
 class SystemConfigService:
     """システム設定サービス."""
 
@@ -15,9 +88,17 @@ class SystemConfigService:
         """Initialize with database session."""
         self.db = db
 
-    # Simple in-memory cache with TTL
-    _cache: dict[str, tuple[str, float]] = {}
-    _TTL_SECONDS = 5.0
+    @staticmethod
+    def get_cached_bool(key: str, default: bool = False) -> bool | None:
+        """キャッシュのみで真偽値を取得（DBアクセスなし）.
+
+        Returns:
+            キャッシュミス時は None（呼び出し側で get_bool() にフォールバック）
+        """
+        raw = system_config_cache.get(key)
+        if isinstance(raw, _Missing):
+            return None
+        return _resolve(raw, str(default).lower()).lower() in _TRUE_VALUES
 
     def get(self, key: str, default: str = "") -> str:
         """設定値を取得 (with TTL Cache).
@@ -29,25 +110,15 @@ class SystemConfigService:
         Returns:
             設定値、存在しない場合はデフォルト値
         """
-        import time
-
-        now = time.time()
-
-        # Check cache
-        if key in self._cache:
-            val, timestamp = self._cache[key]
-            if now - timestamp < self._TTL_SECONDS:
-                return val
-
-        # Fetch from DB
-        config = self.db.query(SystemConfig).filter(SystemConfig.config_key == key).first()
-        val = default
-        if config and config.config_value:
-            val = config.config_value
-
-        # Update cache
-        self._cache[key] = (val, now)
-        return val
+        raw = system_config_cache.get(key)
+        if isinstance(raw, _Missing):
+            raw = (
+                self.db.query(SystemConfig.config_value)
+                .filter(SystemConfig.config_key == key)
+                .scalar()
+            )
+            system_config_cache.put(key, raw)
+        return _resolve(raw, default)
 
     def set(self, key: str, value: str, description: str | None = None) -> SystemConfig:
         """設定値を保存（upsert）.
@@ -80,15 +151,24 @@ class SystemConfigService:
                 description=description,
             )
             self.db.add(config)
+        self._notify_change(key)
         self.db.commit()
         self.db.refresh(config)
 
-        # Invalidate cache
-        if key in self._cache:
-            del self._cache[key]
+        # Invalidate cache (other workers are notified on commit)
+        system_config_cache.invalidate(key)
 
         return config
 
+    def _notify_change(self, key: str) -> None:
+        """他ワーカーへ変更を通知（NOTIFY はコミット時に配信される）."""
+        if self.db.get_bind().dialect.name != "postgresql":
+            return
+        self.db.execute(
+            text("SELECT pg_notify(:channel, :key)"),
+            {"channel": SYSTEM_CONFIG_CHANNEL, "key": key},
+        )
+
     def get_all(self, prefix: str | None = None) -> list[SystemConfig]:
         """全設定値を取得（デフォルト値とDB値をマージ）.
 
@@ -137,7 +217,7 @@ class SystemConfigService:
     def get_bool(self, key: str, default: bool = False) -> bool:
         """真偽値として取得."""
         val = self.get(key, str(default).lower()).lower()
-        return val in ("true", "1", "yes", "on", "t")
+        return val in _TRUE_VALUES
 
     def get_int(self, key: str, default: int = 0) -> int:
         """整数として取得."""
@@ -5,6 +5,7 @@ from typing import cast
 
 from sqlalchemy.orm import Session
 
+from app.application.services.demand.fact_service import DailyDemandFactService
 from app.core.time_utils import utcnow
 from app.infrastructure.persistence.models.auth_models import User
 from app.infrastructure.persistence.models.inventory_models import LotReceipt
@@ -171,6 +172,8 @@ def generate_withdrawals(
 
             withdrawal_count += 1
 
+    # 出庫を直接 INSERT しているため日次需要ファクトを再構築する
+    DailyDemandFactService(db).rebuild()
     db.commit()
     print(
         f"[INFO] Generated {withdrawal_count} withdrawal history records over {history_months} months"
@@ -308,5 +311,7 @@ def _generate_withdrawals_from_patterns(
 
             withdrawal_count += 1
 
+    # 出庫を直接 INSERT しているため日次需要ファクトを再構築する
+    DailyDemandFactService(db).rebuild()
     db.commit()
     print(f"[INFO] Generated {withdrawal_count} withdrawal history records from patterns")
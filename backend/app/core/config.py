@@ -142,6 +142,12 @@ class Settings(BaseSettings):
             raise ValueError("DATABASE_URL must be set")
         return v
 
+    # AsyncSession 用（未指定時は DATABASE_URL のドライバを asyncpg に置き換える）
+    ASYNC_DATABASE_URL: str | None = Field(
+        default=None,
+        validation_alias=AliasChoices("ASYNC_DATABASE_URL", "async_database_url"),
+    )
+
     # CORS設定 - 修正版
     # 環境変数が設定されていない場合はデフォルト値を使用
     # 環境変数がある場合はカンマ区切り文字列として受け取る
@@ -210,6 +216,34 @@ class Settings(BaseSettings):
         ),
     )
 
+    # System config cache (SystemConfigService)
+    SYSTEM_CONFIG_CACHE_TTL_SECONDS: float = Field(
+        default=5.0,
+        validation_alias=AliasChoices(
+            "SYSTEM_CONFIG_CACHE_TTL_SECONDS", "system_config_cache_ttl_seconds"
+        ),
+    )
+    SYSTEM_CONFIG_LISTEN_ENABLED: bool = Field(
+        default=True,
+        validation_alias=AliasChoices(
+            "SYSTEM_CONFIG_LISTEN_ENABLED", "system_config_listen_enabled"
+        ),
+    )
+
+    # Authenticated user cache (get_current_user_optional)
+    USER_PRINCIPAL_CACHE_MAXSIZE: int = Field(
+        default=1024,
+        validation_alias=AliasChoices(
+            "USER_PRINCIPAL_CACHE_MAXSIZE", "user_principal_cache_maxsize"
+        ),
+    )
+    USER_PRINCIPAL_CACHE_TTL_SECONDS: float = Field(
+        default=30.0,
+        validation_alias=AliasChoices(
+            "USER_PRINCIPAL_CACHE_TTL_SECONDS", "user_principal_cache_ttl_seconds"
+        ),
+    )
+
     @model_validator(mode="after")
     def apply_debug_defaults(self):
         if "ENABLE_DB_BROWSER" not in self.model_fields_set and self.ENVIRONMENT != "production":
@@ -251,6 +285,8 @@ class Settings(BaseSettings):
     )
 
     # ファイルアップロード設定
+    # 非同期マスタ取込はジョブワーカーがここからファイルを読むため、
+    # API とワーカーを別ホストで動かす場合は共有ストレージを指定すること
     UPLOAD_DIR: Path = Path(__file__).parent.parent.parent / "uploads"
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
 
@@ -305,6 +341,40 @@ class Settings(BaseSettings):
             "smartread_auto_sync_move_processed",
         ),
     )
+    # ジョブワーカー設定（execution_queue の executor='worker' ジョブ）
+    # False の場合は scripts/run_job_worker.py を別プロセスで起動すること
+    JOB_WORKER_EMBEDDED: bool = Field(
+        default=True,
+        validation_alias=AliasChoices("JOB_WORKER_EMBEDDED", "job_worker_embedded"),
+    )
+    JOB_WORKER_MAX_WORKERS: int = Field(
+        default=4,
+        validation_alias=AliasChoices("JOB_WORKER_MAX_WORKERS", "job_worker_max_workers"),
+    )
+    JOB_WORKER_POLL_INTERVAL_SECONDS: float = Field(
+        default=2.0,
+        validation_alias=AliasChoices(
+            "JOB_WORKER_POLL_INTERVAL_SECONDS", "job_worker_poll_interval_seconds"
+        ),
+    )
+    JOB_WORKER_HEARTBEAT_INTERVAL_SECONDS: float = Field(
+        default=30.0,
+        validation_alias=AliasChoices(
+            "JOB_WORKER_HEARTBEAT_INTERVAL_SECONDS", "job_worker_heartbeat_interval_seconds"
+        ),
+    )
+    JOB_WORKER_STALE_SECONDS: int = Field(
+        default=600,
+        validation_alias=AliasChoices("JOB_WORKER_STALE_SECONDS", "job_worker_stale_seconds"),
+    )
+    # resource_type ごとの同時実行数上限（環境変数は JSON: {"smartread_pad_run": 2}）
+    JOB_WORKER_CONCURRENCY_LIMITS: dict[str, int] = Field(
+        default_factory=lambda: {"smartread_pad_run": 2},
+        validation_alias=AliasChoices(
+            "JOB_WORKER_CONCURRENCY_LIMITS", "job_worker_concurrency_limits"
+        ),
+    )
+
     LOG_JSON_FORMAT: bool = Field(
         default=True,
         validation_alias=AliasChoices("LOG_JSON_FORMAT", "log_json_format"),
@@ -321,6 +391,35 @@ class Settings(BaseSettings):
         default=10,
         validation_alias=AliasChoices("LOG_BACKUP_COUNT", "log_backup_count"),
     )
+    # server_logs 書き込み（バッチ）設定
+    SERVER_LOG_QUEUE_SIZE: int = Field(
+        default=10000,
+        validation_alias=AliasChoices("SERVER_LOG_QUEUE_SIZE", "server_log_queue_size"),
+    )
+    SERVER_LOG_BATCH_SIZE: int = Field(
+        default=100,
+        validation_alias=AliasChoices("SERVER_LOG_BATCH_SIZE", "server_log_batch_size"),
+    )
+    SERVER_LOG_FLUSH_INTERVAL_MS: int = Field(
+        default=500,
+        validation_alias=AliasChoices(
+            "SERVER_LOG_FLUSH_INTERVAL_MS", "server_log_flush_interval_ms"
+        ),
+    )
+
+    # APIメトリクス（MetricsCollector）
+    # 設定するとプロセスごとのスナップショットをこのディレクトリに書き出し、
+    # 読み出し時に全プロセス分を合算する（uvicorn --workers N 用）
+    METRICS_MULTIPROC_DIR: Path | None = Field(
+        default=None,
+        validation_alias=AliasChoices("METRICS_MULTIPROC_DIR", "metrics_multiproc_dir"),
+    )
+    METRICS_FLUSH_INTERVAL_SECONDS: float = Field(
+        default=5.0,
+        validation_alias=AliasChoices(
+            "METRICS_FLUSH_INTERVAL_SECONDS", "metrics_flush_interval_seconds"
+        ),
+    )
 
     # センシティブフィールドのマスキング設定
     LOG_SENSITIVE_FIELDS: list[str] = [
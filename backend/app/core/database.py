@@ -49,7 +49,19 @@
    - 動作: Alembic が「どのマイグレーションまで適用済みか」を記録
    - メリット: データ削除後も、スキーマバージョンが保たれる
 
-5. drop_db() と truncate_all_tables() の使い分け（L101-122）
+5. 非同期セッション（get_async_db）
+   理由: async def のルートから同期 Session を直接使うと、クエリの間
+   イベントループがブロックされ、そのワーカーの全リクエストが直列化する
+   方針:
+   - async def ルート: get_async_db（AsyncSession / asyncpg）を使う
+     既存の同期サービスを呼ぶ場合は await db.run_sync(...) で渡す
+   - 同期 Session が必要なルート: def で定義する
+     （FastAPI がスレッドプールで実行する → ループをブロックしない）
+   - エンジンは初回利用時に生成（ドライバは asyncpg。通常の依存として導入される）
+   - lifespan 終了時に dispose_async_engine() で接続を破棄
+     （asyncpg の接続はイベントループに紐づくため）
+
+6. drop_db() と truncate_all_tables() の使い分け（L101-122）
    drop_db():
    - 用途: スキーマ定義も含めて完全リセット
    - 動作: テーブル構造自体を削除
@@ -61,13 +73,21 @@
    - メリット: マイグレーション不要、高速
 """
 
+from __future__ import annotations
+
 import logging
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 from importlib import import_module
+from typing import TYPE_CHECKING
 
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import Session, sessionmaker
 
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
 from .config import settings
 
 
@@ -95,6 +115,57 @@ def get_db() -> Generator[Session]:
         db.close()
 
 
+# --- Async engine / session ----------------------------------------------
+_async_engine: AsyncEngine | None = None
+_async_session_factory: async_sessionmaker[AsyncSession] | None = None
+
+
+def async_database_url() -> str:
+    """AsyncSession 用の接続URL（postgresql+asyncpg）."""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(settings.DATABASE_URL)
+    if url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+    return url.render_as_string(hide_password=False)
+
+
+def get_async_session_factory() -> async_sessionmaker[AsyncSession]:
+    """AsyncSession のファクトリ（初回呼び出し時にエンジンを生成）."""
+    global _async_engine, _async_session_factory
+    if _async_session_factory is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        _async_engine = create_async_engine(
+            async_database_url(),
+            echo=False,
+            pool_pre_ping=True,
+            pool_recycle=3600,
+        )
+        from app.infrastructure.monitoring.sql_profiler import register_sql_profiler
+
+        register_sql_profiler(_async_engine)
+        _async_session_factory = async_sessionmaker(
+            _async_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_session_factory
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession]:
+    """FastAPI 依存性注入用の非同期DBセッション."""
+    async with get_async_session_factory()() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    """非同期エンジンの接続プールを破棄する（lifespan 終了時）."""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _async_session_factory = None
+
+
 # --- Schema lifecycle -----------------------------------------------------
 def init_db() -> None:
     """Disable Alembic migrations at startup.
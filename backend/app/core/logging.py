@@ -148,12 +148,14 @@ JSON形式でのログ出力、リクエストコンテキスト管理、セン
     - "どこでエラーが発生したか" が一目瞭然
 """
 
+import atexit
 import logging
 import sys
 from contextvars import ContextVar
-from logging.handlers import QueueListener, RotatingFileHandler
+from logging.handlers import RotatingFileHandler
 from pathlib import Path
-from queue import SimpleQueue
+from queue import Queue
+from typing import TYPE_CHECKING
 
 import structlog
 from asgi_correlation_id import correlation_id
@@ -168,7 +170,20 @@ user_id_var: ContextVar[int | None] = ContextVar("user_id", default=None)
 username_var: ContextVar[str | None] = ContextVar("username", default=None)
 
 
-_queue_listener: QueueListener | None = None
+if TYPE_CHECKING:
+    from app.core.server_log_handler import ServerLogBatchWriter
+
+
+_server_log_writer: "ServerLogBatchWriter | None" = None
+_atexit_registered = False
+
+
+def shutdown_server_log_writer() -> None:
+    """Flush pending server_logs rows and stop the background writer."""
+    global _server_log_writer
+    if _server_log_writer:
+        _server_log_writer.stop()
+        _server_log_writer = None
 
 
 class RequestContextFilter(logging.Filter):
@@ -364,15 +379,13 @@ def setup_logging(
         error_handler.setFormatter(formatter)
         root_logger.addHandler(error_handler)
 
-    # DB保存用ログハンドラ（WARNING以上）
-    from app.core.server_log_handler import ServerLogDBHandler, StructlogQueueHandler
+    # DB保存用ログハンドラ（WARNING以上、有界キュー + バッチ書き込み）
+    from app.core.server_log_handler import ServerLogBatchWriter, StructlogQueueHandler
 
-    global _queue_listener
-    if _queue_listener:
-        _queue_listener.stop()
-        _queue_listener = None
+    shutdown_server_log_writer()
 
-    log_queue: SimpleQueue[logging.LogRecord] = SimpleQueue()
+    global _server_log_writer, _atexit_registered
+    log_queue: Queue[logging.LogRecord] = Queue(maxsize=settings.SERVER_LOG_QUEUE_SIZE)
     queue_handler = StructlogQueueHandler(log_queue)
     queue_handler.setLevel(logging.WARNING)
     queue_handler.addFilter(context_filter)
@@ -380,10 +393,18 @@ def setup_logging(
         queue_handler.addFilter(smartread_filter)
     root_logger.addHandler(queue_handler)
 
-    db_handler = ServerLogDBHandler()
-    db_handler.setLevel(logging.WARNING)
-    _queue_listener = QueueListener(log_queue, db_handler, respect_handler_level=True)
-    _queue_listener.start()
+    _server_log_writer = ServerLogBatchWriter(
+        log_queue,
+        batch_size=settings.SERVER_LOG_BATCH_SIZE,
+        flush_interval=settings.SERVER_LOG_FLUSH_INTERVAL_MS / 1000,
+        level=logging.WARNING,
+        queue_handler=queue_handler,
+    )
+    _server_log_writer.start()
+    if not _atexit_registered:
+        # プロセス終了時に未書き込みのログをフラッシュ
+        atexit.register(shutdown_server_log_writer)
+        _atexit_registered = True
 
     # サードパーティライブラリのログレベル調整
     # Uvicornのログフォーマット設定（時刻表示を追加）
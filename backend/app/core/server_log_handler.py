@@ -1,10 +1,32 @@
-"""Server log persistence handler."""
+"""Server log persistence handler.
+
+【設計意図】なぜバッチ書き込みなのか:
+- 以前は WARNING/ERROR 1件ごとにセッションを開いてコミットしていた
+  → 警告が連続すると（例: 引当候補なし）同数のトランザクションが発生する
+- StructlogQueueHandler が有界キューへ積み、ServerLogBatchWriter が
+  バックグラウンドスレッドで N件 または M ミリ秒ごとに一括INSERTする
+- キューが満杯のときは記録を破棄して件数を数え、次回の書き込みで
+  「破棄件数」の行を1件追加する（リクエスト処理をブロックしない）
+- 停止時（stop）はキューを読み切ってから最後のバッチを書き込む
+- 一括INSERTがデータ不正（IntegrityError / DataError）で失敗したときだけ
+  1行ずつ書き直す。接続断などの DB 障害時はバッチを破棄する
+  （行ごとに再試行しても同じ失敗を batch_size 回繰り返し、書き込みスレッドが
+  止まってキューが溢れるだけのため）
+"""
 
 from __future__ import annotations
 
+import json
 import logging
+import queue
+import threading
+import time
 from datetime import UTC, datetime
 from logging.handlers import QueueHandler
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
 
 from app.core.database import SessionLocal
 from app.infrastructure.persistence.models.logs_models import ServerLog
@@ -32,11 +54,35 @@ STANDARD_LOG_FIELDS = {
     "stack_info",
     "thread",
     "threadName",
+    "taskName",
+}
+
+# 専用カラムにあるものはextraから除外
+COLUMN_LOG_FIELDS = {
+    "request_id",
+    "user_id",
+    "username",
+    "method",
+    "path",
+    "event",
+    "timestamp",
+    "level",
+    "logger",
+    "environment",
+    "message",  # messageもカラムにあるのでextraから除外
 }
 
 
 class StructlogQueueHandler(QueueHandler):
-    """QueueHandler that preserves structlog dict in record.msg."""
+    """QueueHandler that preserves structlog dict in record.msg.
+
+    有界キュー使用時、満杯で積めなかった記録は破棄して dropped に数える。
+    """
+
+    def __init__(self, queue: Any) -> None:
+        super().__init__(queue)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
 
     def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
         """Prepare record for queuing.
@@ -59,65 +105,213 @@ class StructlogQueueHandler(QueueHandler):
 
         return record
 
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Enqueue without blocking; count the record as dropped when full."""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def take_dropped(self) -> int:
+        """Return and reset the dropped counter."""
+        with self._dropped_lock:
+            dropped, self.dropped = self.dropped, 0
+        return dropped
+
+
+def _json_safe(value: dict[str, Any]) -> dict[str, Any]:
+    """Make extra JSON-serializable (one bad value must not fail the whole batch)."""
+    safe: dict[str, Any] = json.loads(json.dumps(value, default=str, ensure_ascii=False))
+    return safe
+
+
+def build_server_log_row(record: logging.LogRecord) -> dict[str, Any]:
+    """Convert a log record into a server_logs row."""
+    # Structlogのwrap_for_formatterを使用している場合、
+    # record.msgは辞書（event_dict）になっている可能性がある
+    log_payload = record.msg if isinstance(record.msg, dict) else {}
+
+    # メッセージ/イベントの抽出
+    # structlogでは通常 'event' キーにメッセージが入る
+    message_text = log_payload.get("event") or record.getMessage()
+    event_text = log_payload.get("event") or getattr(record, "event", record.getMessage())
+
+    # extraフィールドの構築
+    # record.msgが辞書ならそれをベースにし、record.__dict__のその他属性をマージ
+    extra_data = {}
+    if isinstance(record.msg, dict):
+        extra_data.update(record.msg)
+
+    # 標準フィールドと重複するものは除外
+    for key, value in record.__dict__.items():
+        if key not in STANDARD_LOG_FIELDS and not key.startswith("_"):
+            extra_data[key] = value
+
+    extra_data = {k: v for k, v in extra_data.items() if k not in COLUMN_LOG_FIELDS}
+
+    return {
+        "created_at": datetime.fromtimestamp(record.created, tz=UTC),
+        "level": record.levelname,
+        "logger": record.name,
+        "event": str(event_text)[:65535] if event_text else None,  # Text型制限考慮
+        "message": str(message_text)[:65535],
+        "request_id": getattr(record, "request_id", log_payload.get("request_id")),
+        "user_id": getattr(record, "user_id", log_payload.get("user_id")),
+        "username": getattr(record, "username", log_payload.get("username")),
+        "method": getattr(record, "method", log_payload.get("method")),
+        "path": getattr(record, "path", log_payload.get("path")),
+        "extra": _json_safe(extra_data) if extra_data else None,
+    }
+
+
+def write_server_log_rows(rows: list[dict[str, Any]]) -> int:
+    """Bulk insert rows in one transaction; fall back to row-by-row on data errors.
+
+    接続エラーなどデータ以外の失敗ではバッチを破棄する（0 を返す）。
+
+    Returns:
+        Number of rows written
+    """
+    if not rows:
+        return 0
+    session = SessionLocal()
+    try:
+        try:
+            session.execute(insert(ServerLog), rows)
+            session.commit()
+            return len(rows)
+        except (IntegrityError, DataError):
+            session.rollback()
+        except Exception:
+            session.rollback()
+            return 0
+
+        written = 0
+        for row in rows:
+            try:
+                session.execute(insert(ServerLog), [row])
+                session.commit()
+                written += 1
+            except (IntegrityError, DataError):
+                session.rollback()
+            except Exception:
+                # 途中で DB 障害になった場合は残りを破棄する
+                session.rollback()
+                break
+        return written
+    finally:
+        session.close()
+
 
 class ServerLogDBHandler(logging.Handler):
-    """Persist WARNING/ERROR logs to the database."""
+    """Persist WARNING/ERROR logs to the database (one row per record).
+
+    通常は ServerLogBatchWriter を使用する。同期書き込みが必要な用途向け。
+    """
 
     def emit(self, record: logging.LogRecord) -> None:
-        session = SessionLocal()
         try:
-            # Structlogのwrap_for_formatterを使用している場合、
-            # record.msgは辞書（event_dict）になっている可能性がある
-            log_payload = record.msg if isinstance(record.msg, dict) else {}
-
-            # メッセージ/イベントの抽出
-            # structlogでは通常 'event' キーにメッセージが入る
-            message_text = log_payload.get("event") or record.getMessage()
-            event_text = log_payload.get("event") or getattr(record, "event", record.getMessage())
-
-            # extraフィールドの構築
-            # record.msgが辞書ならそれをベースにし、record.__dict__のその他属性をマージ
-            extra_data = {}
-            if isinstance(record.msg, dict):
-                extra_data.update(record.msg)
-
-            # 標準フィールドと重複するものは除外
-            for key, value in record.__dict__.items():
-                if key not in STANDARD_LOG_FIELDS and not key.startswith("_"):
-                    extra_data[key] = value
-
-            # 専用カラムにあるものはextraから除外
-            exclude_keys = {
-                "request_id",
-                "user_id",
-                "username",
-                "method",
-                "path",
-                "event",
-                "timestamp",
-                "level",
-                "logger",
-                "environment",
-                "message",  # messageもカラムにあるのでextraから除外
-            }
-            extra_data = {k: v for k, v in extra_data.items() if k not in exclude_keys}
-
-            server_log = ServerLog(
-                created_at=datetime.fromtimestamp(record.created, tz=UTC),
-                level=record.levelname,
-                logger=record.name,
-                event=str(event_text)[:65535] if event_text else None,  # Text型制限考慮
-                message=str(message_text)[:65535],
-                request_id=getattr(record, "request_id", log_payload.get("request_id")),
-                user_id=getattr(record, "user_id", log_payload.get("user_id")),
-                username=getattr(record, "username", log_payload.get("username")),
-                method=getattr(record, "method", log_payload.get("method")),
-                path=getattr(record, "path", log_payload.get("path")),
-                extra=extra_data or None,
+            write_server_log_rows([build_server_log_row(record)])
+        except Exception:
+            self.handleError(record)
+
+
+_STOP = object()
+
+
+class ServerLogBatchWriter:
+    """Drain the log queue on a background thread and bulk-insert server_logs."""
+
+    def __init__(
+        self,
+        log_queue: queue.Queue[Any],
+        *,
+        batch_size: int = 100,
+        flush_interval: float = 0.5,
+        level: int = logging.WARNING,
+        queue_handler: StructlogQueueHandler | None = None,
+    ) -> None:
+        self._queue = log_queue
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.level = level
+        self._queue_handler = queue_handler
+        self._thread: threading.Thread | None = None
+        self.written = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        """Start the background writer thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="server-log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Flush pending records and stop the writer thread."""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        batch: list[logging.LogRecord] = []
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._flush(batch)
+                return
+            if isinstance(item, logging.LogRecord) and item.levelno >= self.level:
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(item)
+
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._flush(batch)
+                batch = []
+
+    def _flush(self, batch: list[logging.LogRecord]) -> None:
+        rows = []
+        for record in batch:
+            try:
+                rows.append(build_server_log_row(record))
+            except Exception:
+                self.failed += 1
+
+        dropped = self._queue_handler.take_dropped() if self._queue_handler else 0
+        if dropped:
+            rows.append(
+                {
+                    "created_at": datetime.now(UTC),
+                    "level": "WARNING",
+                    "logger": __name__,
+                    "event": "Server log records dropped (queue full)",
+                    "message": "Server log records dropped (queue full)",
+                    "request_id": None,
+                    "user_id": None,
+                    "username": None,
+                    "method": None,
+                    "path": None,
+                    "extra": {"dropped": dropped},
+                }
             )
-            session.add(server_log)
-            session.commit()
+
+        if not rows:
+            return
+        try:
+            written = write_server_log_rows(rows)
         except Exception:
-            session.rollback()
-        finally:
-            session.close()
+            written = 0
+        self.written += written
+        self.failed += len(rows) - written
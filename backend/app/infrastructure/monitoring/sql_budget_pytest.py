@@ -0,0 +1,79 @@
+"""pytest plugin: SQL クエリ予算の超過をテスト失敗として扱う.
+
+tests/conftest.py の ``pytest_plugins`` で読み込む。
+
+- テスト実行中に発生した sql_budget の予算超過（デコレータ付きのサービス・
+  エンドポイント、TestClient 経由のリクエストを含む）をテスト失敗にする
+- ``@pytest.mark.sql_budget(max_queries=..., max_repeats=...)`` でテスト本体にも
+  予算を宣言できる（テスト関数の実行部分のみが対象。fixture の準備は含まない）
+- 予算超過そのものを検証するテストは ``sql_budget_violations`` fixture を使う
+  （超過は fixture のリストに集められ、テスト失敗にはならない）
+
+SQL の計測自体は SQL Profiler のイベントリスナーに依存するため、
+対象エンジンに register_sql_profiler が登録済みであること。
+"""
+
+from collections.abc import Generator
+
+import pytest
+
+from app.core.config import settings
+from app.infrastructure.monitoring.sql_profiler import (
+    SQLBudgetViolation,
+    add_budget_listener,
+    remove_budget_listener,
+    sql_budget,
+)
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line(
+        "markers",
+        "sql_budget(max_queries=None, max_repeats=None): fail if the test body exceeds "
+        "the SQL query budget",
+    )
+
+
+def _format(violation: SQLBudgetViolation) -> str:
+    lines = [
+        f"{violation.name}: {violation.query_count} queries (max {violation.max_queries}), "
+        f"same statement {violation.max_repeat_count} times (max {violation.max_repeats})",
+    ]
+    if violation.repeated_sql:
+        lines.append(f"  SQL: {violation.repeated_sql}")
+    lines.extend(f"    at {frame}" for frame in violation.stack or [])
+    return "\n".join(lines)
+
+
+@pytest.fixture
+def sql_budget_violations() -> list[SQLBudgetViolation]:
+    """テスト中の予算超過を受け取るリスト（要求したテストは自分で検証する）."""
+    return []
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item: pytest.Item) -> Generator[None, object, object]:
+    funcargs = getattr(item, "funcargs", {})
+    inspected = "sql_budget_violations" in funcargs
+    violations: list[SQLBudgetViolation] = funcargs["sql_budget_violations"] if inspected else []
+    add_budget_listener(violations.append)
+    marker = item.get_closest_marker("sql_budget")
+    original_enabled = settings.SQL_PROFILER_ENABLED
+    if marker is not None:
+        settings.SQL_PROFILER_ENABLED = True
+    try:
+        if marker is None:
+            result = yield
+        else:
+            with sql_budget(*marker.args, name=item.nodeid, **marker.kwargs):
+                result = yield
+    finally:
+        remove_budget_listener(violations.append)
+        settings.SQL_PROFILER_ENABLED = original_enabled
+
+    if violations and not inspected:
+        pytest.fail(
+            "SQL budget exceeded:\n" + "\n".join(_format(v) for v in violations),
+            pytrace=False,
+        )
+    return result
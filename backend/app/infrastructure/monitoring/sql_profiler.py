@@ -1,10 +1,30 @@
+"""SQL Profiler (リクエスト単位の SQL 計測・N+1 検知・クエリ予算).
+
+【設計意図】なぜクエリ予算（sql_budget）を設けるのか:
+- N+1 はレビューで見落としやすく、件数が少ない開発データでは顕在化しない
+- 「このエンドポイント／サービスは最大 N クエリ」「同一 SQL は最大 M 回」を
+  コード側に宣言しておけば、SQL_PROFILER_ENABLED の環境（テスト含む）で
+  予算超過を構造化ログとして検出できる
+- pytest プラグイン（sql_budget_pytest）は予算超過をテスト失敗として扱い、
+  auto_reserve_bulk や list_lots などホットパスのクエリ数の退行を CI で止める
+
+プロファイラ無効時は sql_budget も何もしない（本番のオーバーヘッドなし）。
+"""
+
 import contextvars
+import functools
+import inspect
 import logging
 import re
+import threading
 import time
+import traceback
 from collections import defaultdict
+from collections.abc import Callable
 from dataclasses import dataclass, field
-from typing import Any
+from pathlib import Path
+from types import TracebackType
+from typing import Any, ParamSpec, TypeVar
 
 from fastapi import Request, Response
 from sqlalchemy import event
@@ -25,6 +45,33 @@ class QueryStats:
     count: int = 0
     total_time: float = 0.0
     example_sql: str = ""
+    # N+1 閾値を超えた時点の呼び出し元（app 配下のフレームのみ）
+    stack: list[str] | None = None
+
+
+@dataclass
+class SQLBudgetViolation:
+    """sql_budget の予算超過 1 件分."""
+
+    name: str
+    query_count: int
+    max_queries: int | None
+    max_repeat_count: int
+    max_repeats: int | None
+    repeated_sql: str = ""
+    stack: list[str] | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """ログ・API 出力用の dict."""
+        return {
+            "name": self.name,
+            "query_count": self.query_count,
+            "max_queries": self.max_queries,
+            "max_repeat_count": self.max_repeat_count,
+            "max_repeats": self.max_repeats,
+            "repeated_sql": self.repeated_sql,
+            "stack": self.stack,
+        }
 
 
 @dataclass
@@ -34,6 +81,7 @@ class RequestStats:
     queries: dict[str, QueryStats] = field(default_factory=lambda: defaultdict(QueryStats))
     total_count: int = 0
     total_time: float = 0.0
+    budget_violations: list[SQLBudgetViolation] = field(default_factory=list)
 
 
 # リクエストごとのSQL統計を保持するContextVar
@@ -41,6 +89,206 @@ _profiler_context: contextvars.ContextVar[RequestStats | None] = contextvars.Con
     "sql_profiler_context", default=None
 )
 
+_APP_ROOT = Path(__file__).resolve().parents[2]
+_PROFILER_DIR = str(Path(__file__).resolve().parent)
+_STACK_DEPTH = 8
+
+
+def _capture_app_stack() -> list[str]:
+    """現在の呼び出し元のうち app 配下のフレームを「path:line in func」で返す."""
+    app_root = str(_APP_ROOT)
+    frames = [
+        f"{Path(frame.filename).relative_to(_APP_ROOT.parent)}:{frame.lineno} in {frame.name}"
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(app_root) and not frame.filename.startswith(_PROFILER_DIR)
+    ]
+    return frames[-_STACK_DEPTH:]
+
+
+# ---------------------------------------------------------------------------
+# Query budget
+# ---------------------------------------------------------------------------
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+_budget_listeners: list[Callable[[SQLBudgetViolation], None]] = []
+
+
+def add_budget_listener(listener: Callable[[SQLBudgetViolation], None]) -> None:
+    """予算超過の通知先を登録する（pytest プラグインが使用）."""
+    _budget_listeners.append(listener)
+
+
+def remove_budget_listener(listener: Callable[[SQLBudgetViolation], None]) -> None:
+    """add_budget_listener で登録した通知先を解除する."""
+    if listener in _budget_listeners:
+        _budget_listeners.remove(listener)
+
+
+class sql_budget:
+    """関数またはブロック内の SQL 実行数に予算を宣言する.
+
+    デコレータ（同期・async 両対応）またはコンテキストマネージャとして使う::
+
+        @sql_budget(max_queries=5)
+        def list_lots(...): ...
+
+        with sql_budget(max_repeats=1, name="bulk insert"):
+            ...
+
+    Args:
+        max_queries: ブロック内の SQL 実行総数の上限
+        max_repeats: 同一の正規化 SQL の実行回数の上限（N+1 検知）
+        name: ログに出す名前（デコレータ使用時は関数の qualname）
+
+    ルートのエンドポイントに付けた場合、SQLProfilerMiddleware は
+    エンドポイント別集計で予算超過件数を数える。
+    """
+
+    def __init__(
+        self,
+        max_queries: int | None = None,
+        max_repeats: int | None = None,
+        *,
+        name: str | None = None,
+    ) -> None:
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+        self.name = name or "sql_budget"
+        self._frames: list[tuple[RequestStats, contextvars.Token | None, int, dict[str, int]]] = []
+
+    def __enter__(self) -> "sql_budget":
+        if not settings.SQL_PROFILER_ENABLED:
+            return self
+        stats = _profiler_context.get()
+        token = None
+        if stats is None:
+            # ミドルウェア外（ワーカー・スクリプト）でも単独で計測できるようにする
+            stats = RequestStats()
+            token = _profiler_context.set(stats)
+        baseline = {sql: qs.count for sql, qs in stats.queries.items()}
+        self._frames.append((stats, token, stats.total_count, baseline))
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        if not self._frames:
+            return
+        stats, token, start_count, baseline = self._frames.pop()
+        if token is not None:
+            _profiler_context.reset(token)
+        if exc_type is None:
+            self._check(stats, start_count, baseline)
+
+    def __call__(self, func: Callable[P, R]) -> Callable[P, R]:
+        if self.name == "sql_budget":
+            self.name = func.__qualname__
+        budget = self
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: P.args, **kwargs: P.kwargs) -> Any:
+                with budget._copy():
+                    return await func(*args, **kwargs)  # type: ignore[misc]
+
+            async_wrapper.__sql_budget__ = budget  # type: ignore[attr-defined]
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            with budget._copy():
+                return func(*args, **kwargs)
+
+        wrapper.__sql_budget__ = budget  # type: ignore[attr-defined]
+        return wrapper
+
+    def _copy(self) -> "sql_budget":
+        # 再入・並行呼び出しで計測状態を共有しないよう呼び出しごとに複製する
+        return sql_budget(self.max_queries, self.max_repeats, name=self.name)
+
+    def _check(self, stats: RequestStats, start_count: int, baseline: dict[str, int]) -> None:
+        query_count = stats.total_count - start_count
+        repeat_count, repeated = 0, None
+        for sql, qs in stats.queries.items():
+            count = qs.count - baseline.get(sql, 0)
+            if count > repeat_count:
+                repeat_count, repeated = count, qs
+
+        over_queries = self.max_queries is not None and query_count > self.max_queries
+        over_repeats = self.max_repeats is not None and repeat_count > self.max_repeats
+        if not (over_queries or over_repeats):
+            return
+
+        violation = SQLBudgetViolation(
+            name=self.name,
+            query_count=query_count,
+            max_queries=self.max_queries,
+            max_repeat_count=repeat_count,
+            max_repeats=self.max_repeats,
+            repeated_sql=repeated.example_sql if repeated else "",
+            stack=(repeated.stack if repeated and repeated.stack else None) or _capture_app_stack(),
+        )
+        stats.budget_violations.append(violation)
+        logger.warning(
+            "SQL budget exceeded",
+            extra={"sql_profiler": {"event": "sql_budget_exceeded", **violation.to_dict()}},
+        )
+        for listener in _budget_listeners:
+            listener(violation)
+
+
+# ---------------------------------------------------------------------------
+# Per-endpoint aggregate
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class EndpointSQLStats:
+    """エンドポイント別の SQL 集計."""
+
+    requests: int = 0
+    total_queries: int = 0
+    max_queries: int = 0
+    total_db_time_ms: float = 0.0
+    n_plus_one_requests: int = 0
+    budget_violations: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        """API 出力用の dict."""
+        return {
+            "requests": self.requests,
+            "avg_queries": round(self.total_queries / self.requests, 2) if self.requests else 0,
+            "max_queries": self.max_queries,
+            "avg_db_time_ms": (
+                round(self.total_db_time_ms / self.requests, 2) if self.requests else 0
+            ),
+            "n_plus_one_requests": self.n_plus_one_requests,
+            "budget_violations": self.budget_violations,
+        }
+
+
+_endpoint_stats: dict[str, EndpointSQLStats] = defaultdict(EndpointSQLStats)
+_endpoint_lock = threading.Lock()
+
+
+def get_endpoint_sql_summary() -> list[dict[str, Any]]:
+    """エンドポイント別の SQL 集計を平均クエリ数の多い順に返す."""
+    with _endpoint_lock:
+        rows = [{"endpoint": key, **value.to_dict()} for key, value in _endpoint_stats.items()]
+    return sorted(rows, key=lambda row: row["avg_queries"], reverse=True)
+
+
+def reset_endpoint_sql_stats() -> None:
+    """エンドポイント別の SQL 集計をクリアする."""
+    with _endpoint_lock:
+        _endpoint_stats.clear()
+
 
 class SQLProfilerMiddleware(BaseHTTPMiddleware):
     """SQL実行を計測し、N+1問題や遅延クエリを検出してログ出力するミドルウェア."""
@@ -64,11 +312,30 @@ class SQLProfilerMiddleware(BaseHTTPMiddleware):
             return response
         finally:
             elapsed_time = (time.perf_counter() - start_time) * 1000
-            self._log_report(request, stats, elapsed_time)
+            has_n_plus_one = self._log_report(request, stats, elapsed_time)
+            self._record_endpoint(request, stats, has_n_plus_one)
             _profiler_context.reset(token)
 
-    def _log_report(self, request: Request, stats: RequestStats, request_elapsed_ms: float) -> None:
-        """集計結果をログに出力する（閾値を超えた場合のみ、または設定による）."""
+    def _record_endpoint(self, request: Request, stats: RequestStats, has_n_plus_one: bool) -> None:
+        """エンドポイント（ルートテンプレート）別の集計に 1 リクエスト分を加算する."""
+        from app.middleware.metrics import route_template
+
+        key = f"{request.method} {route_template(request)}"
+        with _endpoint_lock:
+            endpoint = _endpoint_stats[key]
+            endpoint.requests += 1
+            endpoint.total_queries += stats.total_count
+            endpoint.max_queries = max(endpoint.max_queries, stats.total_count)
+            endpoint.total_db_time_ms += stats.total_time
+            endpoint.n_plus_one_requests += int(has_n_plus_one)
+            endpoint.budget_violations += len(stats.budget_violations)
+
+    def _log_report(self, request: Request, stats: RequestStats, request_elapsed_ms: float) -> bool:
+        """集計結果をログに出力する（閾値を超えた場合のみ、または設定による）.
+
+        Returns:
+            N+1 疑いがあったかどうか
+        """
         # 閾値チェック
         is_slow_db = stats.total_time > settings.SQL_PROFILER_THRESHOLD_TIME
         is_many_queries = stats.total_count > settings.SQL_PROFILER_THRESHOLD_COUNT
@@ -82,7 +349,7 @@ class SQLProfilerMiddleware(BaseHTTPMiddleware):
                         "count": query_stat.count,
                         "time_ms": round(query_stat.total_time, 2),
                         "sql": query_stat.example_sql,  # 正規化されたSQLを出力
-                        # "sql_norm": sql_norm, # 必要なら正規化キーも
+                        "stack": query_stat.stack,
                     }
                 )
 
@@ -90,7 +357,7 @@ class SQLProfilerMiddleware(BaseHTTPMiddleware):
 
         # 何かしらの警告条件に合致した場合のみログ出力（あるいは常にINFO出すかは運用次第）
         # ここでは「閾値超え OR N+1疑い」がある場合に WARNING/INFO を出す方針とする
-        should_log = is_slow_db or is_many_queries or has_n_plus_one
+        should_log = is_slow_db or is_many_queries or has_n_plus_one or stats.budget_violations
 
         if should_log:
             log_payload: dict[str, Any] = {
@@ -104,6 +371,9 @@ class SQLProfilerMiddleware(BaseHTTPMiddleware):
                 "n_plus_one_detected": has_n_plus_one,
             }
 
+            if stats.budget_violations:
+                log_payload["budget_violations"] = [v.to_dict() for v in stats.budget_violations]
+
             if duplicates:
                 log_payload["duplicates"] = sorted(
                     duplicates, key=lambda x: int(x["count"]), reverse=True
@@ -123,10 +393,15 @@ class SQLProfilerMiddleware(BaseHTTPMiddleware):
                     for qs in top_slowest
                 ]
 
-            level = logging.WARNING if (has_n_plus_one or is_slow_db) else logging.INFO
+            level = (
+                logging.WARNING
+                if (has_n_plus_one or is_slow_db or stats.budget_violations)
+                else logging.INFO
+            )
             logger.log(
                 level, f"SQL Profiler Report: {log_payload}", extra={"sql_profiler": log_payload}
             )
+        return has_n_plus_one
 
 
 # 正規化用正規表現
@@ -216,6 +491,9 @@ def after_cursor_execute(
         qs.total_time += duration
         if not qs.example_sql:
             qs.example_sql = normalized_sql  # 初回のみ保存（あるいは常に短い方を保存するなど）
+        # N+1 閾値を超えた瞬間に一度だけ呼び出し元を記録する（以降の実行ではコストなし）
+        if qs.stack is None and qs.count > settings.SQL_PROFILER_N_PLUS_ONE_THRESHOLD:
+            qs.stack = _capture_app_stack()
 
 
 def register_sql_profiler(engine: Engine | Any) -> None:
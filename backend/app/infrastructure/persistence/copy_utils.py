@@ -0,0 +1,78 @@
+"""COPY-based bulk loading helpers (PostgreSQL / psycopg2).
+
+【設計意図】なぜ COPY を使うのか:
+- ORM の db.add() / executemany は1行ごとにパラメータ展開・往復が発生する
+- COPY FROM STDIN は CSV をストリームで送り込むため、数万行でも1往復分のコストで済む
+- 取り込み先は主に一時テーブル（ステージング）で、以降の検証・反映は
+  INSERT ... SELECT / DELETE ... USING などの集合演算で行う
+
+【設計意図】NULL と空文字の区別:
+- csv.QUOTE_NOTNULL で None 以外を引用符付きで書き出す
+  → COPY (FORMAT csv) では引用符なしの空欄が NULL、"" が空文字になる
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+from collections.abc import Iterable, Sequence
+from datetime import date, datetime
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+
+COPY_BATCH_ROWS = 50_000
+"""1回の COPY で送る最大行数（バッファのメモリ上限）."""
+
+
+def _copy_value(value: Any) -> Any:
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    return value
+
+
+def copy_rows(
+    db: Session,
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    *,
+    batch_rows: int = COPY_BATCH_ROWS,
+) -> int:
+    """Load rows into table with COPY FROM STDIN on the session's connection.
+
+    Args:
+        db: セッション（同一トランザクション内で実行される）
+        table: 取り込み先テーブル名（一時テーブル可）
+        columns: 列名（rows の各要素と同じ順序）
+        rows: 行のイテラブル
+        batch_rows: 1回の COPY で送る最大行数
+
+    Returns:
+        Number of rows copied
+    """
+    cursor = db.connection().connection.cursor()
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    total = 0
+    try:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NOTNULL)
+        pending = 0
+        for row in rows:
+            writer.writerow([_copy_value(v) for v in row])
+            pending += 1
+            if pending >= batch_rows:
+                buffer.seek(0)
+                cursor.copy_expert(sql, buffer)
+                total += pending
+                buffer = io.StringIO()
+                writer = csv.writer(buffer, quoting=csv.QUOTE_NOTNULL)
+                pending = 0
+        if pending:
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+            total += pending
+    finally:
+        cursor.close()
+    return total
@@ -15,6 +15,7 @@ from .auth_models import Role, User, UserRole
 from .base_model import Base
 from .calendar_models import CompanyCalendar, HolidayCalendar, OriginalDeliveryCalendar
 from .cloud_flow_models import CloudFlowConfig, CloudFlowJob, CloudFlowJobStatus
+from .daily_demand_fact_model import DailyDemandFact
 from .execution_queue_model import ExecutionQueue
 from .forecast_models import ForecastCurrent, ForecastHistory
 from .inbound_models import ExpectedLot, InboundPlan, InboundPlanLine, InboundPlanStatus
@@ -38,6 +39,7 @@ from .lot_reservations_model import (
     ReservationStateMachine,
     ReservationStatus,
 )
+from .lot_stock_snapshot_model import LotStockSnapshot
 from .maker_models import Maker
 from .masters_models import (
     Customer,
@@ -114,6 +116,7 @@ __all__ = [
     # Inventory
     "LotMaster",
     "LotReceipt",
+    "LotStockSnapshot",
     "LotOriginType",
     "StockMovement",
     "StockTransactionType",
@@ -126,6 +129,7 @@ __all__ = [
     "WithdrawalType",
     "WithdrawalCancelReason",
     "WithdrawalLine",
+    "DailyDemandFact",
     # Reservations
     "LotReservation",
     "ReservationSourceType",
@@ -0,0 +1,93 @@
+"""Daily demand fact model.
+
+出庫実績を (製品, 倉庫, 仕入先, 出庫日, 出庫タイプ) 単位に日次集計した派生テーブル。
+
+【設計意図】なぜ日次集計をテーブルに持つのか:
+- 需要予測（DemandRepository.get_demand_history）と出庫カレンダー
+  （WithdrawalService.get_calendar_summary）は、呼び出しのたびに
+  withdrawals → withdrawal_lines → lot_receipts を結合して ship_date ごとに再集計していた
+  → 発注提案・予測の対象製品数 × 期間分の結合集計が毎回走る
+- daily_demand_facts は集計済みの1日1行（粒度ごと）のみを保持し、
+  読み取りは (supplier_item_id, ship_date) 索引の範囲走査1回で済む
+
+【設計意図】粒度と値:
+- 粒度は (supplier_item_id, warehouse_id, supplier_id, ship_date, withdrawal_type)
+  - supplier_id はロットの仕入先（カレンダーの仕入先フィルタ用）
+  - supplier_item_id / supplier_id はロット側で NULL になりうるため、
+    一意索引は NULLS NOT DISTINCT とする
+- 取消済み出庫・ship_date 未設定の出庫は含めない
+- quantity は withdrawal_lines の数量合計、withdrawal_count は出庫件数
+
+【設計意図】維持方法:
+- WithdrawalService.create_withdrawal / cancel_withdrawal が同一トランザクション内で
+  DailyDemandFactService により差分を加算・減算する
+- それ以外の経路（テストデータ生成・直接のデータ修正）は
+  DailyDemandFactService.rebuild()（scripts/rebuild_daily_demand_facts.py）で再構築する
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import BigInteger, Date, DateTime, Index, Integer, Numeric, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.infrastructure.persistence.models.base_model import Base
+
+
+class DailyDemandFact(Base):
+    """日次需要ファクト（出庫実績の日次集計）."""
+
+    __tablename__ = "daily_demand_facts"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    supplier_item_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    warehouse_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    supplier_id: Mapped[int | None] = mapped_column(
+        BigInteger, nullable=True, comment="ロットの仕入先"
+    )
+    ship_date: Mapped[date] = mapped_column(Date, nullable=False)
+    withdrawal_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    quantity: Mapped[Decimal] = mapped_column(
+        Numeric(15, 3),
+        nullable=False,
+        default=Decimal("0"),
+        server_default=text("0"),
+        comment="出庫数量合計（取消済み出庫を除く）",
+    )
+    withdrawal_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default=text("0"),
+        comment="出庫件数（取消済み出庫を除く）",
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP"),
+        comment="最終更新日時",
+    )
+
+    __table_args__ = (
+        Index(
+            "uq_daily_demand_facts_grain",
+            "supplier_item_id",
+            "ship_date",
+            "warehouse_id",
+            "withdrawal_type",
+            "supplier_id",
+            unique=True,
+            postgresql_nulls_not_distinct=True,
+        ),
+        Index("idx_daily_demand_facts_date", "ship_date", "warehouse_id"),
+        {"comment": "日次需要ファクト（出庫サービスで同一トランザクション更新）"},
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<DailyDemandFact(supplier_item_id={self.supplier_item_id}, "
+            f"warehouse_id={self.warehouse_id}, ship_date={self.ship_date}, "
+            f"withdrawal_type={self.withdrawal_type}, quantity={self.quantity})>"
+        )
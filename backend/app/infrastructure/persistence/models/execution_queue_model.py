@@ -38,6 +38,12 @@ class ExecutionQueue(Base):
         ),
         Index("ix_execution_queue_lookup", "resource_type", "resource_id", "status"),
         Index("ix_execution_queue_created", "status", "created_at"),
+        Index(
+            "ix_execution_queue_worker_pending",
+            "priority",
+            "created_at",
+            postgresql_where=text("status = 'pending' AND executor = 'worker'"),
+        ),
     )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
@@ -51,6 +57,11 @@ class ExecutionQueue(Base):
         String(20), nullable=False, default="pending", server_default=text("'pending'")
     )  # pending, running, completed, failed, cancelled
 
+    # 実行方式: inline（APIプロセス内で実行・完了時に次を起動）/ worker（ジョブワーカーが取得）
+    executor: Mapped[str] = mapped_column(
+        String(20), nullable=False, default="inline", server_default=text("'inline'")
+    )
+
     # 実行要求者
     requested_by_user_id: Mapped[int] = mapped_column(
         BigInteger, ForeignKey("users.id"), nullable=False
@@ -79,6 +90,11 @@ class ExecutionQueue(Base):
     result_message: Mapped[str | None] = mapped_column(Text, nullable=True)
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
 
+    # 進捗（worker 実行時にハンドラが報告する）
+    progress: Mapped[int | None] = mapped_column(Integer, nullable=True)  # 0-100
+    progress_message: Mapped[str | None] = mapped_column(Text, nullable=True)
+    worker_id: Mapped[str | None] = mapped_column(String(100), nullable=True)
+
     # 作成日時
     created_at: Mapped[datetime] = mapped_column(
         DateTime, server_default=text("CURRENT_TIMESTAMP"), nullable=False
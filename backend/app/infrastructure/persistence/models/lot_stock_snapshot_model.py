@@ -0,0 +1,82 @@
+"""Lot stock snapshot model.
+
+ロットごとの在庫集計値（出庫済み・確定予約・仮予約）を保持する派生テーブル。
+
+【設計意図】なぜ集計値をテーブルに持つのか:
+- v_lot_available_qty / v_lot_receipt_stock / v_lot_details は参照のたびに
+  lot_reservations と withdrawal_lines を全件集計していた
+  → 在庫一覧・候補ロット検索・ロット一覧のすべてが集計コストを払う
+- lot_stock_snapshot はロット単位の集計結果のみを保持し、ビューはこれを結合する
+  → received_quantity / locked_quantity は lot_receipts の行から直接読む（集計不要）
+
+【設計意図】なぜDBトリガーで維持するのか:
+- 予約・確定・取消・出庫は ORM、バルクINSERT、UPDATE文など複数の経路で書き込まれる
+  → アプリ側フックでは漏れが出る
+- lot_reservations / withdrawal_lines / withdrawals のステートメントトリガーが
+  同一トランザクション内で refresh_lot_stock_snapshot() を呼び、対象ロットを再集計する
+  （定義は sql/views/create_views.sql）
+- 再集計前にスナップショット行をロックするため、同時更新でも後勝ちの取りこぼしがない
+- 在庫調整は lot_receipts.received_quantity を直接更新するため対象外
+
+整合性は LotStockSnapshotService.find_drift() でライブ集計と比較できる。
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Numeric, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.infrastructure.persistence.models.base_model import Base
+
+
+class LotStockSnapshot(Base):
+    """ロット在庫集計スナップショット（トリガー維持）."""
+
+    __tablename__ = "lot_stock_snapshot"
+    __table_args__ = {
+        "comment": "ロット在庫集計スナップショット（トリガーで同一トランザクション更新）"
+    }
+
+    lot_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("lot_receipts.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    withdrawn_quantity: Mapped[Decimal] = mapped_column(
+        Numeric(15, 3),
+        nullable=False,
+        default=Decimal("0"),
+        server_default=text("0"),
+        comment="出庫済み数量（取消済み出庫を除く）",
+    )
+    confirmed_reserved_quantity: Mapped[Decimal] = mapped_column(
+        Numeric(15, 3),
+        nullable=False,
+        default=Decimal("0"),
+        server_default=text("0"),
+        comment="確定予約数量（CONFIRMED）",
+    )
+    active_reserved_quantity: Mapped[Decimal] = mapped_column(
+        Numeric(15, 3),
+        nullable=False,
+        default=Decimal("0"),
+        server_default=text("0"),
+        comment="仮予約数量（ACTIVE）",
+    )
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP"),
+        comment="最終再集計日時",
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<LotStockSnapshot(lot_id={self.lot_id}, "
+            f"withdrawn={self.withdrawn_quantity}, "
+            f"confirmed={self.confirmed_reserved_quantity}, "
+            f"active={self.active_reserved_quantity})>"
+        )
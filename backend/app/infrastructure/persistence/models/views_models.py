@@ -40,6 +40,7 @@ class VLotAvailableQty(Base):
     - 期限切れのロットを除外
     - ロックされていないロット
     - 利用可能なロットのみ
+    - 出庫・確定予約の集計値は lot_stock_snapshot から取得
     """
 
     __tablename__ = "v_lot_available_qty"
@@ -142,6 +143,7 @@ class VLotDetails(Base):
     ロット詳細情報を提供するビュー。
     - lots テーブルをベースに、products, warehouses, suppliers を JOIN
     - 在庫数量（current_quantity, allocated_quantity, available_quantity）を含む
+      （出庫・予約の集計値は lot_stock_snapshot から取得）
     - 消費期限までの日数（days_to_expiry）を算出
     - 論理削除されたマスタ参照時はCOALESCEでフォールバック値を設定
     """
@@ -3,10 +3,10 @@ from __future__ import annotations
 import logging
 from collections.abc import Sequence
 from datetime import date, timedelta
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING, Any, cast
 
 from sqlalchemy import Select, select
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Query, Session, joinedload
 
 from app.infrastructure.persistence.models import (
     LotReceipt,
@@ -59,16 +59,14 @@ class LotRepository:
        - 自動車部品の適切な出庫順を保証
        - 並行引当時のデータ整合性を保証
 
-    4. なぜ利用可能数量をPython側で計算するのか
-       理由: ロジックの一元管理とテスタビリティ
+    4. 利用可能数量の計算
+       理由: ロジックの一元管理とN+1の回避
        設計:
-       - stock_calculation.get_available_quantity() に委譲
-       → 利用可能数量の計算ロジックを1箇所に集約
-       トレードオフ:
-       - パフォーマンス: N+1問題のリスク
-       - メリット: 計算ロジックの一貫性、テストの容易性
-       将来の改善:
-       - 大量ロット処理時はSQLビューで集計
+       - 引当候補: ロック取得（SELECT ... FOR UPDATE）の後に get_confirmed_reserved_quantities() で
+         候補ロット分をまとめて集計（ロック文に集計を含めると古いスナップショットで計算される）
+       - 在庫ありロット検索: stock_calculation.get_available_quantities() で一括計算
+       → 計算式（received - confirmed reserved - locked）は stock_calculation と同一
+       → ロット数に比例したクエリは発生しない
 
     5. joinedload() の使用（L33, L189）
        理由: N+1問題の防止
@@ -155,12 +153,7 @@ class LotRepository:
           2. テスト容易性（計算ロジックを独立してテスト可能）
           3. 保守性（計算ルール変更時の影響範囲を限定）
 
-        トレードオフ:
-        - パフォーマンス: N+1問題の可能性（ロット数が多いと遅い）
-        - メリット: 正確性とロジックの一貫性を優先
-
-        将来の改善案:
-        - 大量ロット処理時は、バッチで利用可能数量を計算するSQLビューを作成
+        確定予約数量は get_available_quantities() でロット分をまとめて1クエリで集計する。
 
         Args:
             product_code: Product code to filter by
@@ -206,14 +199,13 @@ class LotRepository:
         lots = list(self.db.execute(stmt).scalars().all())
 
         # Filter by available quantity using lot_reservations
-        # 【重要】利用可能数量の計算をstock_calculationサービスに委譲
+        # 【重要】利用可能数量の計算をstock_calculationサービスに委譲（1クエリで一括計算）
         from app.application.services.inventory.stock_calculation import (
-            get_available_quantity,
+            get_available_quantities,
         )
 
-        available_lots = [
-            lot for lot in lots if float(get_available_quantity(self.db, lot)) > min_quantity
-        ]
+        available = get_available_quantities(self.db, lots)
+        available_lots = [lot for lot in lots if float(available[lot.id]) > min_quantity]
         logger.debug(
             "Available lots found",
             extra={
@@ -318,21 +310,183 @@ class LotRepository:
             },
         )
 
+        # 確定予約数量は find_allocation_candidates_for_products() でロック取得後にまとめて集計する
+        # （ロットごとに get_available_quantity() を呼ぶとロット数 + 1 クエリになる）
+        candidates = self.find_allocation_candidates_for_products(
+            [supplier_item_id],
+            policy=policy,
+            lock_mode=lock_mode,
+            warehouse_ids=[warehouse_id] if warehouse_id is not None else None,
+            exclude_expired=exclude_expired,
+            safety_days=safety_days,
+            exclude_locked=exclude_locked,
+            include_sample=include_sample,
+            include_adhoc=include_adhoc,
+            min_available_qty=min_available_qty,
+        ).get(supplier_item_id, [])
+
+        logger.debug(
+            "Allocation candidates found",
+            extra={
+                "supplier_item_id": supplier_item_id,
+                "candidates_returned": len(candidates),
+            },
+        )
+
+        return candidates
+
+    def find_allocation_candidates_for_products(
+        self,
+        supplier_item_ids: Sequence[int],
+        *,
+        policy: AllocationPolicy,
+        lock_mode: LockMode,
+        warehouse_ids: Sequence[int] | None = None,
+        exclude_expired: bool = True,
+        safety_days: int = 0,
+        exclude_locked: bool = True,
+        include_sample: bool = False,
+        include_adhoc: bool = False,
+        min_available_qty: float = 0.0,
+    ) -> dict[int, list[LotCandidate]]:
+        """Fetch allocation candidates for multiple products in one statement.
+
+        find_allocation_candidates() と同じ抽出条件・ソート順で、複数製品分の候補を
+        1クエリで取得（ロック）し、確定予約数量は候補ロット分を1クエリで集計する。
+        製品数・ロット数に関わらず2クエリで済む。
+
+        【設計意図】なぜウィンドウ関数（ROW_NUMBER() OVER (PARTITION BY ...)）を使わないのか:
+        理由: PostgreSQL は FOR UPDATE とウィンドウ関数を同一クエリで併用できない
+        → 本番引当（FOR UPDATE）でも同じメソッドを使えるよう、
+          (supplier_item_id, ポリシー順) の複合ORDER BYで製品ごとの並び順を確定させる
+        → 結果を製品単位に振り分けるだけで、各リストはポリシー順に整列済み
+
+        Args:
+            supplier_item_ids: Product IDs to fetch candidates for
+            policy: Sorting policy (FEFO or FIFO)
+            lock_mode: Database locking mode
+            warehouse_ids: Optional warehouse filter (None = all warehouses)
+            exclude_expired: Exclude lots past expiry date
+            safety_days: Safety margin in days before expiry (default: 0)
+            exclude_locked: Exclude lots with locked_quantity > 0
+            include_sample: Include sample origin lots
+            include_adhoc: Include adhoc origin lots
+            min_available_qty: Minimum available quantity threshold
+
+        Returns:
+            Dict mapping supplier_item_id to candidates sorted by policy
+            (products without candidates are omitted)
+        """
+        from decimal import Decimal
+
+        from app.application.services.inventory.stock_calculation import (
+            get_confirmed_reserved_quantities,
+        )
+        from app.domain.lot import LotCandidate
+
+        product_ids = sorted(set(supplier_item_ids))
+        if not product_ids:
+            return {}
+        if warehouse_ids is not None and not warehouse_ids:
+            return {}
+
+        query = self._build_candidate_query(
+            policy=policy,
+            lock_mode=lock_mode,
+            warehouse_id=None,
+            exclude_expired=exclude_expired,
+            safety_days=safety_days,
+            exclude_locked=exclude_locked,
+            include_sample=include_sample,
+            include_adhoc=include_adhoc,
+            order_prefix=(LotReceipt.supplier_item_id.asc(),),
+        ).filter(LotReceipt.supplier_item_id.in_(product_ids))
+        if warehouse_ids is not None:
+            query = query.filter(LotReceipt.warehouse_id.in_(sorted(set(warehouse_ids))))
+
+        lots: list[LotReceipt] = query.all()
+
+        # 【設計意図】なぜ予約数量をロック取得とは別の文で集計するのか:
+        #
+        # 1. ロック取得のタイミング
+        #    → WITH FOR UPDATEはLotテーブルに対して発行
+        #    → READ COMMITTED では文ごとにスナップショットを取るため、ロック文に集計を含めると
+        #      ロック待ちの間にコミットされた予約が集計に反映されない（過剰引当の原因になる）
+        #    → ロック取得後にPython側でフィルタすることで、最新の予約状況を反映
+        #
+        # 2. N+1 の回避
+        #    → 集計は候補ロット分をまとめて1クエリ（get_confirmed_reserved_quantities）
+        #
+        # available = received_quantity - confirmed reserved - locked
+        # (stock_calculation.get_available_quantity と同じ式)
+        reserved = get_confirmed_reserved_quantities(self.db, (lot.id for lot in lots))
+        result: dict[int, list[LotCandidate]] = {}
+        for lot in lots:
+            available = float(
+                (lot.received_quantity or Decimal(0))
+                - reserved[lot.id]
+                - (lot.locked_quantity or Decimal(0))
+            )
+            if available <= min_available_qty:
+                continue
+
+            result.setdefault(cast(int, lot.supplier_item_id), []).append(
+                LotCandidate(
+                    lot_id=lot.id,
+                    lot_code=lot.lot_number or "",
+                    lot_number=lot.lot_number or "",
+                    product_code=lot.supplier_item.maker_part_no if lot.supplier_item else "",
+                    warehouse_code=lot.warehouse.warehouse_code if lot.warehouse else "",
+                    available_qty=available,
+                    expiry_date=lot.expiry_date,
+                    receipt_date=lot.received_date,
+                )
+            )
+
+        logger.debug(
+            "Batch allocation candidates found",
+            extra={
+                "product_count": len(product_ids),
+                "total_lots_queried": len(lots),
+                "products_with_candidates": len(result),
+            },
+        )
+
+        return result
+
+    def _build_candidate_query(
+        self,
+        *,
+        policy: AllocationPolicy,
+        lock_mode: LockMode,
+        warehouse_id: int | None,
+        exclude_expired: bool,
+        safety_days: int,
+        exclude_locked: bool,
+        include_sample: bool,
+        include_adhoc: bool,
+        order_prefix: Sequence[Any] = (),
+    ) -> Query[Any]:
+        """Build the shared candidate query (filters, ordering and locking).
+
+        単一製品版・複数製品版の引当候補検索で同じ抽出条件を使うための共通ビルダー。
+        製品条件は呼び出し側で追加する。order_prefix はポリシー順より前に付くソートキー。
+        """
         # Build base query using db.query() for session compatibility
         from sqlalchemy import nulls_last
 
         from app.domain.allocation_policy import AllocationPolicy, LockMode
-        from app.domain.lot import LotCandidate
 
-        query = (
+        query: Query[Any] = (
             self.db.query(LotReceipt)
-            .filter(
-                LotReceipt.supplier_item_id == supplier_item_id,
-                LotReceipt.status == "active",
+            .filter(LotReceipt.status == "active")
+            .options(
+                joinedload(LotReceipt.supplier_item),
+                joinedload(LotReceipt.warehouse),
+                # LotCandidate 変換時の lot_number 参照で遅延ロードが走らないようにする
+                joinedload(LotReceipt.lot_master),
             )
-            .options(joinedload(LotReceipt.supplier_item), joinedload(LotReceipt.warehouse))
         )
-
         # Warehouse filter
         if warehouse_id is not None:
             query = query.filter(LotReceipt.warehouse_id == warehouse_id)
@@ -391,6 +545,8 @@ class LotRepository:
         #    理由: 同じ入荷日・有効期限のロットが複数存在する可能性
         #    → IDがないと、ソート順が不定（DBによって結果が変わる）
         #    → テストの再現性、デバッグの容易性のため、決定的なソートが必須
+        if order_prefix:
+            query = query.order_by(*order_prefix)
         if policy == AllocationPolicy.FEFO:
             query = query.order_by(
                 nulls_last(LotReceipt.expiry_date.asc()),  # Expiry date first, NULL last
@@ -409,58 +565,4 @@ class LotRepository:
         elif lock_mode == LockMode.FOR_UPDATE_SKIP_LOCKED:
             query = query.with_for_update(skip_locked=True, of=LotReceipt)
 
-        lots = query.all()
-
-        # Filter by available quantity and convert to LotCandidate
-        # 【設計意図】なぜSQLではなくPython側で利用可能数量をフィルタするのか:
-        #
-        # 理由:
-        # 1. 利用可能数量は動的計算（lot_reservationsテーブルから集計）
-        #    → SQLでサブクエリを書くとクエリが複雑化・パフォーマンス劣化
-        #    → stock_calculationサービスに委譲することで、ロジックを一元管理
-        #
-        # 2. ロック取得のタイミング
-        #    → WITH FOR UPDATEはLotテーブルに対して発行
-        #    → 利用可能数量の計算時にlot_reservationsも参照するが、別トランザクション
-        #    → ロック取得後にPython側でフィルタすることで、正確な数量を取得
-        #
-        # 3. テスタビリティ
-        #    → 利用可能数量の計算ロジックを独立してテスト可能
-        #    → リポジトリ層とサービス層の責務分離
-        #
-        # トレードオフ:
-        # - パフォーマンス: N+1問題の可能性（ロット数×予約数の計算）
-        # - 精度: ロック取得後の計算で、最新の予約状況を反映
-        from app.application.services.inventory.stock_calculation import (
-            get_available_quantity,
-        )
-
-        candidates: list[LotCandidate] = []
-        for lot in lots:
-            available = float(get_available_quantity(self.db, lot))
-            if available <= min_available_qty:
-                continue
-
-            candidates.append(
-                LotCandidate(
-                    lot_id=lot.id,
-                    lot_code=lot.lot_number or "",
-                    lot_number=lot.lot_number or "",
-                    product_code=lot.supplier_item.maker_part_no if lot.supplier_item else "",
-                    warehouse_code=lot.warehouse.warehouse_code if lot.warehouse else "",
-                    available_qty=available,
-                    expiry_date=lot.expiry_date,
-                    receipt_date=lot.received_date,
-                )
-            )
-
-        logger.debug(
-            "Allocation candidates found",
-            extra={
-                "supplier_item_id": supplier_item_id,
-                "total_lots_queried": len(lots),
-                "candidates_returned": len(candidates),
-            },
-        )
-
-        return candidates
+        return query
@@ -228,14 +228,38 @@ async def lifespan(_app: FastAPI):
     check_alembic_revision_on_startup()
     check_data_integrity_on_startup()
 
+    config_listener = None
+    if settings.SYSTEM_CONFIG_LISTEN_ENABLED and settings.DATABASE_URL.startswith("postgresql"):
+        from app.application.services.system_config_listener import SystemConfigChangeListener
+        from app.core.database import engine
+
+        config_listener = SystemConfigChangeListener(engine)
+        config_listener.start()
+
     auto_sync_runner = None
     if settings.SMARTREAD_AUTO_SYNC_ENABLED:
         auto_sync_runner = SmartReadAutoSyncRunner()
         auto_sync_runner.start()
         app.state.smartread_auto_sync = auto_sync_runner
+
+    job_worker = None
+    if settings.JOB_WORKER_EMBEDDED:
+        from app.application.services.jobs import JobWorker
+
+        job_worker = JobWorker()
+        job_worker.start()
+        app.state.job_worker = job_worker
     yield
+    if job_worker:
+        # 実行中ジョブの完了は待たない（heartbeat 途絶後に detect_stale で回収される）
+        job_worker.stop(wait=False)
     if auto_sync_runner:
         await auto_sync_runner.stop()
+    if config_listener:
+        config_listener.stop()
+    from app.core.database import dispose_async_engine
+
+    await dispose_async_engine()
     logger.info("👋 アプリケーションを終了しています...")
 
 
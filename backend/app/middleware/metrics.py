@@ -18,13 +18,13 @@ APIパフォーマンスメトリクスを収集。
    - メトリクス収集で定量的に把握
    → P95, P99レスポンスタイムで異常検出
 
-2. EndpointMetrics の設計（L25-110）
+2. EndpointMetrics の設計
    理由: エンドポイントごとの詳細メトリクスを記録
    フィールド:
    - request_count: 総リクエスト数
    - error_count: エラー数
    - total_duration_ms: 総処理時間
-   - response_times: レスポンスタイム履歴（最新1000件）
+   - histogram: レスポンスタイムの対数バケットヒストグラム（LatencyHistogram）
    - status_codes: ステータスコード分布
    - last_request_time: 最終リクエスト日時
    メリット:
@@ -34,19 +34,20 @@ APIパフォーマンスメトリクスを収集。
    - 「受注一覧API」が遅いと判明
    → クエリ最適化の優先順位決定
 
-3. response_times の最新1000件制限（L54-56）
-   理由: メモリリーク防止
+3. なぜ対数バケットヒストグラム（HDR 方式）なのか
+   以前: 直近1000件のレスポンスタイムをリストに保持し、
+         記録のたびにスライス、P95 計算のたびに statistics.quantiles でソート
    問題:
-   - 全リクエストの履歴を保持
-   → 長時間稼働でメモリ不足
+   - 1000件より古いデータは失われ、P99 は直近の少数サンプルに左右される
+   - パーセンタイル計算が O(n log n)、しかもグローバルロック保持中に実行
+   - 生の値の列はプロセス間で合算できない
    解決:
-   - 最新1000件のみ保持
-   → メモリ使用量を一定に保つ
-   トレードオフ:
-   - 1000件より古いデータは失われる
-   → しかし、統計計算には十分（P95, P99も正確）
+   - 0.01ms〜1時間を公比 1.04 の対数バケット（約500個）に分けて件数だけを数える
+   → メモリはエンドポイントごとに固定、記録は O(1)、パーセンタイルは O(バケット数)
+   → 相対誤差は約4%以内（最小値・最大値は正確に保持）
+   → 件数の足し算だけで合算できる（スレッド間・プロセス間）
 
-4. get_percentile_duration() の設計（L78-99）
+4. パーセンタイルの計算（get_percentile_duration）
    理由: 異常値を含む場合でもパフォーマンスを正確に把握
    問題:
    - 平均値: 1件の極端に遅いリクエストで歪む
@@ -54,42 +55,32 @@ APIパフォーマンスメトリクスを収集。
    解決:
    - P95（95パーセンタイル）: 95%のリクエストはこの値以下
    - P99: 99%のリクエストはこの値以下
-   → 異常値を除外した現実的なパフォーマンス指標
-   業務的意義:
-   - 通常時のパフォーマンス把握
-   - SLA（Service Level Agreement）設定の根拠
+   → 起動以降の全リクエストを対象に、累積件数を先頭から走査して求める
 
-5. MetricsCollector のシングルトンパターン（L112-130）
+5. MetricsCollector のシングルトンとスレッド別シャード
    理由: アプリケーション全体で1つのメトリクス収集器
-   問題:
-   - 各ミドルウェアインスタンスが別々にメトリクス保持
-   → データが分散、集計不可能
-   解決:
-   - シングルトンパターン
-   → 全エンドポイントのメトリクスを1箇所に集約
    実装:
    - __new__() メソッドでインスタンス制御
-   - スレッドセーフ: Lock() で排他制御
+   - 記録はスレッドごとのシャード（threading.local）に書き込む
+   → 各シャードの書き込み元は1スレッドだけなので、記録経路にロックは不要
+   - ロックを取るのはシャードの新規作成時と読み出し（合算）時のみ
    メリット:
+   - リクエストごとのロック競合がなくなる（同期ルートはスレッドプールで並行実行される）
    - 全体のリクエスト数、エラー率を集計可能
-   - /api/admin/metrics で一括取得
 
-6. なぜスレッドセーフ実装なのか（L116, L149）
-   理由: FastAPIの非同期処理での安全性
-   背景:
-   - FastAPI: 複数のリクエストを並行処理
-   → 複数のスレッドが同時にメトリクスを更新
-   問題:
-   - Lock なし: 競合状態（Race Condition）
-   → request_count が不正確（カウント漏れ）
-   解決:
-   - Lock() で排他制御
-   → 同時アクセスを順序化、データ整合性保証
-   パフォーマンス影響:
-   - Lock のオーバーヘッドは微小（ナノ秒オーダー）
-   → メトリクス収集の正確性 > わずかな遅延
+6. プロセス間の合算（METRICS_MULTIPROC_DIR）
+   理由: uvicorn --workers N ではメトリクスがプロセスごとに分散する
+   実装:
+   - 設定時、各プロセスが自分の合算結果を METRICS_MULTIPROC_DIR/metrics-<pid>.json に
+     一定間隔（METRICS_FLUSH_INTERVAL_SECONDS）で書き出す（一時ファイル → rename）
+   - 読み出し時は自プロセス分をメモリから、他プロセス分をファイルから読み合算する
+   - 終了したプロセスのファイルも残す（カウンタは累積値のため）。reset で削除
+   出力:
+   - /api/admin/metrics: JSON サマリー（管理画面）
+   - /api/admin/metrics?format=prometheus（または Accept: text/plain）:
+     Prometheus テキスト形式（http_requests_total / http_request_duration_seconds）
 
-7. get_summary() の設計（L164-200）
+7. get_summary() の設計
    理由: 管理画面でのメトリクス表示用
    出力:
    - total_requests: 総リクエスト数
@@ -105,12 +96,12 @@ APIパフォーマンスメトリクスを収集。
    - /api/admin/metrics エンドポイントで提供
    - 管理画面でのパフォーマンスダッシュボード表示
 
-8. MetricsMiddleware の dispatch() 設計（L220-246）
+8. MetricsMiddleware の dispatch() 設計
    理由: 各リクエストのレスポンスタイム測定
    処理フロー:
-   1. start_time = time.time() （開始時刻記録）
+   1. start_time = time.perf_counter() （開始時刻記録）
    2. response = await call_next(request) （リクエスト処理）
-   3. duration_ms = (time.time() - start_time) * 1000 （経過時間計算）
+   3. duration_ms = (time.perf_counter() - start_time) * 1000 （経過時間計算）
    4. collector.record_request(...) （メトリクス記録）
    5. return response
    重要:
@@ -131,7 +122,7 @@ APIパフォーマンスメトリクスを収集。
    - ユーザー視点での実際のレスポンスタイム
    - ミドルウェア自体のオーバーヘッドも測定
 
-10. reset_metrics() の用途（L202-205）
+10. reset_metrics() の用途
     理由: テスト環境やメンテナンス時のリセット
     用途:
     - 統合テスト前にメトリクスクリア
@@ -142,24 +133,134 @@ APIパフォーマンスメトリクスを収集。
     → 新しい月の性能データを収集
 """
 
+import json
 import logging
+import math
+import os
+import re
+import threading
 import time
 from collections import defaultdict
 from dataclasses import dataclass, field
-from datetime import datetime
-from statistics import StatisticsError, median, quantiles
-from threading import Lock
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, cast
 
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.requests import Request
 from starlette.responses import Response
 from starlette.types import ASGIApp
 
-from app.core.time_utils import utcnow
+from app.core.config import settings
 
 
 logger = logging.getLogger(__name__)
 
+# 対数バケットの範囲と公比（ミリ秒）
+HISTOGRAM_MIN_MS = 0.01
+HISTOGRAM_MAX_MS = 3_600_000.0
+HISTOGRAM_GROWTH = 1.04
+_INV_LOG_GROWTH = 1.0 / math.log(HISTOGRAM_GROWTH)
+HISTOGRAM_BUCKETS = int(math.log(HISTOGRAM_MAX_MS / HISTOGRAM_MIN_MS) * _INV_LOG_GROWTH) + 2
+
+# Prometheus histogram の le 境界（秒）
+PROMETHEUS_BUCKETS_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# ルートに一致しなかったリクエスト（404 等）のパスをまとめるラベル
+UNMATCHED_PATH = "<unmatched>"
+
+
+def bucket_index(value_ms: float) -> int:
+    """Return the histogram bucket for value_ms.
+
+    Bucket 0 holds values below HISTOGRAM_MIN_MS; bucket i (>= 1) holds
+    [MIN * GROWTH**(i-1), MIN * GROWTH**i).
+    """
+    if value_ms < HISTOGRAM_MIN_MS:
+        return 0
+    index = int(math.log(value_ms / HISTOGRAM_MIN_MS) * _INV_LOG_GROWTH) + 1
+    return index if index < HISTOGRAM_BUCKETS else HISTOGRAM_BUCKETS - 1
+
+
+def bucket_upper_bound(index: int) -> float:
+    """Upper bound (ms, exclusive) of bucket index."""
+    return HISTOGRAM_MIN_MS * HISTOGRAM_GROWTH**index
+
+
+class LatencyHistogram:
+    """Fixed-size log-bucketed latency histogram (ms)."""
+
+    __slots__ = ("counts", "max_ms", "min_ms", "total")
+
+    def __init__(self) -> None:
+        self.counts = [0] * HISTOGRAM_BUCKETS
+        self.total = 0
+        self.min_ms = math.inf
+        self.max_ms = 0.0
+
+    def record(self, value_ms: float) -> None:
+        """Record one observation."""
+        self.counts[bucket_index(value_ms)] += 1
+        self.total += 1
+        self.min_ms = min(self.min_ms, value_ms)
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add other's counts into this histogram."""
+        counts = self.counts
+        for i, n in enumerate(other.counts):
+            if n:
+                counts[i] += n
+        self.total += other.total
+        self.min_ms = min(self.min_ms, other.min_ms)
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def value_at_percentile(self, percentile: float) -> float:
+        """Return the value at percentile (0-100) in O(buckets).
+
+        Returns the upper bound of the bucket holding the ranked observation,
+        clamped to the observed min/max.
+        """
+        if self.total == 0:
+            return 0.0
+        if percentile <= 0:
+            return self.min_ms
+        rank = max(1, math.ceil(self.total * percentile / 100))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(max(bucket_upper_bound(i), self.min_ms), self.max_ms)
+        return self.max_ms
+
+    def count_below(self, upper_ms: float) -> int:
+        """Count observations in buckets whose upper bound is <= upper_ms."""
+        last = bucket_index(upper_ms)
+        if bucket_upper_bound(last) > upper_ms:
+            last -= 1
+        return sum(self.counts[: last + 1])
+
+    def to_snapshot(self) -> dict[str, Any]:
+        """Sparse, JSON-serialisable form."""
+        return {
+            "buckets": {str(i): n for i, n in enumerate(self.counts) if n},
+            "total": self.total,
+            "min_ms": None if self.total == 0 else self.min_ms,
+            "max_ms": self.max_ms,
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: dict[str, Any]) -> "LatencyHistogram":
+        """Inverse of to_snapshot."""
+        histogram = cls()
+        for i, n in data.get("buckets", {}).items():
+            histogram.counts[int(i)] = n
+        histogram.total = data.get("total", 0)
+        if data.get("min_ms") is not None:
+            histogram.min_ms = data["min_ms"]
+        histogram.max_ms = data.get("max_ms", 0.0)
+        return histogram
+
 
 @dataclass
 class EndpointMetrics:
@@ -170,9 +271,9 @@ class EndpointMetrics:
     request_count: int = 0
     error_count: int = 0
     total_duration_ms: float = 0.0
-    response_times: list[float] = field(default_factory=list)
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
     status_codes: dict[int, int] = field(default_factory=lambda: defaultdict(int))
-    last_request_time: datetime | None = None
+    last_request_ts: float | None = None
 
     def add_request(self, duration_ms: float, status_code: int):
         """リクエストメトリクスを追加.
@@ -183,16 +284,31 @@ class EndpointMetrics:
         """
         self.request_count += 1
         self.total_duration_ms += duration_ms
-        self.response_times.append(duration_ms)
+        self.histogram.record(duration_ms)
         self.status_codes[status_code] += 1
-        self.last_request_time = utcnow()
+        self.last_request_ts = time.time()
 
         if status_code >= 400:
             self.error_count += 1
 
-        # メモリ節約: 最新1000件のみ保持
-        if len(self.response_times) > 1000:
-            self.response_times = self.response_times[-1000:]
+    def merge(self, other: "EndpointMetrics") -> None:
+        """他シャード・他プロセスのメトリクスを合算."""
+        self.request_count += other.request_count
+        self.error_count += other.error_count
+        self.total_duration_ms += other.total_duration_ms
+        self.histogram.merge(other.histogram)
+        # 他スレッドが書き込み中のシャードでも安全なように list 化してから走査
+        for code, count in list(other.status_codes.items()):
+            self.status_codes[code] += count
+        if other.last_request_ts is not None:
+            self.last_request_ts = max(self.last_request_ts or 0.0, other.last_request_ts)
+
+    @property
+    def last_request_time(self) -> datetime | None:
+        """最終リクエスト日時（UTC）."""
+        if self.last_request_ts is None:
+            return None
+        return datetime.fromtimestamp(self.last_request_ts, UTC)
 
     def get_average_duration(self) -> float:
         """平均レスポンスタイムを取得.
@@ -210,32 +326,18 @@ class EndpointMetrics:
         Returns:
             中央値レスポンスタイム（ミリ秒）
         """
-        if not self.response_times:
-            return 0.0
-        return median(self.response_times)
+        return self.histogram.value_at_percentile(50)
 
-    def get_percentile_duration(self, percentile: int) -> float:
+    def get_percentile_duration(self, percentile: float) -> float:
         """パーセンタイルレスポンスタイムを取得.
 
         Args:
             percentile: パーセンタイル（95, 99など）
 
         Returns:
-            パーセンタイルレスポンスタイム（ミリ秒）
+            パーセンタイルレスポンスタイム（ミリ秒、相対誤差は約4%以内）
         """
-        if not self.response_times or len(self.response_times) < 2:
-            return 0.0
-
-        try:
-            # quantilesは[0.0, 1.0]の範囲で計算
-            n = 100  # 100分割
-            qs = quantiles(self.response_times, n=n)
-            # percentile番目の値を取得（インデックスは0始まり）
-            index = min(percentile - 1, len(qs) - 1)
-            return qs[index]
-        except (StatisticsError, ValueError, IndexError) as e:
-            logger.warning(f"Failed to calculate percentile: {e}")
-            return 0.0
+        return self.histogram.value_at_percentile(percentile)
 
     def get_error_rate(self) -> float:
         """エラー率を取得.
@@ -247,27 +349,81 @@ class EndpointMetrics:
             return 0.0
         return self.error_count / self.request_count
 
+    def to_snapshot(self) -> dict[str, Any]:
+        """JSON に書き出せる形式に変換."""
+        return {
+            "endpoint": self.endpoint,
+            "method": self.method,
+            "request_count": self.request_count,
+            "error_count": self.error_count,
+            "total_duration_ms": self.total_duration_ms,
+            "histogram": self.histogram.to_snapshot(),
+            "status_codes": {str(k): v for k, v in self.status_codes.items()},
+            "last_request_ts": self.last_request_ts,
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: dict[str, Any]) -> "EndpointMetrics":
+        """to_snapshot の逆変換."""
+        metrics = cls(
+            endpoint=data["endpoint"],
+            method=data["method"],
+            request_count=data["request_count"],
+            error_count=data["error_count"],
+            total_duration_ms=data["total_duration_ms"],
+            histogram=LatencyHistogram.from_snapshot(data["histogram"]),
+            last_request_ts=data.get("last_request_ts"),
+        )
+        for code, count in data.get("status_codes", {}).items():
+            metrics.status_codes[int(code)] = count
+        return metrics
+
+
+def _merge_into(target: dict[str, EndpointMetrics], key: str, source: EndpointMetrics) -> None:
+    merged = target.get(key)
+    if merged is None:
+        merged = target[key] = EndpointMetrics(endpoint=source.endpoint, method=source.method)
+    merged.merge(source)
+
 
 class MetricsCollector:
     """メトリクスコレクター（シングルトン）."""
 
     _instance: "MetricsCollector | None" = None
-    _lock = Lock()
+    _lock = threading.Lock()
 
     # Instance attributes (set in __new__)
-    metrics: dict[str, EndpointMetrics]
-    data_lock: Lock
+    data_lock: threading.Lock
+    _local: threading.local
+    _shards: list[dict[str, EndpointMetrics]]
+    _generation: int
+    _last_flush: float
 
     def __new__(cls):
         """シングルトンパターン."""
         if cls._instance is None:
             with cls._lock:
                 if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-                    cls._instance.metrics = {}
-                    cls._instance.data_lock = Lock()
+                    instance = super().__new__(cls)
+                    instance.data_lock = threading.Lock()
+                    instance._local = threading.local()
+                    instance._shards = []
+                    instance._generation = 0
+                    instance._last_flush = time.monotonic()
+                    cls._instance = instance
         return cls._instance
 
+    def _shard(self) -> dict[str, EndpointMetrics]:
+        """呼び出しスレッド専用のシャードを返す（reset 後は作り直す）."""
+        local = self._local
+        if getattr(local, "generation", None) != self._generation:
+            shard: dict[str, EndpointMetrics] = {}
+            with self.data_lock:
+                self._shards.append(shard)
+                local.generation = self._generation
+            local.shard = shard
+        return cast(dict[str, EndpointMetrics], local.shard)
+
     def record_request(
         self,
         method: str,
@@ -275,30 +431,91 @@ class MetricsCollector:
         duration_ms: float,
         status_code: int,
     ):
-        """リクエストを記録.
+        """リクエストを記録（ロックなし: スレッド別シャードに書き込む）.
 
         Args:
             method: HTTPメソッド
-            path: エンドポイントパス
+            path: エンドポイントパス（ルートのパステンプレート）
             duration_ms: レスポンスタイム（ミリ秒）
             status_code: HTTPステータスコード
         """
         key = f"{method} {path}"
-
+        shard = self._shard()
+        metrics = shard.get(key)
+        if metrics is None:
+            metrics = shard[key] = EndpointMetrics(endpoint=path, method=method)
+        metrics.add_request(duration_ms, status_code)
+
+        if settings.METRICS_MULTIPROC_DIR is not None:
+            now = time.monotonic()
+            if now - self._last_flush >= settings.METRICS_FLUSH_INTERVAL_SECONDS:
+                self._last_flush = now
+                self.flush()
+
+    def _collect_local(self) -> dict[str, EndpointMetrics]:
+        """このプロセスの全シャードを合算."""
+        merged: dict[str, EndpointMetrics] = {}
         with self.data_lock:
-            if key not in self.metrics:
-                self.metrics[key] = EndpointMetrics(endpoint=path, method=method)
-
-            self.metrics[key].add_request(duration_ms, status_code)
+            shards = list(self._shards)
+        for shard in shards:
+            for key, metrics in list(shard.items()):
+                _merge_into(merged, key, metrics)
+        return merged
+
+    # ------------------------------------------------------------------
+    # Multiprocess mode
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _snapshot_path(directory: Path, pid: int) -> Path:
+        return directory / f"metrics-{pid}.json"
+
+    def flush(self) -> None:
+        """自プロセスのメトリクスを METRICS_MULTIPROC_DIR に書き出す."""
+        directory = settings.METRICS_MULTIPROC_DIR
+        if directory is None:
+            return
+        snapshot = {key: m.to_snapshot() for key, m in self._collect_local().items()}
+        path = self._snapshot_path(directory, os.getpid())
+        tmp_path = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps(snapshot), encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError:
+            logger.warning("Failed to write metrics snapshot", exc_info=True)
+
+    def _collect_other_processes(self, merged: dict[str, EndpointMetrics]) -> None:
+        directory = settings.METRICS_MULTIPROC_DIR
+        if directory is None or not directory.is_dir():
+            return
+        own = self._snapshot_path(directory, os.getpid())
+        for path in sorted(directory.glob("metrics-*.json")):
+            if path == own:
+                continue
+            try:
+                snapshot = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                logger.warning("Skipping unreadable metrics snapshot", extra={"path": str(path)})
+                continue
+            for key, data in snapshot.items():
+                _merge_into(merged, key, EndpointMetrics.from_snapshot(data))
+
+    # ------------------------------------------------------------------
+    # Read API
+    # ------------------------------------------------------------------
 
     def get_all_metrics(self) -> dict[str, EndpointMetrics]:
-        """全メトリクスを取得.
+        """全メトリクスを取得（スレッド・プロセスを合算）.
 
         Returns:
             エンドポイントごとのメトリクス
         """
-        with self.data_lock:
-            return dict(self.metrics)
+        merged = self._collect_local()
+        if settings.METRICS_MULTIPROC_DIR is not None:
+            self.flush()
+            self._collect_other_processes(merged)
+        return merged
 
     def get_summary(self) -> dict:
         """メトリクスサマリーを取得.
@@ -306,42 +523,108 @@ class MetricsCollector:
         Returns:
             メトリクスサマリー
         """
-        with self.data_lock:
-            total_requests = sum(m.request_count for m in self.metrics.values())
-            total_errors = sum(m.error_count for m in self.metrics.values())
-
-            return {
-                "total_requests": total_requests,
-                "total_errors": total_errors,
-                "error_rate": total_errors / total_requests if total_requests > 0 else 0.0,
-                "endpoints_count": len(self.metrics),
-                "endpoints": [
-                    {
-                        "endpoint": f"{m.method} {m.endpoint}",
-                        "request_count": m.request_count,
-                        "error_count": m.error_count,
-                        "error_rate": m.get_error_rate(),
-                        "avg_duration_ms": round(m.get_average_duration(), 2),
-                        "median_duration_ms": round(m.get_median_duration(), 2),
-                        "p95_duration_ms": round(m.get_percentile_duration(95), 2),
-                        "p99_duration_ms": round(m.get_percentile_duration(99), 2),
-                        "status_codes": dict(m.status_codes),
-                        "last_request_time": (
-                            m.last_request_time.isoformat() if m.last_request_time else None
-                        ),
-                    }
-                    for m in sorted(
-                        self.metrics.values(),
-                        key=lambda x: x.request_count,
-                        reverse=True,
-                    )
-                ],
-            }
+        metrics = self.get_all_metrics()
+        total_requests = sum(m.request_count for m in metrics.values())
+        total_errors = sum(m.error_count for m in metrics.values())
+
+        return {
+            "total_requests": total_requests,
+            "total_errors": total_errors,
+            "error_rate": total_errors / total_requests if total_requests > 0 else 0.0,
+            "endpoints_count": len(metrics),
+            "endpoints": [
+                {
+                    "endpoint": f"{m.method} {m.endpoint}",
+                    "request_count": m.request_count,
+                    "error_count": m.error_count,
+                    "error_rate": m.get_error_rate(),
+                    "avg_duration_ms": round(m.get_average_duration(), 2),
+                    "median_duration_ms": round(m.get_median_duration(), 2),
+                    "p95_duration_ms": round(m.get_percentile_duration(95), 2),
+                    "p99_duration_ms": round(m.get_percentile_duration(99), 2),
+                    "status_codes": dict(m.status_codes),
+                    "last_request_time": (
+                        m.last_request_time.isoformat() if m.last_request_time else None
+                    ),
+                }
+                for m in sorted(
+                    metrics.values(),
+                    key=lambda x: x.request_count,
+                    reverse=True,
+                )
+            ],
+        }
+
+    def render_prometheus(self) -> str:
+        """Prometheus テキスト形式（version 0.0.4）で出力."""
+        metrics = sorted(self.get_all_metrics().values(), key=lambda m: (m.endpoint, m.method))
+        lines = [
+            "# HELP http_requests_total Total HTTP requests.",
+            "# TYPE http_requests_total counter",
+        ]
+        for m in metrics:
+            for code, count in sorted(m.status_codes.items()):
+                labels = _labels(method=m.method, path=m.endpoint, status=str(code))
+                lines.append(f"http_requests_total{{{labels}}} {count}")
+
+        lines += [
+            "# HELP http_request_duration_seconds HTTP request latency.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for m in metrics:
+            base = _labels(method=m.method, path=m.endpoint)
+            for le in PROMETHEUS_BUCKETS_SECONDS:
+                count = m.histogram.count_below(le * 1000)
+                lines.append(f'http_request_duration_seconds_bucket{{{base},le="{le}"}} {count}')
+            lines.append(
+                f'http_request_duration_seconds_bucket{{{base},le="+Inf"}} {m.request_count}'
+            )
+            lines.append(
+                f"http_request_duration_seconds_sum{{{base}}} {m.total_duration_ms / 1000:.6f}"
+            )
+            lines.append(f"http_request_duration_seconds_count{{{base}}} {m.request_count}")
+        return "\n".join(lines) + "\n"
 
     def reset_metrics(self):
         """メトリクスをリセット."""
         with self.data_lock:
-            self.metrics.clear()
+            self._generation += 1
+            self._shards = []
+        directory = settings.METRICS_MULTIPROC_DIR
+        if directory is not None and directory.is_dir():
+            for path in directory.glob("metrics-*.json"):
+                path.unlink(missing_ok=True)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels.items())
+
+
+def route_template(request: Request) -> str:
+    """集計用のパス（一致したルートのパステンプレート）を返す.
+
+    /api/lots/123 → /api/lots/{lot_id}。ID ごとに系列が増え続けないようにする。
+    値からテンプレートを復元するとパラメータ値と同じ固定セグメントも置換してしまうため、
+    ルーティングが設定した scope["route"]（FastAPI の APIRoute）の path_format を使う。
+    ルートに一致しなかったリクエストは UNMATCHED_PATH にまとめる。
+    """
+    route = request.scope.get("route")
+    template = getattr(route, "path_format", None)
+    if not isinstance(template, str):
+        return UNMATCHED_PATH
+    # FastAPI のバージョンによっては include_router のプレフィックスを付けない元のルートが
+    # scope に入る。その場合は実パスのうちルートに一致した部分より前をプレフィックスとする
+    path_regex: re.Pattern[str] | None = getattr(route, "path_regex", None)
+    path: str = request.scope.get("path", "")
+    if path_regex is not None and not path_regex.match(path):
+        match = re.search(path_regex.pattern.removeprefix("^"), path)
+        if match:
+            return path[: match.start()] + template
+    return template
 
 
 class MetricsMiddleware(BaseHTTPMiddleware):
@@ -366,18 +649,18 @@ class MetricsMiddleware(BaseHTTPMiddleware):
         Returns:
             HTTPレスポンス
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         # リクエストを処理
         response = await call_next(request)
 
         # レスポンスタイムを計算
-        duration_ms = (time.time() - start_time) * 1000
+        duration_ms = (time.perf_counter() - start_time) * 1000
 
         # メトリクスを記録
         self.collector.record_request(
             method=request.method,
-            path=request.url.path,
+            path=route_template(request),
             duration_ms=duration_ms,
             status_code=response.status_code,
         )
@@ -13,6 +13,15 @@ from app.core.security import decode_access_token
 logger = logging.getLogger(__name__)
 
 
+def _load_maintenance_mode() -> bool:
+    # Note: Middleware runs before dependency injection, so we manually create a session
+    db = SessionLocal()
+    try:
+        return SystemConfigService(db).get_bool(ConfigKeys.MAINTENANCE_MODE)
+    finally:
+        db.close()
+
+
 class MaintenanceMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next: RequestResponseEndpoint):
         # Allow health checks and static files
@@ -35,44 +44,37 @@ class MaintenanceMiddleware(BaseHTTPMiddleware):
             return await call_next(request)
 
         # Check maintenance mode
-        # Note: Middleware runs before dependency injection, so we manually create a session
-        db = SessionLocal()
-        try:
-            config_service = SystemConfigService(db)
-            # Use run_in_threadpool to avoid blocking the async event loop with sync DB call
-            is_maintenance = await run_in_threadpool(
-                config_service.get_bool, ConfigKeys.MAINTENANCE_MODE
-            )
+        # キャッシュヒット時はセッションを開かない（ミス時のみスレッドプールでDB参照）
+        is_maintenance = SystemConfigService.get_cached_bool(ConfigKeys.MAINTENANCE_MODE)
+        if is_maintenance is None:
+            is_maintenance = await run_in_threadpool(_load_maintenance_mode)
 
-            if is_maintenance:
-                # Check if user is admin
-                auth_header = request.headers.get("Authorization")
-                if auth_header and auth_header.startswith("Bearer "):
-                    token = auth_header.split(" ")[1]
-                    try:
-                        # Simple verification to get roles
-                        payload = decode_access_token(token)
-                        if payload:
-                            roles = payload.get("roles", [])
-                            if "admin" in roles:
-                                return await call_next(request)
-                    except Exception:
-                        # Log unexpected errors during token verification
-                        # Note: decode_access_token already handles jwt.PyJWTError internally
-                        logger.warning(
-                            "Unexpected error during maintenance mode auth check",
-                            exc_info=True,
-                            extra={"path": request.url.path},
-                        )
+        if is_maintenance:
+            # Check if user is admin
+            auth_header = request.headers.get("Authorization")
+            if auth_header and auth_header.startswith("Bearer "):
+                token = auth_header.split(" ")[1]
+                try:
+                    # Simple verification to get roles
+                    payload = decode_access_token(token)
+                    if payload:
+                        roles = payload.get("roles", [])
+                        if "admin" in roles:
+                            return await call_next(request)
+                except Exception:
+                    # Log unexpected errors during token verification
+                    # Note: decode_access_token already handles jwt.PyJWTError internally
+                    logger.warning(
+                        "Unexpected error during maintenance mode auth check",
+                        exc_info=True,
+                        extra={"path": request.url.path},
+                    )
 
-                # If we get here, maintenance mode is on and user is not admin
-                return JSONResponse(
-                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                    content={"detail": "System is under maintenance. Please try again later."},
-                    headers={"Retry-After": "300"},
-                )
-
-        finally:
-            db.close()
+            # If we get here, maintenance mode is on and user is not admin
+            return JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"detail": "System is under maintenance. Please try again later."},
+                headers={"Retry-After": "300"},
+            )
 
         return await call_next(request)
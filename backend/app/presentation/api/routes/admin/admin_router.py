@@ -4,7 +4,8 @@ import logging
 from datetime import date
 from typing import cast
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
@@ -326,15 +327,30 @@ def get_allocatable_lots(
 
 @router.get("/metrics")
 def get_metrics(
+    request: Request,
+    output_format: str | None = Query(
+        default=None, alias="format", description="prometheus: Prometheus テキスト形式"
+    ),
     current_admin=Depends(get_current_admin),  # Only admin can view metrics
 ):
     """パフォーマンスメトリクスを取得.
 
     APIエンドポイントごとのリクエスト数、エラー率、レスポンスタイムなどを返す。
+    format=prometheus、または Accept が application/json を含まず text/plain /
+    application/openmetrics-text を含む場合（Prometheus のスクレイプ）は
+    Prometheus テキスト形式で返す。
     """
     from app.middleware.metrics import MetricsCollector
 
     collector = MetricsCollector()
+    accept = request.headers.get("accept", "")
+    scrape = "application/json" not in accept and (
+        "text/plain" in accept or "application/openmetrics-text" in accept
+    )
+    if output_format == "prometheus" or (output_format is None and scrape):
+        return PlainTextResponse(
+            collector.render_prometheus(), media_type="text/plain; version=0.0.4"
+        )
     return collector.get_summary()
 
 
@@ -360,6 +376,35 @@ def reset_metrics(
     return {"message": "メトリクスをリセットしました"}
 
 
+@router.get("/sql-profile")
+def get_sql_profile(
+    current_admin=Depends(get_current_admin),  # Only admin can view SQL profile
+):
+    """エンドポイント別の SQL 集計を取得.
+
+    SQL Profiler 有効時に記録された、エンドポイント（ルートテンプレート）ごとの
+    リクエスト数・平均/最大クエリ数・平均DB時間・N+1 疑いの件数・クエリ予算超過の件数を
+    平均クエリ数の多い順に返す。
+    """
+    from app.infrastructure.monitoring.sql_profiler import get_endpoint_sql_summary
+
+    return {
+        "enabled": settings.SQL_PROFILER_ENABLED,
+        "endpoints": get_endpoint_sql_summary(),
+    }
+
+
+@router.post("/sql-profile/reset")
+def reset_sql_profile(
+    current_admin=Depends(get_current_admin),  # Only admin can reset SQL profile
+):
+    """エンドポイント別の SQL 集計をリセット."""
+    from app.infrastructure.monitoring.sql_profiler import reset_endpoint_sql_stats
+
+    reset_endpoint_sql_stats()
+    return {"message": "SQL集計をリセットしました"}
+
+
 def _seed_admin_user(db: Session) -> None:
     """初期管理者ユーザーと必要なロールを作成する."""
     # 1. ロールの作成（存在しない場合）
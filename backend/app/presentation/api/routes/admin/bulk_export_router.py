@@ -3,29 +3,40 @@
 Provides endpoints for:
 - Listing available export targets
 - Downloading multiple exports as a single ZIP file
+
+【設計意図】ZIP はストリーミングで返す:
+- 各対象の行はサーバーサイドカーソルで EXPORT_CHUNK_SIZE 件ずつ取得する
+- CSV / XLSX への変換と ZIP への書き込みは StreamingZipExport が行い、
+  書き込まれたバイト列をチャンク単位でクライアントへ送る
+  → ピークメモリは対象テーブルの件数に依存しない
 """
 
-import io
-import zipfile
+from collections.abc import Iterator
 from typing import Any
 
 from fastapi import APIRouter, Depends, Query
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import Session, joinedload
 
-from app.application.services.forecasts.forecast_service import ForecastService
+from app.application.services.common.streaming_export import StreamingZipExport
 from app.application.services.inventory.lot_service import LotService
 from app.application.services.masters.customer_items_service import CustomerItemsService
-from app.application.services.masters.customer_service import CustomerService
 from app.application.services.masters.product_mappings_service import (
     ProductMappingsService,
 )
-from app.application.services.masters.supplier_service import SupplierService
-from app.application.services.masters.warehouse_service import WarehouseService
 from app.application.services.orders.order_service import OrderService
 from app.core.database import get_db
-from app.infrastructure.persistence.models import DeliveryPlace
+from app.infrastructure.persistence.models import (
+    Customer,
+    CustomerItemDeliverySetting,
+    DeliveryPlace,
+    ForecastCurrent,
+    ProductUomConversion,
+    Warehouse,
+    WarehouseDeliveryRoute,
+)
 from app.infrastructure.persistence.models.auth_models import User
 from app.infrastructure.persistence.models.masters_models import Supplier
 from app.infrastructure.persistence.models.supplier_item_model import SupplierItem
@@ -41,6 +52,9 @@ from app.presentation.schemas.masters.supplier_items_schema import SupplierItemR
 
 router = APIRouter(prefix="/bulk-export", tags=["bulk-export"])
 
+EXPORT_CHUNK_SIZE = 1000
+"""サーバーサイドカーソルで一度に取得する行数."""
+
 
 class ExportTarget(BaseModel):
     """Exportable target definition."""
@@ -84,195 +98,177 @@ EXPORT_TARGETS: list[dict[str, str]] = [
 ]
 
 
-def _get_export_data(db: Session, target: str) -> tuple[list[dict[str, Any]], str]:
-    """Get export data for a specific target.
+def _iter_models(db: Session, stmt: Select) -> Iterator[Any]:
+    """Execute stmt with a server-side cursor and yield ORM entities."""
+    return iter(db.execute(stmt.execution_options(yield_per=EXPORT_CHUNK_SIZE)).scalars())
 
-    Returns:
-        Tuple of (data_list, filename)
+
+def _active(model: Any) -> Select:
+    """select(model) with the BaseService.get_all soft-delete filter, ordered by id."""
+    stmt = select(model)
+    if getattr(model, "__soft_delete__", False):
+        stmt = stmt.where(model.valid_to > func.current_date())
+    return stmt.order_by(model.id)
+
+
+def _iter_export_rows(db: Session, target: str) -> Iterator[dict[str, Any]]:
+    """Yield export rows for a specific target.
+
+    行はサーバーサイドカーソル（yield_per）で EXPORT_CHUNK_SIZE 件ずつ取得し、
+    1行ずつ dict に変換して返す（対象全体をリストに載せない）。
     """
     if target == "customers":
-        customer_service = CustomerService(db)
-        customer_list = customer_service.get_all(limit=10000)
-        data = [CustomerResponse.model_validate(c).model_dump() for c in customer_list]
-        return data, "customers"
+        for c in _iter_models(db, _active(Customer)):
+            yield CustomerResponse.model_validate(c).model_dump()
+        return
 
     if target == "products":
-        from sqlalchemy.orm import joinedload
-
-        # Fetch all supplier items with supplier info join
-        results = (
-            db.query(SupplierItem)
-            .options(joinedload(SupplierItem.supplier))
+        stmt = (
+            select(SupplierItem)
             .join(Supplier, SupplierItem.supplier_id == Supplier.id)
-            .all()
+            .options(joinedload(SupplierItem.supplier))
+            .order_by(SupplierItem.id)
         )
-        data = []
-        for si in results:
-            # SupplierItemResponse handles supplier_code/supplier_name if present in the object
-            # Our query might need adjustment if they are not joined properties
+        for si in _iter_models(db, stmt):
             item_dict = SupplierItemResponse.model_validate(si).model_dump()
             # Ensure supplier info is included even if relation not eager-loaded
             if si.supplier:
                 item_dict["supplier_code"] = si.supplier.supplier_code
                 item_dict["supplier_name"] = si.supplier.supplier_name
-            data.append(item_dict)
-        return data, "products"
+            yield item_dict
+        return
 
     if target == "suppliers":
-        supplier_service = SupplierService(db)
-        supplier_list = supplier_service.get_all(limit=10000)
-        data = [SupplierResponse.model_validate(s).model_dump() for s in supplier_list]
-        return data, "suppliers"
+        for s in _iter_models(db, _active(Supplier)):
+            yield SupplierResponse.model_validate(s).model_dump()
+        return
 
     if target == "warehouses":
-        warehouse_service = WarehouseService(db)
-        warehouse_list = warehouse_service.get_all(limit=10000)
-        data = [WarehouseResponse.model_validate(w).model_dump() for w in warehouse_list]
-        return data, "warehouses"
+        for w in _iter_models(db, _active(Warehouse)):
+            yield WarehouseResponse.model_validate(w).model_dump()
+        return
 
     if target == "delivery_places":
-        from sqlalchemy import func
-
-        # Use direct query like delivery_places_router does
-        delivery_place_list = (
-            db.query(DeliveryPlace).filter(DeliveryPlace.valid_to > func.current_date()).all()
-        )
-        data = [DeliveryPlaceResponse.model_validate(d).model_dump() for d in delivery_place_list]
-        return data, "delivery_places"
+        for d in _iter_models(db, _active(DeliveryPlace)):
+            yield DeliveryPlaceResponse.model_validate(d).model_dump()
+        return
 
     if target == "product_mappings":
-        pm_service = ProductMappingsService(db)
-        return pm_service.get_export_data(), "product_mappings"
+        yield from ProductMappingsService(db).iter_export_data(EXPORT_CHUNK_SIZE)
+        return
 
     if target == "customer_items":
-        ci_service = CustomerItemsService(db)
-        customer_item_list = ci_service.list_enriched(limit=10000)
-        # CustomerItem is SQLAlchemy model, need schema validation
         from app.presentation.schemas.masters.customer_items_schema import CustomerItemResponse
 
-        data = [
-            CustomerItemResponse.model_validate(item).model_dump() for item in customer_item_list
-        ]
-        return data, "customer_items"
+        for item in CustomerItemsService(db).iter_enriched(EXPORT_CHUNK_SIZE):
+            yield CustomerItemResponse.model_validate(item).model_dump()
+        return
 
     if target == "uom_conversions":
-        from sqlalchemy import select
-
-        from app.infrastructure.persistence.models.masters_models import (
-            ProductUomConversion,
+        uom_query = (
+            select(
+                ProductUomConversion.conversion_id,
+                ProductUomConversion.supplier_item_id,
+                ProductUomConversion.external_unit,
+                ProductUomConversion.factor,
+                SupplierItem.internal_unit,
+                SupplierItem.maker_part_no,
+                SupplierItem.display_name,
+            )
+            .join(SupplierItem, ProductUomConversion.supplier_item_id == SupplierItem.id)
+            .order_by(ProductUomConversion.conversion_id)
+            .execution_options(yield_per=EXPORT_CHUNK_SIZE)
         )
-
-        uom_query = select(
-            ProductUomConversion.conversion_id,
-            ProductUomConversion.supplier_item_id,
-            ProductUomConversion.external_unit,
-            ProductUomConversion.factor,
-            SupplierItem.internal_unit,
-            SupplierItem.maker_part_no,
-            SupplierItem.display_name,
-        ).join(SupplierItem, ProductUomConversion.supplier_item_id == SupplierItem.id)
-
-        uom_results = db.execute(uom_query).all()
-        data = [
-            {
+        for r in db.execute(uom_query):
+            yield {
                 "conversion_id": r.conversion_id,
                 "supplier_item_id": r.supplier_item_id,
                 "external_unit": r.external_unit,
                 "factor": float(r.factor),
                 "internal_unit": r.internal_unit,
-                # "base_unit": r.base_unit, # Optional if needed
                 "product_code": r.maker_part_no,
                 "product_name": r.display_name,
             }
-            for r in uom_results
-        ]
-        return data, "uom_conversions"
+        return
 
     if target == "warehouse_delivery_routes":
-        from sqlalchemy import select
-
-        from app.infrastructure.persistence.models.masters_models import WarehouseDeliveryRoute
-
-        wdr_query = select(WarehouseDeliveryRoute)
-        routes = db.execute(wdr_query).scalars().all()
-        # Reuse internal router's builder function logic
-        data = []
-        for route in routes:
-            # supplier_item_id is optional FK to supplier_items
-            # Load SupplierItem if supplier_item_id exists
-            product_name = None
-            maker_part_no = None
-            if route.supplier_item_id:
-                supplier_item = (
-                    db.query(SupplierItem).filter(SupplierItem.id == route.supplier_item_id).first()
-                )
-                if supplier_item:
-                    product_name = supplier_item.display_name
-                    maker_part_no = supplier_item.maker_part_no
-
-            data.append(
-                {
-                    "warehouse_code": route.warehouse.warehouse_code if route.warehouse else None,
-                    "warehouse_name": route.warehouse.warehouse_name if route.warehouse else None,
-                    "delivery_place_code": (
-                        route.delivery_place.delivery_place_code if route.delivery_place else None
-                    ),
-                    "delivery_place_name": (
-                        route.delivery_place.delivery_place_name if route.delivery_place else None
-                    ),
-                    "product_name": product_name,
-                    "maker_part_no": maker_part_no,
-                    "transport_lead_time_days": route.transport_lead_time_days,
-                    "notes": route.notes,
-                }
+        # 倉庫・納入先・製品は外部結合で1クエリにまとめる（ルートごとの追加クエリなし）
+        wdr_query = (
+            select(
+                Warehouse.warehouse_code,
+                Warehouse.warehouse_name,
+                DeliveryPlace.delivery_place_code,
+                DeliveryPlace.delivery_place_name,
+                SupplierItem.display_name,
+                SupplierItem.maker_part_no,
+                WarehouseDeliveryRoute.transport_lead_time_days,
+                WarehouseDeliveryRoute.notes,
             )
-        return data, "warehouse_delivery_routes"
+            .outerjoin(Warehouse, WarehouseDeliveryRoute.warehouse_id == Warehouse.id)
+            .outerjoin(DeliveryPlace, WarehouseDeliveryRoute.delivery_place_id == DeliveryPlace.id)
+            .outerjoin(SupplierItem, WarehouseDeliveryRoute.supplier_item_id == SupplierItem.id)
+            .order_by(WarehouseDeliveryRoute.id)
+            .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+        )
+        for route in db.execute(wdr_query):
+            yield {
+                "warehouse_code": route.warehouse_code,
+                "warehouse_name": route.warehouse_name,
+                "delivery_place_code": route.delivery_place_code,
+                "delivery_place_name": route.delivery_place_name,
+                "product_name": route.display_name,
+                "maker_part_no": route.maker_part_no,
+                "transport_lead_time_days": route.transport_lead_time_days,
+                "notes": route.notes,
+            }
+        return
 
     if target == "customer_item_delivery_settings":
-        from app.application.services.masters.customer_item_delivery_setting_service import (
-            CustomerItemDeliverySettingService,
+        from app.presentation.schemas.masters.customer_item_delivery_setting_schema import (
+            CustomerItemDeliverySettingResponse,
         )
 
-        cids_service = CustomerItemDeliverySettingService(db)
-        cids_list = cids_service.list_all()
-        # Convert to dicts
-        data = [setting.model_dump() for setting in cids_list]
-        return data, "customer_item_delivery_settings"
+        cids_query = (
+            select(CustomerItemDeliverySetting)
+            .options(joinedload(CustomerItemDeliverySetting.delivery_place))
+            .order_by(CustomerItemDeliverySetting.id)
+        )
+        for setting in _iter_models(db, cids_query):
+            yield CustomerItemDeliverySettingResponse.model_validate(setting).model_dump()
+        return
 
     if target == "users":
-        from app.application.services.auth.user_service import UserService
-
-        user_service = UserService(db)
-        users = user_service.get_all(limit=10000)
         from app.presentation.schemas.system.users_schema import SystemUserResponse
 
-        user_data = [SystemUserResponse.model_validate(u).model_dump() for u in users]
-        return user_data, "users"
+        for u in _iter_models(db, select(User).where(User.is_active).order_by(User.id)):
+            yield SystemUserResponse.model_validate(u).model_dump()
+        return
 
     if target == "lot_receipts":
-        from app.presentation.schemas.inventory.inventory_schema import LotResponse
-
-        lot_service = LotService(db)
-        lot_list = lot_service.get_all(limit=10000)
-        data = [LotResponse.model_validate(l).model_dump() for l in lot_list]
-        # Ensure we return objects that pandas can handle nicely via ExportService._prepare_data
-        return data, "lot_receipts"
+        for lot in LotService(db).iter_all(EXPORT_CHUNK_SIZE):
+            yield lot.model_dump()
+        return
 
     if target == "orders":
-        from app.presentation.schemas.orders.orders_schema import OrderLineResponse
-
-        order_service = OrderService(db)
-        order_list = order_service.get_all(limit=10000)
-        data = [OrderLineResponse.model_validate(o).model_dump() for o in order_list]
-        return data, "orders"
+        for line in OrderService(db).iter_all_lines(EXPORT_CHUNK_SIZE):
+            yield line.model_dump()
+        return
 
     if target == "forecasts":
         from app.presentation.schemas.forecasts.forecast_schema import ForecastResponse
 
-        forecast_service = ForecastService(db)
-        forecast_list = forecast_service.get_all(limit=10000)
-        data = [ForecastResponse.model_validate(f).model_dump() for f in forecast_list]
-        return data, "forecasts"
+        forecast_query = (
+            select(ForecastCurrent)
+            .options(
+                joinedload(ForecastCurrent.customer),
+                joinedload(ForecastCurrent.delivery_place),
+                joinedload(ForecastCurrent.supplier_item),
+            )
+            .order_by(ForecastCurrent.id)
+        )
+        for f in _iter_models(db, forecast_query):
+            yield ForecastResponse.model_validate(f).model_dump()
+        return
 
     raise ValueError(f"Unknown export target: {target}")
 
@@ -325,66 +321,20 @@ def download_bulk_export(
             detail="User export is strictly limited to administrators",
         )
 
-    # Create ZIP in memory
-    zip_buffer = io.BytesIO()
-
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-        for target in targets:
-            data, filename = _get_export_data(db, target)
-
-            if not data:
-                continue
-
-            # Generate file content
-            if format == "xlsx":
-                file_content = _generate_excel_bytes(data)
-                file_ext = "xlsx"
-            else:
-                file_content = _generate_csv_bytes(data)
-                file_ext = "csv"
-
-            zip_file.writestr(f"{filename}.{file_ext}", file_content)
-
-    zip_buffer.seek(0)
-
     return StreamingResponse(
-        iter([zip_buffer.getvalue()]),
+        _stream_bulk_export(db, targets, format),
         media_type="application/zip",
         headers={"Content-Disposition": "attachment; filename=bulk_export.zip"},
     )
 
 
-def _generate_excel_bytes(data: list[dict[str, Any]]) -> bytes:
-    """Generate Excel file bytes from data."""
-    try:
-        import pandas as pd
-    except ImportError:
-        raise ImportError("pandas is required for export")
-
-    df = pd.DataFrame(data)
-
-    # Convert timezone-aware datetimes to timezone-naive for Excel compatibility
-    for col in df.columns:
-        # Check if column is datetime-like
-        if pd.api.types.is_datetime64_any_dtype(df[col]):
-            # If it has timezone info, strip it (keep wall time)
-            if df[col].dt.tz is not None:
-                df[col] = df[col].dt.tz_localize(None)
-
-    buffer = io.BytesIO()
-    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False, sheet_name="Sheet1")
-    return buffer.getvalue()
-
-
-def _generate_csv_bytes(data: list[dict[str, Any]]) -> bytes:
-    """Generate CSV file bytes from data."""
-    try:
-        import pandas as pd
-    except ImportError:
-        raise ImportError("pandas is required for export")
-
-    df = pd.DataFrame(data)
-    buffer = io.StringIO()
-    df.to_csv(buffer, index=False, encoding="utf-8-sig")
-    return buffer.getvalue().encode("utf-8-sig")
+def _stream_bulk_export(db: Session, targets: list[str], format: str) -> Iterator[bytes]:
+    """Yield the ZIP archive chunk by chunk (rows are never held all at once)."""
+    export = StreamingZipExport()
+    for target in targets:
+        rows = _iter_export_rows(db, target)
+        if format == "xlsx":
+            yield from export.add_xlsx(f"{target}.xlsx", rows)
+        else:
+            yield from export.add_csv(f"{target}.csv", rows)
+    yield from export.close()
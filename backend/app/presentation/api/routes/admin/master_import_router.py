@@ -7,19 +7,31 @@ JSON, YAML, or Excel files.
 from __future__ import annotations
 
 import logging
+import shutil
+import uuid
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from sqlalchemy.orm import Session
 
+from app.application.services.execution_queue_service import ExecutionQueueService
+from app.application.services.jobs import MASTER_IMPORT
 from app.application.services.master_import.file_handlers import (
     FileParseError,
+    ImportRowReader,
     UnsupportedFileFormatError,
-    parse_import_file,
+    validate_import_filename,
 )
 from app.application.services.master_import.import_service import MasterImportService
+from app.core.config import settings
+from app.infrastructure.persistence.models import User
 from app.presentation.api.deps import get_db
-from app.presentation.schemas.import_schema import MasterImportRequest, MasterImportResponse
+from app.presentation.api.routes.auth.auth_router import get_current_user
+from app.presentation.schemas.import_schema import (
+    MasterImportJobResponse,
+    MasterImportRequest,
+    MasterImportResponse,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -28,7 +40,7 @@ router = APIRouter(prefix="/master-import", tags=["Master Import"])
 
 
 @router.post("/upload", response_model=MasterImportResponse)
-async def import_from_file(
+def import_from_file(
     file: Annotated[UploadFile, File(description="Import file (.xlsx, .json, .yaml, .yml)")],
     dry_run: bool = False,
     db: Session = Depends(get_db),
@@ -36,12 +48,15 @@ async def import_from_file(
     """Import master data from uploaded file.
 
     Supported formats:
-    - Excel (.xlsx) with 'suppliers' and/or 'customers' sheets
+    - Excel (.xlsx) with 'suppliers', 'customers' and/or 'product_mappings' sheets
     - JSON (.json)
     - YAML (.yaml, .yml)
 
     CSV is NOT supported and will return an error.
 
+    ファイルは行単位で読み込み、チャンクごとに取り込む。
+    大きなファイルは POST /upload/async でジョブワーカーに回す。
+
     Args:
         file: Upload file
         dry_run: If true, validate only without committing
@@ -51,15 +66,61 @@ async def import_from_file(
         Import result with status and details per table
     """
     try:
-        request = await parse_import_file(file)
-        request.dry_run = dry_run
-    except UnsupportedFileFormatError as e:
+        reader = ImportRowReader(file.filename, file.file)
+    except (UnsupportedFileFormatError, FileParseError) as e:
         raise HTTPException(status_code=400, detail=str(e))
-    except FileParseError as e:
+
+    with reader:
+        return MasterImportService(db).import_rows(
+            reader, dry_run=dry_run, total_rows=reader.total_rows
+        )
+
+
+@router.post("/upload/async", response_model=MasterImportJobResponse, status_code=202)
+def enqueue_import_from_file(
+    file: Annotated[UploadFile, File(description="Import file (.xlsx, .json, .yaml, .yml)")],
+    dry_run: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> MasterImportJobResponse:
+    """Queue a master import for the job worker.
+
+    アップロードファイルを UPLOAD_DIR/master_import に保存し、
+    execution_queue 経由でジョブワーカーに取込を依頼する。
+    ワーカーはこのパスからファイルを読むため、API とワーカーが別ホスト・
+    別コンテナの場合は UPLOAD_DIR を共有ストレージ（共有ボリューム等）にすること。
+    ファイルは取込完了・失敗・キャンセル時に削除される。
+    進捗と結果（MasterImportResponse の JSON）は
+    GET /execution-queue/{queue_id} で確認できる。
+    """
+    try:
+        ext = validate_import_filename(file.filename)
+    except (UnsupportedFileFormatError, FileParseError) as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    service = MasterImportService(db)
-    return service.execute_import(request)
+    upload_dir = settings.UPLOAD_DIR / "master_import"
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    path = upload_dir / f"{uuid.uuid4().hex}{ext}"
+    with path.open("wb") as stream:
+        shutil.copyfileobj(file.file, stream)
+
+    queued = ExecutionQueueService(db).enqueue(
+        resource_type=MASTER_IMPORT,
+        resource_id=path.stem,
+        user_id=current_user.id,
+        parameters={"path": str(path), "filename": file.filename, "dry_run": dry_run},
+        timeout_seconds=3600,  # 大容量ファイルを想定
+        executor="worker",
+    )
+    logger.info(
+        "Master import queued",
+        extra={"queue_id": queued.queue_entry.id, "upload_file": path.name},
+    )
+    return MasterImportJobResponse(
+        queue_id=queued.queue_entry.id,
+        status=queued.status,
+        message=f"マスタ取込をキューに登録しました ({file.filename})",
+    )
 
 
 @router.post("/json", response_model=MasterImportResponse)
@@ -199,6 +199,7 @@ def _map_fefo_preview(result) -> FefoPreviewResponse:
         order_id=result.order_id,
         lines=lines,
         warnings=result.warnings,
+        timings=result.timings,
     )
 
 
@@ -500,7 +501,7 @@ def bulk_cancel(
 
 
 @router.post("/bulk-auto-allocate", response_model=BulkAutoAllocateResponse)
-async def bulk_auto_allocate(
+def bulk_auto_allocate(
     request: BulkAutoAllocateRequest,
     db: Session = Depends(get_db),
     current_user: User | None = Depends(get_current_user_optional),
@@ -516,6 +517,7 @@ async def bulk_auto_allocate(
             "customer_id": request.customer_id,
             "delivery_place_id": request.delivery_place_id,
             "order_type": request.order_type,
+            "set_based": request.set_based,
         },
     )
     try:
@@ -526,6 +528,7 @@ async def bulk_auto_allocate(
             delivery_place_id=request.delivery_place_id,
             order_type=request.order_type,
             skip_already_reserved=request.skip_already_allocated,
+            set_based=request.set_based,
         )
         # Helper string construction moved to logic or kept here if simple
         # result keys: processed_lines, reserved_lines, total_reservations, skipped_lines, failed_lines
@@ -3,8 +3,9 @@ from datetime import UTC, datetime, timedelta
 
 from fastapi import APIRouter, Cookie, Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
+from app.application.services.auth.user_principal_cache import user_principal_cache
 from app.core.config import settings
 from app.core.database import get_db
 from app.core.security import (
@@ -13,7 +14,7 @@ from app.core.security import (
     decode_access_token,
     decode_refresh_token,
 )
-from app.infrastructure.persistence.models.auth_models import User
+from app.infrastructure.persistence.models.auth_models import User, UserRole
 from app.presentation.schemas.auth.auth_schemas import AuthUserResponse, LoginRequest, TokenResponse
 
 
@@ -91,7 +92,20 @@ def get_current_user_optional(
     user_id = payload.get("sub")
     if user_id is None:
         return None
-    return db.query(User).filter(User.id == int(user_id)).first()
+    token_version = str(payload.get("exp", ""))
+    cached = user_principal_cache.get(db, int(user_id), token_version)
+    if cached is not None:
+        return cached
+
+    user = (
+        db.query(User)
+        .options(joinedload(User.user_roles).joinedload(UserRole.role))
+        .filter(User.id == int(user_id))
+        .first()
+    )
+    if user is not None:
+        user_principal_cache.put(user, token_version)
+    return user
 
 
 def get_current_user(
@@ -533,6 +547,11 @@ def logout(
     refresh_token: str | None = Cookie(default=None, alias=REFRESH_TOKEN_COOKIE_NAME),
 ):
     """Clear refresh token cookie."""
+    payload = decode_refresh_token(refresh_token) if refresh_token else None
+    user_id = payload.get("sub") if payload else None
+    if user_id is not None and str(user_id).isdigit():
+        user_principal_cache.invalidate_user(int(user_id))
+
     client_ip = http_request.client.host if http_request.client else None
     user_agent = http_request.headers.get("user-agent")
     logger.info(
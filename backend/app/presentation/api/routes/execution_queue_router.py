@@ -63,6 +63,19 @@ def get_my_tasks(
     return [QueueEntryResponse.model_validate(t) for t in tasks]
 
 
+@router.get("/{queue_id}", response_model=QueueEntryResponse)
+def get_task(
+    queue_id: int,
+    _current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_db)],
+):
+    """Get a single task including its progress (progress / progress_message)."""
+    task = ExecutionQueueService(db).get_entry(queue_id)
+    if task is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    return QueueEntryResponse.model_validate(task)
+
+
 @router.delete("/{queue_id}", status_code=status.HTTP_204_NO_CONTENT)
 def cancel_task(
     queue_id: int,
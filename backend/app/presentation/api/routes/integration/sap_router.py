@@ -93,7 +93,7 @@ async def register_sales_orders(
 
 
 @router.get("/connections", response_model=list[SapConnectionResponse])
-async def list_connections(
+def list_connections(
     db: Annotated[Session, Depends(get_db)],
     active_only: bool = Query(True, description="アクティブな接続のみ"),
 ) -> list[SapConnectionResponse]:
@@ -110,7 +110,7 @@ async def list_connections(
 
 
 @router.post("/connections", response_model=SapConnectionResponse)
-async def create_connection(
+def create_connection(
     request: SapConnectionCreateRequest,
     db: Annotated[Session, Depends(get_db)],
 ) -> SapConnectionResponse:
@@ -157,7 +157,7 @@ async def create_connection(
 
 
 @router.put("/connections/{connection_id}", response_model=SapConnectionResponse)
-async def update_connection(
+def update_connection(
     connection_id: int,
     request: SapConnectionUpdateRequest,
     db: Annotated[Session, Depends(get_db)],
@@ -202,7 +202,7 @@ async def update_connection(
 
 
 @router.delete("/connections/{connection_id}")
-async def delete_connection(
+def delete_connection(
     connection_id: int,
     db: Annotated[Session, Depends(get_db)],
 ) -> dict[str, str]:
@@ -220,7 +220,7 @@ async def delete_connection(
 
 
 @router.post("/connections/{connection_id}/test", response_model=SapConnectionTestResponse)
-async def test_connection(
+def test_connection(
     connection_id: int,
     db: Annotated[Session, Depends(get_db)],
 ) -> SapConnectionTestResponse:
@@ -316,7 +316,7 @@ async def test_connection(
 
 
 @router.post("/materials/fetch", response_model=SapMaterialFetchResponse)
-async def fetch_materials(
+def fetch_materials(
     request: SapMaterialFetchRequest,
     db: Annotated[Session, Depends(get_db)],
 ) -> SapMaterialFetchResponse:
@@ -378,7 +378,7 @@ async def fetch_materials(
 
 
 @router.get("/materials/cache", response_model=list[SapMaterialCacheResponse])
-async def list_cached_materials(
+def list_cached_materials(
     db: Annotated[Session, Depends(get_db)],
     connection_id: int | None = Query(None, description="接続ID"),
     kunnr: str | None = Query(None, description="得意先コード"),
@@ -392,7 +392,7 @@ async def list_cached_materials(
 
 
 @router.get("/cache", response_model=SapCacheListResponse)
-async def get_sap_cache(
+def get_sap_cache(
     db: Annotated[Session, Depends(get_db)],
     connection_id: int | None = Query(None, description="接続ID"),
     kunnr: str | None = Query(None, description="得意先コード"),
@@ -457,7 +457,7 @@ async def get_sap_cache(
 
 
 @router.delete("/materials/cache")
-async def clear_cache(
+def clear_cache(
     db: Annotated[Session, Depends(get_db)],
     connection_id: int | None = Query(None, description="接続ID"),
     kunnr: str | None = Query(None, description="得意先コード"),
@@ -477,7 +477,7 @@ async def clear_cache(
 
 
 @router.post("/reconcile", response_model=SapReconcileSummaryResponse)
-async def reconcile_ocr_results(
+def reconcile_ocr_results(
     request: SapReconcileRequest,
     db: Annotated[Session, Depends(get_db)],
 ) -> SapReconcileSummaryResponse:
@@ -528,7 +528,7 @@ async def reconcile_ocr_results(
 
 
 @router.post("/reconcile/single", response_model=SapReconcileResultResponse)
-async def reconcile_single(
+def reconcile_single(
     db: Annotated[Session, Depends(get_db)],
     material_code: str = Query(..., description="材質コード"),
     jiku_code: str | None = Query(None, description="次区"),
@@ -564,7 +564,7 @@ async def reconcile_single(
 
 
 @router.get("/logs", response_model=list[SapFetchLogResponse])
-async def list_fetch_logs(
+def list_fetch_logs(
     db: Annotated[Session, Depends(get_db)],
     connection_id: int | None = Query(None, description="接続ID"),
     limit: int = Query(50, description="取得件数上限"),
@@ -143,6 +143,7 @@ from app.application.services.assignments.assignment_service import UserSupplier
 from app.application.services.common.export_service import ExportService
 from app.application.services.inventory.lot_service import LotService
 from app.core.database import get_db
+from app.infrastructure.monitoring.sql_profiler import sql_budget
 from app.infrastructure.persistence.models.auth_models import User
 from app.presentation.api.routes.auth.auth_router import (
     get_current_user,
@@ -286,6 +287,7 @@ def export_lots(
 
 
 @router.get("", response_model=list[LotResponse])
+@sql_budget(max_queries=8, max_repeats=3)
 def list_lots(
     skip: int = 0,
     limit: int = 100,
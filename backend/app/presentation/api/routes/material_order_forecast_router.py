@@ -38,7 +38,7 @@ maker_router = APIRouter(prefix="/api/makers", tags=["makers"])
 
 
 @router.post("/import", response_model=MaterialOrderForecastImportResponse)
-async def import_forecast_csv(
+def import_forecast_csv(
     file: Annotated[UploadFile, File(description="CSV file (ヘッダーなし)")],
     target_month: Annotated[str | None, Form()] = None,
     db: Session = Depends(get_db),
@@ -2,6 +2,11 @@
 
 v_ocr_resultsビューから直接データを取得し、
 SmartRead縦持ちデータと出荷用マスタをJOINした結果を返す。
+
+全エンドポイントが同期 Session と同期サービス（SAP照合・営業日計算）を使うため
+def で定義し、FastAPI のスレッドプールで実行する（イベントループをブロックしない）。
+SAP照合の load_sap_cache はキャッシュ期限切れ時に SAP RFC を同期実行するため、
+AsyncSession.run_sync（ループ上で実行される）には載せない。
 """
 
 import logging
@@ -342,8 +347,60 @@ def build_shipping_slip_text(
     return result
 
 
+def _apply_sap_reconciliation(sap_service: SapReconciliationService, item: OcrResultItem) -> None:
+    """SAP照合結果を OcrResultItem に反映する."""
+    sap_result = sap_service.reconcile_single(
+        material_code=item.material_code or "",
+        jiku_code=item.jiku_code or "",
+        customer_code=item.customer_code or "100427105",
+    )
+
+    # 照合結果を追加
+    item.sap_match_type = sap_result.sap_match_type.value if sap_result.sap_match_type else None
+    item.sap_matched_zkdmat_b = sap_result.sap_matched_zkdmat_b
+
+    # SAP raw_dataから情報を抽出
+    if sap_result.sap_raw_data:
+        item.sap_supplier_code = sap_result.sap_raw_data.get("ZLIFNR_H")
+        item.sap_qty_unit = sap_result.sap_raw_data.get("MEINS")
+        item.sap_maker_item = sap_result.sap_raw_data.get("ZMKMAT_B")
+
+        # 仕入先名は既にマスタから取得されている場合があるので、
+        # SAP仕入先コードがある場合のみ追加情報として保持
+        # (仕入先名の取得はフロントエンドで行うか、別途マスタから取得可能)
+
+
+def _enrich_ocr_items(db: Session, items: list[OcrResultItem]) -> None:
+    """SAP照合と出荷日の自動計算."""
+    sap_service = SapReconciliationService(db)
+    sap_service.load_sap_cache(kunnr="100427105")  # デフォルト得意先
+
+    for item in items:
+        if item.material_code:
+            _apply_sap_reconciliation(sap_service, item)
+
+        # 出荷日の自動計算（transport_lt_daysとdelivery_dateがある場合）
+        if item.transport_lt_days and item.delivery_date:
+            try:
+                # 納期をdate型に変換
+                delivery_date_obj = datetime.strptime(item.delivery_date, "%Y-%m-%d").date()
+
+                # CalendarServiceで営業日計算
+                calendar_service = CalendarService(db)
+                request = BusinessDayCalculationRequest(
+                    start_date=delivery_date_obj,
+                    days=item.transport_lt_days,
+                    direction="before",
+                    include_start=False,
+                )
+                item.calculated_shipping_date = calendar_service.calculate_business_day(request)
+            except (ValueError, Exception):
+                # 日付フォーマットエラーや計算エラーは無視
+                pass
+
+
 @router.get("", response_model=OcrResultListResponse)
-async def list_ocr_results(
+def list_ocr_results(
     task_date: Annotated[str | None, Query(description="タスク日付 (YYYY-MM-DD)")] = None,
     status: Annotated[str | None, Query(description="ステータスでフィルタ")] = None,
     has_error: Annotated[bool | None, Query(description="エラーのみ表示")] = None,
@@ -413,53 +470,9 @@ async def list_ocr_results(
 
     items = [OcrResultItem.model_validate(dict(row)) for row in rows]
 
-    # SAP照合処理を追加
-    sap_service = SapReconciliationService(db)
-    sap_service.load_sap_cache(kunnr="100427105")  # デフォルト得意先
-
-    for item in items:
-        if item.material_code:
-            # SAP照合を実行
-            sap_result = sap_service.reconcile_single(
-                material_code=item.material_code,
-                jiku_code=item.jiku_code or "",
-                customer_code=item.customer_code or "100427105",
-            )
-
-            # 照合結果を追加
-            item.sap_match_type = (
-                sap_result.sap_match_type.value if sap_result.sap_match_type else None
-            )
-            item.sap_matched_zkdmat_b = sap_result.sap_matched_zkdmat_b
-
-            # SAP raw_dataから情報を抽出
-            if sap_result.sap_raw_data:
-                item.sap_supplier_code = sap_result.sap_raw_data.get("ZLIFNR_H")
-                item.sap_qty_unit = sap_result.sap_raw_data.get("MEINS")
-                item.sap_maker_item = sap_result.sap_raw_data.get("ZMKMAT_B")
-
-                # 仕入先名は既にマスタから取得されている場合があるので、
-                # SAP仕入先コードがある場合のみ追加情報として保持
-                # (仕入先名の取得はフロントエンドで行うか、別途マスタから取得可能)
-
-        # 出荷日の自動計算（transport_lt_daysとdelivery_dateがある場合）
-        if item.transport_lt_days and item.delivery_date:
-            try:
-                # 納期をdate型に変換
-                delivery_date_obj = datetime.strptime(item.delivery_date, "%Y-%m-%d").date()
-
-                # CalendarServiceで営業日計算
-                calendar_service = CalendarService(db)
-                request = BusinessDayCalculationRequest(
-                    start_date=delivery_date_obj,
-                    days=item.transport_lt_days,
-                    direction="before",
-                    include_start=False,
-                )
-                item.calculated_shipping_date = calendar_service.calculate_business_day(request)
-            except (ValueError, Exception):
-                # 日付フォーマットエラーや計算エラーは無視
-                pass
+    # SAP照合・出荷日計算
+    if items:
+        _enrich_ocr_items(db, items)
 
     logger.info(
         "OCR results fetched",
@@ -469,7 +482,7 @@ async def list_ocr_results(
 
 
 @router.get("/completed", response_model=OcrResultListResponse)
-async def list_completed_ocr_results(
+def list_completed_ocr_results(
     task_date: Annotated[str | None, Query(description="タスク日付 (YYYY-MM-DD)")] = None,
     limit: Annotated[int, Query(ge=1, le=1000)] = 100,
     offset: Annotated[int, Query(ge=0)] = 0,
@@ -582,7 +595,7 @@ async def list_completed_ocr_results(
 
 
 @router.post("/complete", status_code=204)
-async def complete_ocr_items(
+def complete_ocr_items(
     request: SmartReadCompletionRequest,
     db: Session = Depends(get_db),
     _current_user: User = Depends(get_current_user),
@@ -599,7 +612,7 @@ async def complete_ocr_items(
 
 
 @router.post("/restore", status_code=204)
-async def restore_ocr_items(
+def restore_ocr_items(
     request: SmartReadCompletionRequest,
     db: Session = Depends(get_db),
     _current_user: User = Depends(get_current_user),
@@ -616,7 +629,7 @@ async def restore_ocr_items(
 
 
 @router.get("/export/download")
-async def export_ocr_results(
+def export_ocr_results(
     task_date: Annotated[str | None, Query(description="タスク日付 (YYYY-MM-DD)")] = None,
     status: Annotated[str | None, Query(description="ステータスでフィルタ")] = None,
     has_error: Annotated[bool | None, Query(description="エラーのみ表示")] = None,
@@ -851,7 +864,7 @@ async def export_ocr_results(
 
 
 @router.get("/{item_id}", response_model=OcrResultItem)
-async def get_ocr_result(
+def get_ocr_result(
     item_id: int,
     db: Session = Depends(get_db),
     _current_user: User = Depends(get_current_user),
@@ -877,26 +890,13 @@ async def get_ocr_result(
     if item.material_code:
         sap_service = SapReconciliationService(db)
         sap_service.load_sap_cache(kunnr="100427105")
-
-        sap_result = sap_service.reconcile_single(
-            material_code=item.material_code,
-            jiku_code=item.jiku_code or "",
-            customer_code=item.customer_code or "100427105",
-        )
-
-        item.sap_match_type = sap_result.sap_match_type.value if sap_result.sap_match_type else None
-        item.sap_matched_zkdmat_b = sap_result.sap_matched_zkdmat_b
-
-        if sap_result.sap_raw_data:
-            item.sap_supplier_code = sap_result.sap_raw_data.get("ZLIFNR_H")
-            item.sap_qty_unit = sap_result.sap_raw_data.get("MEINS")
-            item.sap_maker_item = sap_result.sap_raw_data.get("ZMKMAT_B")
+        _apply_sap_reconciliation(sap_service, item)
 
     return item
 
 
 @router.post("/{item_id}/edit", response_model=OcrResultEditResponse)
-async def save_ocr_result_edit(
+def save_ocr_result_edit(
     item_id: int,
     request: OcrResultEditRequest,
     db: Session = Depends(get_db),
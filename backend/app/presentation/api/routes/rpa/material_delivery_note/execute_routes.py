@@ -26,7 +26,7 @@ logger = logging.getLogger(__name__)
     response_model=MaterialDeliveryNoteExecuteResponse,
     status_code=status.HTTP_200_OK,
 )
-async def execute_material_delivery_note(
+def execute_material_delivery_note(
     request: MaterialDeliveryNoteExecuteRequest,
     background_tasks: BackgroundTasks,
     current_user: User | None = Depends(get_current_user_optional),
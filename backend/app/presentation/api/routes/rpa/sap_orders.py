@@ -31,7 +31,7 @@ logger = logging.getLogger(__name__)
 
 
 @router.post("/start", response_model=RpaOrderStartResponse)
-async def start_rpa_job(
+def start_rpa_job(
     request: RpaOrderStartRequest,
     db: Session = Depends(get_db),
     _current_user: User = Depends(get_current_user),
@@ -84,7 +84,7 @@ async def start_rpa_job(
 
 
 @router.post("/checkout", response_model=RpaOrderCheckoutResponse)
-async def checkout_rpa_job(
+def checkout_rpa_job(
     request: RpaOrderCheckoutRequest,
     db: Session = Depends(get_db),
     _current_user: User = Depends(get_current_user),
@@ -164,7 +164,7 @@ async def checkout_rpa_job(
 
 
 @router.post("/verify", response_model=RpaOrderVerifyResponse)
-async def verify_rpa_job(
+def verify_rpa_job(
     request: RpaOrderVerifyRequest,
     db: Session = Depends(get_db),
     _current_user: User = Depends(get_current_user),
@@ -202,7 +202,7 @@ async def verify_rpa_job(
 
 
 @router.post("/result", response_model=RpaOrderResultResponse)
-async def result_rpa_job(
+def result_rpa_job(
     request: RpaOrderResultRequest,
     db: Session = Depends(get_db),
     _current_user: User = Depends(get_current_user),
@@ -1,4 +1,9 @@
-"""SmartRead OCR router - PDFインポートAPI."""
+"""SmartRead OCR router - PDFインポートAPI.
+
+外部 SmartRead API を await しないルートは def で定義し、FastAPI のスレッドプールで
+実行する。await するルートでも、同期 Session を使う前後の処理（設定取得・スキップ判定・
+取込・コミット）は run_in_threadpool で実行し、イベントループをブロックしない。
+"""
 
 import asyncio
 import logging
@@ -19,9 +24,11 @@ from fastapi import (
 )
 from fastapi.responses import JSONResponse, Response
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.application.services.common.uow_service import UnitOfWork
 from app.application.services.execution_queue_service import ExecutionQueueService
+from app.application.services.jobs import SMARTREAD_PAD_RUN
 from app.application.services.smartread import SmartReadService
 from app.infrastructure.persistence.models import User
 from app.infrastructure.persistence.models.execution_queue_model import ExecutionQueue
@@ -276,7 +283,7 @@ async def analyze_file(
 
 
 @router.post("/analyze-simple")
-async def analyze_file_simple(
+def analyze_file_simple(
     file: Annotated[UploadFile, File(description="解析するファイル（PDF, PNG, JPG）")],
     background_tasks: BackgroundTasks,
     config_id: int = Query(..., description="使用する設定のID"),
@@ -291,7 +298,7 @@ async def analyze_file_simple(
     Returns:
         処理開始のレスポンス（task_idを含む）
     """
-    file_content = await file.read()
+    file_content = file.file.read()
     filename = file.filename or "unknown"
     logger.info(
         "Starting simple analyze in background",
@@ -595,7 +602,7 @@ async def get_tasks(
     assert uow.session is not None
     service = SmartReadService(uow.session)
     tasks = await service.get_tasks(config_id)
-    uow.session.commit()
+    await run_in_threadpool(uow.session.commit)
     logger.debug("Tasks listed", extra={"config_id": config_id, "count": len(tasks)})
     return SmartReadTaskListResponse(
         tasks=[
@@ -686,7 +693,7 @@ async def get_export_csv(
     service = SmartReadService(uow.session)
 
     # skip_todayチェック
-    if service.should_skip_today(task_id):
+    if await run_in_threadpool(service.should_skip_today, task_id):
         logger.warning("Task skipped today", extra={"task_id": task_id})
         raise HTTPException(
             status_code=403, detail="このタスクは今日スキップする設定になっています"
@@ -713,7 +720,7 @@ async def get_export_csv(
         raise HTTPException(status_code=404, detail="CSVデータの取得に失敗しました")
 
     if save_to_db:
-        uow.session.commit()
+        await run_in_threadpool(uow.session.commit)
 
     return SmartReadCsvDataResponse(
         wide_data=result["wide_data"],
@@ -902,7 +909,7 @@ async def sync_task_results(
             },
         )
 
-    uow.session.commit()
+    await run_in_threadpool(uow.session.commit)
 
     return SmartReadCsvDataResponse(
         wide_data=result["wide_data"],
@@ -922,7 +929,7 @@ async def sync_task_results(
 
 
 @router.post("/tasks/{task_id}/save-long-data", response_model=SmartReadSaveLongDataResponse)
-async def save_long_data(
+def save_long_data(
     task_id: str,
     request: SmartReadSaveLongDataRequest,
     uow: UnitOfWork = Depends(get_uow),
@@ -1220,21 +1227,18 @@ def start_pad_run(
     config_id: int,
     request: SmartReadPadRunStartRequest,
     uow: UnitOfWork = Depends(get_uow),
-    _current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
 ) -> SmartReadPadRunStartResponse:
     """PAD互換フローを開始（バックグラウンド処理）.
 
     監視フォルダ内のファイルを指定してPAD互換フローを開始します。
-    処理はバックグラウンドスレッドで実行され、即座にrun_idを返します。
+    処理はジョブワーカー（execution_queue）で実行され、即座にrun_idを返します。
 
     進捗状況は GET /pad-runs/{run_id} で確認できます。
     """
-    import threading
-
     from app.application.services.smartread.pad_runner_service import (
         SmartReadPadRunnerService,
     )
-    from app.core.database import SessionLocal
 
     assert uow.session is not None
     logger.info(
@@ -1248,33 +1252,21 @@ def start_pad_run(
     uow.session.commit()
     logger.info("PAD run started", extra={"run_id": run_id})
 
-    # バックグラウンドスレッドで実行
-    # Note: daemon=True なのでプロセス終了時にスレッドも終了する
+    # ジョブワーカーで実行（execution_queue 経由。同時実行数は resource_type ごとに制限）
     # heartbeat_at で生存確認し、一定時間更新がなければ STALE として検出する
-    def run_in_background(run_id: str) -> None:
-        import logging
-
-        logger = logging.getLogger(__name__)
-        logger.info(f"[PAD Run BG] Starting background thread for {run_id}")
-        try:
-            with SessionLocal() as session:
-                bg_runner = SmartReadPadRunnerService(session)
-                bg_runner.execute_run(run_id)
-        except Exception as e:
-            logger.exception(f"[PAD Run BG] Background thread failed: {e}")
-
-    thread = threading.Thread(
-        target=run_in_background,
-        args=(run_id,),
-        daemon=True,
-        name=f"pad-run-{run_id[:8]}",
+    queued = ExecutionQueueService(uow.session).enqueue(
+        resource_type=SMARTREAD_PAD_RUN,
+        resource_id=run_id,
+        user_id=current_user.id,
+        parameters={"run_id": run_id, "config_id": config_id},
+        executor="worker",
     )
-    thread.start()
 
     return SmartReadPadRunStartResponse(
         run_id=run_id,
         status="RUNNING",
         message=f"PAD互換フローを開始しました ({len(request.filenames)}ファイル)",
+        queue_id=queued.queue_entry.id,
     )
 
 
@@ -1386,19 +1378,16 @@ def retry_pad_run(
     config_id: int,
     run_id: str,
     uow: UnitOfWork = Depends(get_uow),
-    _current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user),
 ) -> SmartReadPadRunRetryResponse:
     """失敗/Staleの実行をリトライ.
 
     同じ入力ファイルで新しい実行を開始します。
     リトライ回数には上限があります（デフォルト3回）。
     """
-    import threading
-
     from app.application.services.smartread.pad_runner_service import (
         SmartReadPadRunnerService,
     )
-    from app.core.database import SessionLocal
 
     assert uow.session is not None
     runner = SmartReadPadRunnerService(uow.session)
@@ -1446,29 +1435,18 @@ def retry_pad_run(
         extra={"original_run_id": run_id, "new_run_id": new_run_id},
     )
 
-    # バックグラウンドスレッドで実行
-    def run_in_background(new_run_id: str) -> None:
-        import logging
-
-        logger = logging.getLogger(__name__)
-        logger.info(f"[PAD Run BG] Starting retry thread for {new_run_id}")
-        try:
-            with SessionLocal() as session:
-                bg_runner = SmartReadPadRunnerService(session)
-                bg_runner.execute_run(new_run_id)
-        except Exception as e:
-            logger.exception(f"[PAD Run BG] Retry thread failed: {e}")
-
-    thread = threading.Thread(
-        target=run_in_background,
-        args=(new_run_id,),
-        daemon=True,
-        name=f"pad-run-retry-{new_run_id[:8]}",
+    # ジョブワーカーで実行
+    queued = ExecutionQueueService(uow.session).enqueue(
+        resource_type=SMARTREAD_PAD_RUN,
+        resource_id=new_run_id,
+        user_id=current_user.id,
+        parameters={"run_id": new_run_id, "config_id": config_id},
+        executor="worker",
     )
-    thread.start()
 
     return SmartReadPadRunRetryResponse(
         new_run_id=new_run_id,
         original_run_id=run_id,
         message="リトライを開始しました",
+        queue_id=queued.queue_entry.id,
     )
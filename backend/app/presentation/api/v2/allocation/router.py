@@ -68,7 +68,10 @@ def _to_preview_response(service_result) -> FefoPreviewResponse:
             )
         )
     return FefoPreviewResponse(
-        order_id=service_result.order_id, lines=lines, warnings=service_result.warnings
+        order_id=service_result.order_id,
+        lines=lines,
+        warnings=service_result.warnings,
+        timings=service_result.timings,
     )
 
 
@@ -46,6 +46,17 @@ async def list_inventory(
         description="Grouping mode: 'supplier_product_warehouse' (default) or 'product_warehouse'",
     ),
     assigned_staff_only: bool = Query(default=False),
+    cursor: str | None = Query(
+        None, description="Keyset cursor (next_cursor of the previous page); skip is ignored"
+    ),
+    total_mode: str = Query(
+        default="auto",
+        pattern="^(auto|exact|estimate)$",
+        description=(
+            "'auto' counts all groups except on cursor pages (estimate), "
+            "'exact' always counts, 'estimate' uses the planner row estimate"
+        ),
+    ),
     current_user: User | None = Depends(get_current_user_optional),
     db: Session = Depends(get_db),
 ):
@@ -54,17 +65,22 @@ async def list_inventory(
 
     service = InventoryService(db)
     supplier_item_id = supplier_item_id or product_group_id
-    return service.get_inventory_items(
-        skip=skip,
-        limit=limit,
-        supplier_item_id=supplier_item_id,
-        warehouse_id=warehouse_id,
-        supplier_id=supplier_id,
-        tab=tab,
-        group_by=group_by,
-        assigned_staff_only=assigned_staff_only,
-        current_user_id=current_user.id if current_user else None,
-    )
+    try:
+        return service.get_inventory_items(
+            skip=skip,
+            limit=limit,
+            supplier_item_id=supplier_item_id,
+            warehouse_id=warehouse_id,
+            supplier_id=supplier_id,
+            tab=tab,
+            group_by=group_by,
+            assigned_staff_only=assigned_staff_only,
+            current_user_id=current_user.id if current_user else None,
+            cursor=cursor,
+            total_mode=total_mode,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
 
 
 @router.get("/filter-options", response_model=InventoryFilterOptions)
@@ -57,6 +57,9 @@ class FefoPreviewResponse(BaseSchema):
     order_id: int
     lines: list[FefoLineAllocation] = Field(default_factory=list)
     warnings: list[str] = Field(default_factory=list)
+    timings: dict[str, float] = Field(
+        default_factory=dict, description="フェーズ別処理時間（ミリ秒）"
+    )
 
 
 class FefoCommitResponse(BaseSchema):
@@ -172,6 +175,10 @@ class BulkAutoAllocateRequest(BaseSchema):
     skip_already_allocated: bool = Field(
         default=True, description="既に全量引当済みの明細をスキップ"
     )
+    set_based: bool = Field(
+        default=False,
+        description="セットベースの一括引当エンジンを使用（結果は明細別処理と同一）",
+    )
 
 
 class BulkAutoAllocateFailedLine(BaseSchema):
@@ -17,6 +17,7 @@ class QueueEntryResponse(BaseModel):
     resource_type: str
     resource_id: str
     status: str
+    executor: str = "inline"
     requested_by_user_id: int
     parameters: dict[str, Any]
     priority: int
@@ -27,6 +28,9 @@ class QueueEntryResponse(BaseModel):
     timeout_seconds: int
     result_message: str | None
     error_message: str | None
+    progress: int | None = None
+    progress_message: str | None = None
+    worker_id: str | None = None
     created_at: datetime
 
 
@@ -37,7 +37,7 @@ class SupplierImportRow(BaseSchema):
 
 
 class SupplyDataImport(BaseSchema):
-    """Supply-side import data (suppliers + products + product_suppliers)."""
+    """Supply-side import data (suppliers + their products, stored as supplier_items)."""
 
     suppliers: list[SupplierImportRow] = Field(
         default_factory=list, description="List of suppliers with their products"
@@ -209,3 +209,11 @@ class MasterImportResponse(BaseSchema):
     dry_run: bool = Field(..., description="Whether this was a dry run")
     results: list[ImportResultDetail] = Field(default_factory=list, description="Results per table")
     errors: list[str] = Field(default_factory=list, description="Global errors")
+
+
+class MasterImportJobResponse(BaseSchema):
+    """Queued master import job (progress via GET /execution-queue/{queue_id})."""
+
+    queue_id: int
+    status: str
+    message: str
@@ -367,6 +367,13 @@ class InventoryListResponse(BaseSchema):
     total: int
     page: int
     size: int
+    next_cursor: str | None = Field(
+        None, description="次ページ取得用のキーセットカーソル（最終ページでは null）"
+    )
+    total_is_estimate: bool = Field(
+        False,
+        description="total がプランナー推定値（total_mode=estimate、または auto のカーソルページ）の場合 true",
+    )
 
 
 class InventoryBySupplierResponse(BaseSchema):
@@ -344,6 +344,9 @@ class SmartReadPadRunStartResponse(BaseModel):
     run_id: str = Field(..., description="実行ID (UUID)")
     status: str = Field(default="RUNNING", description="ステータス")
     message: str = Field(default="PAD互換フローを開始しました", description="メッセージ")
+    queue_id: int | None = Field(
+        default=None, description="実行キューID（GET /execution-queue/{queue_id} で進捗取得）"
+    )
 
 
 class SmartReadPadRunStatusResponse(BaseModel):
@@ -393,6 +396,7 @@ class SmartReadPadRunRetryResponse(BaseModel):
     new_run_id: str = Field(..., description="新しい実行ID")
     original_run_id: str = Field(..., description="元の実行ID")
     message: str = Field(default="リトライを開始しました", description="メッセージ")
+    queue_id: int | None = Field(default=None, description="実行キューID")
 
 
 class SmartReadCompletionRequest(BaseModel):